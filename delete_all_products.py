@@ -6,87 +6,69 @@ Run: python delete_all_products.py
 Before running:
 1. Go to WooCommerce > Settings > Advanced > REST API
 2. Add key with Read/Write permissions
-3. Update CONSUMER_KEY and CONSUMER_SECRET below
+3. Export WOO_CONSUMER_KEY and WOO_CONSUMER_SECRET (and WOO_URL if not
+   https://hmoonhydro.com)
+
+IDs are listed with ``_fields=id`` and pages fetched in parallel; deletes go
+through concurrent ``/products/batch`` requests (see scripts/woo_rest.py).
 """
 
-import requests
-from requests.auth import HTTPBasicAuth
-import time
+import sys
+from pathlib import Path
 
-# ============ UPDATE THESE ============
-SITE_URL = "https://hmoonhydro.com"
-CONSUMER_KEY = "ck_XXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXX"  # Your API key
-CONSUMER_SECRET = "cs_XXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXX"  # Your API secret
-# ======================================
+sys.path.insert(0, str(Path(__file__).resolve().parent / "scripts"))
+from woo_rest import client_from_env  # noqa: E402
 
-API_URL = f"{SITE_URL}/wp-json/wc/v3"
-AUTH = HTTPBasicAuth(CONSUMER_KEY, CONSUMER_SECRET)
 
-def get_products(per_page=100):
+def get_products(woo):
     """Get all product IDs"""
     all_ids = []
-    page = 1
-    while True:
-        resp = requests.get(
-            f"{API_URL}/products",
-            auth=AUTH,
-            params={"per_page": per_page, "page": page}
-        )
-        if resp.status_code != 200:
-            print(f"Error: {resp.status_code} - {resp.text}")
-            break
-        products = resp.json()
-        if not products:
-            break
-        all_ids.extend([p["id"] for p in products])
-        print(f"Page {page}: Found {len(products)} products (total: {len(all_ids)})")
-        page += 1
+    for page_no, page in enumerate(woo.iter_pages("products", fields="id"), start=1):
+        all_ids.extend(p["id"] for p in page)
+        print(f"Page {page_no}: Found {len(page)} products (total: {len(all_ids)})")
     return all_ids
 
-def delete_product(product_id):
-    """Delete a single product permanently"""
-    resp = requests.delete(
-        f"{API_URL}/products/{product_id}",
-        auth=AUTH,
-        params={"force": True}  # Permanent delete, skip trash
-    )
-    return resp.status_code == 200
-
-def batch_delete(ids, batch_size=100):
-    """Batch delete products (faster)"""
-    for i in range(0, len(ids), batch_size):
-        batch = ids[i:i+batch_size]
-        resp = requests.post(
-            f"{API_URL}/products/batch",
-            auth=AUTH,
-            json={"delete": batch}
-        )
-        if resp.status_code == 200:
-            print(f"Deleted batch {i//batch_size + 1}: {len(batch)} products")
-        else:
-            print(f"Error in batch: {resp.status_code}")
-        time.sleep(0.5)  # Rate limit
+
+def batch_delete(woo, ids, batch_size=100):
+    """Batch delete products (several batches in flight)"""
+    def report(action, items, body):
+        status = "Error in batch" if "error" in body and action not in body else "Deleted batch"
+        print(f"{status}: {len(items)} products")
+
+    result = woo.batch("products", delete=ids, batch_size=batch_size, on_batch=report)
+    for error in result["errors"][:10]:
+        print(f"  ❌ {error['item']}: {error['error']}")
+    return result
+
 
 def main():
+    try:
+        woo = client_from_env()
+    except RuntimeError as exc:
+        print(f"❌ {exc}")
+        return 1
+
     print("🔍 Fetching all products...")
-    product_ids = get_products()
+    product_ids = get_products(woo)
     print(f"\n📦 Found {len(product_ids)} products to delete")
-    
+
     if not product_ids:
         print("No products to delete!")
-        return
-    
+        return 0
+
     confirm = input(f"\n⚠️  Delete ALL {len(product_ids)} products? (yes/no): ")
     if confirm.lower() != "yes":
         print("Cancelled.")
-        return
-    
+        return 0
+
     print("\n🗑️  Deleting products...")
-    batch_delete(product_ids)
-    
+    batch_delete(woo, product_ids)
+
     # Verify
-    remaining = get_products()
-    print(f"\n✅ Done! Remaining products: {len(remaining)}")
+    remaining = get_products(woo)
+    print(f"\n✅ Done! Remaining products: {len(remaining)} ({woo.stats['requests']} requests)")
+    return 0
+
 
 if __name__ == "__main__":
-    main()
+    raise SystemExit(main())
@@ -0,0 +1,642 @@
+#!/usr/bin/env python3
+"""Local stand-in for the Shopify Admin API and WooCommerce REST API.
+
+Serves the endpoints the sync scripts use from an in-memory catalog, with
+Shopify-style rate limiting and configurable latency, so throughput can be
+measured without touching a live store:
+
+* Shopify REST (``/admin/api/<version>/``): ``products.json`` (``limit``,
+  ``fields``, ``since_id``, ``updated_at_min``, ``page_info`` + ``Link``),
+  ``products/<id>.json``, ``variants.json?sku=``, ``variants/<id>.json``,
+  ``inventory_levels.json``, ``inventory_levels/set.json``,
+  ``locations.json``.  A 40-call bucket leaking 2/s (``--plan plus``:
+  400 / 20/s) is reported in ``X-Shopify-Shop-Api-Call-Limit``; overflow
+  returns 429 + ``Retry-After``.
+* Shopify GraphQL (``graphql.json``): ``productVariants`` (paged or
+  ``sku:`` query), ``products`` (handles), ``productByHandle``,
+  ``productVariantsBulkUpdate``, ``inventorySetQuantities``,
+  ``productUpdate``.  Costs are charged against a 1000-point bucket
+  restoring 50/s (plus: 2000 / 100/s) and reported in
+  ``extensions.cost.throttleStatus``; overflow returns ``THROTTLED``.
+  Bulk operations / staged uploads are not simulated.
+* WooCommerce (``/wp-json/wc/v3/``): ``products`` listing (``page``,
+  ``per_page``, ``_fields``, ``sku``, ``X-WP-Total(Pages)``) and
+  ``products/batch`` (max 100 items).  No rate limit, latency only.
+* Storefront ``/products.json?limit=&page=`` (the public catalog the
+  scrapers crawl): page-numbered, max 250, most recently updated first,
+  with ``ETag`` / ``Last-Modified`` (``If-None-Match`` -> 304); a
+  20-request bucket leaking 4/s per server answers 429 + ``Retry-After``
+  when crawled too fast.
+* ``GET /_sim/stats`` and ``POST /_sim/reset`` expose and clear counters.
+
+Point the scripts at it with ``SHOPIFY_API_BASE_URL=http://127.0.0.1:8765``
+(read by shopify_transport.py) and ``WOO_URL=http://127.0.0.1:8765``.
+
+Usage:
+    python scripts/api_simulator.py --products 2000 --variants 3 --latency-ms 80
+    python scripts/api_simulator.py --plan plus --port 9000
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlencode, urlparse
+
+DEFAULT_PORT = 8765
+LOCATION_ID = 1001
+PLANS = {
+    # plan: (REST bucket size, REST leak/s, GraphQL points, GraphQL restore/s)
+    "standard": (40, 2.0, 1000, 50.0),
+    "plus": (400, 20.0, 2000, 100.0),
+}
+WOO_BATCH_LIMIT = 100
+STOREFRONT_LIMIT = (20, 4.0)  # public /products.json: bucket size, leak/s
+
+
+class Bucket:
+    """Server-side leaky bucket; ``take`` fails instead of waiting."""
+
+    def __init__(self, size: float, leak: float) -> None:
+        self.size = size
+        self.leak = leak
+        self.used = 0.0
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def take(self, amount: float) -> Tuple[bool, float]:
+        """Return (accepted, used after the call)."""
+        with self.lock:
+            now = time.monotonic()
+            self.used = max(0.0, self.used - (now - self.updated) * self.leak)
+            self.updated = now
+            if self.used + amount > self.size:
+                return False, self.used
+            self.used += amount
+            return True, self.used
+
+
+def _gid(kind: str, value: int) -> str:
+    return f"gid://shopify/{kind}/{value}"
+
+
+def _num(gid: object) -> int:
+    return int(str(gid).rsplit("/", 1)[-1])
+
+
+def _cursor(offset: int) -> str:
+    return base64.urlsafe_b64encode(str(offset).encode()).decode()
+
+
+def _offset(cursor: Optional[str]) -> int:
+    return int(base64.urlsafe_b64decode(cursor.encode()).decode()) if cursor else 0
+
+
+class Catalog:
+    """In-memory Shopify + WooCommerce data, guarded by one lock."""
+
+    def __init__(self) -> None:
+        self.lock = threading.RLock()
+        self.products: Dict[int, Dict] = {}
+        self.variants: Dict[int, Dict] = {}
+        self.levels: Dict[Tuple[int, int], int] = {}
+        self.woo: Dict[int, Dict] = {}
+        self.next_id = 1_000_000
+
+    def _new_id(self) -> int:
+        self.next_id += 1
+        return self.next_id
+
+    def seed(self, products: int, variants: int, woo_products: int) -> None:
+        base = datetime(2026, 1, 1, tzinfo=timezone.utc)
+        with self.lock:
+            for p in range(products):
+                stamp = (base + timedelta(minutes=p)).isoformat()
+                self.add_product({
+                    "title": f"Sim Product {p}",
+                    "handle": f"sim-product-{p}",
+                    "vendor": f"Vendor {p % 25}",
+                    "product_type": "Nutrients",
+                    "status": "active",
+                    "tags": "sim",
+                    "body_html": "<p>Simulated</p>",
+                    "created_at": stamp,
+                    "updated_at": stamp,
+                    "options": [{"name": "Size"}],
+                    "variants": [
+                        {"option1": f"Size {v}", "sku": f"SIM-{p}-{v}", "price": "19.99",
+                         "inventory_quantity": 5, "inventory_management": "shopify" if v else None}
+                        for v in range(variants)
+                    ],
+                    "images": [{"src": f"https://example.com/sim/{p}.jpg"}],
+                })
+            for w in range(woo_products):
+                woo_id = self._new_id()
+                self.woo[woo_id] = {"id": woo_id, "name": f"Woo Product {w}", "sku": f"WOO-{w}",
+                                    "status": "publish", "stock_quantity": 3}
+
+    def add_product(self, payload: Dict) -> Dict:
+        with self.lock:
+            product_id = self._new_id()
+            now = datetime.now(timezone.utc).isoformat()
+            product = {k: v for k, v in payload.items() if k not in ("variants", "images")}
+            product.update(id=product_id, created_at=payload.get("created_at", now),
+                           updated_at=payload.get("updated_at", now), variants=[], images=[])
+            for position, raw in enumerate(payload.get("variants") or [{}], start=1):
+                variant_id = self._new_id()
+                variant = {
+                    "id": variant_id, "product_id": product_id, "position": position,
+                    "title": raw.get("option1") or "Default Title", "sku": raw.get("sku"),
+                    "price": raw.get("price", "0.00"), "compare_at_price": raw.get("compare_at_price"),
+                    "barcode": raw.get("barcode"), "option1": raw.get("option1") or "Default Title",
+                    "option2": None, "option3": None, "weight": raw.get("weight", 0),
+                    "weight_unit": raw.get("weight_unit", "lb"), "requires_shipping": True, "taxable": True,
+                    "inventory_management": raw.get("inventory_management"),
+                    "inventory_policy": raw.get("inventory_policy", "deny"),
+                    "inventory_item_id": self._new_id(),
+                    "inventory_quantity": int(raw.get("inventory_quantity") or 0),
+                }
+                self.variants[variant_id] = variant
+                self.levels[(variant["inventory_item_id"], LOCATION_ID)] = variant["inventory_quantity"]
+                product["variants"].append(variant)
+            for position, image in enumerate(payload.get("images") or [], start=1):
+                product["images"].append({"id": self._new_id(), "product_id": product_id,
+                                          "position": position, "src": image.get("src"), "alt": image.get("alt")})
+            self.products[product_id] = product
+            return product
+
+    def delete_product(self, product_id: int) -> bool:
+        with self.lock:
+            product = self.products.pop(product_id, None)
+            if not product:
+                return False
+            for variant in product["variants"]:
+                self.variants.pop(variant["id"], None)
+            return True
+
+    def touch(self, product_id: int) -> None:
+        if product_id in self.products:
+            self.products[product_id]["updated_at"] = datetime.now(timezone.utc).isoformat()
+
+    def set_level(self, inventory_item_id: int, location_id: int, quantity: int) -> bool:
+        with self.lock:
+            for variant in self.variants.values():
+                if variant["inventory_item_id"] == inventory_item_id:
+                    variant["inventory_quantity"] = quantity
+                    self.levels[(inventory_item_id, location_id)] = quantity
+                    self.touch(variant["product_id"])
+                    return True
+            return False
+
+
+class Simulator:
+    """Request counters, rate-limit buckets and latency shared by all handler threads."""
+
+    def __init__(self, catalog: Catalog, plan: str = "standard", latency_ms: float = 50.0,
+                 jitter_ms: float = 20.0) -> None:
+        self.catalog = catalog
+        self.plan = plan
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.stats_lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        rest_size, rest_leak, gql_size, gql_restore = PLANS[self.plan]
+        self.rest_bucket = Bucket(rest_size, rest_leak)
+        self.graphql_bucket = Bucket(gql_size, gql_restore)
+        self.storefront_bucket = Bucket(*STOREFRONT_LIMIT)
+        with self.stats_lock:
+            self.stats = {"requests": 0, "rest": 0, "graphql": 0, "woo": 0, "storefront": 0,
+                          "throttled": 0, "graphql_cost": 0.0, "started": time.time()}
+
+    def count(self, kind: str, throttled: bool = False, cost: float = 0.0) -> None:
+        with self.stats_lock:
+            self.stats["requests"] += 1
+            self.stats[kind] += 1
+            self.stats["graphql_cost"] += cost
+            if throttled:
+                self.stats["throttled"] += 1
+
+    def snapshot(self) -> Dict:
+        with self.stats_lock:
+            data = dict(self.stats)
+        data["elapsed"] = time.time() - data.pop("started")
+        return data
+
+    def delay(self) -> None:
+        if self.latency or self.jitter:
+            time.sleep(max(0.0, self.latency + random.uniform(-self.jitter, self.jitter)))
+
+
+# ── GraphQL ──────────────────────────────────────────────────────────────────
+def _variant_node(variant: Dict) -> Dict:
+    return {
+        "id": _gid("ProductVariant", variant["id"]),
+        "sku": variant.get("sku"),
+        "barcode": variant.get("barcode"),
+        "price": variant.get("price"),
+        "compareAtPrice": variant.get("compare_at_price"),
+        "product": {"id": _gid("Product", variant["product_id"])},
+        "inventoryItem": {
+            "id": _gid("InventoryItem", variant["inventory_item_id"]),
+            "unitCost": {"amount": variant["cost"]} if variant.get("cost") else None,
+            "inventoryLevel": {"quantities": [{"quantity": variant["inventory_quantity"]}]},
+        },
+    }
+
+
+def graphql_cost(query: str, variables: Dict) -> float:
+    """Rough Shopify cost: connections cost 2 + first, mutations 10, lookups 1."""
+    if query.lstrip().startswith("mutation"):
+        return 10.0
+    first = variables.get("first")
+    if first is None:
+        match = re.search(r"first:\s*(\d+)", query)
+        first = int(match.group(1)) if match else 1
+    return 2.0 + float(first) if "edges" in query else 1.0
+
+
+def run_graphql(catalog: Catalog, query: str, variables: Dict) -> Tuple[Dict, Optional[List]]:
+    """Return (data, errors) for the operations the sync scripts send."""
+    with catalog.lock:
+        if "productVariantsBulkUpdate" in query:
+            errors = []
+            product_id = _num(variables["productId"])
+            for index, update in enumerate(variables.get("variants") or []):
+                variant = catalog.variants.get(_num(update.get("id", "0")))
+                if not variant or variant["product_id"] != product_id:
+                    errors.append({"field": ["variants", str(index), "id"], "message": "Variant not found",
+                                   "code": "PRODUCT_VARIANT_DOES_NOT_EXIST"})
+                    continue
+                for src, dst in (("price", "price"), ("compareAtPrice", "compare_at_price"), ("barcode", "barcode")):
+                    if src in update:
+                        variant[dst] = update[src]
+                if "cost" in (update.get("inventoryItem") or {}):
+                    variant["cost"] = update["inventoryItem"]["cost"]
+            catalog.touch(product_id)
+            return {"productVariantsBulkUpdate": {"userErrors": errors}}, None
+
+        if "inventorySetQuantities" in query:
+            errors = []
+            for index, item in enumerate(variables["input"].get("quantities") or []):
+                if not catalog.set_level(_num(item["inventoryItemId"]), _num(item["locationId"]), int(item["quantity"])):
+                    errors.append({"field": ["input", "quantities", str(index), "inventoryItemId"],
+                                   "message": "Inventory item not found", "code": "INVALID_INVENTORY_ITEM"})
+            return {"inventorySetQuantities": {"userErrors": errors}}, None
+
+        if "productUpdate" in query:
+            product = catalog.products.get(_num(variables["input"]["id"]))
+            if product and variables["input"].get("status"):
+                product["status"] = variables["input"]["status"].lower()
+                catalog.touch(product["id"])
+            errors = [] if product else [{"field": ["id"], "message": "Product does not exist"}]
+            return {"productUpdate": {"userErrors": errors}}, None
+
+        if "productByHandle" in query:
+            handle = variables.get("handle")
+            product = next((p for p in catalog.products.values() if p["handle"] == handle), None)
+            node = {"id": _gid("Product", product["id"]), "status": product["status"].upper()} if product else None
+            return {"productByHandle": node}, None
+
+        if "productVariants" in query:
+            search = variables.get("query") or ""
+            variants = sorted(catalog.variants.values(), key=lambda v: v["id"])
+            if search.startswith("sku:"):
+                variants = [v for v in variants if v.get("sku") == search[4:]]
+            first = int(variables.get("first") or 1)
+            start = _offset(variables.get("after"))
+            page = variants[start:start + first]
+            return {"productVariants": {
+                "pageInfo": {"hasNextPage": start + first < len(variants), "endCursor": _cursor(start + len(page))},
+                "edges": [{"node": _variant_node(v)} for v in page],
+            }}, None
+
+        if re.search(r"\bproducts\s*\(", query):
+            products = sorted(catalog.products.values(), key=lambda p: p["id"])
+            first = int(variables.get("first") or 50)
+            start = _offset(variables.get("after"))
+            page = products[start:start + first]
+            return {"products": {
+                "pageInfo": {"hasNextPage": start + first < len(products), "endCursor": _cursor(start + len(page))},
+                "edges": [{"node": {"id": _gid("Product", p["id"]), "handle": p["handle"]}} for p in page],
+            }}, None
+
+    return {}, [{"message": "Operation not supported by api_simulator"}]
+
+
+# ── REST helpers ─────────────────────────────────────────────────────────────
+def _project(record: Dict, fields: Optional[str]) -> Dict:
+    if not fields:
+        return record
+    wanted = [f.strip() for f in fields.split(",") if f.strip()]
+    return {key: record[key] for key in wanted if key in record}
+
+
+class Handler(BaseHTTPRequestHandler):
+    server_version = "api-simulator/1.0"
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real APIs
+
+    @property
+    def sim(self) -> Simulator:
+        return self.server.simulator  # type: ignore[attr-defined]
+
+    def log_message(self, format, *args):  # noqa: A002 - keep the console quiet
+        pass
+
+    # ── response helpers ────────────────────────────────────────────────────
+    def _send(self, status: int, body: object, headers: Optional[Dict[str, str]] = None) -> None:
+        raw = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(raw)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(raw)
+
+    def _body(self) -> Dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return {}
+        try:
+            return json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            return {}
+
+    def _dispatch(self, method: str) -> None:
+        url = urlparse(self.path)
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        body = self._body() if method in ("POST", "PUT") else {}
+        path = url.path
+
+        if path.startswith("/_sim/"):
+            if path == "/_sim/reset" and method == "POST":
+                self.sim.reset()
+            return self._send(200, self.sim.snapshot())
+
+        self.sim.delay()
+        if path.startswith("/wp-json/wc/v3/"):
+            self.sim.count("woo")
+            return self._woo(method, path[len("/wp-json/wc/v3/"):], query, body)
+        if path == "/products.json" and method == "GET":
+            return self._storefront_products(query)
+
+        match = re.match(r"^/admin/api/[^/]+/(.+)$", path)
+        if not match:
+            return self._send(404, {"errors": "Not Found"})
+        resource = match.group(1)
+        if resource == "graphql.json" and method == "POST":
+            return self._graphql(body)
+        return self._rest(method, resource, query, body)
+
+    def do_GET(self):  # noqa: N802
+        self._dispatch("GET")
+
+    def do_POST(self):  # noqa: N802
+        self._dispatch("POST")
+
+    def do_PUT(self):  # noqa: N802
+        self._dispatch("PUT")
+
+    def do_DELETE(self):  # noqa: N802
+        self._dispatch("DELETE")
+
+    # ── Shopify ─────────────────────────────────────────────────────────────
+    def _graphql(self, body: Dict) -> None:
+        query = body.get("query") or ""
+        variables = body.get("variables") or {}
+        cost = graphql_cost(query, variables)
+        bucket = self.sim.graphql_bucket
+        accepted, used = bucket.take(cost)
+        throttle = {"maximumAvailable": bucket.size, "currentlyAvailable": round(bucket.size - used),
+                    "restoreRate": bucket.leak}
+        self.sim.count("graphql", throttled=not accepted, cost=cost if accepted else 0.0)
+        extensions = {"cost": {"requestedQueryCost": cost, "actualQueryCost": cost if accepted else None,
+                               "throttleStatus": throttle}}
+        if not accepted:
+            return self._send(200, {"errors": [{"message": "Throttled", "extensions": {"code": "THROTTLED"}}],
+                                    "extensions": extensions})
+        data, errors = run_graphql(self.sim.catalog, query, variables)
+        payload = {"data": data, "extensions": extensions}
+        if errors:
+            payload["errors"] = errors
+        self._send(200, payload)
+
+    def _rest(self, method: str, resource: str, query: Dict, body: Dict) -> None:
+        bucket = self.sim.rest_bucket
+        accepted, used = bucket.take(1)
+        limit = {"X-Shopify-Shop-Api-Call-Limit": f"{int(round(used))}/{int(bucket.size)}"}
+        self.sim.count("rest", throttled=not accepted)
+        if not accepted:
+            return self._send(429, {"errors": "Exceeded 2 calls per second for api client. Reduce request rates "
+                                              "to resume uninterrupted service."},
+                              {**limit, "Retry-After": "1.0"})
+        catalog = self.sim.catalog
+        with catalog.lock:
+            if resource == "products.json" and method == "GET":
+                return self._list_products(query, limit)
+            if resource == "products.json" and method == "POST":
+                product = catalog.add_product(body.get("product") or {})
+                return self._send(201, {"product": product}, limit)
+            if resource == "locations.json":
+                return self._send(200, {"locations": [{"id": LOCATION_ID, "name": "Simulated warehouse"}]}, limit)
+            if resource == "inventory_levels.json" and method == "GET":
+                return self._list_levels(query, limit)
+            if resource == "inventory_levels/set.json" and method == "POST":
+                if catalog.set_level(int(body.get("inventory_item_id", 0)), int(body.get("location_id", 0)),
+                                     int(body.get("available", 0))):
+                    return self._send(200, {"inventory_level": body}, limit)
+                return self._send(422, {"errors": {"inventory_item_id": ["not found"]}}, limit)
+            if resource == "variants.json":
+                sku = query.get("sku")
+                found = [v for v in catalog.variants.values() if sku is None or v.get("sku") == sku]
+                return self._send(200, {"variants": found[: int(query.get("limit", 50))]}, limit)
+
+            match = re.match(r"^(products|variants)/(\d+)\.json$", resource)
+            if match:
+                kind, record_id = match.group(1), int(match.group(2))
+                table = catalog.products if kind == "products" else catalog.variants
+                record = table.get(record_id)
+                if record is None:
+                    return self._send(404, {"errors": "Not Found"}, limit)
+                if method == "DELETE" and kind == "products":
+                    catalog.delete_product(record_id)
+                    return self._send(200, {}, limit)
+                if method == "PUT":
+                    changes = body.get("product" if kind == "products" else "variant") or {}
+                    record.update({k: v for k, v in changes.items() if k != "id"})
+                    catalog.touch(record_id if kind == "products" else record["product_id"])
+                key = "product" if kind == "products" else "variant"
+                return self._send(200, {key: record}, limit)
+        self._send(404, {"errors": "Not Found"}, limit)
+
+    def _list_levels(self, query: Dict, headers: Dict[str, str]) -> None:
+        if query.get("page_info"):
+            query = json.loads(base64.urlsafe_b64decode(query["page_info"].encode()).decode())
+        location = int(query.get("location_ids", LOCATION_ID))
+        levels = sorted((item, qty) for (item, loc), qty in self.sim.catalog.levels.items() if loc == location)
+        start = int(query.get("offset", 0))
+        limit = min(int(query.get("limit", 50)), 250)
+        page = levels[start:start + limit]
+        headers = dict(headers)
+        if start + limit < len(levels):
+            token = base64.urlsafe_b64encode(json.dumps(dict(query, offset=start + limit)).encode()).decode()
+            host = self.headers.get("Host", "127.0.0.1")
+            headers["Link"] = (f'<http://{host}{urlparse(self.path).path}?'
+                               f'{urlencode({"limit": limit, "page_info": token})}>; rel="next"')
+        self._send(200, {"inventory_levels": [
+            {"inventory_item_id": item, "location_id": location, "available": qty} for item, qty in page
+        ]}, headers)
+
+    def _list_products(self, query: Dict, headers: Dict[str, str]) -> None:
+        if query.get("page_info"):
+            # page_info carries the original filters, as Shopify's does
+            query = json.loads(base64.urlsafe_b64decode(query["page_info"].encode()).decode())
+        products = sorted(self.sim.catalog.products.values(), key=lambda p: p["id"])
+        if query.get("since_id"):
+            products = [p for p in products if p["id"] > int(query["since_id"])]
+        if query.get("updated_at_min"):
+            cutoff = datetime.fromisoformat(query["updated_at_min"].replace("Z", "+00:00"))
+            if cutoff.tzinfo is None:
+                cutoff = cutoff.replace(tzinfo=timezone.utc)
+            products = [p for p in products if datetime.fromisoformat(p["updated_at"]) >= cutoff]
+        limit = min(int(query.get("limit", 50)), 250)
+        page = products[:limit]
+        headers = dict(headers)
+        if len(products) > limit:
+            following = dict(query, since_id=page[-1]["id"])
+            token = base64.urlsafe_b64encode(json.dumps(following).encode()).decode()
+            params = {"limit": limit, "page_info": token}
+            if query.get("fields"):
+                params["fields"] = query["fields"]
+            host = self.headers.get("Host", "127.0.0.1")
+            headers["Link"] = f'<http://{host}{urlparse(self.path).path}?{urlencode(params)}>; rel="next"'
+        self._send(200, {"products": [_project(p, query.get("fields")) for p in page]}, headers)
+
+    def _storefront_products(self, query: Dict) -> None:
+        accepted, _used = self.sim.storefront_bucket.take(1)
+        self.sim.count("storefront", throttled=not accepted)
+        if not accepted:
+            return self._send(429, {"errors": "Too Many Requests"}, {"Retry-After": "1.0"})
+        limit = min(int(query.get("limit", 30)), 250)
+        page = max(1, int(query.get("page", 1)))
+        with self.sim.catalog.lock:
+            products = sorted(self.sim.catalog.products.values(),
+                              key=lambda p: (p["updated_at"], p["id"]), reverse=True)
+            chunk = products[(page - 1) * limit: page * limit]
+            body = {"products": chunk}
+            etag = '"%s"' % hashlib.sha1(json.dumps(body, sort_keys=True).encode()).hexdigest()
+        headers = {"ETag": etag}
+        if chunk:
+            newest = max(datetime.fromisoformat(p["updated_at"]) for p in chunk)
+            headers["Last-Modified"] = format_datetime(newest.astimezone(timezone.utc), usegmt=True)
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return None
+        self._send(200, body, headers)
+
+    # ── WooCommerce ─────────────────────────────────────────────────────────
+    def _woo(self, method: str, resource: str, query: Dict, body: Dict) -> None:
+        catalog = self.sim.catalog
+        with catalog.lock:
+            if resource == "products" and method == "GET":
+                records = sorted(catalog.woo.values(), key=lambda r: r["id"])
+                if query.get("sku"):
+                    records = [r for r in records if r["sku"] == query["sku"]]
+                if query.get("status") and query["status"] != "any":
+                    records = [r for r in records if r["status"] == query["status"]]
+                per_page = min(int(query.get("per_page", 10)), 100)
+                page = int(query.get("page", 1))
+                total_pages = max(1, -(-len(records) // per_page))
+                chunk = records[(page - 1) * per_page: page * per_page]
+                return self._send(200, [_project(r, query.get("_fields")) for r in chunk],
+                                  {"X-WP-Total": str(len(records)), "X-WP-TotalPages": str(total_pages)})
+            if resource == "products/batch" and method == "POST":
+                if sum(len(body.get(k) or []) for k in ("create", "update", "delete")) > WOO_BATCH_LIMIT:
+                    return self._send(413, {"code": "rest_request_entity_too_large",
+                                            "message": f"Unable to accept more than {WOO_BATCH_LIMIT} items"})
+                result: Dict[str, List] = {}
+                for item in body.get("create") or []:
+                    woo_id = catalog._new_id()
+                    catalog.woo[woo_id] = dict(item, id=woo_id)
+                    result.setdefault("create", []).append(catalog.woo[woo_id])
+                for item in body.get("update") or []:
+                    record = catalog.woo.get(int(item.get("id", 0)))
+                    if record is None:
+                        result.setdefault("update", []).append(
+                            {"id": item.get("id"), "error": {"code": "woocommerce_rest_product_invalid_id",
+                                                             "message": "Invalid ID."}})
+                        continue
+                    record.update(item)
+                    result.setdefault("update", []).append(record)
+                for woo_id in body.get("delete") or []:
+                    record = catalog.woo.pop(int(woo_id), None)
+                    result.setdefault("delete", []).append(
+                        record or {"id": woo_id, "error": {"code": "woocommerce_rest_product_invalid_id",
+                                                            "message": "Invalid ID."}})
+                return self._send(200, result)
+        self._send(404, {"code": "rest_no_route", "message": "No route was found matching the URL"})
+
+
+def start_simulator(
+    port: int = 0,
+    *,
+    products: int = 500,
+    variants: int = 2,
+    woo_products: int = 1000,
+    plan: str = "standard",
+    latency_ms: float = 50.0,
+    jitter_ms: float = 20.0,
+) -> Tuple[ThreadingHTTPServer, str]:
+    """Seed a catalog and serve it on a daemon thread; returns (server, base URL)."""
+    catalog = Catalog()
+    catalog.seed(products, variants, woo_products)
+    server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    server.daemon_threads = True
+    server.simulator = Simulator(catalog, plan, latency_ms, jitter_ms)  # type: ignore[attr-defined]
+    threading.Thread(target=server.serve_forever, name="api-simulator", daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Serve a simulated Shopify + WooCommerce API")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--products", type=int, default=500, help="Shopify products to seed")
+    parser.add_argument("--variants", type=int, default=2, help="Variants per Shopify product")
+    parser.add_argument("--woo-products", type=int, default=1000, help="WooCommerce products to seed")
+    parser.add_argument("--plan", choices=sorted(PLANS), default="standard", help="Rate-limit profile")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="Base latency added to every request")
+    parser.add_argument("--jitter-ms", type=float, default=20.0, help="Random +/- latency jitter")
+    args = parser.parse_args()
+
+    server, base_url = start_simulator(
+        args.port, products=args.products, variants=args.variants, woo_products=args.woo_products,
+        plan=args.plan, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+    )
+    print(f"🧪 API simulator on {base_url} ({args.plan} plan, {args.latency_ms:.0f}ms latency)")
+    print(f"   export SHOPIFY_API_BASE_URL={base_url} WOO_URL={base_url}")
+    print("   Ctrl+C to stop")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -16,12 +16,16 @@ What gets SKIPPED:
 Usage:
   python scripts/apply_enrichment.py           # Dry run (default)
   python scripts/apply_enrichment.py --confirm  # LIVE run
+  python scripts/apply_enrichment.py --confirm --bulk-sql  # LIVE, set-based writes
 """
 
 import json, os, sys
 
+from wp_bulk_sql import BULK_SQL_LIB_PHP
+
 BASE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 CONFIRM = '--confirm' in sys.argv
+BULK_SQL = '--bulk-sql' in sys.argv
 
 SSH_HOST = os.getenv('HMOON_SSH_HOST')
 SSH_USER = os.getenv('HMOON_SSH_USER')
@@ -29,57 +33,9 @@ SSH_PASS = os.getenv('HMOON_SSH_PASS')
 SITE_DIR = os.getenv('HMOON_SITE_DIR', '~/hmoonhydro.com')
 
 
-def run():
-    import paramiko
-
-    if not SSH_HOST or not SSH_USER or not SSH_PASS:
-        raise SystemExit('Missing SSH env vars: HMOON_SSH_HOST, HMOON_SSH_USER, HMOON_SSH_PASS')
-
-    dry_run = not CONFIRM
-    mode = 'DRY RUN' if dry_run else 'LIVE'
-
-    # Load enrichment data
-    enrichment_path = os.path.join(BASE, 'outputs', 'deep_enrichment.json')
-    with open(enrichment_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-
-    print('=== Apply Enrichment: ' + mode + ' ===')
-    print('Total products in enrichment: ' + str(len(data)))
-
-    # Build the enrichment payload - only what we want to apply
-    payload = {}
-    for pid, prod in data.items():
-        entry = {}
-        if prod.get('brand'):
-            entry['brand'] = prod['brand']
-        if prod.get('description'):
-            entry['description'] = prod['description']
-        if prod.get('short_description'):
-            entry['short_description'] = prod['short_description']
-        if entry:
-            payload[pid] = entry
-
-    brand_count = sum(1 for v in payload.values() if v.get('brand'))
-    desc_count = sum(1 for v in payload.values() if v.get('description'))
-    short_count = sum(1 for v in payload.values() if v.get('short_description'))
-
-    print('Brands to set: ' + str(brand_count))
-    print('Descriptions (fill empty): ' + str(desc_count))
-    print('Short descriptions (fill empty): ' + str(short_count))
-    print()
-
-    # Build PHP
-    dry_val = 'true' if dry_run else 'false'
-    
+def _loop_php_body():
+    """Per-product PHP: wp_set_object_terms / wp_update_post with full hooks."""
     p = []
-    p.append('<?php')
-    p.append('wp_set_current_user(1);')
-    p.append('$dry = ' + dry_val + ';')
-    p.append('$data = json_decode(file_get_contents(__DIR__ . "/enrichment_payload.json"), true);')
-    p.append('$stats = ["brands" => 0, "desc" => 0, "short_desc" => 0, "skipped" => 0, "not_found" => 0];')
-    p.append('')
-    p.append('echo "Processing " . count($data) . " products...\\n";')
-    p.append('')
     p.append('foreach ($data as $pid => $fields) {')
     p.append('    $post = get_post($pid);')
     p.append('    if (!$post || $post->post_type !== "product") {')
@@ -137,6 +93,100 @@ def run():
     p.append('    }')
     p.append('}')
     p.append('')
+    return p
+
+
+def _bulk_php_body():
+    """Set-based PHP: one term assignment per brand, CASE updates for text."""
+    p = []
+    p.append('hmoon_bulk_begin();')
+    p.append('$ids = hmoon_bulk_existing_ids(array_keys($data));')
+    p.append('$stats["not_found"] = count($data) - count($ids);')
+    p.append('$by_brand = array(); $desc = array(); $short = array();')
+    p.append('foreach ($ids as $pid) {')
+    p.append('    $fields = $data[$pid];')
+    p.append('    if (!empty($fields["brand"])) $by_brand[$fields["brand"]][] = $pid;')
+    p.append('    if (!empty($fields["description"])) $desc[$pid] = $fields["description"];')
+    p.append('    if (!empty($fields["short_description"])) $short[$pid] = $fields["short_description"];')
+    p.append('}')
+    p.append('')
+    p.append('// Brands: one set-based replace per distinct brand')
+    p.append('foreach ($by_brand as $brand => $pids) {')
+    p.append('    $tid = hmoon_bulk_term_id($brand, "pwb-brand");')
+    p.append('    if (!$tid) continue;')
+    p.append('    hmoon_bulk_set_terms("pwb-brand", $pids, array($tid), false);')
+    p.append('    $stats["brands"] += count($pids);')
+    p.append('}')
+    p.append('')
+    p.append('// Descriptions: only fill rows that are currently empty')
+    p.append('$stats["desc"] = hmoon_bulk_set_post_field("post_content", $desc, true);')
+    p.append('$stats["short_desc"] = hmoon_bulk_set_post_field("post_excerpt", $short, true);')
+    p.append('$stats["skipped"] = (count($desc) - $stats["desc"]) + (count($short) - $stats["short_desc"]);')
+    p.append('hmoon_bulk_finish();')
+    p.append('')
+    return p
+
+
+def run():
+    import paramiko
+
+    if not SSH_HOST or not SSH_USER or not SSH_PASS:
+        raise SystemExit('Missing SSH env vars: HMOON_SSH_HOST, HMOON_SSH_USER, HMOON_SSH_PASS')
+
+    dry_run = not CONFIRM
+    bulk = BULK_SQL and not dry_run
+    mode = 'DRY RUN' if dry_run else 'LIVE'
+
+    # Load enrichment data
+    enrichment_path = os.path.join(BASE, 'outputs', 'deep_enrichment.json')
+    with open(enrichment_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    print('=== Apply Enrichment: ' + mode + ' ===')
+    print('Total products in enrichment: ' + str(len(data)))
+
+    # Build the enrichment payload - only what we want to apply
+    payload = {}
+    for pid, prod in data.items():
+        entry = {}
+        if prod.get('brand'):
+            entry['brand'] = prod['brand']
+        if prod.get('description'):
+            entry['description'] = prod['description']
+        if prod.get('short_description'):
+            entry['short_description'] = prod['short_description']
+        if entry:
+            payload[pid] = entry
+
+    brand_count = sum(1 for v in payload.values() if v.get('brand'))
+    desc_count = sum(1 for v in payload.values() if v.get('description'))
+    short_count = sum(1 for v in payload.values() if v.get('short_description'))
+
+    print('Brands to set: ' + str(brand_count))
+    print('Descriptions (fill empty): ' + str(desc_count))
+    print('Short descriptions (fill empty): ' + str(short_count))
+    if bulk:
+        print('Backend: bulk SQL (set-based writes, one transaction)')
+    print()
+
+    # Build PHP
+    dry_val = 'true' if dry_run else 'false'
+    
+    p = []
+    p.append('<?php')
+    if bulk:
+        p.append(BULK_SQL_LIB_PHP)
+    p.append('wp_set_current_user(1);')
+    p.append('$dry = ' + dry_val + ';')
+    p.append('$data = json_decode(file_get_contents(__DIR__ . "/enrichment_payload.json"), true);')
+    p.append('$stats = ["brands" => 0, "desc" => 0, "short_desc" => 0, "skipped" => 0, "not_found" => 0];')
+    p.append('')
+    p.append('echo "Processing " . count($data) . " products...\\n";')
+    p.append('')
+    if bulk:
+        p.extend(_bulk_php_body())
+    else:
+        p.extend(_loop_php_body())
     p.append('echo "\\n=== SUMMARY ===\\n";')
     p.append('$mode_str = $dry ? "DRY RUN" : "LIVE";')
     p.append('echo "Mode: $mode_str\\n";')
@@ -6,6 +6,11 @@ Usage:
     python scripts/apply_grouped_wave_by_sku.py
     python scripts/apply_grouped_wave_by_sku.py --csv outputs/woo_grouping_waves/grouping_wave_air_filtration_20260221_164842.csv --label air_filtration_wave1
     python scripts/apply_grouped_wave_by_sku.py --confirm
+    python scripts/apply_grouped_wave_by_sku.py --confirm --full-backup   # Old whole-table SQL export
+
+By default step 4 takes a restore point of the wave's parent products only (see
+restore_points.py) while the CSV uploads.  Undo with:
+    python scripts/restore_points.py restore <restore point path> --confirm
 """
 
 import argparse
@@ -19,6 +24,8 @@ from pathlib import Path
 
 import paramiko
 
+from restore_points import collect_csv_keys, start_restore_point
+
 WORKSPACE = Path(__file__).parent.parent
 
 
@@ -68,6 +75,11 @@ def parse_args() -> argparse.Namespace:
         action='store_true',
         help='Actually update _children + grouped product_type. Without this flag, runs dry-run only.',
     )
+    parser.add_argument(
+        '--full-backup',
+        action='store_true',
+        help='Export whole posts/postmeta/term tables instead of a per-wave restore point',
+    )
     return parser.parse_args()
 
 
@@ -480,32 +492,41 @@ def main() -> int:
         return 1
     print('  ✓ Backup directory ready')
 
-    print('[4/7] Creating DB backup before grouped update...')
-    backup_cmd = (
-        f'cd {q(resolved_site_dir)} && '
-        f'wp db export {q(db_backup_file)} '
-        '--tables=wp_posts,wp_postmeta,wp_term_relationships,wp_term_taxonomy --porcelain'
-    )
-    code, out, err = run_cmd(ssh, backup_cmd, timeout=180)
-    if code != 0:
-        print('  ⚠️ Targeted table backup failed; trying full DB backup...')
-        fallback_backup = f'{backup_dir}/grouped_wave_backup_full_{timestamp}{backup_label_suffix}.sql'
-        fallback_cmd = f'cd {q(resolved_site_dir)} && wp db export {q(fallback_backup)} --porcelain'
-        code2, out2, err2 = run_cmd(ssh, fallback_cmd, timeout=180)
-        if code2 != 0:
-            print('❌ Database backup failed. Aborting for safety.')
-            if out.strip():
-                print(out.strip())
-            if err.strip():
-                print(err.strip())
-            if out2.strip():
-                print(out2.strip())
-            if err2.strip():
-                print(err2.strip())
-            ssh.close()
-            return 1
-        db_backup_file = fallback_backup
-    print(f'  ✓ DB backup created: {db_backup_file}')
+    pending_backup = None
+    if args.full_backup:
+        print('[4/7] Creating DB backup before grouped update...')
+        backup_cmd = (
+            f'cd {q(resolved_site_dir)} && '
+            f'wp db export {q(db_backup_file)} '
+            '--tables=wp_posts,wp_postmeta,wp_term_relationships,wp_term_taxonomy --porcelain'
+        )
+        code, out, err = run_cmd(ssh, backup_cmd, timeout=180)
+        if code != 0:
+            print('  ⚠️ Targeted table backup failed; trying full DB backup...')
+            fallback_backup = f'{backup_dir}/grouped_wave_backup_full_{timestamp}{backup_label_suffix}.sql'
+            fallback_cmd = f'cd {q(resolved_site_dir)} && wp db export {q(fallback_backup)} --porcelain'
+            code2, out2, err2 = run_cmd(ssh, fallback_cmd, timeout=180)
+            if code2 != 0:
+                print('❌ Database backup failed. Aborting for safety.')
+                if out.strip():
+                    print(out.strip())
+                if err.strip():
+                    print(err.strip())
+                if out2.strip():
+                    print(out2.strip())
+                if err2.strip():
+                    print(err2.strip())
+                ssh.close()
+                return 1
+            db_backup_file = fallback_backup
+        print(f'  ✓ DB backup created: {db_backup_file}')
+    else:
+        # Only the parents' rows change; snapshot them while the CSV uploads
+        csv_ids, csv_skus = collect_csv_keys(local_csv)
+        print(f'[4/7] Starting restore point for {len(csv_skus)} parent SKUs in background...')
+        pending_backup = start_restore_point(
+            ssh, resolved_site_dir, f'grouped_wave_backup{backup_label_suffix}', ids=csv_ids, skus=csv_skus,
+        )
 
     print('[5/7] Uploading grouped wave CSV + remote runner script...')
     php_script = build_remote_php_script()
@@ -522,6 +543,17 @@ def main() -> int:
     print(f'  ✓ CSV uploaded: {remote_csv}')
     print(f'  ✓ PHP runner uploaded: {remote_php}')
 
+    if pending_backup is not None:
+        try:
+            point = pending_backup.result()
+        except Exception as exc:
+            print(f'❌ Restore point failed. Aborting for safety: {exc}')
+            ssh.close()
+            return 1
+        db_backup_file = point['path']
+        print(f"  ✓ Restore point created: {db_backup_file} "
+              f"({point['products']} products, {point['rows']} rows, {point['bytes'] / 1024:.0f} KB)")
+
     print('[6/7] Running grouped wave apply via wp eval-file...')
     mode = 'confirm' if confirm else 'dry-run'
     apply_cmd = (
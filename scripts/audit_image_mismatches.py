@@ -24,7 +24,6 @@ Output:
 from __future__ import annotations
 import argparse
 import csv
-import json
 import os
 import re
 import sys
@@ -37,6 +36,8 @@ except ImportError:
     print("Missing deps: pip install paramiko python-dotenv")
     sys.exit(1)
 
+from manifest_stream import build_stream_php, stream_products
+
 WORKSPACE = Path(__file__).resolve().parent.parent
 OUTPUT_DIR = WORKSPACE / "outputs" / "audit"
 OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
@@ -146,25 +147,18 @@ def run_remote(ssh: paramiko.SSHClient, cmd: str) -> str:
 
 # ─── Fetch products from live DB ─────────────────────────────────────────────
 
-FETCH_PHP = r"""<?php
-// Fetch all products with their image filenames as JSON
-$args = [
-    'post_type'      => 'product',
-    'posts_per_page' => -1,
-    'post_status'    => 'publish',
-    {CATEGORY_FILTER}
-];
-$products = get_posts($args);
-$rows = [];
-foreach ($products as $p) {
-    $sku      = get_post_meta($p->ID, '_sku', true);
-    $type     = get_post_meta($p->ID, '_type', true) ?: wp_get_object_terms($p->ID, 'product_type', ['fields'=>'names'])[0] ?? '';
-    $thumb_id = get_post_thumbnail_id($p->ID);
+FETCH_ROW_PHP = r"""
+// One product row with its image filename
+function hmoon_manifest_row($pid) {
+    $p        = get_post($pid);
+    $sku      = get_post_meta($pid, '_sku', true);
+    $type     = get_post_meta($pid, '_type', true) ?: wp_get_object_terms($pid, 'product_type', ['fields'=>'names'])[0] ?? '';
+    $thumb_id = get_post_thumbnail_id($pid);
     $img_url  = $thumb_id ? wp_get_attachment_url($thumb_id) : '';
     $img_file = $img_url  ? basename($img_url) : '';
-    $cats     = wp_get_post_terms($p->ID, 'product_cat', ['fields'=>'names']);
-    $rows[]   = [
-        'id'       => $p->ID,
+    $cats     = wp_get_post_terms($pid, 'product_cat', ['fields'=>'names']);
+    return [
+        'id'       => $pid,
         'sku'      => $sku,
         'name'     => $p->post_title,
         'type'     => $type,
@@ -173,7 +167,6 @@ foreach ($products as $p) {
         'cats'     => implode(' | ', $cats),
     ];
 }
-echo json_encode($rows);
 """
 
 
@@ -182,22 +175,16 @@ def fetch_products(ssh: paramiko.SSHClient, site_dir: str, category: str = "") -
     if category:
         cat_filter = f"""'tax_query' => [['taxonomy'=>'product_cat','field'=>'slug','terms'=>'{category}']],"""
 
-    php = FETCH_PHP.replace("{CATEGORY_FILTER}", cat_filter)
+    php = build_stream_php(FETCH_ROW_PHP, cat_filter)
     remote_php = "/tmp/hmoon_img_audit.php"
 
-    sftp = ssh.open_sftp()
-    with sftp.open(remote_php, "w") as f:
-        f.write(php)
-    sftp.close()
-
-    out = run_remote(ssh, f"cd {site_dir} && wp eval-file {remote_php} --allow-root 2>/dev/null")
-    run_remote(ssh, f"rm -f {remote_php}")
-
     try:
-        return json.loads(out)
-    except json.JSONDecodeError:
-        print(f"ERROR parsing JSON response:\n{out[:500]}")
+        return list(stream_products(ssh, site_dir, php, remote_php, extra_flags="--allow-root"))
+    except RuntimeError as e:
+        print(f"ERROR fetching products: {e}")
         return []
+    finally:
+        run_remote(ssh, f"rm -f {remote_php}")
 
 
 # ─── Main ─────────────────────────────────────────────────────────────────────
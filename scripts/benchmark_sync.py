@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""Benchmark the Shopify / WooCommerce sync paths against the local API simulator.
+
+Each scenario gets a freshly seeded api_simulator.py instance, runs the real
+code path of one script in-process (its console output is captured), then
+reports API requests, 429/THROTTLED responses, wall time, requests/s and
+items/s.  Nothing touches a live store.
+
+Scenarios:
+    export     export_products.py        stream every product to CSV
+    inventory  sync_inventory.py         push stock for every seeded SKU (REST)
+    csv        update_shopify_from_csv   price + inventory from a CSV (GraphQL)
+    import     import_consolidated_products.py   create products (REST)
+    woo-delete delete_all_products.py    list IDs + batch delete (Woo REST)
+    crawl      catalog_crawler.py        /products.json from --stores simulated stores at once
+    recrawl    catalog_crawler.py        incremental refresh after --changed products were updated
+
+Usage:
+    python scripts/benchmark_sync.py
+    python scripts/benchmark_sync.py --scenarios inventory csv --products 1000 --workers 8
+    python scripts/benchmark_sync.py --plan plus --latency-ms 120 --json outputs/benchmarks/run.json
+    python scripts/benchmark_sync.py --scenarios crawl recrawl --stores 8 --products 2000
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import csv
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+from unittest import mock
+
+from api_simulator import LOCATION_ID, PLANS, start_simulator
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+SCENARIOS = ("export", "inventory", "csv", "import", "woo-delete", "crawl", "recrawl")
+EXTRA_SERVERS: List = []  # simulators a scenario starts besides the main one
+
+
+def seeded_skus(products: int, variants: int) -> List[str]:
+    return [f"SIM-{p}-{v}" for p in range(products) for v in range(variants)]
+
+
+def run_cli(main: Callable, argv: List[str]) -> object:
+    """Call a script's ``main()`` with ``argv`` as if from the command line."""
+    with mock.patch.object(sys, "argv", [main.__module__] + argv):
+        try:
+            return main()
+        except SystemExit as exc:
+            return exc.code
+
+
+# ── scenarios: each returns the number of items it processed ───────────────
+def scenario_export(args, workdir: Path) -> int:
+    from export_products import ShopifyProductExporter
+
+    exporter = ShopifyProductExporter("sim-shop", "sim-token")
+    products, _rows = exporter.stream_export(csv_path=workdir / "export.csv")
+    return products
+
+
+def scenario_inventory(args, workdir: Path) -> int:
+    from sync_inventory import update_shopify_remote
+
+    woo_products = {
+        sku: {"sku": sku, "stock": index % 7, "shopify_mapping": {}}
+        for index, sku in enumerate(seeded_skus(args.products, args.variants))
+    }
+    success, _skipped, _missing, _failures = update_shopify_remote(
+        woo_products, "sim-shop", "sim-token", str(LOCATION_ID), workers=args.workers
+    )
+    return success
+
+
+def scenario_csv(args, workdir: Path) -> int:
+    import update_shopify_from_csv
+
+    skus = seeded_skus(args.products, args.variants)
+    csv_path = workdir / "prices.csv"
+    with csv_path.open("w", newline="", encoding="utf-8") as handle:
+        writer = csv.writer(handle)
+        writer.writerow(["Variant SKU", "Variant Price", "Variant Inventory Qty"])
+        for index, sku in enumerate(skus):
+            writer.writerow([sku, f"{20 + index % 50}.99", index % 9])
+    run_cli(update_shopify_from_csv.main, [
+        "--csv", str(csv_path), "--variant-index", str(workdir / "variant_index.json"),
+        "--workers", str(args.workers),
+    ])
+    return len(skus)
+
+
+def scenario_import(args, workdir: Path) -> int:
+    import import_consolidated_products
+
+    count = max(1, args.products // 5)
+    csv_path = workdir / "consolidated.csv"
+    with csv_path.open("w", newline="", encoding="utf-8") as handle:
+        writer = csv.writer(handle)
+        writer.writerow(["Handle", "Product_Name", "Status", "Variant_Option1_Name", "Variant_Option1",
+                         "Variant_SKU", "Variant_Price", "Variant_Inventory", "Variant_Inventory_Tracker"])
+        for p in range(count):
+            for v in range(args.variants):
+                writer.writerow([f"bench-import-{p}", f"Bench Import {p}", "draft", "Size", f"Size {v}",
+                                 f"BENCH-{p}-{v}", "12.50", v + 1, "shopify"])
+    run_cli(import_consolidated_products.main, ["--csv", str(csv_path)])
+    return count
+
+
+def scenario_woo_delete(args, workdir: Path) -> int:
+    sys.path.insert(0, str(REPO_ROOT))
+    from delete_all_products import batch_delete, get_products
+    from woo_rest import client_from_env
+
+    woo = client_from_env(max_workers=args.workers)
+    ids = get_products(woo)
+    batch_delete(woo, ids)
+    return len(ids)
+
+
+def crawl_stores(args) -> Dict[str, str]:
+    """The main simulator plus ``--stores - 1`` more, one per simulated host."""
+    stores = {"store0": os.environ["WOO_URL"]}
+    for index in range(1, args.stores):
+        server, base_url = start_simulator(products=args.products, variants=args.variants, woo_products=0,
+                                           plan=args.plan, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms)
+        EXTRA_SERVERS.append(server)
+        stores[f"store{index}"] = base_url
+    return stores
+
+
+def scenario_crawl(args, workdir: Path) -> int:
+    from catalog_crawler import crawl_catalogs
+
+    results = crawl_catalogs(crawl_stores(args), workdir / "catalogs", max_age_hours=0)
+    return sum(result.products for result in results.values())
+
+
+def setup_recrawl(args, workdir: Path, servers: List) -> None:
+    """Full crawl first (not timed), then update ``--changed`` products per store."""
+    from catalog_crawler import crawl_catalogs
+
+    args.recrawl_stores = crawl_stores(args)
+    crawl_catalogs(args.recrawl_stores, workdir / "catalogs", max_age_hours=0)
+    for server in servers + EXTRA_SERVERS:
+        catalog = server.simulator.catalog
+        for product_id in random.sample(sorted(catalog.products), min(args.changed, len(catalog.products))):
+            catalog.touch(product_id)
+
+
+def scenario_recrawl(args, workdir: Path) -> int:
+    from catalog_crawler import crawl_catalogs
+
+    results = crawl_catalogs(args.recrawl_stores, workdir / "catalogs", max_age_hours=0)
+    return sum(result.changed for result in results.values())
+
+
+RUNNERS: Dict[str, Callable] = {
+    "export": scenario_export,
+    "inventory": scenario_inventory,
+    "csv": scenario_csv,
+    "import": scenario_import,
+    "woo-delete": scenario_woo_delete,
+    "crawl": scenario_crawl,
+    "recrawl": scenario_recrawl,
+}
+SETUPS: Dict[str, Callable] = {"recrawl": setup_recrawl}  # untimed preparation
+
+
+def run_scenario(name: str, args) -> Dict[str, object]:
+    server, base_url = start_simulator(
+        products=args.products, variants=args.variants, woo_products=args.woo_products,
+        plan=args.plan, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+    )
+    env = {
+        "SHOPIFY_API_BASE_URL": base_url,
+        "SHOPIFY_DOMAIN": "sim-shop",
+        "SHOPIFY_ACCESS_TOKEN": "sim-token",
+        "SHOPIFY_LOCATION_ID": str(LOCATION_ID),
+        "WOO_URL": base_url,
+        "WOO_CONSUMER_KEY": "ck_sim",
+        "WOO_CONSUMER_SECRET": "cs_sim",
+    }
+    result: Dict[str, object] = {"scenario": name}
+    log = io.StringIO()
+    try:
+        with tempfile.TemporaryDirectory(prefix=f"bench_{name}_") as tmp, \
+                mock.patch.dict(os.environ, dict(env, SYNC_JOURNAL_DIR=tmp)), \
+                contextlib.redirect_stdout(log), contextlib.redirect_stderr(log):
+            if name in SETUPS:
+                SETUPS[name](args, Path(tmp), [server])
+            for running in [server] + EXTRA_SERVERS:
+                running.simulator.reset()  # type: ignore[attr-defined]
+            started = time.perf_counter()
+            items = RUNNERS[name](args, Path(tmp))
+            wall = time.perf_counter() - started
+    except ImportError as exc:
+        result["error"] = f"skipped ({exc})"
+        return result
+    except Exception as exc:  # pylint: disable=broad-except
+        result["error"] = f"{type(exc).__name__}: {exc}"
+        result["log_tail"] = log.getvalue()[-2000:]
+        return result
+    finally:
+        extras = list(EXTRA_SERVERS)
+        EXTRA_SERVERS.clear()
+        for running in [server] + extras:
+            running.shutdown()
+            running.server_close()
+
+    stats = server.simulator.snapshot()  # type: ignore[attr-defined]
+    for extra in extras:
+        extra_stats = extra.simulator.snapshot()  # type: ignore[attr-defined]
+        stats["requests"] += extra_stats["requests"]
+        stats["throttled"] += extra_stats["throttled"]
+    result.update(
+        items=items,
+        requests=stats["requests"],
+        throttled=stats["throttled"],
+        wall_seconds=round(wall, 3),
+        requests_per_second=round(stats["requests"] / wall, 2) if wall else 0.0,
+        items_per_second=round(items / wall, 2) if wall else 0.0,
+    )
+    if args.verbose:
+        result["log_tail"] = log.getvalue()[-2000:]
+    return result
+
+
+def print_table(results: List[Dict[str, object]]) -> None:
+    header = f"{'scenario':<11} {'items':>7} {'requests':>9} {'429/thr':>8} {'wall s':>8} {'req/s':>8} {'items/s':>9}"
+    print(header)
+    print("-" * len(header))
+    for row in results:
+        if "error" in row:
+            print(f"{row['scenario']:<11} {row['error']}")
+            continue
+        print(f"{row['scenario']:<11} {row['items']:>7} {row['requests']:>9} {row['throttled']:>8} "
+              f"{row['wall_seconds']:>8.2f} {row['requests_per_second']:>8.1f} {row['items_per_second']:>9.1f}")
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark sync scripts against the local API simulator")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--products", type=int, default=300, help="Shopify products seeded per scenario")
+    parser.add_argument("--variants", type=int, default=2, help="Variants per product")
+    parser.add_argument("--woo-products", type=int, default=1000, help="WooCommerce products seeded")
+    parser.add_argument("--plan", choices=sorted(PLANS), default="standard", help="Simulated rate-limit profile")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="Simulated per-request latency")
+    parser.add_argument("--jitter-ms", type=float, default=10.0, help="Random +/- latency jitter")
+    parser.add_argument("--stores", type=int, default=4, help="Simulated stores for the crawl scenarios")
+    parser.add_argument("--changed", type=int, default=20, help="Products updated per store before a recrawl")
+    parser.add_argument("--workers", type=int, default=4, help="Worker threads passed to the scripts")
+    parser.add_argument("--json", type=Path, help="Also write the results as JSON")
+    parser.add_argument("--verbose", action="store_true", help="Include each script's output tail in the results")
+    return parser.parse_args(argv)
+
+
+def main() -> int:
+    args = parse_args()
+    print(f"⏱️  Benchmarking {', '.join(args.scenarios)} – {args.products} products x {args.variants} variants, "
+          f"{args.plan} plan, {args.latency_ms:.0f}ms latency, {args.workers} workers\n")
+    results = []
+    for name in args.scenarios:
+        print(f"▶ {name} …", flush=True)
+        result = run_scenario(name, args)
+        if args.verbose or ("error" in result and "log_tail" in result):
+            print(result.get("log_tail", ""))
+        results.append(result)
+    print()
+    print_table(results)
+    if args.json:
+        args.json.parent.mkdir(parents=True, exist_ok=True)
+        args.json.write_text(json.dumps({"settings": {k: str(v) for k, v in vars(args).items()},
+                                         "results": results}, indent=2), encoding="utf-8")
+        print(f"\n📄 Results written to {args.json}")
+    return 1 if any("error" in r and not str(r["error"]).startswith("skipped") for r in results) else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
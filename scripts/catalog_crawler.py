@@ -0,0 +1,560 @@
+#!/usr/bin/env python3
+"""Crawl public Shopify ``/products.json`` catalogs from many stores at once.
+
+Stores are crawled concurrently (``max_hosts`` at a time) while each host is
+kept polite: at most ``per_host_concurrency`` requests in flight and request
+starts spaced ``per_host_interval`` seconds apart.  Stores sharing a host
+(e.g. two brands on one manufacturer site) share that host's limits.
+
+* Page 1 decides whether the store is Shopify; later pages are fetched in
+  windows of ``per_host_concurrency`` until a short or empty page.
+* 429 / 5xx responses and dropped connections are retried with exponential
+  backoff (``Retry-After`` wins); a 429 pauses the whole host, not just the
+  one request.
+* Pages are streamed into ``<out_dir>/<key>_products.json.part`` as they
+  arrive and renamed to ``<key>_products.json`` (the JSON list the scrapers
+  already read) once the store is complete, so memory stays flat and a
+  half-written catalog never replaces a good one.
+* Existing catalogs younger than ``max_age_hours`` are reused
+  (``max_age_hours=None``: reuse any existing file).
+* Older catalogs are refreshed incrementally from a sidecar
+  ``<out_dir>/.crawl_state/<key>.json`` (kept out of the ``*.json`` globs
+  the enrichment tools run over the catalog directory): each page is
+  requested with the ETag / Last-Modified it had last time (a 304 costs no
+  body), products are merged by id, and only those whose ``updated_at`` is
+  past the stored watermark count as changed.  When the store lists newest-first, the walk stops at
+  the first page with nothing new.  Early stops cannot see deletions, so a
+  complete walk (still conditional) runs every ``full_every_hours``; an
+  unchanged catalog is only touched, not rewritten.
+
+HTTP goes through ``requests`` (one keep-alive session per worker thread)
+driven from an asyncio event loop, so no extra dependency is needed.  A full
+refresh takes about as long as the slowest single store.
+
+Usage:
+    from catalog_crawler import crawl_catalogs
+
+    results = crawl_catalogs({"hydrobuilder": "https://hydrobuilder.com"}, CATALOG_DIR)
+    print(results["hydrobuilder"].status, results["hydrobuilder"].products)
+
+    python scripts/catalog_crawler.py hydrobuilder=https://hydrobuilder.com bluelab=https://bluelab.com
+    python scripts/catalog_crawler.py --out /tmp/catalogs --max-age-hours 0 --per-host-interval 1 zen=https://zenhydro.com
+    python scripts/catalog_crawler.py --max-age-hours 0 --full-refresh hydrobuilder=https://hydrobuilder.com
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Mapping, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+
+DEFAULT_OUT_DIR = Path(__file__).resolve().parent.parent / "outputs" / "scraped" / "catalogs"
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Accept": "application/json",
+}
+PAGE_LIMIT = 250               # Shopify's maximum for /products.json
+RETRY_STATUS = {429, 500, 502, 503, 504}
+STATE_DIRNAME = ".crawl_state"
+
+
+@dataclass
+class CrawlResult:
+    """Outcome of one store: ``ok`` | ``cached`` | ``not_shopify`` | ``unreachable``."""
+
+    key: str
+    url: str
+    status: str = "pending"
+    products: int = 0
+    pages: int = 0
+    requests: int = 0
+    retries: int = 0
+    changed: int = 0           # products new or updated since the last crawl
+    not_modified: int = 0      # pages answered 304
+    bytes: int = 0
+    seconds: float = 0.0
+    path: Optional[Path] = None
+    error: Optional[str] = None
+
+    @property
+    def reachable(self) -> bool:
+        return self.status in ("ok", "cached", "not_shopify")
+
+
+class HostLimiter:
+    """Concurrency cap plus minimum spacing between request starts for one host."""
+
+    def __init__(self, concurrency: int, interval: float) -> None:
+        self.semaphore = asyncio.Semaphore(max(1, concurrency))
+        self.interval = interval
+        self._lock = asyncio.Lock()
+        self._next_start = 0.0
+        self._paused_until = 0.0
+
+    def pause(self, seconds: float) -> None:
+        """Hold every request to this host for ``seconds`` (after a 429)."""
+        loop = asyncio.get_running_loop()
+        self._paused_until = max(self._paused_until, loop.time() + seconds)
+
+    async def __aenter__(self) -> "HostLimiter":
+        await self.semaphore.acquire()
+        loop = asyncio.get_running_loop()
+        async with self._lock:
+            now = loop.time()
+            start = max(now, self._next_start, self._paused_until)
+            self._next_start = start + self.interval
+        if start > now:
+            await asyncio.sleep(start - now)
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        self.semaphore.release()
+
+
+class _FetchError(Exception):
+    def __init__(self, message: str, status: Optional[int] = None) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+class _CatalogWriter:
+    """Append pages to ``<path>.part`` as one JSON list; ``commit`` renames it into place."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.part = path.with_name(path.name + ".part")
+        self.count = 0
+        self._handle = None
+
+    def write(self, products: List[Dict]) -> None:
+        if self._handle is None:
+            self.part.parent.mkdir(parents=True, exist_ok=True)
+            self._handle = self.part.open("w", encoding="utf-8")
+            self._handle.write("[")
+        for product in products:
+            if self.count:
+                self._handle.write(",")
+            self._handle.write(json.dumps(product, ensure_ascii=False))
+            self.count += 1
+        self._handle.flush()
+
+    def commit(self) -> bool:
+        """Finish the list and replace the catalog; False (nothing written) for empty stores."""
+        if self._handle is None:
+            return False
+        self._handle.write("]")
+        self._handle.close()
+        os.replace(self.part, self.path)
+        return True
+
+    def discard(self) -> None:
+        if self._handle is not None:
+            self._handle.close()
+            self.part.unlink(missing_ok=True)
+
+
+def _parse_time(value: object) -> Optional[datetime]:
+    try:
+        stamp = datetime.fromisoformat(str(value).replace("Z", "+00:00")) if value else None
+    except ValueError:
+        return None
+    return stamp.replace(tzinfo=timezone.utc) if stamp and stamp.tzinfo is None else stamp
+
+
+def _write_json(path: Path, data: object) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(data), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def catalog_age_hours(path: Path) -> Optional[float]:
+    if not path.exists():
+        return None
+    return (time.time() - path.stat().st_mtime) / 3600
+
+
+class CatalogCrawler:
+    """Concurrent, per-host-polite ``/products.json`` crawler (see module docstring)."""
+
+    def __init__(
+        self,
+        out_dir: Path = DEFAULT_OUT_DIR,
+        *,
+        max_hosts: int = 16,
+        per_host_concurrency: int = 2,
+        per_host_interval: float = 0.5,
+        retries: int = 4,
+        backoff: float = 1.0,
+        timeout: float = 30,
+        page_limit: int = PAGE_LIMIT,
+        max_pages: Optional[int] = None,
+        max_age_hours: Optional[float] = 24,
+        incremental: bool = True,
+        full_every_hours: float = 7 * 24,
+        probe_root: bool = True,
+        headers: Optional[Dict[str, str]] = None,
+        log: Callable[[str], None] = print,
+        verbose: bool = False,
+    ) -> None:
+        self.out_dir = Path(out_dir)
+        self.max_hosts = max(1, max_hosts)
+        self.per_host_concurrency = max(1, per_host_concurrency)
+        self.per_host_interval = per_host_interval
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.page_limit = page_limit
+        self.max_pages = max_pages
+        self.max_age_hours = max_age_hours
+        self.incremental = incremental
+        self.full_every_hours = full_every_hours
+        self.probe_root = probe_root
+        self.headers = dict(headers or DEFAULT_HEADERS)
+        self.log = log
+        self.verbose = verbose
+        self._local = threading.local()
+        self._limiters: Dict[str, HostLimiter] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    # ── plumbing ────────────────────────────────────────────────────────────
+    def _get(self, url: str, headers: Optional[Dict[str, str]] = None) -> Tuple[int, Dict[str, str], bytes]:
+        """Blocking GET on the calling worker thread's keep-alive session."""
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            session.headers.update(self.headers)
+            self._local.session = session
+        response = session.get(url, headers=headers, timeout=self.timeout)
+        return response.status_code, dict(response.headers), response.content
+
+    def limiter(self, url: str) -> HostLimiter:
+        host = urlparse(url).netloc.lower()
+        if host not in self._limiters:
+            self._limiters[host] = HostLimiter(self.per_host_concurrency, self.per_host_interval)
+        return self._limiters[host]
+
+    async def fetch(
+        self, url: str, result: CrawlResult, headers: Optional[Dict[str, str]] = None
+    ) -> Tuple[int, Dict[str, str], bytes]:
+        """GET ``url`` under its host's limits, retrying throttling, 5xx and connection errors."""
+        loop = asyncio.get_running_loop()
+        limiter = self.limiter(url)
+        for attempt in range(self.retries + 1):
+            result.requests += 1
+            if attempt:
+                result.retries += 1
+            status, response_headers, body, error = None, {}, b"", None
+            async with limiter:
+                try:
+                    status, response_headers, body = await loop.run_in_executor(
+                        self._executor, self._get, url, headers
+                    )
+                except requests.RequestException as exc:
+                    error = exc
+            result.bytes += len(body)
+            if (status is not None and status not in RETRY_STATUS) or attempt == self.retries:
+                break
+            delay = self.backoff * 2 ** attempt + random.uniform(0, self.backoff / 2)
+            try:
+                delay = max(delay, float(response_headers.get("Retry-After", 0)))
+            except ValueError:
+                pass
+            if status == 429:
+                limiter.pause(delay)
+            await asyncio.sleep(delay)
+        if status is None:
+            raise _FetchError(f"{type(error).__name__}: {error}")
+        return status, response_headers, body
+
+    async def fetch_page(
+        self, base_url: str, page: int, result: CrawlResult, validators: Optional[Dict] = None
+    ) -> Tuple[Optional[List[Dict]], Dict[str, str]]:
+        """Return ``(products, validators)``; products is None when the server answered 304."""
+        conditional = {}
+        if validators and self.incremental:
+            if validators.get("etag"):
+                conditional["If-None-Match"] = validators["etag"]
+            if validators.get("last_modified"):
+                conditional["If-Modified-Since"] = validators["last_modified"]
+        url = f"{base_url}/products.json?limit={self.page_limit}&page={page}"
+        status, headers, body = await self.fetch(url, result, conditional or None)
+        if status == 304 and conditional:
+            return None, validators
+        if status != 200:
+            raise _FetchError(f"page {page}: HTTP {status}", status)
+        try:
+            data = json.loads(body)
+        except ValueError:
+            raise _FetchError(f"page {page}: not JSON", status) from None
+        if not isinstance(data, dict) or not isinstance(data.get("products"), list):
+            raise _FetchError(f"page {page}: no products list", status)
+        lowered = {k.lower(): v for k, v in headers.items()}
+        return data["products"], {"etag": lowered.get("etag"), "last_modified": lowered.get("last-modified")}
+
+    # ── per store ───────────────────────────────────────────────────────────
+    def _load_previous(self, path: Path, state_path: Path) -> Tuple[Dict, Dict]:
+        """Previous catalog keyed by product id plus its refresh state (both empty if unusable)."""
+        if not self.incremental or not path.exists() or not state_path.exists():
+            return {}, {}
+        try:
+            with state_path.open(encoding="utf-8") as handle:
+                state = json.load(handle)
+            with path.open(encoding="utf-8") as handle:
+                previous = {product["id"]: product for product in json.load(handle)}
+        except (ValueError, KeyError, TypeError):
+            return {}, {}
+        return previous, state
+
+    async def crawl_store(self, key: str, url: str) -> CrawlResult:
+        base_url = url.rstrip("/")
+        path = self.out_dir / f"{key}_products.json"
+        state_path = self.out_dir / STATE_DIRNAME / f"{key}.json"
+        result = CrawlResult(key=key, url=base_url, path=path)
+        started = time.perf_counter()
+
+        age = catalog_age_hours(path)
+        if age is not None and (self.max_age_hours is None or age < self.max_age_hours):
+            with path.open(encoding="utf-8") as handle:
+                result.products = len(json.load(handle))
+            result.status = "cached"
+            self.log(f"  {key}: using cached catalog ({result.products} products, {age:.1f}h old)")
+            return result
+
+        previous, state = self._load_previous(path, state_path)
+        old_pages: Dict[str, Dict] = state.get("pages", {})
+        watermark = _parse_time(state.get("watermark"))
+        # early stops skip deletions, so walk everything now and then
+        full = not previous or time.time() - state.get("last_full", 0) > self.full_every_hours * 3600
+        descending = True          # updated_at never increased so far along the walk
+        newest = watermark
+        pages: Dict[str, Dict] = {}
+        seen_ids = set()
+        walked_ids = set()
+        complete = False
+
+        writer = _CatalogWriter(path)
+        try:
+            try:
+                batch = [await self.fetch_page(base_url, 1, result, old_pages.get("1"))]
+            except _FetchError as exc:
+                result.error = str(exc)
+                result.status = await self._classify(base_url, exc, result)
+                self.log(f"  {key}: {result.status.replace('_', ' ')} ({exc})")
+                return result
+            page, stop = 1, False
+            last_seen: Optional[datetime] = None
+            while True:
+                for number, (products, validators) in enumerate(batch, start=page - len(batch) + 1):
+                    if products is None:
+                        # 304: same products as last time
+                        ids = old_pages[str(number)].get("ids", [])
+                        pages[str(number)] = old_pages[str(number)]
+                        seen_ids.update(ids)
+                        result.not_modified += 1
+                        if not full and state.get("descending"):
+                            stop = True  # newest-first listing: nothing above it changed either
+                            break
+                        if len(ids) < self.page_limit:
+                            complete = stop = True
+                            break
+                        continue
+                    if not products:
+                        complete = stop = True
+                        break
+                    fresh, listed = 0, len(products)
+                    for product in products:
+                        stamp = _parse_time(product.get("updated_at"))
+                        if stamp and last_seen and stamp > last_seen:
+                            descending = False
+                        last_seen = stamp or last_seen
+                        if stamp and (newest is None or stamp > newest):
+                            newest = stamp
+                        if product.get("id") not in previous or not stamp or watermark is None or stamp > watermark:
+                            fresh += 1
+                    products = [p for p in products if p.get("id") not in walked_ids]
+                    walked_ids.update(p.get("id") for p in products)
+                    seen_ids.update(p.get("id") for p in products)
+                    writer.write(products)
+                    result.pages += 1
+                    result.changed += fresh
+                    pages[str(number)] = dict(validators, ids=[p.get("id") for p in products])
+                    if self.verbose:
+                        self.log(f"    {key} page {number}: +{len(products)} ({fresh} new/changed)")
+                    if listed < self.page_limit:
+                        complete = stop = True
+                        break
+                    if not full and descending and not fresh:
+                        stop = True  # newest-first and this whole page is unchanged
+                        break
+                if stop or (self.max_pages is not None and page >= self.max_pages):
+                    break
+                last = page + self.per_host_concurrency
+                if self.max_pages is not None:
+                    last = min(last, self.max_pages)
+                try:
+                    batch = await asyncio.gather(*(
+                        self.fetch_page(base_url, n, result, old_pages.get(str(n)))
+                        for n in range(page + 1, last + 1)
+                    ))
+                except _FetchError as exc:
+                    # keep what we have, like the serial fetchers did
+                    result.error = str(exc)
+                    self.log(f"  {key}: stopped early ({exc})")
+                    break
+                page = last
+
+            # products not re-downloaded: kept, unless a full walk no longer lists them
+            removed = 0
+            for product_id, product in previous.items():
+                if product_id in walked_ids:
+                    continue
+                if complete and full and product_id not in seen_ids:
+                    removed += 1
+                    continue
+                writer.write([product])
+            result.products = writer.count
+            result.status = "ok"
+            if previous and not result.changed and not removed:
+                writer.discard()
+                os.utime(path)
+                self.log(f"  {key}: unchanged ({result.products} products, "
+                         f"{result.not_modified} pages not modified, {result.bytes:,} bytes)")
+            elif writer.commit():
+                self.log(f"  {key}: {result.products} products ({result.changed} new/changed, {removed} removed) "
+                         f"in {result.pages} pages -> {path.name}")
+            else:
+                result.path = None
+                self.log(f"  {key}: no products found")
+            if result.path is not None:
+                if not complete:
+                    pages = {**old_pages, **pages}
+                _write_json(state_path, {
+                    "watermark": newest.isoformat() if newest else None,
+                    "descending": descending if result.pages else state.get("descending", False),
+                    "last_full": time.time() if (complete and full) else state.get("last_full", 0),
+                    "pages": pages,
+                })
+        except BaseException:
+            writer.discard()
+            raise
+        finally:
+            result.seconds = round(time.perf_counter() - started, 2)
+        return result
+
+    async def _classify(self, base_url: str, exc: _FetchError, result: CrawlResult) -> str:
+        """Tell a non-Shopify site from an unreachable one after page 1 failed."""
+        result.path = None
+        if exc.status is None or exc.status in RETRY_STATUS:
+            return "unreachable"  # connection failures / persistent 5xx were already retried
+        if not self.probe_root:
+            return "not_shopify"
+        try:
+            status, _headers, _body = await self.fetch(base_url, result)
+        except _FetchError:
+            return "unreachable"
+        return "not_shopify" if status == 200 else "unreachable"
+
+    # ── all stores ──────────────────────────────────────────────────────────
+    async def crawl(self, stores: Mapping[str, str]) -> Dict[str, CrawlResult]:
+        """Crawl every ``{key: base_url}``; each URL is fetched once even if listed under several keys."""
+        by_url: Dict[str, List[str]] = {}
+        for key, url in stores.items():
+            by_url.setdefault(url.rstrip("/"), []).append(key)
+
+        gate = asyncio.Semaphore(self.max_hosts)
+
+        async def run(url: str, key: str) -> CrawlResult:
+            async with gate:
+                return await self.crawl_store(key, url)
+
+        workers = self.max_hosts * self.per_host_concurrency
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="crawler") as executor:
+            self._executor = executor
+            try:
+                done = await asyncio.gather(*(run(url, keys[0]) for url, keys in by_url.items()))
+            finally:
+                self._executor = None
+
+        results: Dict[str, CrawlResult] = {}
+        for (url, keys), first in zip(by_url.items(), done):
+            results[keys[0]] = first
+            for alias in keys[1:]:
+                copy = CrawlResult(**{**first.__dict__, "key": alias})
+                if first.path is not None and first.path.exists():
+                    copy.path = self.out_dir / f"{alias}_products.json"
+                    if copy.path != first.path:
+                        shutil.copyfile(first.path, copy.path)
+                results[alias] = copy
+        return {key: results[key] for key in stores}
+
+
+def crawl_catalogs(stores: Mapping[str, str], out_dir: Path = DEFAULT_OUT_DIR, **options) -> Dict[str, CrawlResult]:
+    """Synchronous wrapper: ``CatalogCrawler(out_dir, **options).crawl(stores)``."""
+    return asyncio.run(CatalogCrawler(out_dir, **options).crawl(stores))
+
+
+def load_catalog(result: CrawlResult) -> List[Dict]:
+    """Read the products a result points at (``[]`` when nothing was saved)."""
+    if result.path is None or not result.path.exists():
+        return []
+    with result.path.open(encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+def print_summary(results: Mapping[str, CrawlResult], wall: float) -> None:
+    print(f"\n  {'store':<24} {'status':<12} {'products':>8} {'changed':>7} {'pages':>5} {'304':>4} "
+          f"{'req':>5} {'retry':>5} {'KB':>8} {'secs':>6}")
+    for key, r in results.items():
+        print(f"  {key:<24} {r.status:<12} {r.products:>8} {r.changed:>7} {r.pages:>5} {r.not_modified:>4} "
+              f"{r.requests:>5} {r.retries:>5} {r.bytes / 1024:>8.0f} {r.seconds:>6.1f}")
+    total = sum(r.products for r in results.values())
+    print(f"\n  {total} products from {len(results)} stores in {wall:.1f}s")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Crawl Shopify /products.json catalogs concurrently")
+    parser.add_argument("stores", nargs="+", metavar="KEY=URL", help="Store key and base URL")
+    parser.add_argument("--out", type=Path, default=DEFAULT_OUT_DIR, help="Catalog directory")
+    parser.add_argument("--max-hosts", type=int, default=16, help="Stores crawled at once")
+    parser.add_argument("--per-host-concurrency", type=int, default=2, help="Requests in flight per host")
+    parser.add_argument("--per-host-interval", type=float, default=0.5, help="Seconds between request starts per host")
+    parser.add_argument("--retries", type=int, default=4, help="Retries for 429/5xx/connection errors")
+    parser.add_argument("--max-pages", type=int, help="Stop each store after this many pages")
+    parser.add_argument("--max-age-hours", type=float, default=24, help="Reuse catalogs younger than this (0 = always refetch)")
+    parser.add_argument("--full-refresh", action="store_true", help="Ignore saved ETags/watermarks and re-download")
+    parser.add_argument("--verbose", action="store_true", help="Log every page")
+    args = parser.parse_args()
+
+    stores = {}
+    for item in args.stores:
+        key, sep, url = item.partition("=")
+        if not sep or not url:
+            parser.error(f"expected KEY=URL, got {item!r}")
+        stores[key] = url
+
+    started = time.perf_counter()
+    results = crawl_catalogs(
+        stores, args.out, max_hosts=args.max_hosts, per_host_concurrency=args.per_host_concurrency,
+        per_host_interval=args.per_host_interval, retries=args.retries, max_pages=args.max_pages,
+        max_age_hours=args.max_age_hours, incremental=not args.full_refresh, verbose=args.verbose,
+    )
+    print_summary(results, time.perf_counter() - started)
+    return 0 if any(r.status in ("ok", "cached") for r in results.values()) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,479 @@
+#!/usr/bin/env python3
+"""SQLite index over the retailer catalogs in ``outputs/scraped/catalogs``.
+
+The crawler keeps writing ``<retailer>_products.json``; this store mirrors
+them into ``outputs/scraped/catalog_store.sqlite`` so enrichment tools stop
+``json.load``-ing every catalog (full ``body_html``, every variant and
+image) on startup:
+
+* ``slim()`` returns the matching projection only – retailer, handle,
+  title, vendor, product type, tags, min/max/first price, first image,
+  image URLs, first variant weight, counts.
+* ``get(retailer, handle)`` lazily returns the full Shopify product,
+  stored zlib-compressed (recently used products are kept in a small LRU).
+* ``search("big bloom")`` runs an FTS5 prefix query over title + vendor.
+* ``variants(...)`` / ``images(...)`` read the normalized tables built in the
+  same pass: one row per variant (retailer, handle, sku, title, option
+  values, price, compare-at price, grams, weight, barcode, image_id) and per
+  image (image_id, position, src, alt, size).  Prices and weights are parsed
+  once at index time, so consumers filter in SQL (``priced=True``,
+  ``sku=...``, ``variant_prices(keys)``) instead of re-walking product JSON.
+
+``open_store()`` checks each JSON file with a stat; only when its size or
+mtime changed is the file hashed, and a retailer is re-indexed only when
+that content fingerprint differs (the crawler touches unchanged catalogs on
+every refresh).  Retailers whose file is gone are dropped.
+
+Usage:
+    from catalog_store import open_store
+
+    store = open_store()
+    for row in store.slim("hydrobuilder"):
+        ...row["title"], row["min_price"], row["handle"]...
+    product = store.get("hydrobuilder", row["handle"])
+    hits = store.search("foxfarm big bloom", retailer="hydrobuilder", limit=30)
+    for variant in store.variants("hydrobuilder", row["handle"], priced=True):
+        ...variant["sku"], variant["price"], variant["grams"]...
+
+    python scripts/catalog_store.py              # sync and print per-retailer counts
+    python scripts/catalog_store.py --rebuild    # re-index every catalog
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+WORKSPACE = Path(__file__).resolve().parent.parent
+DEFAULT_CATALOG_DIR = WORKSPACE / "outputs" / "scraped" / "catalogs"
+DEFAULT_DB_PATH = WORKSPACE / "outputs" / "scraped" / "catalog_store.sqlite"
+SCHEMA_VERSION = 3
+LRU_SIZE = 2048
+SQL_CHUNK = 500               # bound parameters per IN (...) query
+
+SLIM_COLUMNS = (
+    "retailer", "handle", "title", "vendor", "product_type", "tags", "min_price", "max_price",
+    "first_price", "image", "images", "weight", "weight_unit", "variant_count", "image_count", "updated_at",
+)
+VARIANT_COLUMNS = (
+    "retailer", "handle", "position", "variant_id", "sku", "title", "option1", "option2", "option3",
+    "price", "compare_at_price", "grams", "weight", "weight_unit", "barcode", "image_id",
+)
+IMAGE_COLUMNS = ("retailer", "handle", "position", "image_id", "src", "alt", "width", "height")
+GRAMS_PER_UNIT = {"g": 1.0, "kg": 1000.0, "lb": 453.59237, "oz": 28.349523125}
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS sources (
+    retailer TEXT PRIMARY KEY,
+    path TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    fingerprint TEXT NOT NULL,
+    products INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS products (
+    rowid INTEGER PRIMARY KEY,
+    retailer TEXT NOT NULL,
+    handle TEXT NOT NULL,
+    title TEXT NOT NULL,
+    vendor TEXT,
+    product_type TEXT,
+    tags TEXT,
+    min_price REAL,
+    max_price REAL,
+    first_price TEXT,
+    image TEXT,
+    images TEXT,
+    weight REAL,
+    weight_unit TEXT,
+    variant_count INTEGER,
+    image_count INTEGER,
+    updated_at TEXT,
+    body BLOB NOT NULL,
+    UNIQUE (retailer, handle)
+);
+CREATE TABLE IF NOT EXISTS variants (
+    retailer TEXT NOT NULL,
+    handle TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    variant_id INTEGER,
+    sku TEXT,
+    title TEXT,
+    option1 TEXT,
+    option2 TEXT,
+    option3 TEXT,
+    price REAL,
+    compare_at_price REAL,
+    grams INTEGER,
+    weight REAL,
+    weight_unit TEXT,
+    barcode TEXT,
+    image_id INTEGER
+);
+CREATE INDEX IF NOT EXISTS variants_product ON variants (retailer, handle);
+CREATE INDEX IF NOT EXISTS variants_sku ON variants (sku);
+CREATE TABLE IF NOT EXISTS images (
+    retailer TEXT NOT NULL,
+    handle TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    image_id INTEGER,
+    src TEXT NOT NULL,
+    alt TEXT,
+    width INTEGER,
+    height INTEGER
+);
+CREATE INDEX IF NOT EXISTS images_product ON images (retailer, handle);
+CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5(
+    title, vendor, content='products', content_rowid='rowid'
+);
+PRAGMA user_version = {SCHEMA_VERSION};
+"""
+
+
+def file_fingerprint(path: Path) -> str:
+    """sha256 of a catalog file's bytes."""
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        for chunk in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def parse_price(value: object) -> Optional[float]:
+    """Positive float from a Shopify price/weight string or number, else None."""
+    try:
+        price = float(value)
+    except (TypeError, ValueError):
+        return None
+    return price if price > 0 else None
+
+
+def _image_src(image: object) -> str:
+    return (image.get("src") or "") if isinstance(image, dict) else str(image or "")
+
+
+def _int(value: object) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def normalize_product(retailer: str, product: Dict) -> Tuple[List[Tuple], List[Tuple]]:
+    """Flatten one Shopify product into ``variants`` and ``images`` rows (``*_COLUMNS`` order)."""
+    handle = product.get("handle") or str(product.get("id", ""))
+    variants = []
+    for position, variant in enumerate(product.get("variants") or [], 1):
+        if not isinstance(variant, dict):
+            continue
+        weight = parse_price(variant.get("weight"))
+        weight_unit = (variant.get("weight_unit") or "lb") if weight else None
+        grams = _int(variant.get("grams")) or None
+        if grams is None and weight and weight_unit in GRAMS_PER_UNIT:
+            grams = round(weight * GRAMS_PER_UNIT[weight_unit])
+        featured = variant.get("featured_image")
+        image_id = variant.get("image_id") or (featured.get("id") if isinstance(featured, dict) else None)
+        variants.append((
+            retailer, handle, position, _int(variant.get("id")), variant.get("sku") or None,
+            variant.get("title") or None, variant.get("option1"), variant.get("option2"), variant.get("option3"),
+            parse_price(variant.get("price")), parse_price(variant.get("compare_at_price")), grams,
+            weight, weight_unit, variant.get("barcode") or None, _int(image_id),
+        ))
+    images = []
+    raw_images = product.get("images") or ([product["image"]] if product.get("image") else [])
+    for image in raw_images:
+        src = _image_src(image)
+        if not src:
+            continue
+        meta = image if isinstance(image, dict) else {}
+        images.append((retailer, handle, len(images) + 1, _int(meta.get("id")), src, meta.get("alt") or None,
+                       _int(meta.get("width")), _int(meta.get("height"))))
+    return variants, images
+
+
+def slim_row(retailer: str, product: Dict, variants: Optional[List[Tuple]] = None,
+             images: Optional[List[Tuple]] = None) -> Tuple:
+    """Flatten one Shopify product into a ``products`` row (``SLIM_COLUMNS`` + compressed body).
+
+    Aggregates come from the normalized rows (``normalize_product``), so
+    prices and weights are parsed once.
+    """
+    if variants is None or images is None:
+        variants, images = normalize_product(retailer, product)
+    price_at = VARIANT_COLUMNS.index("price")
+    weight_at = VARIANT_COLUMNS.index("weight")
+    prices = [v[price_at] for v in variants if v[price_at] is not None]
+    first_price = f"{prices[0]:.2f}" if prices else None
+    srcs = [image[IMAGE_COLUMNS.index("src")] for image in images]
+    weighed = next((v for v in variants if v[weight_at]), None)
+    tags = product.get("tags") or ""
+    if isinstance(tags, list):
+        tags = ", ".join(tags)
+    body = zlib.compress(json.dumps(product, ensure_ascii=False).encode("utf-8"), 6)
+    return (
+        retailer, product.get("handle") or str(product.get("id", "")), product.get("title") or "",
+        product.get("vendor") or "", product.get("product_type") or "", tags,
+        min(prices) if prices else None, max(prices) if prices else None, first_price,
+        srcs[0] if srcs else None, json.dumps(srcs),
+        weighed[weight_at] if weighed else None, weighed[weight_at + 1] if weighed else None,
+        len(product.get("variants") or []), len(srcs), product.get("updated_at"), body,
+    )
+
+
+class CatalogStore:
+    """Read-mostly catalog index; safe to share between threads (one connection, one lock)."""
+
+    def __init__(self, db_path: Path = DEFAULT_DB_PATH, catalog_dir: Path = DEFAULT_CATALOG_DIR) -> None:
+        self.db_path = Path(db_path)
+        self.catalog_dir = Path(catalog_dir)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._lru: "OrderedDict[Tuple[str, str], Dict]" = OrderedDict()
+        self.conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        if self.conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            self.conn.executescript("DROP TABLE IF EXISTS products_fts; DROP TABLE IF EXISTS products; "
+                                    "DROP TABLE IF EXISTS variants; DROP TABLE IF EXISTS images; "
+                                    "DROP TABLE IF EXISTS sources;")
+        self.conn.executescript(SCHEMA)
+
+    # ── indexing ────────────────────────────────────────────────────────────
+    def sync(self, rebuild: bool = False) -> Dict[str, int]:
+        """Re-index catalogs whose content changed; returns {retailer: products} for those re-indexed (or dropped)."""
+        with self._lock:
+            known = {row["retailer"]: row for row in self.conn.execute("SELECT * FROM sources")}
+            files = {path.name[: -len("_products.json")]: path
+                     for path in sorted(self.catalog_dir.glob("*_products.json"))}
+            changed: Dict[str, int] = {}
+            for retailer in set(known) - set(files):
+                self._drop(retailer)
+                changed[retailer] = 0
+            for retailer, path in files.items():
+                stat = path.stat()
+                row = known.get(retailer)
+                if not rebuild and row and row["size"] == stat.st_size and row["mtime"] == stat.st_mtime:
+                    continue
+                fingerprint = file_fingerprint(path)
+                if not rebuild and row and row["fingerprint"] == fingerprint:
+                    # touched but identical: remember the new stat, keep the rows
+                    self.conn.execute("UPDATE sources SET path = ?, size = ?, mtime = ? WHERE retailer = ?",
+                                      (str(path), stat.st_size, stat.st_mtime, retailer))
+                    continue
+                count = self._index(retailer, path, stat.st_size, stat.st_mtime, fingerprint)
+                if count is not None:
+                    changed[retailer] = count
+            if changed:
+                self.conn.execute("INSERT INTO products_fts(products_fts) VALUES ('rebuild')")
+                self.conn.commit()
+                self._lru.clear()
+            self.conn.commit()
+            return changed
+
+    def _drop(self, retailer: str) -> None:
+        for table in ("products", "variants", "images"):
+            self.conn.execute(f"DELETE FROM {table} WHERE retailer = ?", (retailer,))
+        self.conn.execute("DELETE FROM sources WHERE retailer = ?", (retailer,))
+
+    def _index(self, retailer: str, path: Path, size: int, mtime: float, fingerprint: str) -> Optional[int]:
+        """Replace a retailer's rows from its file; None when the file was unusable (rows kept)."""
+        try:
+            with path.open(encoding="utf-8") as handle:
+                products = json.load(handle)
+        except ValueError as exc:
+            print(f"  ⚠️  {path.name}: not valid JSON ({exc}); keeping the previous index")
+            return None
+        if not isinstance(products, list):
+            print(f"  ⚠️  {path.name}: not a product list; skipped")
+            return None
+        self._drop(retailer)
+        by_handle = {}  # a handle listed twice keeps its last copy, as INSERT OR REPLACE did
+        for product in products:
+            if isinstance(product, dict):
+                by_handle[product.get("handle") or str(product.get("id", ""))] = product
+        slim_rows, variant_rows, image_rows = [], [], []
+        for product in by_handle.values():
+            variants, images = normalize_product(retailer, product)
+            slim_rows.append(slim_row(retailer, product, variants, images))
+            variant_rows.extend(variants)
+            image_rows.extend(images)
+        for table, columns, rows in (("products", SLIM_COLUMNS + ("body",), slim_rows),
+                                     ("variants", VARIANT_COLUMNS, variant_rows),
+                                     ("images", IMAGE_COLUMNS, image_rows)):
+            self.conn.executemany(
+                f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})", rows
+            )
+        count = self.conn.execute("SELECT COUNT(*) FROM products WHERE retailer = ?", (retailer,)).fetchone()[0]
+        self.conn.execute("INSERT INTO sources VALUES (?, ?, ?, ?, ?, ?)",
+                          (retailer, str(path), size, mtime, fingerprint, count))
+        return count
+
+    # ── reads ───────────────────────────────────────────────────────────────
+    @staticmethod
+    def _slim(row: sqlite3.Row) -> Dict:
+        item = {column: row[column] for column in SLIM_COLUMNS}
+        item["images"] = json.loads(item["images"] or "[]")
+        return item
+
+    def retailers(self) -> Dict[str, int]:
+        with self._lock:
+            return {row["retailer"]: row["products"]
+                    for row in self.conn.execute("SELECT retailer, products FROM sources ORDER BY retailer")}
+
+    def slim(self, retailer: Optional[str] = None, priced: bool = False) -> List[Dict]:
+        """Matching projection for one retailer (or all, ordered by retailer); ``priced``: titled rows with a price."""
+        sql = f"SELECT {', '.join(SLIM_COLUMNS)} FROM products"
+        where, params = [], []
+        if retailer:
+            where.append("retailer = ?")
+            params.append(retailer)
+        if priced:
+            where.append("min_price IS NOT NULL AND title != ''")
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        with self._lock:
+            return [self._slim(row) for row in self.conn.execute(sql + " ORDER BY retailer, rowid", params)]
+
+    def get(self, retailer: str, handle: str) -> Optional[Dict]:
+        """Full Shopify product by retailer + handle, or None."""
+        key = (retailer, handle)
+        with self._lock:
+            if key in self._lru:
+                self._lru.move_to_end(key)
+                return self._lru[key]
+            row = self.conn.execute("SELECT body FROM products WHERE retailer = ? AND handle = ?", key).fetchone()
+            if row is None:
+                return None
+            product = json.loads(zlib.decompress(row["body"]))
+            self._lru[key] = product
+            if len(self._lru) > LRU_SIZE:
+                self._lru.popitem(last=False)
+            return product
+
+    def get_many(self, keys: Iterable[Tuple[str, str]]) -> Dict[Tuple[str, str], Dict]:
+        found = {}
+        for key in keys:
+            product = self.get(*key)
+            if product is not None:
+                found[key] = product
+        return found
+
+    def search(self, query: str, retailer: Optional[str] = None, limit: int = 30) -> List[Dict]:
+        """Slim rows whose title/vendor contain every word of ``query`` as a word prefix."""
+        words = re.findall(r"\w+", query.lower())
+        if not words:
+            return []
+        match = " ".join(f'"{word}"*' for word in words)
+        sql = (f"SELECT {', '.join('p.' + c for c in SLIM_COLUMNS)} FROM products_fts "
+               "JOIN products p ON p.rowid = products_fts.rowid WHERE products_fts MATCH ?")
+        params: List = [match]
+        if retailer:
+            sql += " AND p.retailer = ?"
+            params.append(retailer)
+        sql += " ORDER BY rank LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            return [self._slim(row) for row in self.conn.execute(sql, params)]
+
+    def variants(self, retailer: Optional[str] = None, handle: Optional[str] = None, *,
+                 sku: Optional[str] = None, priced: bool = False) -> List[Dict]:
+        """Normalized variant rows, filtered in SQL, in catalog order."""
+        where, params = [], []
+        for column, value in (("retailer", retailer), ("handle", handle), ("sku", sku)):
+            if value is not None:
+                where.append(f"{column} = ?")
+                params.append(value)
+        if priced:
+            where.append("price IS NOT NULL")
+        sql = f"SELECT {', '.join(VARIANT_COLUMNS)} FROM variants"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        with self._lock:
+            return [dict(row) for row in self.conn.execute(sql + " ORDER BY rowid", params)]
+
+    def images(self, retailer: str, handle: str) -> List[Dict]:
+        """Normalized image rows of one product, by position."""
+        with self._lock:
+            return [dict(row) for row in self.conn.execute(
+                f"SELECT {', '.join(IMAGE_COLUMNS)} FROM images WHERE retailer = ? AND handle = ? ORDER BY position",
+                (retailer, handle),
+            )]
+
+    def variant_prices(self, keys: Iterable[Tuple[str, str]]) -> Dict[Tuple[str, str], List[float]]:
+        """Sorted positive variant prices per ``(retailer, handle)`` that has any."""
+        prices: Dict[Tuple[str, str], List[float]] = {}
+        by_retailer: Dict[str, List[str]] = {}
+        for retailer, handle in set(keys):
+            by_retailer.setdefault(retailer, []).append(handle)
+        for retailer, handles in sorted(by_retailer.items()):
+            for start in range(0, len(handles), SQL_CHUNK):
+                chunk = handles[start:start + SQL_CHUNK]
+                with self._lock:
+                    rows = self.conn.execute(
+                        "SELECT handle, price FROM variants WHERE retailer = ? AND price IS NOT NULL "
+                        f"AND handle IN ({', '.join('?' * len(chunk))}) ORDER BY handle, price",
+                        [retailer, *chunk],
+                    ).fetchall()
+                for handle, price in rows:
+                    prices.setdefault((retailer, handle), []).append(price)
+        return prices
+
+    def iter_products(self, retailer: Optional[str] = None) -> Iterator[Tuple[str, Dict]]:
+        """Yield ``(retailer, full product)`` one at a time (for tools that really need everything)."""
+        sql = "SELECT retailer, body FROM products"
+        params: Tuple = ()
+        if retailer:
+            sql += " WHERE retailer = ?"
+            params = (retailer,)
+        with self._lock:
+            rows = self.conn.execute(sql + " ORDER BY retailer, rowid", params).fetchall()
+        for row in rows:
+            yield row["retailer"], json.loads(zlib.decompress(row["body"]))
+
+    def close(self) -> None:
+        with self._lock:
+            self.conn.close()
+
+
+def open_store(db_path: Path = DEFAULT_DB_PATH, catalog_dir: Path = DEFAULT_CATALOG_DIR) -> CatalogStore:
+    """Open the store and bring it up to date with the catalog files."""
+    store = CatalogStore(db_path, catalog_dir)
+    changed = store.sync()
+    if changed:
+        print(f"  Catalog store: re-indexed {', '.join(f'{k} ({v})' for k, v in sorted(changed.items()))}")
+    return store
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Sync the SQLite retailer catalog index")
+    parser.add_argument("--db", type=Path, default=DEFAULT_DB_PATH)
+    parser.add_argument("--catalogs", type=Path, default=DEFAULT_CATALOG_DIR)
+    parser.add_argument("--rebuild", action="store_true", help="Re-index every catalog")
+    parser.add_argument("--search", help="Run a title search after syncing")
+    args = parser.parse_args()
+
+    store = CatalogStore(args.db, args.catalogs)
+    changed = store.sync(rebuild=args.rebuild)
+    for retailer, count in store.retailers().items():
+        marker = " (re-indexed)" if retailer in changed else ""
+        print(f"  {retailer:<24} {count:>7} products{marker}")
+    if args.search:
+        for row in store.search(args.search):
+            print(f"  [{row['retailer']}] {row['title']} – {row['min_price']} ({row['handle']})")
+            for variant in store.variants(row["retailer"], row["handle"], priced=True):
+                print(f"      {variant['title'] or '-':<30} {variant['sku'] or '':<16} {variant['price']:>8.2f}"
+                      f"  {variant['grams'] or '':>6}")
+    store.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -13,12 +13,16 @@ Phases:
 Usage:
   python scripts/category_cleanup.py           # Dry run (default)
   python scripts/category_cleanup.py --confirm  # LIVE run
+  python scripts/category_cleanup.py --confirm --bulk-sql  # LIVE, set-based term moves
 """
 
 import json, os, sys, time
 
+from wp_bulk_sql import BULK_SQL_LIB_PHP
+
 BASE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 CONFIRM = '--confirm' in sys.argv
+BULK_SQL = '--bulk-sql' in sys.argv
 
 SSH_HOST = os.getenv('HMOON_SSH_HOST')
 SSH_USER = os.getenv('HMOON_SSH_USER')
@@ -85,14 +89,21 @@ REPARENT = {
 }
 
 
-def build_php(dry_run=True):
-    """Generate the PHP cleanup script as a string."""
+def build_php(dry_run=True, bulk=False):
+    """Generate the PHP cleanup script as a string.
+
+    With ``bulk`` the per-product term loops become set-based moves
+    (see wp_bulk_sql.py) inside one transaction.
+    """
     mode = 'DRY RUN' if dry_run else 'LIVE'
     dry_val = 'true' if dry_run else 'false'
+    bulk = bulk and not dry_run
 
     p = []
     p.append('<?php')
-    p.append('// H-Moon Hydro Category Cleanup - ' + mode)
+    if bulk:
+        p.append(BULK_SQL_LIB_PHP)
+    p.append('// H-Moon Hydro Category Cleanup - ' + mode + (' (bulk SQL)' if bulk else ''))
     p.append('// Generated: ' + time.strftime("%Y-%m-%d %H:%M"))
     p.append('')
     p.append('wp_set_current_user(1);')
@@ -104,6 +115,8 @@ def build_php(dry_run=True):
     p.append('function logmsg($msg) {')
     p.append('    global $log; $log[] = $msg; echo $msg . "\\n";')
     p.append('}')
+    if bulk:
+        p.append('hmoon_bulk_begin();')
 
     # PHASE 1
     p.append('')
@@ -165,11 +178,14 @@ def build_php(dry_run=True):
         p.append('        $count = count($products);')
         p.append('        logmsg("  Merge $abs_id \\"{$abs_term->name}\\" ($count) -> $keep_id \\"{$keep_term->name}\\"");')
         p.append('        if (!$dry) {')
-        p.append('            foreach ($products as $pid) {')
-        p.append('                wp_set_object_terms($pid, $keep_id, \'product_cat\', true);')
-        p.append('                wp_remove_object_terms($pid, $abs_id, \'product_cat\');')
-        p.append('                $stats["moved"]++;')
-        p.append('            }')
+        if bulk:
+            p.append('            $stats["moved"] += count(hmoon_bulk_move_term(\'product_cat\', $abs_id, $keep_id));')
+        else:
+            p.append('            foreach ($products as $pid) {')
+            p.append('                wp_set_object_terms($pid, $keep_id, \'product_cat\', true);')
+            p.append('                wp_remove_object_terms($pid, $abs_id, \'product_cat\');')
+            p.append('                $stats["moved"]++;')
+            p.append('            }')
         p.append('            wp_delete_term($abs_id, \'product_cat\');')
         p.append('            $stats["merged"]++;')
         p.append('            logmsg("    -> Moved $count products, deleted cat $abs_id");')
@@ -215,18 +231,25 @@ def build_php(dry_run=True):
         p.append('    $count = count($products);')
         p.append('    logmsg("  Brand $brand_cat_id \\"{$brand_cat->name}\\" ($count) -> cat $move_to_id + brand \\"$brand_name\\"");')
         p.append('    if (!$dry) {')
-        p.append('        $bt = get_term_by(\'name\', $brand_name, \'pwb-brand\');')
-        p.append('        if (!$bt) {')
-        p.append('            $r = wp_insert_term($brand_name, \'pwb-brand\');')
-        p.append('            if (!is_wp_error($r)) logmsg("    Created brand: \\"$brand_name\\"");')
-        p.append('        }')
-        p.append('        foreach ($products as $pid) {')
-        p.append('            wp_set_object_terms($pid, $move_to_id, \'product_cat\', true);')
-        p.append('            wp_remove_object_terms($pid, $brand_cat_id, \'product_cat\');')
-        p.append('            wp_set_object_terms($pid, $brand_name, \'pwb-brand\', false);')
-        p.append('            $stats["moved"]++;')
-        p.append('            $stats["brands_set"]++;')
-        p.append('        }')
+        if bulk:
+            p.append('        $bt_id = hmoon_bulk_term_id($brand_name, \'pwb-brand\');')
+            p.append('        $moved = hmoon_bulk_move_term(\'product_cat\', $brand_cat_id, $move_to_id);')
+            p.append('        if ($bt_id) hmoon_bulk_set_terms(\'pwb-brand\', $moved, array($bt_id), false);')
+            p.append('        $stats["moved"] += count($moved);')
+            p.append('        $stats["brands_set"] += $bt_id ? count($moved) : 0;')
+        else:
+            p.append('        $bt = get_term_by(\'name\', $brand_name, \'pwb-brand\');')
+            p.append('        if (!$bt) {')
+            p.append('            $r = wp_insert_term($brand_name, \'pwb-brand\');')
+            p.append('            if (!is_wp_error($r)) logmsg("    Created brand: \\"$brand_name\\"");')
+            p.append('        }')
+            p.append('        foreach ($products as $pid) {')
+            p.append('            wp_set_object_terms($pid, $move_to_id, \'product_cat\', true);')
+            p.append('            wp_remove_object_terms($pid, $brand_cat_id, \'product_cat\');')
+            p.append('            wp_set_object_terms($pid, $brand_name, \'pwb-brand\', false);')
+            p.append('            $stats["moved"]++;')
+            p.append('            $stats["brands_set"]++;')
+            p.append('        }')
         p.append('        wp_delete_term($brand_cat_id, \'product_cat\');')
         p.append('        $stats["merged"]++;')
         p.append('        logmsg("    -> Moved $count, set brand, deleted cat $brand_cat_id");')
@@ -251,6 +274,10 @@ def build_php(dry_run=True):
         p.append('}')
         p.append('')
 
+    if bulk:
+        p.append('if (!hmoon_bulk_finish()) $errors[] = "Bulk SQL transaction rolled back";')
+        p.append('')
+
     # SUMMARY
     p.append('logmsg("=== SUMMARY ===");')
     p.append('$mode_str = $dry ? "DRY RUN" : "LIVE";')
@@ -296,9 +323,11 @@ def run():
     print('Phase 2: Merge ' + str(merge_count) + ' cats into ' + str(len(MERGE_MAP)) + ' targets')
     print('Phase 3: Dissolve ' + str(len(BRAND_CATS)) + ' brand-as-category entries')
     print('Phase 4: Reparent ' + str(len(REPARENT)) + ' sub-categories')
+    if BULK_SQL:
+        print('Backend: bulk SQL (set-based term moves, one transaction)')
     print()
 
-    php_code = build_php(dry_run)
+    php_code = build_php(dry_run, bulk=BULK_SQL)
 
     # Save PHP locally
     php_path = os.path.join(BASE, 'outputs', 'category_cleanup.php')
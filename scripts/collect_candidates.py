@@ -21,6 +21,9 @@ import json, re, os, sys, time, html
 from pathlib import Path
 from urllib.parse import quote
 
+from catalog_store import open_store
+from image_prefetch import normalize_image_url
+
 BASE = Path(__file__).resolve().parent.parent
 
 STOP_WORDS = {'the', 'a', 'an', 'and', 'or', 'in', 'of', 'for', 'with', 'by',
@@ -117,9 +120,10 @@ def extract_candidate(catalog_item, retailer, score):
     for img in item.get('images', []):
         src = img.get('src', img) if isinstance(img, dict) else str(img)
         if src:
-            # Remove Shopify size suffix to get full-res URL
-            full = re.sub(r'_\d+x\d*\.', '.', src)
-            images.append(full)
+            # Full-res URL: no Shopify CDN size suffix or ?v= cache buster
+            full = normalize_image_url(src)
+            if full not in images:
+                images.append(full)
 
     # Extract price from variants
     price = None
@@ -181,22 +185,13 @@ def main():
         products = json.load(f)
     print(f"  Products: {len(products)}")
 
-    # Load all retailer catalogs
-    catalog_dir = BASE / 'outputs' / 'scraped' / 'catalogs'
-    all_items = []
-    retailer_map = {}  # idx -> retailer name
-    catalog_sizes = {}
-
-    for fp in sorted(catalog_dir.glob('*.json')):
-        retailer = fp.stem.replace('_products', '')
-        with open(fp, 'r', encoding='utf-8') as f:
-            items = json.load(f)
-        start_idx = len(all_items)
-        all_items.extend(items)
-        for i in range(start_idx, len(all_items)):
-            retailer_map[i] = retailer
-        catalog_sizes[retailer] = len(items)
-        print(f"  Catalog {retailer}: {len(items)} products")
+    # Load all retailer catalogs (slim rows for matching; full products per candidate)
+    store = open_store()
+    all_items = store.slim()
+    retailer_map = {i: item['retailer'] for i, item in enumerate(all_items)}  # idx -> retailer name
+    catalog_sizes = store.retailers()
+    for retailer, count in catalog_sizes.items():
+        print(f"  Catalog {retailer}: {count} products")
 
     print(f"  Total catalog: {len(all_items)} products")
     print(f"  Max candidates per product: {max_per_product}")
@@ -241,7 +236,8 @@ def main():
                 continue
             seen_titles.add(dup_key)
 
-            candidate = extract_candidate(item, retailer, score)
+            full = store.get(retailer, item['handle']) or item
+            candidate = extract_candidate(full, retailer, score)
             if candidate['images'] or candidate['description_text'] or candidate['price']:
                 candidates.append(candidate)
 
@@ -10,12 +10,12 @@ Runs a Flask server at http://localhost:5111 providing:
 
 Usage:
     python scripts/curate.py              # Start dashboard
-    python scripts/curate.py --refresh    # Refresh manifest from server first
+    python scripts/curate.py --refresh    # Refresh manifest from server first (changed products only)
+    python scripts/curate.py --refresh --full   # ...re-exporting every product
 """
 
 import json
 import os
-import re
 import sys
 import textwrap
 import time
@@ -26,6 +26,10 @@ from pathlib import Path
 import paramiko
 from flask import Flask, jsonify, request, send_from_directory
 
+from catalog_store import open_store
+from image_prefetch import ImagePrefetcher, normalize_image_url
+from manifest_stream import refresh_manifest_file
+
 # ── paths ──────────────────────────────────────────────────────────────
 WORKSPACE = Path(__file__).parent.parent
 MANIFEST   = WORKSPACE / "outputs" / "enrichment_manifest.json"
@@ -41,21 +45,26 @@ USER = os.getenv('HMOON_SSH_USER')
 PASS = os.getenv('HMOON_SSH_PASS')
 SITE = os.getenv('HMOON_SITE_DIR', '~/hmoonhydro.com')
 
+# ── candidate image prefetch ───────────────────────────────────────────
+PREFETCH_WORKERS  = 8
+PREFETCH_MIN_SIDE = 100   # px; smaller candidate images are icons/placeholders
+
 # ── Flask app ──────────────────────────────────────────────────────────
 app = Flask(__name__, static_folder=str(STATIC_DIR), static_url_path="/static")
 
 # ── caches (loaded once on startup) ────────────────────────────────────
 _manifest = []
 _matches  = {}       # id → enrichment_match record
-_catalogs = {}       # retailer → [products]
+_store    = None     # CatalogStore: retailer catalogs, searched on disk
 _queue    = []        # pending changes
 _brands   = set()     # known brand names
 _candidates = {}      # id -> candidate data
+_prefetcher = None    # ImagePrefetcher: candidate images downloaded in the background
 
 
 def load_data():
     """Load manifest, matches, candidates, and retailer catalogs into memory."""
-    global _manifest, _matches, _catalogs, _queue, _brands, _candidates
+    global _manifest, _matches, _store, _queue, _brands, _candidates, _prefetcher
 
     # Manifest
     if MANIFEST.exists():
@@ -70,10 +79,11 @@ def load_data():
 
     # Retailer catalogs
     if CATALOGS.is_dir():
-        for f in CATALOGS.glob("*_products.json"):
-            key = f.stem.replace("_products", "")
-            _catalogs[key] = json.loads(f.read_text(encoding="utf-8"))
-            print(f"  Catalog {key}: {len(_catalogs[key])} products")
+        if _store is not None:
+            _store.close()
+        _store = open_store(catalog_dir=CATALOGS)
+        for key, count in _store.retailers().items():
+            print(f"  Catalog {key}: {count} products")
 
     # Curation queue
     if QUEUE_FILE.exists():
@@ -90,6 +100,9 @@ def load_data():
         _candidates = json.loads(CANDIDATES.read_text(encoding="utf-8"))
     print(f"  Candidates: {len(_candidates)} products with candidate data")
 
+    if _prefetcher is None:
+        _prefetcher = ImagePrefetcher(workers=PREFETCH_WORKERS, min_side=PREFETCH_MIN_SIDE)
+
 
 def save_queue():
     """Persist the curation queue."""
@@ -183,7 +196,7 @@ def api_product_detail(pid):
 
 @app.route("/api/search")
 def api_search_catalogs():
-    """Search retailer catalogs. ?q=foxfarm+big+bloom&retailer=hydrobuilder"""
+    """Search retailer catalogs (word prefixes in title/vendor). ?q=foxfarm+big+bloom&retailer=hydrobuilder"""
     q = request.args.get("q", "").lower().split()
     retailer = request.args.get("retailer", "")
     limit = int(request.args.get("limit", 30))
@@ -192,33 +205,30 @@ def api_search_catalogs():
         return jsonify({"results": []})
 
     results = []
-    sources = {retailer: _catalogs[retailer]} if retailer and retailer in _catalogs else _catalogs
-
-    for rkey, products in sources.items():
-        for p in products:
-            title_lower = p.get("title", "").lower()
-            if all(tok in title_lower for tok in q):
-                images = p.get("images", [])
-                variants = p.get("variants", [])
-                results.append({
-                    "retailer": rkey,
-                    "title": p["title"],
-                    "handle": p.get("handle", ""),
-                    "vendor": p.get("vendor", ""),
-                    "product_type": p.get("product_type", ""),
-                    "image": images[0]["src"] if images else None,
-                    "image_count": len(images),
-                    "images": [img["src"] for img in images[:6]],
-                    "price": variants[0].get("price") if variants else None,
-                    "weight": variants[0].get("weight") if variants else None,
-                    "weight_unit": variants[0].get("weight_unit", "lb") if variants else None,
-                    "tags": p.get("tags", ""),
-                    "body_html_preview": (p.get("body_html") or "")[:300],
-                })
-            if len(results) >= limit:
-                break
-        if len(results) >= limit:
-            break
+    if _store is None:
+        return jsonify({"results": [], "total": 0})
+    if retailer not in _store.retailers():
+        retailer = None
+
+    for hit in _store.search(" ".join(q), retailer=retailer, limit=limit):
+        p = _store.get(hit["retailer"], hit["handle"]) or {}
+        images = p.get("images", [])
+        variants = p.get("variants", [])
+        results.append({
+            "retailer": hit["retailer"],
+            "title": p.get("title", hit["title"]),
+            "handle": hit["handle"],
+            "vendor": p.get("vendor", ""),
+            "product_type": p.get("product_type", ""),
+            "image": images[0]["src"] if images else None,
+            "image_count": len(images),
+            "images": [img["src"] for img in images[:6]],
+            "price": variants[0].get("price") if variants else None,
+            "weight": variants[0].get("weight") if variants else None,
+            "weight_unit": variants[0].get("weight_unit", "lb") if variants else None,
+            "tags": p.get("tags", ""),
+            "body_html_preview": (p.get("body_html") or "")[:300],
+        })
 
     return jsonify({"results": results, "total": len(results)})
 
@@ -240,6 +250,11 @@ def api_candidates(pid):
     if min_score:
         candidates = [c for c in candidates if c["score"] >= min_score]
 
+    # Start downloading their images now, so the All Images tab opens from disk
+    for c in sorted(candidates, key=lambda c: -c["score"]):
+        for img_url in c.get("images", []):
+            _prefetcher.submit(img_url)
+
     return jsonify({
         "title": data.get("title", ""),
         "current_thumb": data.get("current_thumb", ""),
@@ -251,7 +266,12 @@ def api_candidates(pid):
 
 @app.route("/api/candidates/<int:pid>/images")
 def api_candidate_images(pid):
-    """Get ALL images across all candidates for a product, deduped and scored."""
+    """Get ALL images across all candidates for a product, deduped and scored.
+
+    Images already in the prefetch cache carry ``local_url`` and their pixel
+    size; the rest are queued for download.  Copies of one picture under
+    different URLs are listed once.
+    """
     data = _candidates.get(str(pid))
     if not data:
         return jsonify({"images": [], "total": 0})
@@ -260,8 +280,8 @@ def api_candidate_images(pid):
     seen = set()
     for c in data.get("candidates", []):
         for img_url in c.get("images", []):
-            # Deduplicate by normalized URL (ignore size variants)
-            norm = re.sub(r'_\d+x\d*\.', '.', img_url)
+            # Deduplicate by normalized URL (ignore Shopify size variants and ?v= cache busters)
+            norm = normalize_image_url(img_url)
             if norm in seen:
                 continue
             seen.add(norm)
@@ -273,14 +293,38 @@ def api_candidate_images(pid):
                 "vendor": c.get("vendor", ""),
             })
 
+    entries = _prefetcher.lookup_many(img["url"] for img in images)
+    listed, hashes = [], set()
+    for img in images:
+        entry = entries.get(img["url"])
+        if entry is None or entry["status"] == "error":
+            _prefetcher.submit(img["url"])
+            img["status"] = "pending"
+        elif entry["status"] == "ok":
+            if entry["sha256"] in hashes:
+                continue  # same bytes as an image already listed
+            hashes.add(entry["sha256"])
+            img.update(status="ready", local_url=f"/api/image-cache/{entry['file']}",
+                       width=entry["width"], height=entry["height"], bytes=entry["bytes"])
+        else:
+            img.update(status="rejected", error=entry["error"])
+        listed.append(img)
+
     return jsonify({
         "title": data.get("title", ""),
         "current_thumb": data.get("current_thumb", ""),
-        "images": images,
-        "total": len(images),
+        "images": listed,
+        "total": len(listed),
+        "ready": sum(1 for img in listed if img["status"] == "ready"),
     })
 
 
+@app.route("/api/image-cache/<name>")
+def api_image_cache(name):
+    """Serve a prefetched candidate image from the local cache."""
+    return send_from_directory(str(_prefetcher.cache_dir), name, max_age=86400)
+
+
 @app.route("/api/candidates/stats")
 def api_candidate_stats():
     """Overview stats on candidate data."""
@@ -406,7 +450,7 @@ def api_apply_single():
 def api_refresh():
     """Re-export manifest from server and reload data."""
     try:
-        _refresh_manifest()
+        _refresh_manifest(full=bool(request.args.get("full")))
         load_data()
         return jsonify({"ok": True, "total": len(_manifest)})
     except Exception as ex:
@@ -543,24 +587,17 @@ def _run_on_server(php_code: str, dry_run: bool) -> str:
     return out + ("\nSTDERR: " + err if err.strip() else "")
 
 
-def _refresh_manifest():
-    """Re-export manifest from server."""
+def _refresh_manifest(full: bool = False):
+    """Re-export changed products from server and merge them into the manifest."""
     ssh = _ssh_connect()
-    php_path = str(WORKSPACE / "scripts" / "export_manifest.php")
+    php = (WORKSPACE / "scripts" / "export_manifest.php").read_text(encoding="utf-8")
     remote = f"{SITE}/wp-content/run_script.php"
-
-    sftp = ssh.open_sftp()
-    sftp.put(php_path, remote)
-    sftp.close()
-
-    _, stdout, stderr = ssh.exec_command(f"cd {SITE} && wp eval-file {remote}", timeout=300)
-    out = stdout.read().decode("utf-8", errors="replace")
-    ssh.close()
-
-    idx = out.find("[")
-    if idx >= 0:
-        data = json.loads(out[idx:])
-        MANIFEST.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
+    try:
+        stats = refresh_manifest_file(ssh, SITE, MANIFEST, php, remote, full=full)
+    finally:
+        ssh.close()
+    print(f"  Manifest refreshed ({stats['mode']}): {stats['total']} products, "
+          f"{stats['changed']} changed, {stats['deleted']} deleted")
 
 
 # ──────────────────────────────────────────────────────────────────────
@@ -570,7 +607,7 @@ def _refresh_manifest():
 if __name__ == "__main__":
     if "--refresh" in sys.argv:
         print("Refreshing manifest from server...")
-        _refresh_manifest()
+        _refresh_manifest(full="--full" in sys.argv)
 
     print("Loading data...")
     load_data()
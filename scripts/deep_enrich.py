@@ -11,6 +11,8 @@ import json, re, os, sys, time
 from pathlib import Path
 from difflib import SequenceMatcher
 
+from catalog_store import open_store
+
 BASE = Path(__file__).resolve().parent.parent
 
 # ──────────────────────────────────────────────────────────────
@@ -273,56 +275,24 @@ def main():
     with open(manifest_path, 'r', encoding='utf-8') as f:
         products = json.load(f)
 
-    # Load existing retailer catalogs
-    catalog_dir = BASE / 'outputs' / 'scraped' / 'catalogs'
-    catalogs = {}
-    if catalog_dir.exists():
-        for fp in catalog_dir.glob('*.json'):
-            retailer = fp.stem.replace('_products', '')
-            with open(fp, 'r', encoding='utf-8') as f:
-                catalogs[retailer] = json.load(f)
-            print(f"  Loaded {retailer}: {len(catalogs[retailer])} products")
+    # Load existing retailer catalogs (slim rows; descriptions fetched per match)
+    store = open_store()
+    for retailer, count in store.retailers().items():
+        print(f"  Loaded {retailer}: {count} products")
 
     # Build combined catalog index by cleaned title
     catalog_index = []
-    for retailer, items in catalogs.items():
-        for item in items:
-            # Extract main image - Shopify format: images[0].src or image.src
-            main_image = ''
-            images_list = item.get('images', [])
-            if images_list:
-                first = images_list[0]
-                main_image = first.get('src', first) if isinstance(first, dict) else str(first)
-            elif item.get('image'):
-                img = item['image']
-                main_image = img.get('src', img) if isinstance(img, dict) else str(img)
-
-            # Extract all image URLs
-            all_images = []
-            for img in images_list:
-                src = img.get('src', img) if isinstance(img, dict) else str(img)
-                if src:
-                    all_images.append(src)
-
-            catalog_index.append({
-                'retailer': retailer,
-                'title': item.get('title', ''),
-                'price': '',
-                'image': main_image,
-                'images': all_images,
-                'description': item.get('body_html', item.get('description', '')),
-                'vendor': item.get('vendor', ''),
-                'handle': item.get('handle', ''),
-                'url': item.get('url', ''),
-                'variants': item.get('variants', []),
-            })
-            # Get price from first variant
-            variants = item.get('variants', [])
-            if variants:
-                for v in variants:
-                    if v.get('price') and v['price'] != '0.00':
-                        catalog_index[-1]['price'] = str(v['price'])
-                        break
+    for row in store.slim():
+        catalog_index.append({
+            'retailer': row['retailer'],
+            'title': row['title'],
+            'price': row['first_price'] or '',
+            'image': row['image'] or '',
+            'images': row['images'],
+            'vendor': row['vendor'],
+            'handle': row['handle'],
+            'url': '',
+        })
 
     print(f"\nTotal catalog products: {len(catalog_index)}")
     print(f"Products to enrich: {len(products)}")
@@ -372,6 +342,10 @@ def main():
             if needs_price and best_match.get('price') and best_match['price'] != '0.00':
                 data['price'] = str(best_match['price'])
 
+            if (needs_desc or needs_short) and 'description' not in best_match:
+                full = store.get(best_match['retailer'], best_match['handle']) or {}
+                best_match['description'] = full.get('body_html', full.get('description', '')) or ''
+
             if needs_desc and best_match.get('description'):
                 desc = best_match['description']
                 if len(desc) > 30:
@@ -1,75 +1,110 @@
 <?php
 /**
  * Export enrichment manifest — products + their data gaps
- * Output: JSON to stdout for the Python scraper to consume
+ * Output: NDJSON (one product per line) to stdout for the Python scraper to consume
+ *
+ * Products are walked in pages of IDs (first eval-file arg, default 200) so
+ * memory stays flat and the consumer sees rows as soon as each page is done.
+ * An optional second arg names a file of comma-separated IDs to limit the
+ * export to (used by the delta refresh in manifest_stream.py).
  */
 wp_set_current_user(1);
 global $wpdb;
 
-$products = get_posts(array('post_type'=>'product','post_status'=>'publish','posts_per_page'=>-1));
-$manifest = array();
+$per_page = isset($args[0]) ? max(1, (int) $args[0]) : 200;
 
-foreach ($products as $p) {
-    $meta = get_post_meta($p->ID);
-    $thumb_id = get_post_thumbnail_id($p->ID);
-    $gallery = get_post_meta($p->ID, '_product_image_gallery', true);
-    $weight = isset($meta['_weight'][0]) ? trim($meta['_weight'][0]) : '';
-    $price = isset($meta['_regular_price'][0]) ? trim($meta['_regular_price'][0]) : '';
-    $short = trim($p->post_excerpt);
-    $desc = trim($p->post_content);
-    $sku = isset($meta['_sku'][0]) ? $meta['_sku'][0] : '';
-    
-    // Get brand
-    $brands = wp_get_object_terms($p->ID, 'pwb-brand', array('fields'=>'names'));
-    $brand = (!is_wp_error($brands) && !empty($brands)) ? $brands[0] : '';
-    
-    // Get categories
-    $cats = wp_get_object_terms($p->ID, 'product_cat', array('fields'=>'names'));
-    $cat_str = (!is_wp_error($cats)) ? implode(' | ', $cats) : '';
-    
-    // Determine what's missing
-    $missing = array();
-    if (!$thumb_id) $missing[] = 'image';
-    if (empty($gallery)) $missing[] = 'gallery';
-    if (empty($weight)) $missing[] = 'weight';
-    if (empty($short)) $missing[] = 'short_description';
-    if (empty($desc)) $missing[] = 'description';
-    if (empty($brand)) $missing[] = 'brand';
-    if (empty($price)) $missing[] = 'price';
-    
-    $manifest[] = array(
-        'id' => $p->ID,
-        'title' => $p->post_title,
-        'sku' => $sku,
-        'brand' => $brand,
-        'category' => $cat_str,
-        'missing' => $missing,
-        'has_image' => (bool) $thumb_id,
-        'has_gallery' => !empty($gallery),
-        'has_weight' => !empty($weight),
-        'has_short_desc' => !empty($short),
-        'has_desc' => !empty($desc),
-        'has_brand' => !empty($brand),
-        'has_price' => !empty($price),
-    );
+// Optional second arg: file of comma-separated IDs to export (delta refresh)
+$only = null;
+if (!empty($args[1])) {
+    $only = array_values(array_filter(array_map('intval', explode(',', (string) @file_get_contents($args[1])))));
+    if (!$only) $only = array(0);
 }
 
-// Summary
-$total = count($manifest);
-$needs_image = count(array_filter($manifest, function($p){ return !$p['has_image']; }));
-$needs_gallery = count(array_filter($manifest, function($p){ return !$p['has_gallery']; }));
-$needs_weight = count(array_filter($manifest, function($p){ return !$p['has_weight']; }));
-$needs_short = count(array_filter($manifest, function($p){ return !$p['has_short_desc']; }));
-$needs_desc = count(array_filter($manifest, function($p){ return !$p['has_desc']; }));
-$needs_brand = count(array_filter($manifest, function($p){ return !$p['has_brand']; }));
+$total = 0;
+$needs = array('image'=>0, 'gallery'=>0, 'weight'=>0, 'short_description'=>0, 'description'=>0, 'brand'=>0);
+
+$page = 1;
+do {
+    $query = array(
+        'post_type'      => 'product',
+        'post_status'    => 'publish',
+        'fields'         => 'ids',
+        'orderby'        => 'ID',
+        'order'          => 'ASC',
+        'no_found_rows'  => true,
+        'posts_per_page' => $per_page,
+        'paged'          => $page,
+    );
+    if ($only !== null) $query['post__in'] = $only;
+    $ids = get_posts($query);
+    if ($ids) {
+        _prime_post_caches($ids, false, false);
+        update_meta_cache('post', $ids);
+        update_object_term_cache($ids, 'product');
+    }
+
+    foreach ($ids as $pid) {
+        $p = get_post($pid);
+        $meta = get_post_meta($pid);
+        $thumb_id = isset($meta['_thumbnail_id'][0]) ? (int) $meta['_thumbnail_id'][0] : 0;
+        $gallery = isset($meta['_product_image_gallery'][0]) ? $meta['_product_image_gallery'][0] : '';
+        $weight = isset($meta['_weight'][0]) ? trim($meta['_weight'][0]) : '';
+        $price = isset($meta['_regular_price'][0]) ? trim($meta['_regular_price'][0]) : '';
+        $short = trim($p->post_excerpt);
+        $desc = trim($p->post_content);
+        $sku = isset($meta['_sku'][0]) ? $meta['_sku'][0] : '';
+
+        // Get brand
+        $brands = wp_get_object_terms($pid, 'pwb-brand', array('fields'=>'names'));
+        $brand = (!is_wp_error($brands) && !empty($brands)) ? $brands[0] : '';
+
+        // Get categories
+        $cats = wp_get_object_terms($pid, 'product_cat', array('fields'=>'names'));
+        $cat_str = (!is_wp_error($cats)) ? implode(' | ', $cats) : '';
 
+        // Determine what's missing
+        $missing = array();
+        if (!$thumb_id) $missing[] = 'image';
+        if (empty($gallery)) $missing[] = 'gallery';
+        if (empty($weight)) $missing[] = 'weight';
+        if (empty($short)) $missing[] = 'short_description';
+        if (empty($desc)) $missing[] = 'description';
+        if (empty($brand)) $missing[] = 'brand';
+        if (empty($price)) $missing[] = 'price';
+
+        foreach ($missing as $m) {
+            if (isset($needs[$m])) $needs[$m]++;
+        }
+        $total++;
+
+        echo json_encode(array(
+            'id' => $pid,
+            'title' => $p->post_title,
+            'sku' => $sku,
+            'brand' => $brand,
+            'category' => $cat_str,
+            'missing' => $missing,
+            'has_image' => (bool) $thumb_id,
+            'has_gallery' => !empty($gallery),
+            'has_weight' => !empty($weight),
+            'has_short_desc' => !empty($short),
+            'has_desc' => !empty($desc),
+            'has_brand' => !empty($brand),
+            'has_price' => !empty($price),
+        ), JSON_UNESCAPED_UNICODE) . "\n";
+    }
+
+    if (function_exists('wp_cache_flush_runtime')) wp_cache_flush_runtime();
+    flush();
+    $page++;
+} while (count($ids) === $per_page);
+
+// Summary
 fprintf(STDERR, "=== MANIFEST EXPORTED ===\n");
 fprintf(STDERR, "Total products: %d\n", $total);
-fprintf(STDERR, "Missing image: %d\n", $needs_image);
-fprintf(STDERR, "Missing gallery: %d\n", $needs_gallery);
-fprintf(STDERR, "Missing weight: %d\n", $needs_weight);
-fprintf(STDERR, "Missing short desc: %d\n", $needs_short);
-fprintf(STDERR, "Missing description: %d\n", $needs_desc);
-fprintf(STDERR, "Missing brand: %d\n", $needs_brand);
-
-echo json_encode($manifest, JSON_PRETTY_PRINT | JSON_UNESCAPED_UNICODE);
+fprintf(STDERR, "Missing image: %d\n", $needs['image']);
+fprintf(STDERR, "Missing gallery: %d\n", $needs['gallery']);
+fprintf(STDERR, "Missing weight: %d\n", $needs['weight']);
+fprintf(STDERR, "Missing short desc: %d\n", $needs['short_description']);
+fprintf(STDERR, "Missing description: %d\n", $needs['description']);
+fprintf(STDERR, "Missing brand: %d\n", $needs['brand']);
@@ -1,72 +1,108 @@
 #!/usr/bin/env python3
 """
 Shopify Product Data Exporter
-Exports comprehensive product information to CSV/Excel format
+Exports comprehensive product information to CSV/Excel/Parquet format
+
+Products are streamed a page at a time (keyset paging on ``since_id``, so
+every page is an independent cursor) and each page's rows are written
+before the next page is fetched, so memory stays flat for any store size.
+
+* ``--fields``         - REST ``fields=`` projection (default: only what the
+                         export columns need)
+* ``--changed-since``  - delta export of products updated since a timestamp
+* ``--since-id``       - start after a product id
+* ``--resume``         - continue an interrupted export from its checkpoint
+
+Usage:
+    python scripts/export_products.py --csv-output outputs/shopify_products.csv --no-excel
+    python scripts/export_products.py --parquet-output outputs/shopify_products.parquet --no-excel
+    python scripts/export_products.py --changed-since 2026-02-01 --csv-output outputs/delta.csv --no-excel
+    python scripts/export_products.py --csv-output outputs/shopify_products.csv --no-excel --resume
 """
 
 import argparse
 import csv
 import json
 import os
+import re
 from datetime import datetime
 from pathlib import Path
 
-import pandas as pd
 import requests
 
+from shopify_transport import ShopifyTransport
+
+SHOPIFY_API_VERSION = os.environ.get("SHOPIFY_API_VERSION", "2023-10")
+PAGE_SIZE = 250
+DEFAULT_FIELDS = (
+    "id,title,handle,product_type,vendor,status,created_at,updated_at,published_at,"
+    "tags,body_html,variants,images"
+)
+COLUMNS = [
+    'Product_ID', 'Product_Name', 'Handle', 'Product_Type', 'Vendor', 'Status',
+    'Created_Date', 'Updated_Date', 'Published_Date', 'Tags', 'Description',
+    'SEO_Title', 'SEO_Description', 'Total_Variants', 'Total_Images',
+    'Product_URL', 'Admin_URL',
+    'Variant_ID', 'Variant_Title', 'Variant_SKU', 'Variant_Price', 'Variant_Compare_Price',
+    'Variant_Inventory', 'Variant_Weight', 'Variant_Weight_Unit', 'Variant_Requires_Shipping',
+    'Variant_Taxable', 'Variant_Barcode', 'Variant_Option1', 'Variant_Option2', 'Variant_Option3',
+    'Image_ID', 'Image_URL', 'Image_Alt', 'Image_Position',
+]
+TAG_RE = re.compile('<.*?>')
+
+
 class ShopifyProductExporter:
-    def __init__(self, shop_domain, access_token=None):
+    def __init__(self, shop_domain, access_token=None, api_version=SHOPIFY_API_VERSION):
         self.shop_domain = shop_domain.replace('.myshopify.com', '')
         self.base_url = f"https://{self.shop_domain}.myshopify.com"
         self.access_token = access_token
-        self.headers = {
-            'Content-Type': 'application/json',
-            'Accept': 'application/json'
-        }
-        if access_token:
-            self.headers['X-Shopify-Access-Token'] = access_token
+        self.transport = ShopifyTransport(self.shop_domain, access_token, api_version) if access_token else None
+        self.last_id = None
 
-    def get_products(self, limit=250):
-        """Fetch all products from Shopify store"""
-        products = []
-        page_info = None
-        
+    def iter_product_pages(self, limit=PAGE_SIZE, fields=DEFAULT_FIELDS, since_id=None, updated_at_min=None):
+        """Yield lists of products, one page at a time, in ascending id order.
+
+        ``since_id`` doubles as the cursor: each request asks for products
+        after the last id seen, which keeps the filters on every page and
+        lets an interrupted export resume from ``self.last_id``.
+        """
+        if not self.transport:
+            print("⚠️  No API access token provided. Creating template structure...")
+            yield self._create_sample_data()
+            return
+
+        self.last_id = since_id
         while True:
-            url = f"{self.base_url}/admin/api/2023-10/products.json"
             params = {'limit': limit}
-            
-            if page_info:
-                params['page_info'] = page_info
-            
-            try:
-                if self.access_token:
-                    response = requests.get(url, headers=self.headers, params=params)
-                else:
-                    # For stores without API access, we'll create a template
-                    print("⚠️  No API access token provided. Creating template structure...")
-                    return self._create_sample_data()
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    products.extend(data.get('products', []))
-                    
-                    # Check for pagination
-                    link_header = response.headers.get('Link', '')
-                    if 'rel="next"' in link_header:
-                        # Extract next page info
-                        next_link = [link.strip() for link in link_header.split(',') if 'rel="next"' in link][0]
-                        page_info = next_link.split('page_info=')[1].split('>')[0]
-                    else:
-                        break
-                else:
-                    print(f"❌ Error fetching products: {response.status_code} - {response.text}")
-                    return self._create_sample_data()
-                    
-            except Exception as e:
-                print(f"❌ Exception occurred: {str(e)}")
-                return self._create_sample_data()
-        
-        return products
+            if fields:
+                params['fields'] = fields if 'id' in fields.split(',') else f"id,{fields}"
+            if self.last_id:
+                params['since_id'] = self.last_id
+            if updated_at_min:
+                params['updated_at_min'] = updated_at_min
+            response = self.transport.rest('get', 'products.json', params=params)
+            if response.status_code != 200:
+                raise RuntimeError(f"Error fetching products: {response.status_code} - {response.text[:300]}")
+            page = response.json().get('products', [])
+            if not page:
+                return
+            self.last_id = max(product['id'] for product in page)
+            yield page
+            if len(page) < limit:
+                return
+
+    def iter_products(self, **kwargs):
+        """Yield products one at a time (see ``iter_product_pages``)."""
+        for page in self.iter_product_pages(**kwargs):
+            yield from page
+
+    def get_products(self, limit=PAGE_SIZE):
+        """Fetch all products from Shopify store"""
+        try:
+            return list(self.iter_products(limit=limit, fields=None))
+        except (requests.RequestException, RuntimeError) as e:
+            print(f"❌ {e}")
+            return self._create_sample_data()
 
     def _create_sample_data(self):
         """Create sample data structure for reference"""
@@ -104,75 +140,80 @@ class ShopifyProductExporter:
     def process_product_data(self, products):
         """Process and flatten product data for spreadsheet export"""
         processed_data = []
-        
         for product in products:
-            # Basic product info
-            base_info = {
-                'Product_ID': product.get('id', ''),
-                'Product_Name': product.get('title', ''),
-                'Handle': product.get('handle', ''),
-                'Product_Type': product.get('product_type', ''),
-                'Vendor': product.get('vendor', ''),
-                'Status': product.get('status', ''),
-                'Created_Date': self._format_date(product.get('created_at', '')),
-                'Updated_Date': self._format_date(product.get('updated_at', '')),
-                'Published_Date': self._format_date(product.get('published_at', '')),
-                'Tags': product.get('tags', ''),
-                'Description': self._clean_html(product.get('body_html', '')),
-                'SEO_Title': product.get('seo_title', ''),
-                'SEO_Description': product.get('seo_description', ''),
-                'Total_Variants': len(product.get('variants', [])),
-                'Total_Images': len(product.get('images', [])),
-                'Product_URL': f"https://{self.shop_domain}.myshopify.com/products/{product.get('handle', '')}",
-                'Admin_URL': f"https://{self.shop_domain}.myshopify.com/admin/products/{product.get('id', '')}"
-            }
-            
-            variants = product.get('variants', [])
-            images = product.get('images', [])
-            
-            if variants:
-                for i, variant in enumerate(variants):
-                    row = base_info.copy()
-                    row.update({
-                        'Variant_ID': variant.get('id', ''),
-                        'Variant_Title': variant.get('title', ''),
-                        'Variant_SKU': variant.get('sku', ''),
-                        'Variant_Price': variant.get('price', ''),
-                        'Variant_Compare_Price': variant.get('compare_at_price', ''),
-                        'Variant_Inventory': variant.get('inventory_quantity', ''),
-                        'Variant_Weight': variant.get('weight', ''),
-                        'Variant_Weight_Unit': variant.get('weight_unit', ''),
-                        'Variant_Requires_Shipping': variant.get('requires_shipping', ''),
-                        'Variant_Taxable': variant.get('taxable', ''),
-                        'Variant_Barcode': variant.get('barcode', ''),
-                        'Variant_Option1': variant.get('option1', ''),
-                        'Variant_Option2': variant.get('option2', ''),
-                        'Variant_Option3': variant.get('option3', ''),
-                    })
-                    
-                    # Add image info if available
-                    if i < len(images):
-                        image = images[i]
-                        row.update({
-                            'Image_ID': image.get('id', ''),
-                            'Image_URL': image.get('src', ''),
-                            'Image_Alt': image.get('alt', ''),
-                            'Image_Position': image.get('position', '')
-                        })
-                    
-                    processed_data.append(row)
-            else:
-                # Product without variants
+            processed_data.extend(self.product_rows(product))
+        return processed_data
+
+    def product_rows(self, product):
+        """Flatten one product into its spreadsheet rows (one per variant)"""
+        processed_data = []
+        # Basic product info
+        base_info = {
+            'Product_ID': product.get('id', ''),
+            'Product_Name': product.get('title', ''),
+            'Handle': product.get('handle', ''),
+            'Product_Type': product.get('product_type', ''),
+            'Vendor': product.get('vendor', ''),
+            'Status': product.get('status', ''),
+            'Created_Date': self._format_date(product.get('created_at', '')),
+            'Updated_Date': self._format_date(product.get('updated_at', '')),
+            'Published_Date': self._format_date(product.get('published_at', '')),
+            'Tags': product.get('tags', ''),
+            'Description': self._clean_html(product.get('body_html', '')),
+            'SEO_Title': product.get('seo_title', ''),
+            'SEO_Description': product.get('seo_description', ''),
+            'Total_Variants': len(product.get('variants', [])),
+            'Total_Images': len(product.get('images', [])),
+            'Product_URL': f"https://{self.shop_domain}.myshopify.com/products/{product.get('handle', '')}",
+            'Admin_URL': f"https://{self.shop_domain}.myshopify.com/admin/products/{product.get('id', '')}"
+        }
+        
+        variants = product.get('variants', [])
+        images = product.get('images', [])
+        
+        if variants:
+            for i, variant in enumerate(variants):
                 row = base_info.copy()
-                if images:
-                    image = images[0]
+                row.update({
+                    'Variant_ID': variant.get('id', ''),
+                    'Variant_Title': variant.get('title', ''),
+                    'Variant_SKU': variant.get('sku', ''),
+                    'Variant_Price': variant.get('price', ''),
+                    'Variant_Compare_Price': variant.get('compare_at_price', ''),
+                    'Variant_Inventory': variant.get('inventory_quantity', ''),
+                    'Variant_Weight': variant.get('weight', ''),
+                    'Variant_Weight_Unit': variant.get('weight_unit', ''),
+                    'Variant_Requires_Shipping': variant.get('requires_shipping', ''),
+                    'Variant_Taxable': variant.get('taxable', ''),
+                    'Variant_Barcode': variant.get('barcode', ''),
+                    'Variant_Option1': variant.get('option1', ''),
+                    'Variant_Option2': variant.get('option2', ''),
+                    'Variant_Option3': variant.get('option3', ''),
+                })
+                
+                # Add image info if available
+                if i < len(images):
+                    image = images[i]
                     row.update({
                         'Image_ID': image.get('id', ''),
                         'Image_URL': image.get('src', ''),
                         'Image_Alt': image.get('alt', ''),
                         'Image_Position': image.get('position', '')
                     })
+                
                 processed_data.append(row)
+        else:
+            # Product without variants
+            row = base_info.copy()
+            if images:
+                image = images[0]
+                row.update({
+                    'Image_ID': image.get('id', ''),
+                    'Image_URL': image.get('src', ''),
+                    'Image_Alt': image.get('alt', ''),
+                    'Image_Position': image.get('position', '')
+                })
+            processed_data.append(row)
         
         return processed_data
 
@@ -190,42 +231,103 @@ class ShopifyProductExporter:
         """Remove HTML tags from description"""
         if not html_str:
             return ''
-        import re
-        clean = re.compile('<.*?>')
-        return re.sub(clean, '', html_str).strip()
+        return TAG_RE.sub('', html_str).strip()
+
+    def _default_filename(self, suffix):
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        return f"shopify_products_{self.shop_domain}_{timestamp}.{suffix}"
+
+    def stream_export(self, csv_path=None, parquet_path=None, resume=False, **page_kwargs):
+        """Fetch and write products page by page; returns (products, rows).
+
+        Rows go to CSV and/or Parquet as each page arrives.  After every page
+        ``<output>.checkpoint.json`` records the last product id, so
+        ``resume=True`` appends to the existing files starting after it.
+        """
+        outputs = [Path(p) for p in (csv_path, parquet_path) if p]
+        if not outputs:
+            raise ValueError("stream_export needs a CSV or Parquet output path")
+        for path in outputs:
+            path.parent.mkdir(parents=True, exist_ok=True)
+        checkpoint_path = outputs[0].with_name(outputs[0].name + '.checkpoint.json')
+
+        products = rows = 0
+        if resume and checkpoint_path.exists():
+            checkpoint = json.loads(checkpoint_path.read_text(encoding='utf-8'))
+            page_kwargs['since_id'] = checkpoint['last_id']
+            page_kwargs.setdefault('updated_at_min', checkpoint.get('updated_at_min'))
+            products, rows = checkpoint['products'], checkpoint['rows']
+            print(f"↩️  Resuming after product id {checkpoint['last_id']} ({products} products already exported)")
+        else:
+            resume = False
+
+        csv_handle = writer = None
+        if csv_path:
+            csv_handle = Path(csv_path).open('a' if resume else 'w', newline='', encoding='utf-8')
+            writer = csv.DictWriter(csv_handle, fieldnames=COLUMNS, extrasaction='ignore')
+            if not resume:
+                writer.writeheader()
+        parquet = ParquetPageWriter(parquet_path, resume) if parquet_path else None
+
+        try:
+            for page in self.iter_product_pages(**page_kwargs):
+                page_rows = [row for product in page for row in self.product_rows(product)]
+                if writer:
+                    writer.writerows(page_rows)
+                    csv_handle.flush()
+                if parquet:
+                    parquet.write(page_rows)
+                products += len(page)
+                rows += len(page_rows)
+                if self.last_id:
+                    checkpoint_path.write_text(json.dumps({
+                        'last_id': self.last_id,
+                        'updated_at_min': page_kwargs.get('updated_at_min'),
+                        'products': products,
+                        'rows': rows,
+                    }), encoding='utf-8')
+                print(f"   … {products} products / {rows} rows written")
+        finally:
+            if csv_handle:
+                csv_handle.close()
+            if parquet:
+                parquet.close()
+
+        # A finished export needs no checkpoint; an interrupted one keeps it for --resume
+        checkpoint_path.unlink(missing_ok=True)
+        for path in outputs:
+            print(f"✅ Data exported to: {path}")
+        return products, rows
 
     def export_to_csv(self, data, filename=None):
         """Export data to CSV file"""
-        if not filename:
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            filename = f"shopify_products_{self.shop_domain}_{timestamp}.csv"
-        path = Path(filename)
-        if path.parent:
-            path.parent.mkdir(parents=True, exist_ok=True)
+        path = Path(filename or self._default_filename('csv'))
+        path.parent.mkdir(parents=True, exist_ok=True)
 
         if not data:
             print("❌ No data to export")
             return None
 
-        df = pd.DataFrame(data)
-        df.to_csv(path, index=False, encoding='utf-8')
+        with path.open('w', newline='', encoding='utf-8') as handle:
+            writer = csv.DictWriter(handle, fieldnames=COLUMNS, extrasaction='ignore')
+            writer.writeheader()
+            writer.writerows(data)
         print(f"✅ Data exported to: {path}")
         return str(path)
 
     def export_to_excel(self, data, filename=None):
-        """Export data to Excel file"""
-        if not filename:
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            filename = f"shopify_products_{self.shop_domain}_{timestamp}.xlsx"
-        path = Path(filename)
-        if path.parent:
-            path.parent.mkdir(parents=True, exist_ok=True)
+        """Export data (a list of rows or a CSV path) to Excel file"""
+        import pandas as pd
+
+        path = Path(filename or self._default_filename('xlsx'))
+        path.parent.mkdir(parents=True, exist_ok=True)
 
         if not data:
             print("❌ No data to export")
             return None
 
-        df = pd.DataFrame(data)
+        # Excel has no streaming writer here; it is built from the finished CSV
+        df = pd.read_csv(data, dtype=str) if isinstance(data, (str, Path)) else pd.DataFrame(data, columns=COLUMNS)
         with pd.ExcelWriter(path, engine='openpyxl') as writer:
             df.to_excel(writer, sheet_name='Products', index=False)
 
@@ -246,14 +348,53 @@ class ShopifyProductExporter:
         print(f"✅ Data exported to: {path}")
         return str(path)
 
+class ParquetPageWriter:
+    """Append pages of rows to a Parquet file as row groups (needs pyarrow)."""
+
+    def __init__(self, path, resume=False):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as exc:
+            raise SystemExit("Parquet output needs pyarrow: pip install pyarrow") from exc
+        self.pa = pa
+        self.path = Path(path)
+        self.schema = pa.schema([(name, pa.string()) for name in COLUMNS])
+        # Parquet files cannot be appended to; a resumed export writes a numbered part file
+        if resume and self.path.exists():
+            part = 1
+            while self.path.with_name(f"{self.path.stem}.part{part}{self.path.suffix}").exists():
+                part += 1
+            self.path = self.path.with_name(f"{self.path.stem}.part{part}{self.path.suffix}")
+        self.writer = pq.ParquetWriter(self.path, self.schema)
+
+    def write(self, rows):
+        if not rows:
+            return
+        columns = {
+            name: [None if row.get(name) in (None, '') else str(row[name]) for row in rows]
+            for name in COLUMNS
+        }
+        self.writer.write_table(self.pa.table(columns, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+
+
 def main():
     """Main execution function"""
-    parser = argparse.ArgumentParser(description="Export Shopify products to CSV/Excel")
+    parser = argparse.ArgumentParser(description="Export Shopify products to CSV/Excel/Parquet")
     parser.add_argument("--shop-domain", default=os.environ.get("SHOPIFY_DOMAIN", "h-moon-hydro"), help="Shopify store domain (without .myshopify.com)")
     parser.add_argument("--access-token", default=os.environ.get("SHOPIFY_ACCESS_TOKEN"), help="Shopify Admin API access token")
     parser.add_argument("--csv-output", type=Path, help="Optional path for CSV output")
+    parser.add_argument("--parquet-output", type=Path, help="Optional path for Parquet output (needs pyarrow)")
     parser.add_argument("--excel-output", type=Path, help="Optional path for Excel output")
     parser.add_argument("--no-excel", action="store_true", help="Skip Excel export")
+    parser.add_argument("--fields", default=DEFAULT_FIELDS, help="REST fields= projection ('' for full product bodies)")
+    parser.add_argument("--since-id", type=int, help="Only export products with an id above this")
+    parser.add_argument("--changed-since", help="Only export products updated since this ISO date/time (delta export)")
+    parser.add_argument("--resume", action="store_true", help="Continue an interrupted export from its checkpoint")
+    parser.add_argument("--api-version", default=SHOPIFY_API_VERSION, help="Shopify Admin API version")
     args = parser.parse_args()
 
     print("🛍️  Shopify Product Data Exporter")
@@ -266,47 +407,59 @@ def main():
         print("⚠️  No API access token provided; falling back to sample data")
 
     print(f"📊 Fetching products from: {shop_domain}.myshopify.com")
+    if args.changed_since:
+        print(f"🕒 Delta export: products updated since {args.changed_since}")
 
-    # Initialize exporter
-    exporter = ShopifyProductExporter(shop_domain, access_token)
-    
-    # Fetch products
-    print("🔄 Fetching product data...")
-    products = exporter.get_products()
-    
-    if not products:
+    exporter = ShopifyProductExporter(shop_domain, access_token, api_version=args.api_version)
+
+    csv_file = args.csv_output
+    if not csv_file and not args.parquet_output:
+        csv_file = Path(exporter._default_filename('csv'))
+
+    print("🔄 Streaming product data...")
+    try:
+        product_count, row_count = exporter.stream_export(
+            csv_path=csv_file,
+            parquet_path=args.parquet_output,
+            resume=args.resume,
+            fields=args.fields or None,
+            since_id=args.since_id,
+            updated_at_min=args.changed_since,
+        )
+    except (requests.RequestException, RuntimeError) as exc:
+        print(f"❌ Export stopped: {exc}")
+        if exporter.last_id:
+            print(f"   Re-run with --resume to continue after product id {exporter.last_id}")
+        return 1
+
+    if not product_count:
         print("❌ No products found or unable to fetch data")
-        return
-    
-    print(f"✅ Found {len(products)} products")
-    
-    # Process data
-    print("🔄 Processing product data...")
-    processed_data = exporter.process_product_data(products)
-    print(f"✅ Processed {len(processed_data)} product records")
-    
-    # Export to both formats
-    print("💾 Exporting data...")
-    csv_target = args.csv_output if args.csv_output else None
-    excel_target = args.excel_output if args.excel_output else None
-
-    csv_file = exporter.export_to_csv(processed_data, filename=str(csv_target) if csv_target else None)
+        return 0
+
     excel_file = None
     if not args.no_excel:
-        excel_file = exporter.export_to_excel(processed_data, filename=str(excel_target) if excel_target else None)
-    
+        if csv_file:
+            excel_file = exporter.export_to_excel(str(csv_file), filename=str(args.excel_output) if args.excel_output else None)
+        else:
+            print("⚠️  Excel export is built from the CSV; add --csv-output or --no-excel")
+
     print("\n📋 Export Summary:")
-    print(f"• Products found: {len(products)}")
-    print(f"• Records exported: {len(processed_data)}")
+    print(f"• Products found: {product_count}")
+    print(f"• Records exported: {row_count}")
     if csv_file:
         print(f"• CSV file: {csv_file}")
+    if args.parquet_output:
+        print(f"• Parquet file: {args.parquet_output}")
     if excel_file:
         print(f"• Excel file: {excel_file}")
-    
+    if exporter.transport:
+        print(f"• API requests: {exporter.transport.stats['requests']}")
+
     print("\n💡 Next steps:")
     print("• Review the exported files")
     print("• Add your Shopify private app access token for live data")
     print("• Customize the script for additional fields if needed")
+    return 0
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    raise SystemExit(main())
@@ -9,7 +9,6 @@ fresh_scrape_pipeline.py — Full pipeline:
 import json
 import os
 import sys
-import time
 from pathlib import Path
 
 import paramiko
@@ -17,10 +16,12 @@ import paramiko
 WORKSPACE = Path(__file__).parent.parent
 sys.path.insert(0, str(WORKSPACE / "scripts"))
 
+from catalog_crawler import crawl_catalogs
 from retailer_scraper import (
-    CATALOG_DIR, OUTPUT_DIR, RETAILERS, MANIFEST_PATH,
-    fetch_shopify_catalog, match_products, save_results
+    CATALOG_DIR, HEADERS, OUTPUT_DIR, RATE_LIMIT, RETAILERS, MANIFEST_PATH,
+    load_catalogs, match_products, save_results
 )
+from manifest_stream import refresh_manifest_file
 
 # Server credentials
 HOST = os.getenv('HMOON_SSH_HOST')
@@ -38,8 +39,11 @@ def ssh_run(ssh, cmd):
     return out, err
 
 
-def step1_export_manifest():
-    """Upload export_manifest.php and run it to get current product data."""
+def step1_export_manifest(full=False):
+    """Upload export_manifest.php and stream its NDJSON output into the manifest.
+
+    Only products changed since the last sync are re-exported unless ``full``.
+    """
     if not HOST or not USER or not PASS:
         raise RuntimeError('Missing SSH env vars: HMOON_SSH_HOST, HMOON_SSH_USER, HMOON_SSH_PASS')
     print("\n" + "=" * 60)
@@ -50,74 +54,50 @@ def step1_export_manifest():
     ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
     ssh.connect(HOST, username=USER, password=PASS)
     
-    # Upload PHP script
-    sftp = ssh.open_sftp()
-    local_php = str(WORKSPACE / "scripts" / "export_manifest.php")
-    sftp.put(local_php, REMOTE_SCRIPT)
-    sftp.close()
-    
-    # Run it
+    # Stream NDJSON rows straight into the manifest file
     print("  Running export on server...")
-    out, err = ssh_run(ssh, f'cd {SITE_DIR} && wp eval-file {REMOTE_SCRIPT}')
-    ssh.close()
-    
-    # Print summary from stderr
-    if err:
-        for line in err.strip().split('\n'):
-            print(f"  {line}")
-    
-    # Parse JSON from stdout
+    php = (WORKSPACE / "scripts" / "export_manifest.php").read_text(encoding='utf-8')
+    gaps = {}
+
+    def tally(rows):
+        for p in rows:
+            for m in p.get('missing', []):
+                gaps[m] = gaps.get(m, 0) + 1
+            yield p
+
     try:
-        manifest = json.loads(out)
-    except json.JSONDecodeError:
-        # Sometimes WP outputs warnings before JSON
-        # Find the JSON array start
-        idx = out.find('[')
-        if idx >= 0:
-            manifest = json.loads(out[idx:])
-        else:
-            print("  ERROR: Could not parse manifest JSON")
-            print(out[:500])
-            return None
-    
-    # Save locally
-    MANIFEST_PATH.parent.mkdir(parents=True, exist_ok=True)
-    with open(MANIFEST_PATH, 'w', encoding='utf-8') as f:
-        json.dump(manifest, f, indent=2, ensure_ascii=False)
-    
-    print(f"  Manifest saved: {len(manifest)} products → {MANIFEST_PATH.name}")
-    
+        stats = refresh_manifest_file(ssh, SITE_DIR, MANIFEST_PATH, php, REMOTE_SCRIPT,
+                                      full=full, tally=tally)
+    except RuntimeError as e:
+        print(f"  ERROR: {e}")
+        return None
+    finally:
+        ssh.close()
+
+    total = stats['total']
+    print(f"  Manifest saved ({stats['mode']}): {total} products → {MANIFEST_PATH.name}")
+
     # Quick stats
-    gaps = {}
-    for p in manifest:
-        for m in p.get('missing', []):
-            gaps[m] = gaps.get(m, 0) + 1
     print(f"\n  Data gaps:")
     for gap, count in sorted(gaps.items(), key=lambda x: -x[1]):
-        print(f"    {gap:20s}: {count:5d} / {len(manifest)}")
-    
-    return manifest
+        print(f"    {gap:20s}: {count:5d} / {total}")
+
+    return total
 
 
 def step2_fetch_catalogs(force=True):
-    """Fetch fresh retailer catalogs (delete old cache to force refresh)."""
+    """Fetch fresh retailer catalogs (force: refresh every store now, incrementally)."""
     print("\n" + "=" * 60)
     print("  STEP 2: FETCH FRESH RETAILER CATALOGS")
     print("=" * 60)
     
-    CATALOG_DIR.mkdir(parents=True, exist_ok=True)
-    
-    if force:
-        # Delete old cache files to force fresh download
-        for f in CATALOG_DIR.glob("*_products.json"):
-            age_hours = (time.time() - os.path.getmtime(f)) / 3600
-            print(f"  Removing old cache: {f.name} ({age_hours:.0f}h old)")
-            f.unlink()
-    
-    catalogs = {}
-    for key, info in RETAILERS.items():
-        products = fetch_shopify_catalog(key, info)
-        catalogs[key] = {'info': info, 'products': products}
+    # Conditional GETs against the saved catalogs: unchanged pages cost a 304,
+    # and only new/updated products are merged in
+    crawl_catalogs(
+        {key: info["url"] for key, info in RETAILERS.items()}, CATALOG_DIR,
+        headers=HEADERS, per_host_interval=RATE_LIMIT, max_age_hours=0 if force else 24,
+    )
+    catalogs = load_catalogs()
     
     total = sum(len(c['products']) for c in catalogs.values())
     print(f"\n  Total retailer products fetched: {total}")
@@ -221,7 +201,8 @@ if __name__ == '__main__':
     
     if '--help' in args:
         print("Usage: python scripts/fresh_scrape_pipeline.py [options]")
-        print("  --manifest   Step 1: Export manifest from WooCommerce")
+        print("  --manifest   Step 1: Export manifest from WooCommerce (changed products only)")
+        print("  --full       With --manifest/--all: re-export every product")
         print("  --fetch      Step 2: Fetch fresh retailer catalogs")
         print("  --match      Step 3: Match products")
         print("  --generate   Step 4: Generate enrichment data")
@@ -231,7 +212,7 @@ if __name__ == '__main__':
     run_all = '--all' in args
     
     if run_all or '--manifest' in args:
-        manifest = step1_export_manifest()
+        manifest = step1_export_manifest(full='--full' in args)
         if manifest is None:
             print("Failed to export manifest, aborting.")
             sys.exit(1)
@@ -242,12 +223,7 @@ if __name__ == '__main__':
     if run_all or '--match' in args:
         # Load catalogs if not already loaded
         if 'catalogs' not in dir():
-            catalogs = {}
-            for key, info in RETAILERS.items():
-                cache_file = CATALOG_DIR / f"{key}_products.json"
-                if cache_file.exists():
-                    with open(cache_file, encoding='utf-8') as f:
-                        catalogs[key] = {'info': info, 'products': json.load(f)}
+            catalogs = load_catalogs()
         results = step3_match_and_save(catalogs)
     
     if run_all or '--generate' in args:
@@ -1,7 +1,17 @@
 #!/usr/bin/env python3
-"""Generate the PHP price import script from price_fixes.json"""
+"""Generate the PHP price import script from price_fixes.json
+
+Usage:
+    python scripts/generate_price_php.py              # per-product update_post_meta
+    python scripts/generate_price_php.py --bulk-sql   # set-based meta writes (wp_bulk_sql.py)
+"""
 import json
 import os
+import sys
+
+from wp_bulk_sql import BULK_SQL_LIB_PHP
+
+BULK_SQL = '--bulk-sql' in sys.argv
 
 BASE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
@@ -19,32 +29,7 @@ for m in data['matched']:
     except:
         pass
 
-php = """<?php
-/**
- * H-Moon Hydro Price Fix Script
- * Applies prices to """ + str(len(php_entries)) + """ products missing prices
- * Sources: Feb 12 CSV export, enrichment retailer matches, manual MSRP
- * 
- * DRY RUN: wp eval-file wp-content/apply_prices.php
- * LIVE:    CONFIRM=1 wp eval-file wp-content/apply_prices.php
- */
-
-wp_set_current_user(1);
-
-$confirm = getenv('CONFIRM') === '1';
-$dry_run = !$confirm;
-
-if ($dry_run) {
-    echo "=== DRY RUN MODE (use CONFIRM=1 to apply) ===\\n";
-} else {
-    echo "=== LIVE MODE - Applying prices ===\\n";
-}
-
-// product_id => array(price, title, source)
-$price_fixes = array(
-""" + "\n".join(php_entries) + """
-);
-
+APPLY_LOOP_PHP = """\
 $updated = 0;
 $skipped = 0;
 $errors = 0;
@@ -84,7 +69,64 @@ foreach ($price_fixes as $product_id => $info) {
         $updated++;
     }
 }
+"""
+
+# Same semantics, but existence/"already priced" checks are one query per
+# chunk and the writes are two set-based meta upserts in one transaction.
+APPLY_BULK_PHP = """\
+$errors = 0;
+$ids = hmoon_bulk_existing_ids(array_keys($price_fixes));
+$skipped = count($price_fixes) - count($ids);
+$todo = hmoon_bulk_ids_missing_meta($ids, '_regular_price');
+$skipped += count($ids) - count($todo);
+
+$values = array();
+foreach ($todo as $product_id) {
+    list($price, $title, $source) = $price_fixes[$product_id];
+    $values[$product_id] = number_format($price, 2, '.', '');
+    echo ($dry_run ? "WOULD SET" : "SET") . ": #$product_id $title => \\$" . $values[$product_id] . " [$source]\\n";
+}
+$updated = count($values);
+
+if (!$dry_run && $values) {
+    hmoon_bulk_begin();
+    // Set both _regular_price and _price (WooCommerce needs both)
+    hmoon_bulk_set_meta('_regular_price', $values);
+    hmoon_bulk_set_meta('_price', $values);
+    if (!hmoon_bulk_finish()) {
+        $errors = $updated;
+        $updated = 0;
+    }
+}
+"""
+
+php = """<?php""" + (BULK_SQL_LIB_PHP if BULK_SQL else "") + """
+/**
+ * H-Moon Hydro Price Fix Script
+ * Applies prices to """ + str(len(php_entries)) + """ products missing prices
+ * Sources: Feb 12 CSV export, enrichment retailer matches, manual MSRP
+ * 
+ * DRY RUN: wp eval-file wp-content/apply_prices.php
+ * LIVE:    CONFIRM=1 wp eval-file wp-content/apply_prices.php
+ */
+
+wp_set_current_user(1);
+
+$confirm = getenv('CONFIRM') === '1';
+$dry_run = !$confirm;
+
+if ($dry_run) {
+    echo "=== DRY RUN MODE (use CONFIRM=1 to apply) ===\\n";
+} else {
+    echo "=== LIVE MODE - Applying prices ===\\n";
+}
+
+// product_id => array(price, title, source)
+$price_fixes = array(
+""" + "\n".join(php_entries) + """
+);
 
+""" + (APPLY_BULK_PHP if BULK_SQL else APPLY_LOOP_PHP) + """
 echo "\\n=== SUMMARY ===\\n";
 echo "Updated: $updated\\n";
 echo "Skipped (already priced or not found): $skipped\\n";
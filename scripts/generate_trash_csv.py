@@ -13,14 +13,69 @@ Usage:
 Two-step workflow:
 1. Import step1_trash_products.csv (updates existing to trash status)
 2. Import step2_consolidated_products.csv (creates new variable products)
+
+Step 1 can instead run straight over the WooCommerce REST API (batched,
+several requests in flight; needs WOO_CONSUMER_KEY/WOO_CONSUMER_SECRET):
+    python scripts/generate_trash_csv.py --rest             # dry run
+    python scripts/generate_trash_csv.py --rest --confirm   # trash them
 """
 
+import argparse
 import csv
 import sys
 from pathlib import Path
 
 
+def resolve_ids(woo, products):
+    """Map rows to product IDs, looking up SKU-only rows from one parallel id/sku sweep."""
+    ids = []
+    by_sku = None
+    unresolved = []
+    for product in products:
+        product_id = (product.get('ID') or '').strip()
+        if product_id.isdigit():
+            ids.append(int(product_id))
+            continue
+        sku = (product.get('SKU') or '').strip()
+        if by_sku is None:
+            by_sku = {p['sku']: p['id'] for p in woo.get_all('products', {'status': 'any'}, fields='id,sku') if p.get('sku')}
+        if sku in by_sku:
+            ids.append(by_sku[sku])
+        else:
+            unresolved.append(sku or product.get('Name', ''))
+    return sorted(set(ids)), unresolved
+
+
+def trash_via_rest(products, confirm, workers):
+    """Set products to 'trash' with concurrent /products/batch updates."""
+    from woo_rest import client_from_env
+
+    woo = client_from_env(max_workers=workers)
+    ids, unresolved = resolve_ids(woo, products)
+    print(f"Resolved {len(ids)} product IDs ({len(unresolved)} not found)")
+    if not confirm:
+        print("Dry run – re-run with --confirm to trash them")
+        return 0
+
+    result = woo.batch(
+        'products',
+        update=[{'id': product_id, 'status': 'trash'} for product_id in ids],
+        on_batch=lambda action, items, body: print(f"  trashed batch of {len(items)}"),
+    )
+    print(f"Trashed {len(result['update'])} products, {len(result['errors'])} errors "
+          f"({woo.stats['requests']} requests)")
+    for error in result['errors'][:10]:
+        print(f"  ❌ {error['item']['id']}: {error['error']}")
+    return 1 if result['errors'] else 0
+
+
 def main():
+    parser = argparse.ArgumentParser(description="Trash products listed in products_to_delete.csv")
+    parser.add_argument('--rest', action='store_true', help="Trash over the WooCommerce REST API instead of writing the import CSV")
+    parser.add_argument('--confirm', action='store_true', help="With --rest: actually trash (default is a dry run)")
+    parser.add_argument('--workers', type=int, default=4, help="Concurrent REST requests (default: 4)")
+    args = parser.parse_args()
+
     delete_csv = Path("outputs/woo_consolidation/products_to_delete.csv")
     output_dir = Path("outputs/woo_consolidation")
     
@@ -36,6 +91,9 @@ def main():
             products.append(row)
     
     print(f"Found {len(products)} products to trash")
+
+    if args.rest:
+        sys.exit(trash_via_rest(products, args.confirm, args.workers))
     
     # Generate Step 1: Trash existing products
     step1_path = output_dir / "step1_trash_products.csv"
@@ -0,0 +1,422 @@
+#!/usr/bin/env python3
+"""On-disk HTTP GET cache for the enrichment scrapers (search pages, product pages, JSON).
+
+Responses are kept in ``outputs/scraped/http_cache.sqlite`` keyed by URL +
+request headers, with status, headers, validators and the zlib-compressed
+body, so re-running an enrichment phase replays earlier lookups instead of
+hitting the retailer or manufacturer site again:
+
+* 200 responses are served from disk for ``HTTP_CACHE_TTL_HOURS`` (72).
+  Once stale they are revalidated with ``If-None-Match`` /
+  ``If-Modified-Since``; a 304 refreshes the entry without a body.
+* 404 / 410 are cached too (negative caching) for
+  ``HTTP_CACHE_NEGATIVE_TTL_HOURS`` (24), so dead search URLs are not
+  retried on every run.
+* A host whose connections fail outright (DNS failure, refused, connect
+  timeout) ``DOWN_AFTER_FAILURES`` (3) times in a row is marked down for
+  ``HTTP_CACHE_UNREACHABLE_TTL_HOURS`` (6); later URLs on it return at once.
+  Resets, SSL errors and read timeouts never mark a host down.
+* When revalidating a stale 200 fails on the network (or its host is down)
+  the stale copy is served rather than an error.
+* Other statuses (403, 429, 5xx) are returned but never stored.
+
+``HTTP_CACHE_MODE`` selects the behaviour:
+
+    normal    serve fresh entries, revalidate stale ones, fetch misses (default)
+    offline   replay only: never touch the network; a miss returns status 0
+    refresh   revalidate every entry, even fresh ones
+    off       bypass the cache completely
+
+``per_host_interval`` spaces out *network* requests to the same host, so
+callers no longer sleep between lookups that turn out to be cache hits.
+
+Usage:
+    from http_cache import default_cache
+
+    resp = default_cache().get(url, headers=HEADERS)
+    if resp.status_code == 200:
+        data = resp.json()          # .text, .content, .headers, .from_cache
+
+    HTTP_CACHE_MODE=offline python scripts/web_lookup.py     # reproducible, no network
+
+    python scripts/http_cache.py                             # entry counts by status / host
+    python scripts/http_cache.py --prune --older-than-days 30            # dry run
+    python scripts/http_cache.py --prune --older-than-days 30 --confirm
+    python scripts/http_cache.py --forget-host growace.com --confirm
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import urllib.parse
+import zlib
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Optional
+
+import requests
+from urllib3.exceptions import NewConnectionError
+from requests.structures import CaseInsensitiveDict
+
+WORKSPACE = Path(__file__).resolve().parent.parent
+DEFAULT_CACHE_PATH = WORKSPACE / "outputs" / "scraped" / "http_cache.sqlite"
+MODES = ("normal", "offline", "refresh", "off")
+NEGATIVE_STATUSES = (404, 410)
+DOWN_AFTER_FAILURES = 3         # consecutive connect failures before a host is marked down
+SCHEMA_VERSION = 1
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    host TEXT NOT NULL,
+    status INTEGER NOT NULL,
+    headers TEXT NOT NULL,
+    body BLOB NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    fetched_at REAL NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_host ON responses (host);
+CREATE TABLE IF NOT EXISTS down_hosts (
+    host TEXT PRIMARY KEY,
+    error TEXT NOT NULL,
+    until REAL NOT NULL
+);
+PRAGMA user_version = {SCHEMA_VERSION};
+"""
+
+
+def _env_hours(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+def _host(url: str) -> str:
+    return urllib.parse.urlsplit(url).netloc.lower()
+
+
+def cache_key(url: str, headers: Optional[Dict[str, str]] = None) -> str:
+    """Stable key for a GET of ``url`` with ``headers`` (header names are case-insensitive)."""
+    canonical = sorted((name.lower(), str(value)) for name, value in (headers or {}).items())
+    return hashlib.sha256(json.dumps([url, canonical]).encode("utf-8")).hexdigest()
+
+
+class CachedResponse:
+    """The parts of ``requests.Response`` the scrapers use, served from disk or the network."""
+
+    def __init__(self, url: str, status_code: int, headers: Optional[Dict[str, str]] = None,
+                 content: bytes = b"", from_cache: bool = False, error: Optional[str] = None) -> None:
+        self.url = url
+        self.status_code = status_code
+        self.headers = CaseInsensitiveDict(headers or {})
+        self.content = content
+        self.from_cache = from_cache
+        self.error = error
+
+    @property
+    def ok(self) -> bool:
+        return 200 <= self.status_code < 400
+
+    @property
+    def encoding(self) -> str:
+        match = re.search(r"charset=([\w.-]+)", self.headers.get("Content-Type", ""), re.I)
+        return match.group(1) if match else "utf-8"
+
+    @property
+    def text(self) -> str:
+        try:
+            return self.content.decode(self.encoding, errors="replace")
+        except LookupError:
+            return self.content.decode("utf-8", errors="replace")
+
+    def json(self):
+        return json.loads(self.text)
+
+    def __repr__(self) -> str:
+        source = "cache" if self.from_cache else "network"
+        return f"<CachedResponse [{self.status_code}] {source} {self.url}>"
+
+
+def _connect_failure(exc: requests.RequestException) -> bool:
+    """True for errors where no connection was made at all (DNS, refused, connect timeout)."""
+    if isinstance(exc, requests.ConnectTimeout):
+        return True
+    if isinstance(exc, requests.exceptions.SSLError) or not isinstance(exc, requests.ConnectionError):
+        return False
+    reason = exc.args[0] if exc.args else None
+    return isinstance(getattr(reason, "reason", reason), NewConnectionError)
+
+
+class HttpCache:
+    """SQLite-backed GET cache with TTLs, revalidation and negative entries (thread-safe)."""
+
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        *,
+        mode: Optional[str] = None,
+        ttl_hours: Optional[float] = None,
+        negative_ttl_hours: Optional[float] = None,
+        unreachable_ttl_hours: Optional[float] = None,
+        per_host_interval: float = 0.0,
+        timeout: float = 15,
+    ) -> None:
+        self.path = Path(path or os.environ.get("HTTP_CACHE_PATH") or DEFAULT_CACHE_PATH)
+        self.mode = (mode or os.environ.get("HTTP_CACHE_MODE") or "normal").lower()
+        if self.mode not in MODES:
+            raise ValueError(f"HTTP_CACHE_MODE must be one of {', '.join(MODES)}, not {self.mode!r}")
+        self.ttl = 3600 * (ttl_hours if ttl_hours is not None else _env_hours("HTTP_CACHE_TTL_HOURS", 72))
+        self.negative_ttl = 3600 * (negative_ttl_hours if negative_ttl_hours is not None
+                                    else _env_hours("HTTP_CACHE_NEGATIVE_TTL_HOURS", 24))
+        self.unreachable_ttl = 3600 * (unreachable_ttl_hours if unreachable_ttl_hours is not None
+                                       else _env_hours("HTTP_CACHE_UNREACHABLE_TTL_HOURS", 6))
+        self.per_host_interval = per_host_interval
+        self.timeout = timeout
+        self.stats: Counter = Counter()
+        self._lock = threading.RLock()
+        self._host_next: Dict[str, float] = {}
+        self._connect_failures: Counter = Counter()  # consecutive, per host, this process only
+        self._sessions = threading.local()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        if self.conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            self.conn.executescript("DROP TABLE IF EXISTS responses; DROP TABLE IF EXISTS down_hosts;")
+        self.conn.executescript(SCHEMA)
+
+    # ── network ─────────────────────────────────────────────────────────────
+    def _session(self) -> requests.Session:
+        session = getattr(self._sessions, "session", None)
+        if session is None:
+            session = self._sessions.session = requests.Session()
+        return session
+
+    def _wait_turn(self, host: str) -> None:
+        if self.per_host_interval <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._host_next.get(host, 0.0))
+            self._host_next[host] = start + self.per_host_interval
+        if start > now:
+            time.sleep(start - now)
+
+    def _fetch(self, url: str, headers: Dict[str, str], timeout: float) -> requests.Response:
+        self._wait_turn(_host(url))
+        self.stats["network"] += 1
+        return self._session().get(url, headers=headers, timeout=timeout)
+
+    # ── storage ─────────────────────────────────────────────────────────────
+    def _load(self, key: str) -> Optional[sqlite3.Row]:
+        with self._lock:
+            return self.conn.execute("SELECT * FROM responses WHERE key = ?", (key,)).fetchone()
+
+    def _store(self, key: str, url: str, resp: requests.Response, ttl: float) -> None:
+        headers = {name: value for name, value in resp.headers.items()
+                   if name.lower() in ("content-type", "etag", "last-modified", "location")}
+        now = time.time()
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, url, _host(url), resp.status_code, json.dumps(headers),
+                 zlib.compress(resp.content, 6), resp.headers.get("ETag"), resp.headers.get("Last-Modified"),
+                 now, now + ttl),
+            )
+            self.conn.commit()
+
+    def _extend(self, key: str, ttl: float) -> None:
+        now = time.time()
+        with self._lock:
+            self.conn.execute("UPDATE responses SET fetched_at = ?, expires_at = ? WHERE key = ?",
+                              (now, now + ttl, key))
+            self.conn.commit()
+
+    def _host_down(self, host: str) -> Optional[str]:
+        with self._lock:
+            row = self.conn.execute("SELECT error, until FROM down_hosts WHERE host = ?", (host,)).fetchone()
+        if row and (row["until"] > time.time() or self.mode == "offline"):
+            return row["error"]
+        return None
+
+    def _connect_failed(self, host: str, error: str) -> None:
+        """Count a connect failure; mark the host down once ``DOWN_AFTER_FAILURES`` happen in a row."""
+        with self._lock:
+            self._connect_failures[host] += 1
+            if self._connect_failures[host] < DOWN_AFTER_FAILURES:
+                return
+            self._connect_failures.pop(host)
+            self.conn.execute("INSERT OR REPLACE INTO down_hosts VALUES (?, ?, ?)",
+                              (host, error[:300], time.time() + self.unreachable_ttl))
+            self.conn.commit()
+
+    @staticmethod
+    def _replay(row: sqlite3.Row) -> CachedResponse:
+        return CachedResponse(row["url"], row["status"], json.loads(row["headers"]),
+                              zlib.decompress(row["body"]), from_cache=True)
+
+    # ── public API ──────────────────────────────────────────────────────────
+    def get(self, url: str, headers: Optional[Dict[str, str]] = None, *,
+            ttl_hours: Optional[float] = None, timeout: Optional[float] = None) -> CachedResponse:
+        """GET ``url`` through the cache; never raises for network errors (see ``.error``)."""
+        headers = dict(headers or {})
+        timeout = timeout or self.timeout
+        ttl = 3600 * ttl_hours if ttl_hours is not None else self.ttl
+        if self.mode == "off":
+            try:
+                resp = self._fetch(url, headers, timeout)
+            except requests.RequestException as exc:
+                return CachedResponse(url, 0, error=str(exc))
+            return CachedResponse(url, resp.status_code, dict(resp.headers), resp.content)
+
+        key = cache_key(url, headers)
+        row = self._load(key)
+        if row is not None and (self.mode == "offline" or
+                                (self.mode == "normal" and row["expires_at"] > time.time())):
+            self.stats["negative" if row["status"] in NEGATIVE_STATUSES else "hits"] += 1
+            return self._replay(row)
+        host = _host(url)
+        down = self._host_down(host)
+        if down:
+            self.stats["host_down"] += 1
+            if row is not None and row["status"] == 200:
+                self.stats["stale"] += 1
+                return self._replay(row)
+            return CachedResponse(url, 0, from_cache=True, error=f"host unreachable (cached): {down}")
+        if self.mode == "offline":
+            self.stats["offline_misses"] += 1
+            return CachedResponse(url, 0, error="not in cache (HTTP_CACHE_MODE=offline)")
+
+        request_headers = dict(headers)
+        if row is not None and row["status"] == 200:
+            if row["etag"]:
+                request_headers["If-None-Match"] = row["etag"]
+            if row["last_modified"]:
+                request_headers["If-Modified-Since"] = row["last_modified"]
+        try:
+            resp = self._fetch(url, request_headers, timeout)
+        except requests.RequestException as exc:
+            if _connect_failure(exc):
+                self._connect_failed(host, str(exc))
+            if row is not None and row["status"] == 200:
+                self.stats["stale"] += 1
+                return self._replay(row)
+            return CachedResponse(url, 0, error=str(exc))
+        with self._lock:
+            self._connect_failures.pop(host, None)
+
+        if resp.status_code == 304 and row is not None:
+            self._extend(key, ttl)
+            self.stats["revalidated"] += 1
+            return self._replay(row)
+        if resp.status_code == 200:
+            self._store(key, url, resp, ttl)
+        elif resp.status_code in NEGATIVE_STATUSES:
+            self._store(key, url, resp, self.negative_ttl)
+        self.stats["stored" if resp.status_code in (200,) + NEGATIVE_STATUSES else "uncached"] += 1
+        return CachedResponse(url, resp.status_code, dict(resp.headers), resp.content)
+
+    def summary(self) -> str:
+        """One line of this run's counters, e.g. for the end of a scrape."""
+        parts = [f"{name} {count}" for name, count in sorted(self.stats.items())]
+        return f"HTTP cache ({self.mode}): " + (", ".join(parts) if parts else "no requests")
+
+    def entries(self) -> Dict[str, Counter]:
+        """Stored entry counts per host, split by status."""
+        counts: Dict[str, Counter] = {}
+        with self._lock:
+            for row in self.conn.execute("SELECT host, status, COUNT(*) AS n FROM responses GROUP BY host, status"):
+                counts.setdefault(row["host"], Counter())[row["status"]] = row["n"]
+        return counts
+
+    def down_hosts(self) -> Dict[str, Dict]:
+        """Hosts currently short-circuited: {host: {"error", "hours_left"}}."""
+        now = time.time()
+        with self._lock:
+            rows = self.conn.execute("SELECT * FROM down_hosts WHERE until > ? ORDER BY host", (now,)).fetchall()
+        return {row["host"]: {"error": row["error"], "hours_left": (row["until"] - now) / 3600} for row in rows}
+
+    def prune(self, older_than_days: float, dry_run: bool = True) -> int:
+        """Delete entries that expired more than ``older_than_days`` ago (plus lapsed down-host marks)."""
+        cutoff = time.time() - older_than_days * 86400
+        with self._lock:
+            count = self.conn.execute("SELECT COUNT(*) FROM responses WHERE expires_at < ?", (cutoff,)).fetchone()[0]
+            if not dry_run:
+                self.conn.execute("DELETE FROM responses WHERE expires_at < ?", (cutoff,))
+                self.conn.execute("DELETE FROM down_hosts WHERE until < ?", (time.time(),))
+                self.conn.commit()
+        return count
+
+    def forget_host(self, host: str, dry_run: bool = True) -> int:
+        """Drop every entry (and any down mark) for ``host``."""
+        host = host.lower()
+        with self._lock:
+            count = self.conn.execute("SELECT COUNT(*) FROM responses WHERE host = ?", (host,)).fetchone()[0]
+            if not dry_run:
+                self.conn.execute("DELETE FROM responses WHERE host = ?", (host,))
+                self.conn.execute("DELETE FROM down_hosts WHERE host = ?", (host,))
+                self.conn.commit()
+        return count
+
+    def close(self) -> None:
+        with self._lock:
+            self.conn.close()
+
+
+_default: Optional[HttpCache] = None
+_default_lock = threading.Lock()
+
+
+def default_cache(**options) -> HttpCache:
+    """Process-wide cache configured from the environment (``options`` apply on first call only)."""
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = HttpCache(**options)
+        return _default
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Inspect or prune the on-disk HTTP cache")
+    parser.add_argument("--path", type=Path, help="Cache database (default: HTTP_CACHE_PATH or outputs/scraped)")
+    parser.add_argument("--prune", action="store_true", help="Delete long-expired entries")
+    parser.add_argument("--older-than-days", type=float, default=30, help="With --prune: expired for this long")
+    parser.add_argument("--forget-host", help="Delete every entry for one host")
+    parser.add_argument("--confirm", action="store_true", help="Actually delete (default is a dry run)")
+    args = parser.parse_args()
+
+    cache = HttpCache(args.path)
+    verb = "Deleted" if args.confirm else "Would delete"
+    if args.prune:
+        count = cache.prune(args.older_than_days, dry_run=not args.confirm)
+        print(f"{verb} {count} entries expired more than {args.older_than_days:g} days ago")
+    if args.forget_host:
+        count = cache.forget_host(args.forget_host, dry_run=not args.confirm)
+        print(f"{verb} {count} entries for {args.forget_host}")
+    if (args.prune or args.forget_host) and not args.confirm:
+        print("Dry run – re-run with --confirm to delete")
+
+    entries = cache.entries()
+    print(f"\n{cache.path}")
+    for host, statuses in sorted(entries.items()):
+        detail = ", ".join(f"{status}: {count}" for status, count in sorted(statuses.items()))
+        print(f"  {host:<36} {sum(statuses.values()):>6}  ({detail})")
+    for host, info in cache.down_hosts().items():
+        print(f"  ⚠️  {host} marked down for {info['hours_left']:.1f}h: {info['error'][:80]}")
+    cache.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,406 @@
+#!/usr/bin/env python3
+"""Concurrent candidate-image prefetch into ``outputs/audit/_img_cache/prefetch``.
+
+Retailer candidate images (``product_candidates.json``, ``curate.py``'s
+All Images tab, drops onto ``image_sourcing_tool.py``) are downloaded ahead
+of time so applying one only copies a local file:
+
+* a bounded thread pool (``workers``, at most ``per_host`` requests per host)
+  streams each body to a ``.part`` file in 64 KB chunks – never whole in memory;
+* the index is keyed on the URL as given (``image_cache_key``: only ``?v=``
+  dropped), so ``gorilla-tent_2x4.jpg`` and ``_4x4.jpg`` stay two images;
+  content is deduped by SHA-256, so a picture reachable under several URLs
+  is stored once as ``<sha256[:20]>.<ext>``;
+* the full-size URL (``normalize_image_url``: Shopify CDN size tokens such as
+  ``_600x600`` / ``_grande`` / ``@2x`` and ``width=`` dropped) is fetched
+  first, the URL as given if that fails;
+* width/height are read from the first bytes (PNG, GIF, JPEG, WebP headers)
+  while streaming, and a ``Content-Length`` under ``min_bytes`` or a side
+  under ``min_side`` is rejected before the rest of the body is read.
+
+The URL → file index (status, hash, bytes, size, content type) lives in
+``prefetch.sqlite`` next to the files, so the curation dashboard, the
+sourcing tool and this CLI share it.
+
+Usage:
+    from image_prefetch import ImagePrefetcher, normalize_image_url
+
+    prefetcher = ImagePrefetcher(workers=8)
+    prefetcher.submit(url)                 # background; returns a Future
+    entry = prefetcher.fetch(url)          # blocking; entry["status"] == "ok" -> prefetcher.path(entry)
+
+    python scripts/image_prefetch.py                       # every image in product_candidates.json
+    python scripts/image_prefetch.py --ids 1234 5678 --workers 16
+    python scripts/image_prefetch.py --urls https://cdn.shopify.com/s/files/.../a_600x600.jpg
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import struct
+import threading
+import time
+import urllib.parse
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import requests
+
+WORKSPACE = Path(__file__).resolve().parent.parent
+DEFAULT_CACHE_DIR = WORKSPACE / "outputs" / "audit" / "_img_cache" / "prefetch"
+CANDIDATES = WORKSPACE / "outputs" / "product_candidates.json"
+CHUNK = 64 * 1024
+PROBE_BYTES = 256 * 1024  # stop looking for dimensions after this much
+SCHEMA_VERSION = 2
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+                  "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Accept": "image/avif,image/webp,image/apng,image/*,*/*;q=0.8",
+}
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS images (
+    key TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    status TEXT NOT NULL,
+    file TEXT,
+    sha256 TEXT,
+    bytes INTEGER,
+    width INTEGER,
+    height INTEGER,
+    content_type TEXT,
+    error TEXT,
+    fetched_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS images_sha256 ON images (sha256);
+PRAGMA user_version = {SCHEMA_VERSION};
+"""
+ENTRY_FIELDS = ("key", "url", "status", "file", "sha256", "bytes", "width", "height",
+                "content_type", "error", "fetched_at")
+
+# Shopify CDN size tokens before the extension: _600x600 / _600x / _x600 (3+ digits, so product
+# dimensions like _2x4 / _4x4 stay) or _grande, _large, ... with optional _crop_center and @2x
+_SHOPIFY_SIZE = re.compile(
+    r"(?:_(?:\d{3,}x\d{3,}|\d{3,}x|x\d{3,}|pico|icon|thumb|small|compact|medium|large|grande|original|master)"
+    r"(?:_crop_[a-z]+)?(?:@\dx)?)+(?=\.[A-Za-z0-9]+$)"
+)
+_SHOPIFY_PARAMS = {"v", "width", "height", "crop"}  # cache buster + CDN resize parameters
+_EXTENSIONS = {"image/jpeg": ".jpg", "image/png": ".png", "image/gif": ".gif", "image/webp": ".webp",
+               "image/avif": ".avif", "image/svg+xml": ".svg"}
+
+
+def _clean_url(url: str, shopify_full_size: bool) -> str:
+    url = url.strip()
+    if url.startswith("//"):
+        url = "https:" + url
+    parts = urllib.parse.urlsplit(url)
+    shopify = shopify_full_size and ("shopify" in parts.netloc.lower() or "/cdn/shop/" in parts.path)
+    path = _SHOPIFY_SIZE.sub("", parts.path) if shopify else parts.path
+    drop = _SHOPIFY_PARAMS if shopify else {"v"}
+    query = urllib.parse.urlencode([(k, v) for k, v in urllib.parse.parse_qsl(parts.query, keep_blank_values=True)
+                                    if k.lower() not in drop])
+    return urllib.parse.urlunsplit((parts.scheme or "https", parts.netloc.lower(), path, query, ""))
+
+
+def image_cache_key(url: str) -> str:
+    """Index key: the URL as given, with a lower-case host and no ``?v=`` cache buster."""
+    return _clean_url(url, shopify_full_size=False)
+
+
+def normalize_image_url(url: str) -> str:
+    """Full-size download URL: on Shopify's CDN without size tokens or resize params, else the cache key."""
+    return _clean_url(url, shopify_full_size=True)
+
+
+def image_size(head: bytes) -> Optional[Tuple[int, int]]:
+    """(width, height) from the start of a PNG/GIF/JPEG/WebP file, or None if not (yet) known."""
+    if head[:8] == b"\x89PNG\r\n\x1a\n" and len(head) >= 24:
+        return struct.unpack(">II", head[16:24])
+    if head[:6] in (b"GIF87a", b"GIF89a") and len(head) >= 10:
+        return struct.unpack("<HH", head[6:10])
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP" and len(head) >= 30:
+        chunk = head[12:16]
+        if chunk == b"VP8 ":
+            width, height = struct.unpack("<HH", head[26:30])
+            return width & 0x3FFF, height & 0x3FFF
+        if chunk == b"VP8L":
+            bits = struct.unpack("<I", head[21:25])[0]
+            return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+        if chunk == b"VP8X":
+            return int.from_bytes(head[24:27], "little") + 1, int.from_bytes(head[27:30], "little") + 1
+        return None
+    if head[:2] == b"\xff\xd8":
+        pos = 2
+        while pos + 9 <= len(head):
+            if head[pos] != 0xFF:
+                return None
+            marker = head[pos + 1]
+            if marker == 0xFF:  # fill byte
+                pos += 1
+                continue
+            if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7:  # markers without a length
+                pos += 2
+                continue
+            if marker in (0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF):
+                height, width = struct.unpack(">HH", head[pos + 5:pos + 9])
+                return width, height
+            pos += 2 + struct.unpack(">H", head[pos + 2:pos + 4])[0]
+    return None
+
+
+class _Rejected(Exception):
+    """The response is not a usable image (too small, not an image); cached as ``rejected``."""
+
+    def __init__(self, message: str, size: Optional[Tuple[int, int]] = None) -> None:
+        super().__init__(message)
+        self.size = size
+
+
+class ImagePrefetcher:
+    """Bounded-pool image downloader with a shared on-disk, deduplicated cache (thread-safe)."""
+
+    def __init__(
+        self,
+        cache_dir: Path = DEFAULT_CACHE_DIR,
+        *,
+        workers: int = 8,
+        per_host: int = 4,
+        min_bytes: int = 500,
+        min_side: int = 0,
+        timeout: float = 25,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> None:
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.per_host = max(1, per_host)
+        self.min_bytes = min_bytes
+        self.min_side = min_side
+        self.timeout = timeout
+        self.headers = dict(headers or HEADERS)
+        self._pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="image-prefetch")
+        self._lock = threading.RLock()
+        self._inflight: Dict[str, Future] = {}
+        self._hosts: Dict[str, threading.Semaphore] = {}
+        self._sessions = threading.local()
+        self.conn = sqlite3.connect(str(self.cache_dir / "prefetch.sqlite"), check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        if self.conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            self.conn.executescript("DROP TABLE IF EXISTS images;")
+        self.conn.executescript(SCHEMA)
+
+    # ── index ───────────────────────────────────────────────────────────────
+    def lookup(self, url: str) -> Optional[Dict]:
+        """Index entry for ``url``, or None if never fetched."""
+        with self._lock:
+            row = self.conn.execute("SELECT * FROM images WHERE key = ?", (image_cache_key(url),)).fetchone()
+        return dict(row) if row else None
+
+    def lookup_many(self, urls: Iterable[str]) -> Dict[str, Dict]:
+        """``lookup`` for several URLs at once: {url: entry} for those in the index."""
+        keys = {url: image_cache_key(url) for url in urls}
+        if not keys:
+            return {}
+        with self._lock:
+            marks = ", ".join("?" * len(set(keys.values())))
+            rows = {row["key"]: dict(row) for row in
+                    self.conn.execute(f"SELECT * FROM images WHERE key IN ({marks})", list(set(keys.values())))}
+        return {url: rows[key] for url, key in keys.items() if key in rows}
+
+    def _record(self, fields: Dict) -> Dict:
+        entry = {field: fields.get(field) for field in ENTRY_FIELDS}
+        entry["fetched_at"] = time.time()
+        with self._lock:
+            self.conn.execute(f"INSERT OR REPLACE INTO images ({', '.join(ENTRY_FIELDS)}) "
+                              f"VALUES ({', '.join('?' * len(ENTRY_FIELDS))})",
+                              tuple(entry.values()))
+            self.conn.commit()
+        return entry
+
+    def path(self, entry: Dict) -> Optional[Path]:
+        """Local file of an ``ok`` entry."""
+        return self.cache_dir / entry["file"] if entry and entry.get("file") else None
+
+    def _usable(self, entry: Optional[Dict]) -> bool:
+        """Already settled: downloaded (file still there) or rejected under this instance's limits."""
+        if not entry:
+            return False
+        if entry["status"] == "ok":
+            return self.path(entry).exists()
+        if entry["status"] == "rejected" and entry["width"]:  # rejected for its pixel size
+            return min(entry["width"], entry["height"]) < self.min_side
+        return entry["status"] == "rejected"
+
+    # ── download ────────────────────────────────────────────────────────────
+    def _session(self) -> requests.Session:
+        session = getattr(self._sessions, "session", None)
+        if session is None:
+            session = self._sessions.session = requests.Session()
+        return session
+
+    def _host_slot(self, host: str) -> threading.Semaphore:
+        with self._lock:
+            if host not in self._hosts:
+                self._hosts[host] = threading.Semaphore(self.per_host)
+            return self._hosts[host]
+
+    def _stream(self, source: str, key: str) -> Dict:
+        """Stream ``source`` into the cache; the ``ok`` entry fields, or raise."""
+        part = self.cache_dir / f".{hashlib.sha1(key.encode()).hexdigest()}.part"
+        try:
+            with self._host_slot(urllib.parse.urlsplit(source).netloc):
+                with self._session().get(source, headers=self.headers, timeout=self.timeout, stream=True) as resp:
+                    resp.raise_for_status()
+                    content_type = resp.headers.get("Content-Type", "").split(";")[0].strip().lower()
+                    length = int(resp.headers.get("Content-Length") or 0)
+                    if length and length < self.min_bytes:
+                        raise _Rejected(f"Too small ({length} bytes) — probably not an image")
+                    digest, head, size, total = hashlib.sha256(), b"", None, 0
+                    with part.open("wb") as handle:
+                        for chunk in resp.iter_content(CHUNK):
+                            digest.update(chunk)
+                            handle.write(chunk)
+                            total += len(chunk)
+                            if size is None and len(head) < PROBE_BYTES:
+                                head += chunk
+                                size = image_size(head)
+                                if size and min(size) < self.min_side:
+                                    raise _Rejected(f"Too small ({size[0]}x{size[1]} px)", size)
+            if total < self.min_bytes:
+                raise _Rejected(f"Too small ({total} bytes) — probably not an image")
+            if size is None and not content_type.startswith("image/"):
+                raise _Rejected(f"Not an image ({content_type or 'unknown type'})")
+            sha = digest.hexdigest()
+            ext = _EXTENSIONS.get(content_type) or Path(urllib.parse.urlsplit(source).path).suffix.lower()
+            name = sha[:20] + (ext if ext and len(ext) <= 6 else ".jpg")
+            final = self.cache_dir / name
+            if final.exists():  # same picture under another URL
+                part.unlink()
+            else:
+                os.replace(part, final)
+            return {"file": name, "sha256": sha, "bytes": total, "content_type": content_type,
+                    "width": size[0] if size else None, "height": size[1] if size else None}
+        finally:
+            if part.exists():
+                part.unlink()
+
+    def _download(self, url: str, key: str) -> Dict:
+        entry = {"key": key, "url": url}
+        # the full-size URL first; the URL as given if that one fails
+        sources = (normalize_image_url(url), key)
+        for source in dict.fromkeys(u for u in sources if u.startswith(("http://", "https://"))):
+            try:
+                entry.update(self._stream(source, key), status="ok", error=None)
+                break
+            except _Rejected as exc:
+                entry.update(status="rejected", error=str(exc))
+                if exc.size:
+                    entry.update(width=exc.size[0], height=exc.size[1])
+                break
+            except (requests.RequestException, OSError) as exc:
+                entry.update(status="error", error=str(exc)[:300])
+        return self._record(entry)
+
+    def _run(self, url: str, key: str) -> Dict:
+        try:
+            return self._download(url, key)
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    # ── public API ──────────────────────────────────────────────────────────
+    def submit(self, url: str, refresh: bool = False) -> Future:
+        """Queue ``url`` (deduped against the index and in-flight downloads); Future of its entry."""
+        key = image_cache_key(url)
+        with self._lock:
+            if key in self._inflight:
+                return self._inflight[key]
+            entry = None if refresh else self.lookup(key)
+            if self._usable(entry):
+                done: Future = Future()
+                done.set_result(entry)
+                return done
+            future = self._pool.submit(self._run, url, key)
+            self._inflight[key] = future
+            return future
+
+    def fetch(self, url: str, refresh: bool = False) -> Dict:
+        """Blocking ``submit``."""
+        return self.submit(url, refresh).result()
+
+    def prefetch(self, urls: Iterable[str], progress: Optional[Callable[[int, int], None]] = None) -> Dict[str, Dict]:
+        """Fetch every URL concurrently and wait: {url: entry}."""
+        futures = {url: self.submit(url) for url in dict.fromkeys(urls)}
+        results = {}
+        for done, (url, future) in enumerate(futures.items(), 1):
+            results[url] = future.result()
+            if progress:
+                progress(done, len(futures))
+        return results
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=True)
+        with self._lock:
+            self.conn.close()
+
+
+def candidate_image_urls(candidates: Dict, ids: Optional[List[str]] = None) -> List[str]:
+    """Every candidate image URL in ``product_candidates.json`` data, best-scoring candidates first."""
+    urls = []
+    for pid, data in candidates.items():
+        if ids and pid not in ids:
+            continue
+        for candidate in sorted(data.get("candidates", []), key=lambda c: -c.get("score", 0)):
+            urls.extend(candidate.get("images", []))
+    return list(dict.fromkeys(urls))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Prefetch candidate images into the local image cache")
+    parser.add_argument("--candidates", type=Path, default=CANDIDATES, help="product_candidates.json")
+    parser.add_argument("--ids", nargs="+", help="Only these product ids")
+    parser.add_argument("--urls", nargs="+", help="Prefetch these URLs instead of the candidates file")
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent downloads (default: 8)")
+    parser.add_argument("--per-host", type=int, default=4, help="Concurrent downloads per host (default: 4)")
+    parser.add_argument("--min-side", type=int, default=100, help="Reject images smaller than this (px)")
+    parser.add_argument("--cache-dir", type=Path, default=DEFAULT_CACHE_DIR)
+    args = parser.parse_args()
+
+    if args.urls:
+        urls = list(dict.fromkeys(args.urls))
+    else:
+        with args.candidates.open(encoding="utf-8") as handle:
+            urls = candidate_image_urls(json.load(handle), args.ids)
+    unique = len({image_cache_key(url) for url in urls})
+    print(f"🖼️  {len(urls)} image URLs ({unique} after URL normalization) → {args.cache_dir}")
+
+    prefetcher = ImagePrefetcher(args.cache_dir, workers=args.workers, per_host=args.per_host,
+                                 min_side=args.min_side)
+    started = time.perf_counter()
+
+    def progress(done: int, total: int) -> None:
+        if done % 100 == 0 or done == total:
+            print(f"  {done}/{total} ({time.perf_counter() - started:.1f}s)", flush=True)
+
+    results = prefetcher.prefetch(urls, progress)
+    prefetcher.close()
+    statuses: Dict[str, int] = {}
+    for entry in results.values():
+        statuses[entry["status"]] = statuses.get(entry["status"], 0) + 1
+    files = {entry["file"] for entry in results.values() if entry.get("file")}
+    size_mb = sum(entry["bytes"] or 0 for entry in results.values() if entry.get("file")) / 1e6
+    print(f"\n  {', '.join(f'{k}: {v}' for k, v in sorted(statuses.items()))}")
+    print(f"  {len(files)} distinct files (content-deduped), ~{size_mb:.1f} MB referenced, "
+          f"{time.perf_counter() - started:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -18,6 +18,12 @@ Options:
   --port 5001        Port to listen on (default: 5001)
   --csv <path>       CSV file with products to source (default: outputs/audit/images_needing_sourcing.csv)
   --all-products     Show ALL products (not just flagged/placeholder ones)
+  --workers 4        Background image jobs processed at once (default: 4)
+
+Image and gallery drops are queued on a bounded worker pool and return a job id
+at once; the page polls /api/jobs/<id> and /api/products?since=<seq> for the
+changes.  Status changes are appended to image_sourcing_state.journal.jsonl and
+folded into image_sourcing_state.json every JOURNAL_COMPACT_EVERY entries.
 """
 from __future__ import annotations
 
@@ -29,14 +35,20 @@ import json
 import logging
 import os
 import re
+import shutil
 import sys
 import tempfile
 import threading
 import time
 import urllib.parse
 import urllib.request
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+from image_prefetch import ImagePrefetcher
+
 WORKSPACE = Path(__file__).resolve().parent.parent
 
 try:
@@ -58,6 +70,9 @@ SITE_DIR = "/home/wp_9dm4yz/hmoonhydro.com"
 
 DEFAULT_CSV    = WORKSPACE / "outputs" / "audit" / "images_needing_sourcing.csv"
 STATE_FILE     = WORKSPACE / "outputs" / "audit" / "image_sourcing_state.json"
+STATE_JOURNAL  = WORKSPACE / "outputs" / "audit" / "image_sourcing_state.journal.jsonl"
+JOURNAL_COMPACT_EVERY = 200   # journal entries before folding into STATE_FILE
+JOB_WORKERS    = 4
 UPLOAD_CACHE   = WORKSPACE / "outputs" / "audit" / "_img_cache"
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
@@ -80,20 +95,120 @@ def _build_thumb_index():
     log.info(f"Thumb index: {count} files indexed, {len(_THUMB_INDEX)} unique names")
 
 # ── Thread-safe state ─────────────────────────────────────────────────────────
+# Every change is one appended journal line ({"sku", "state"}; state null =
+# reset) instead of a full rewrite; compact_state() folds the journal into
+# STATE_FILE.  _seq/_sku_seq let the UI fetch only rows changed since its last poll.
 _state_lock = threading.Lock()
 _state: dict[str, dict] = {}   # keyed by sku: {status, attachment_id, applied_url, ts}
+_seq = 0
+_sku_seq: dict[str, int] = {}
+_journal_entries = 0
+_EPOCH = uuid.uuid4().hex[:8]  # changes on restart so stale ?since= cursors get a full list
 
 def load_state() -> dict:
+    state = {}
     if STATE_FILE.exists():
         try:
-            return json.loads(STATE_FILE.read_text())
+            state = json.loads(STATE_FILE.read_text())
         except Exception:
             pass
-    return {}
+    if STATE_JOURNAL.exists():
+        for line in STATE_JOURNAL.read_text(encoding="utf-8").splitlines():
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # torn last line from a crash
+            if entry.get("state") is None:
+                state.pop(entry.get("sku", ""), None)
+            else:
+                state[entry["sku"]] = entry["state"]
+    return state
 
-def save_state():
+def compact_state():
+    """Write the full state snapshot and truncate the journal (caller holds _state_lock)."""
+    global _journal_entries
     STATE_FILE.parent.mkdir(parents=True, exist_ok=True)
-    STATE_FILE.write_text(json.dumps(_state, indent=2))
+    tmp = STATE_FILE.with_suffix(".json.tmp")
+    tmp.write_text(json.dumps(_state, indent=2))
+    os.replace(tmp, STATE_FILE)
+    STATE_JOURNAL.write_text("")
+    _journal_entries = 0
+
+def _journal(sku: str, entry: dict | None):
+    global _seq, _journal_entries
+    _seq += 1
+    _sku_seq[sku] = _seq
+    STATE_JOURNAL.parent.mkdir(parents=True, exist_ok=True)
+    with STATE_JOURNAL.open("a", encoding="utf-8") as f:
+        f.write(json.dumps({"sku": sku, "state": entry}) + "\n")
+    _journal_entries += 1
+    if _journal_entries >= JOURNAL_COMPACT_EVERY:
+        compact_state()
+
+def set_state(sku: str, entry: dict):
+    """Replace a product's state (caller holds _state_lock)."""
+    _state[sku] = entry
+    _journal(sku, entry)
+
+def update_state(sku: str, **fields):
+    """Merge fields into a product's state (caller holds _state_lock)."""
+    set_state(sku, {**_state.get(sku, {}), **fields})
+
+def delete_state(sku: str):
+    """Reset a product to pending (caller holds _state_lock)."""
+    _state.pop(sku, None)
+    _journal(sku, None)
+
+# ── Background jobs ───────────────────────────────────────────────────────────
+_job_pool = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix="image-job")
+_jobs: dict[str, dict] = {}    # job_id -> {id, kind, sku, status, result, ts}
+_jobs_lock = threading.Lock()
+_sku_queues: dict[str, deque] = {}  # sku -> jobs waiting behind the running one (under _jobs_lock)
+MAX_FINISHED_JOBS = 500
+
+def submit_job(kind: str, sku: str, fn, *args) -> str:
+    """Queue fn(*args) on the worker pool; it must return {"ok": bool, ...}.
+
+    Jobs for one SKU run one after another (staging files, the remote upload and
+    the gallery meta read-modify-write would otherwise interleave); jobs for
+    different SKUs still run in parallel.
+    """
+    job_id = uuid.uuid4().hex[:12]
+    with _jobs_lock:
+        _jobs[job_id] = {"id": job_id, "kind": kind, "sku": sku, "status": "queued",
+                         "ts": time.strftime("%Y-%m-%dT%H:%M:%S")}
+
+    def _run():
+        with _jobs_lock:
+            _jobs[job_id]["status"] = "running"
+        try:
+            result = fn(*args)
+        except Exception as e:
+            log.exception(f"{kind} job failed")
+            result = {"ok": False, "error": str(e)}
+        finally:
+            with _jobs_lock:
+                waiting = _sku_queues[sku]
+                after = waiting.popleft() if waiting else None
+                if after is None:
+                    del _sku_queues[sku]
+            if after is not None:
+                _job_pool.submit(after)
+        with _jobs_lock:
+            _jobs[job_id].update(status="done" if result.get("ok") else "error", result=result,
+                                 ts=time.strftime("%Y-%m-%dT%H:%M:%S"))
+            finished = [j for j in _jobs.values() if j["status"] in ("done", "error")]
+            for old in finished[:-MAX_FINISHED_JOBS]:
+                _jobs.pop(old["id"], None)
+
+    with _jobs_lock:
+        waiting = _sku_queues.get(sku)
+        if waiting is not None:
+            waiting.append(_run)
+            return job_id
+        _sku_queues[sku] = deque()
+    _job_pool.submit(_run)
+    return job_id
 
 # ── SSH helpers ───────────────────────────────────────────────────────────────
 _ssh_pool: list[paramiko.SSHClient] = []
@@ -136,16 +251,18 @@ FAKE_BROWSER = {
     "Referer": "https://www.google.com/",
 }
 
+# Shared with curate.py / image_prefetch.py: candidate images prefetched there are
+# copied from disk here, and drops are streamed (not buffered) into the same cache.
+_prefetcher = ImagePrefetcher(workers=JOB_WORKERS, headers=FAKE_BROWSER)
+
 def download_url(url: str, dest: str) -> tuple[bool, str]:
-    """Download image from URL to dest path. Returns (ok, error_msg)."""
+    """Copy image at URL to dest path, downloading it into the prefetch cache first if needed.
+    Returns (ok, error_msg)."""
     try:
-        req = urllib.request.Request(url, headers=FAKE_BROWSER)
-        with urllib.request.urlopen(req, timeout=25) as resp:
-            data = resp.read()
-        if len(data) < 500:
-            return False, f"Too small ({len(data)} bytes) — probably not an image"
-        with open(dest, "wb") as f:
-            f.write(data)
+        entry = _prefetcher.fetch(url)
+        if entry["status"] != "ok":
+            return False, entry["error"] or entry["status"]
+        shutil.copyfile(_prefetcher.path(entry), dest)
         return True, ""
     except Exception as e:
         return False, str(e)
@@ -163,23 +280,32 @@ def save_base64_image(data_url: str, dest: str) -> tuple[bool, str]:
     except Exception as e:
         return False, str(e)
 
+def _put_remote_tmp(ssh: paramiko.SSHClient, local_file: str, remote_dir: str, remote_name: str) -> str:
+    """Upload into a per-job temp dir so the imported file keeps its name; returns the remote path."""
+    sftp = ssh.open_sftp()
+    try:
+        sftp.mkdir(remote_dir)
+        remote_tmp = f"{remote_dir}/{remote_name}"
+        sftp.put(local_file, remote_tmp)
+    finally:
+        sftp.close()
+    return remote_tmp
+
 def sftp_upload_and_assign(product_id: str, sku: str, local_file: str,
-                            remote_name: str) -> tuple[str, str, str]:
+                            remote_name: str, tag: str) -> tuple[str, str, str]:
     """SFTP upload → wp media import → featured image.
     Returns (status, att_id, image_url) — image_url is the WordPress GUID URL on success."""
-    remote_tmp = f"/tmp/hmoon_img_{remote_name}"
+    remote_dir = f"/tmp/hmoon_img_{tag}"
     ssh = get_ssh()
     try:
-        sftp = ssh.open_sftp()
-        sftp.put(local_file, remote_tmp)
-        sftp.close()
+        remote_tmp = _put_remote_tmp(ssh, local_file, remote_dir, remote_name)
 
         result = run_remote(
             ssh,
             f"cd {SITE_DIR} && wp media import {remote_tmp} "
             f"--post_id={product_id} --featured_image --porcelain --allow-root 2>&1"
         )
-        run_remote(ssh, f"rm -f {remote_tmp}")
+        run_remote(ssh, f"rm -rf {remote_dir}")
 
         if result.strip().isdigit():
             att_id = result.strip()
@@ -198,22 +324,21 @@ def sftp_upload_and_assign(product_id: str, sku: str, local_file: str,
 
 
 def sftp_add_to_gallery(product_id: str, sku: str, local_file: str,
-                         remote_name: str) -> tuple[str, str, str]:
+                         remote_name: str, tag: str) -> tuple[str, str, str]:
     """SFTP upload → wp media import (not featured) → append to _product_image_gallery.
-    Returns (status, att_id, image_url)."""
-    remote_tmp = f"/tmp/hmoon_gal_{remote_name}"
+    Returns (status, att_id, image_url).  The meta read-modify-write relies on
+    submit_job running one job per SKU at a time."""
+    remote_dir = f"/tmp/hmoon_gal_{tag}"
     ssh = get_ssh()
     try:
-        sftp = ssh.open_sftp()
-        sftp.put(local_file, remote_tmp)
-        sftp.close()
+        remote_tmp = _put_remote_tmp(ssh, local_file, remote_dir, remote_name)
 
         result = run_remote(
             ssh,
             f"cd {SITE_DIR} && wp media import {remote_tmp} "
             f"--post_id={product_id} --porcelain --allow-root 2>&1"
         )
-        run_remote(ssh, f"rm -f {remote_tmp}")
+        run_remote(ssh, f"rm -rf {remote_dir}")
 
         if not result.strip().isdigit():
             return "ERROR", result[:300], ""
@@ -279,119 +404,162 @@ CSV_PATH: Path = DEFAULT_CSV
 def index():
     return render_template_string(HTML_TEMPLATE)
 
+def _product_row(p: dict) -> dict:
+    s = _state.get(p.get("sku", ""), {})
+    return {
+        **p,
+        "status": s.get("status", "pending"),
+        "attachment_id": s.get("attachment_id", ""),
+        "applied_url": s.get("applied_url", ""),
+        "image_url": s.get("image_url", ""),
+        "source_url": s.get("source_url", ""),
+        "gallery_ids": s.get("gallery_ids", []),
+        "ts": s.get("ts", ""),
+    }
+
 @app.route("/api/products")
 def api_products():
+    """All products, or with ?since=<seq>&epoch=<e> only those changed since that poll."""
+    since = request.args.get("since", type=int)
+    with _state_lock:
+        if since is None:
+            return jsonify([_product_row(p) for p in PRODUCTS])
+        full = since < 0 or since > _seq or request.args.get("epoch") != _EPOCH
+        rows = [_product_row(p) for p in PRODUCTS
+                if full or _sku_seq.get(p.get("sku", ""), 0) > since]
+        seq = _seq
+    return jsonify({"seq": seq, "epoch": _EPOCH, "full": full, "products": rows})
+
+@app.route("/api/jobs/<job_id>")
+def api_job(job_id: str):
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+        job = dict(job) if job else None
+    if not job:
+        return jsonify({"ok": False, "error": "Unknown job"}), 404
+    return jsonify(job)
+
+def _stage_image(name: str, sku: str, prefix: str = "") -> dict:
+    """Save an uploaded/base64 image locally, or note the URL for the worker to download.
+
+    Request data is only readable inside the request, so this runs before
+    queueing.  Each call gets its own tag, used in the local and remote temp
+    names so two drops for one SKU never share a file.
+    Returns {local_path, ext, tag, source_url, download_url} or {error}.
+    """
+    tag = uuid.uuid4().hex[:12]
+    prefix = f"{prefix}{tag}_"
+    image_url = request.form.get("image_url", "").strip()
+    data_url  = request.form.get("data_url", "").strip()
+    if "file" in request.files:
+        f = request.files["file"]
+        fname = f.filename or "upload.jpg"
+        ext = Path(fname).suffix or ".jpg"
+        local_path = str(UPLOAD_CACHE / (prefix + safe_filename(name, sku, ext)))
+        f.save(local_path)
+        return {"local_path": local_path, "ext": ext, "tag": tag, "source_url": f"file:{fname}", "download_url": ""}
+    if data_url.startswith("data:"):
+        # Detect extension from mime type
+        mime = data_url.split(";")[0].split(":")[1]
+        ext = {"image/jpeg": ".jpg", "image/png": ".png",
+               "image/webp": ".webp", "image/gif": ".gif"}.get(mime, ".jpg")
+        local_path = str(UPLOAD_CACHE / (prefix + safe_filename(name, sku, ext)))
+        ok, err = save_base64_image(data_url, local_path)
+        if not ok:
+            return {"error": f"Base64 decode failed: {err}"}
+        return {"local_path": local_path, "ext": ext, "tag": tag, "source_url": "(base64)", "download_url": ""}
+    if image_url:
+        ext_guess = Path(re.sub(r"\?.*", "", image_url).split("/")[-1]).suffix
+        ext = ext_guess if ext_guess in (".jpg", ".jpeg", ".png", ".webp", ".gif") else ".jpg"
+        local_path = str(UPLOAD_CACHE / (prefix + safe_filename(name, sku, ext)))
+        return {"local_path": local_path, "ext": ext, "tag": tag, "source_url": image_url, "download_url": image_url}
+    return {"error": "No image source provided"}
+
+def _apply_image_job(product_id: str, sku: str, name: str, staged: dict) -> dict:
+    """Worker: download (if needed) → SFTP → assign featured image → record state."""
+    try:
+        if staged["download_url"]:
+            ok, err = download_url(staged["download_url"], staged["local_path"])
+            if not ok:
+                raise RuntimeError(f"Download failed: {err}")
+
+        remote_name = safe_filename(name, sku, staged["ext"])
+        status, detail, image_url = sftp_upload_and_assign(product_id, sku, staged["local_path"],
+                                                           remote_name, staged["tag"])
+    except Exception as e:
+        status, detail, image_url = "ERROR", str(e), ""
+    finally:
+        Path(staged["local_path"]).unlink(missing_ok=True)
+
+    with _state_lock:
+        prev = _state.get(sku, {})
+        if status == "OK":
+            set_state(sku, {"status": "done",
+                            "attachment_id": detail,
+                            "image_url": image_url,
+                            "applied_url": staged["source_url"],
+                            "source_url": prev.get("source_url", ""),
+                            "gallery_ids": prev.get("gallery_ids", []),
+                            "ts": time.strftime("%Y-%m-%dT%H:%M:%S")})
+        else:
+            set_state(sku, {"status": "error", "error": detail,
+                            "source_url": prev.get("source_url", ""),
+                            "gallery_ids": prev.get("gallery_ids", []),
+                            "ts": time.strftime("%Y-%m-%dT%H:%M:%S")})
+    if status == "OK":
+        return {"ok": True, "attachment_id": detail, "image_url": image_url}
+    return {"ok": False, "error": detail}
+
+def _apply_gallery_job(product_id: str, sku: str, name: str, staged: dict) -> dict:
+    """Worker: download (if needed) → SFTP → append to gallery → record state."""
+    try:
+        if staged["download_url"]:
+            ok, err = download_url(staged["download_url"], staged["local_path"])
+            if not ok:
+                return {"ok": False, "error": f"Download failed: {err}"}
+
+        remote_name = "gal_" + safe_filename(name, sku, staged["ext"])
+        status, att_id, img_url = sftp_add_to_gallery(product_id, sku, staged["local_path"],
+                                                      remote_name, staged["tag"])
+    finally:
+        Path(staged["local_path"]).unlink(missing_ok=True)
+    if status != "OK":
+        return {"ok": False, "error": att_id}
     with _state_lock:
-        result = []
-        for p in PRODUCTS:
-            sku = p.get("sku", "")
-            s = _state.get(sku, {})
-            result.append({
-                **p,
-                "status": s.get("status", "pending"),
-                "attachment_id": s.get("attachment_id", ""),
-                "applied_url": s.get("applied_url", ""),
-                "image_url": s.get("image_url", ""),
-                "source_url": s.get("source_url", ""),
-                "gallery_ids": s.get("gallery_ids", []),
-                "ts": s.get("ts", ""),
-            })
-    return jsonify(result)
+        gallery = list(_state.get(sku, {}).get("gallery_ids", []))
+        gallery.append({"att_id": att_id, "image_url": img_url})
+        update_state(sku, gallery_ids=gallery)
+    return {"ok": True, "att_id": att_id, "image_url": img_url}
 
 @app.route("/api/apply-image", methods=["POST"])
 def api_apply_image():
-    """Accept an image via URL or file upload, process and assign to product."""
+    """Accept an image via URL or file upload and queue it for assignment to the product."""
     product_id = request.form.get("product_id", "").strip()
     sku        = request.form.get("sku", "").strip()
     name       = request.form.get("product_name", "").strip()
-    image_url  = request.form.get("image_url", "").strip()
-    data_url   = request.form.get("data_url", "").strip()
 
     if not product_id:
         return jsonify({"ok": False, "error": "Missing product_id"}), 400
 
+    staged = _stage_image(name, sku)
+    if "error" in staged:
+        with _state_lock:
+            update_state(sku, status="error", error=staged["error"],
+                         ts=time.strftime("%Y-%m-%dT%H:%M:%S"))
+        return jsonify({"ok": False, "error": staged["error"]})
+
     # Mark as processing
     with _state_lock:
-        _state[sku] = {"status": "processing", "ts": time.strftime("%Y-%m-%dT%H:%M:%S")}
-        save_state()
-
-    def _process():
-        try:
-            # ── Figure out extension ───────────────────────────────────────────
-            if "file" in request.files:
-                f = request.files["file"]
-                fname = f.filename or "upload.jpg"
-                ext = Path(fname).suffix or ".jpg"
-                local_path = str(UPLOAD_CACHE / safe_filename(name, sku, ext))
-                f.save(local_path)
-                source_url = f"file:{fname}"
-            elif data_url.startswith("data:"):
-                # Detect extension from mime type
-                mime = data_url.split(";")[0].split(":")[1]
-                ext = {"image/jpeg": ".jpg", "image/png": ".png",
-                       "image/webp": ".webp", "image/gif": ".gif"}.get(mime, ".jpg")
-                local_path = str(UPLOAD_CACHE / safe_filename(name, sku, ext))
-                ok, err = save_base64_image(data_url, local_path)
-                source_url = "(base64)"
-                if not ok:
-                    return {"ok": False, "error": f"Base64 decode failed: {err}"}
-            elif image_url:
-                ext_guess = Path(re.sub(r"\?.*", "", image_url).split("/")[-1]).suffix
-                ext = ext_guess if ext_guess in (".jpg", ".jpeg", ".png", ".webp", ".gif") else ".jpg"
-                local_path = str(UPLOAD_CACHE / safe_filename(name, sku, ext))
-                ok, err = download_url(image_url, local_path)
-                source_url = image_url
-                if not ok:
-                    return {"ok": False, "error": f"Download failed: {err}"}
-            else:
-                return {"ok": False, "error": "No image source provided"}
-
-            # ── Upload and assign ──────────────────────────────────────────────
-            remote_name = safe_filename(name, sku, ext)
-            status, detail, image_url = sftp_upload_and_assign(product_id, sku, local_path, remote_name)
-
-            if status == "OK":
-                with _state_lock:
-                    existing = _state.get(sku, {})
-                    _state[sku] = {
-                        "status": "done",
-                        "attachment_id": detail,
-                        "image_url": image_url,
-                        "applied_url": source_url,
-                        "source_url": existing.get("source_url", ""),
-                        "gallery_ids": existing.get("gallery_ids", []),
-                        "ts": time.strftime("%Y-%m-%dT%H:%M:%S"),
-                    }
-                    save_state()
-                return {"ok": True, "attachment_id": detail, "image_url": image_url}
-            else:
-                with _state_lock:
-                    prev = _state.get(sku, {})
-                    _state[sku] = {"status": "error", "error": detail,
-                                   "source_url": prev.get("source_url", ""),
-                                   "gallery_ids": prev.get("gallery_ids", []),
-                                   "ts": time.strftime("%Y-%m-%dT%H:%M:%S")}
-                    save_state()
-                return {"ok": False, "error": detail}
+        update_state(sku, status="processing", ts=time.strftime("%Y-%m-%dT%H:%M:%S"))
 
-        except Exception as e:
-            log.exception("Error processing image")
-            with _state_lock:
-                _state[sku] = {"status": "error", "error": str(e),
-                               "ts": time.strftime("%Y-%m-%dT%H:%M:%S")}
-                save_state()
-            return {"ok": False, "error": str(e)}
-
-    # Run synchronously (we need the request files before returning)
-    result = _process()
-    return jsonify(result)
+    job_id = submit_job("image", sku, _apply_image_job, product_id, sku, name, staged)
+    return jsonify({"ok": True, "queued": True, "job_id": job_id}), 202
 
 @app.route("/api/reset/<sku>", methods=["POST"])
 def api_reset(sku: str):
     with _state_lock:
         if sku in _state:
-            del _state[sku]
-            save_state()
+            delete_state(sku)
     return jsonify({"ok": True})
 
 @app.route("/api/save-source-url", methods=["POST"])
@@ -403,63 +571,25 @@ def api_save_source_url():
     if not sku:
         return jsonify({"ok": False, "error": "Missing sku"}), 400
     with _state_lock:
-        if sku not in _state:
-            _state[sku] = {}
-        _state[sku]["source_url"] = url
-        save_state()
+        update_state(sku, source_url=url)
     return jsonify({"ok": True})
 
 
 @app.route("/api/apply-gallery-image", methods=["POST"])
 def api_apply_gallery_image():
-    """Add an additional image to the product's WooCommerce gallery (not featured)."""
+    """Queue an additional image for the product's WooCommerce gallery (not featured)."""
     product_id = request.form.get("product_id", "").strip()
     sku        = request.form.get("sku", "").strip()
     name       = request.form.get("product_name", "").strip()
-    image_url  = request.form.get("image_url", "").strip()
-    data_url   = request.form.get("data_url", "").strip()
 
     if not product_id:
         return jsonify({"ok": False, "error": "Missing product_id"}), 400
-    try:
-        if "file" in request.files:
-            f = request.files["file"]
-            ext = Path(f.filename or "upload.jpg").suffix or ".jpg"
-            local_path = str(UPLOAD_CACHE / ("gal_" + safe_filename(name, sku, ext)))
-            f.save(local_path)
-        elif data_url.startswith("data:"):
-            mime = data_url.split(";")[0].split(":")[1]
-            ext = {"image/jpeg": ".jpg", "image/png": ".png",
-                   "image/webp": ".webp", "image/gif": ".gif"}.get(mime, ".jpg")
-            local_path = str(UPLOAD_CACHE / ("gal_" + safe_filename(name, sku, ext)))
-            ok, err = save_base64_image(data_url, local_path)
-            if not ok:
-                return jsonify({"ok": False, "error": f"Base64 decode failed: {err}"}), 400
-        elif image_url:
-            ext_guess = Path(re.sub(r"\?.*", "", image_url).split("/")[-1]).suffix
-            ext = ext_guess if ext_guess in (".jpg", ".jpeg", ".png", ".webp", ".gif") else ".jpg"
-            local_path = str(UPLOAD_CACHE / ("gal_" + safe_filename(name, sku, ext)))
-            ok, err = download_url(image_url, local_path)
-            if not ok:
-                return jsonify({"ok": False, "error": f"Download failed: {err}"}), 400
-        else:
-            return jsonify({"ok": False, "error": "No image source provided"}), 400
+    staged = _stage_image(name, sku, prefix="gal_")
+    if "error" in staged:
+        return jsonify({"ok": False, "error": staged["error"]}), 400
 
-        remote_name = "gal_" + safe_filename(name, sku, ext)
-        status, att_id, img_url = sftp_add_to_gallery(product_id, sku, local_path, remote_name)
-        if status == "OK":
-            with _state_lock:
-                if sku not in _state:
-                    _state[sku] = {}
-                gallery = list(_state[sku].get("gallery_ids", []))
-                gallery.append({"att_id": att_id, "image_url": img_url})
-                _state[sku]["gallery_ids"] = gallery
-                save_state()
-            return jsonify({"ok": True, "att_id": att_id, "image_url": img_url})
-        return jsonify({"ok": False, "error": att_id}), 500
-    except Exception as e:
-        log.exception("Gallery image error")
-        return jsonify({"ok": False, "error": str(e)}), 500
+    job_id = submit_job("gallery", sku, _apply_gallery_job, product_id, sku, name, staged)
+    return jsonify({"ok": True, "queued": True, "job_id": job_id}), 202
 
 
 @app.route("/api/stats")
@@ -958,11 +1088,52 @@ let products = [];
 let filter = 'all';
 let highlighted = null;  // sku of card being dragged over window
 
+let _seq = -1, _epoch = '';
+const _jobs = {};  // job_id -> {sku, name, kind} while queued/running on the server
+
+// Fetch only products changed since the last poll and merge them in
 async function loadProducts() {
-  const res = await fetch('/api/products');
-  products = await res.json();
-  renderGrid();
-  updateStats();
+  await checkJobs();
+  const res = await fetch(`/api/products?since=${_seq}&epoch=${encodeURIComponent(_epoch)}`);
+  const data = await res.json();
+  _seq = data.seq; _epoch = data.epoch;
+  if (data.full) {
+    products = data.products;
+  } else {
+    const index = new Map(products.map((p, i) => [p.sku, i]));
+    data.products.forEach(row => {
+      const i = index.get(row.sku);
+      if (i === undefined) products.push(row); else products[i] = row;
+    });
+  }
+  if (data.full || data.products.length) { renderGrid(); updateStats(); }
+}
+
+async function checkJobs() {
+  const before = Object.keys(_jobs).length;
+  for (const id of Object.keys(_jobs)) {
+    const res = await fetch(`/api/jobs/${id}`);
+    if (!res.ok) { delete _jobs[id]; continue; }
+    const job = await res.json();
+    if (job.status === 'queued' || job.status === 'running') continue;
+    const {name, kind} = _jobs[id];
+    delete _jobs[id];
+    const r = job.result || {ok: false, error: 'Unknown error'};
+    if (kind === 'gallery') {
+      if (r.ok) toast(`📸 Gallery added`, `${name} · #${r.att_id}`, true);
+      else toast(`⚠ Gallery error`, (r.error || 'Unknown').slice(0, 120), false);
+    } else if (r.ok) {
+      toast(`✓ ${name}`, `Attachment #${r.attachment_id}`, true);
+    } else {
+      toast(`⚠ ${name}`, (r.error || 'Unknown error').slice(0, 120), false);
+    }
+  }
+  if (Object.keys(_jobs).length !== before) startPoll();
+}
+
+function trackJob(jobId, p, kind) {
+  _jobs[jobId] = {sku: p.sku, name: p.product_name || p.sku, kind};
+  startPoll();
 }
 
 function updateStats() {
@@ -1217,9 +1388,8 @@ async function submitImage(fd, p) {
     const res = await fetch('/api/apply-image', { method: 'POST', body: fd });
     const data = await res.json();
     if (data.ok) {
-      p.status = 'done'; p.attachment_id = data.attachment_id;
-      p.image_url = data.image_url || '';   // store WP guid for display
-      toast(`✓ ${p.product_name || p.sku}`, `Attachment #${data.attachment_id}`, true);
+      p.status = 'processing';   // result arrives via the job/delta poll
+      trackJob(data.job_id, p, 'image');
     } else {
       p.status = 'error'; p.error = data.error || 'Unknown error';
       toast(`⚠ ${p.product_name || p.sku}`, p.error.slice(0, 120), false);
@@ -1300,9 +1470,7 @@ async function submitGalleryImage(fd, p) {
     const res = await fetch('/api/apply-gallery-image', {method: 'POST', body: fd});
     const data = await res.json();
     if (data.ok) {
-      if (!p.gallery_ids) p.gallery_ids = [];
-      p.gallery_ids.push({att_id: data.att_id, image_url: data.image_url || ''});
-      toast(`📸 Gallery added`, `${p.product_name || p.sku} · #${data.att_id}`, true);
+      trackJob(data.job_id, p, 'gallery');
     } else {
       toast(`⚠ Gallery error`, (data.error || 'Unknown').slice(0, 120), false);
     }
@@ -1409,9 +1577,12 @@ function escJs(s) {
   return (s||'').replace(/'/g,"\\'").replace(/\\/g,'\\\\');
 }
 
-// Poll every 15 s; pause when tab is hidden to avoid flooding 404s
+// Poll every 15 s (2 s while jobs are queued); pause when tab is hidden to avoid flooding 404s
 let _pollTimer;
-function startPoll() { clearInterval(_pollTimer); _pollTimer = setInterval(loadProducts, 15000); }
+function startPoll() {
+  clearInterval(_pollTimer);
+  _pollTimer = setInterval(loadProducts, Object.keys(_jobs).length ? 2000 : 15000);
+}
 document.addEventListener('visibilitychange', () => {
   if (document.hidden) { clearInterval(_pollTimer); } else { loadProducts(); startPoll(); }
 });
@@ -1480,13 +1651,15 @@ def wrong_image_proxy():
 
 # ── Main ───────────────────────────────────────────────────────────────────────
 def main():
-    global PRODUCTS, CSV_PATH, _state
+    global PRODUCTS, CSV_PATH, _state, _job_pool
 
     parser = argparse.ArgumentParser(description="H-Moon Image Sourcing Tool")
     parser.add_argument("--port", type=int, default=5001)
     parser.add_argument("--csv", default=str(DEFAULT_CSV))
     parser.add_argument("--host", default="127.0.0.1",
                         help="Host to bind (use 0.0.0.0 for LAN access)")
+    parser.add_argument("--workers", type=int, default=JOB_WORKERS,
+                        help=f"Background image jobs processed at once (default: {JOB_WORKERS})")
     args = parser.parse_args()
 
     CSV_PATH = Path(args.csv)
@@ -1497,6 +1670,10 @@ def main():
 
     PRODUCTS = load_products(CSV_PATH)
     _state = load_state()
+    with _state_lock:
+        compact_state()   # fold any journal left by the previous session
+    if args.workers != JOB_WORKERS:
+        _job_pool = ThreadPoolExecutor(max_workers=max(1, args.workers), thread_name_prefix="image-job")
 
     # Use utf-8 for stdout to handle emoji on Windows
     import io as _io
@@ -1514,7 +1691,13 @@ def main():
     print(f"     http://localhost:{args.port}")
     print(f"     (drag images, paste URLs, or use file picker)\n")
 
-    app.run(host=args.host, port=args.port, debug=False, threaded=True)
+    try:
+        app.run(host=args.host, port=args.port, debug=False, threaded=True)
+    finally:
+        _job_pool.shutdown(wait=True)
+        _prefetcher.close()
+        with _state_lock:
+            compact_state()
 
 
 if __name__ == "__main__":
@@ -10,6 +10,18 @@ Features
 * Optionally overwrites existing products that share the same handle.
 * Sets variant inventory quantities at the configured Shopify location.
 * Supports dry-run mode for verification before making live changes.
+* ``--bulk`` mode: writes one ``productSet`` input per product to JSONL, runs
+  it as a single Shopify bulk mutation via staged upload, polls until it
+  finishes and reconciles the result file into a CSV report.
+
+Existing products are looked up from a handle -> id map fetched once
+(250 products per GraphQL page) instead of one query per handle.  If that
+map cannot be fetched the import aborts (every handle would otherwise be
+created again as a duplicate) unless ``--assume-empty-store`` is given.
+
+Deletes, creates and inventory writes are journalled per handle (see
+``sync_journal.py``); ``--resume`` continues an interrupted import without
+recreating products it already made.
 
 Required environment variables
 ------------------------------
@@ -22,6 +34,9 @@ Optional
 --------
 * ``SHOPIFY_API_VERSION`` – Defaults to ``2023-10`` to match the rest of the
   tooling in this repo.
+
+Calls are paced by Shopify's rate-limit feedback (``shopify_transport.py``);
+``--throttle`` only adds a minimum spacing on top.
 """
 
 from __future__ import annotations
@@ -40,9 +55,17 @@ from typing import Dict, Iterable, List, Optional
 
 import requests
 
+from shopify_transport import ShopifyTransport
+from sync_journal import SyncJournal
+
 SHOPIFY_API_VERSION = os.environ.get("SHOPIFY_API_VERSION", "2023-10")
+# productSet and InventoryItemInput.sku/measurement need 2024-07+
+BULK_API_VERSION = os.environ.get("SHOPIFY_BULK_API_VERSION", "2024-07")
 DEFAULT_CSV_PATH = Path("outputs/variant_consolidation/variant_consolidation.csv")
-DEFAULT_THROTTLE = 0.5
+DEFAULT_BULK_DIR = Path("outputs/variant_consolidation")
+DEFAULT_THROTTLE = 0.0
+BULK_POLL_INTERVAL = 10.0
+WEIGHT_UNITS = {"g": "GRAMS", "kg": "KILOGRAMS", "oz": "OUNCES", "lb": "POUNDS"}
 
 
 @dataclass
@@ -102,34 +125,42 @@ def load_csv(path: Path) -> OrderedDict[str, List[VariantRow]]:
     return products
 
 
-def product_exists(session: requests.Session, graphql_url: str, handle: str) -> Optional[str]:
+def fetch_handle_map(shop: ShopifyTransport, page_size: int = 250) -> Dict[str, str]:
+    """Return {handle: numeric product id} for every product in the store."""
     query = """
-    query($handle: String!) {
-      productByHandle(handle: $handle) {
-        id
+    query($first: Int!, $after: String) {
+      products(first: $first, after: $after) {
+        pageInfo { hasNextPage endCursor }
+        edges { node { id handle } }
       }
     }
     """
-    payload = {"query": query, "variables": {"handle": handle}}
-    response = session.post(graphql_url, json=payload, timeout=30)
-    response.raise_for_status()
-    data = response.json()
-    product = data.get("data", {}).get("productByHandle")
-    if not product:
-        return None
-    gid = product.get("id")
-    if not gid:
-        return None
-    # gid format: gid://shopify/Product/1234567890
-    return gid.split("/")[-1]
+    handles: Dict[str, str] = {}
+    cursor: Optional[str] = None
+    while True:
+        data = shop.graphql_data(query, {"first": page_size, "after": cursor})
+        connection = data.get("products", {})
+        for edge in connection.get("edges", []):
+            node = edge["node"]
+            # gid format: gid://shopify/Product/1234567890
+            handles[node["handle"]] = node["id"].split("/")[-1]
+        page_info = connection.get("pageInfo", {})
+        if not page_info.get("hasNextPage"):
+            return handles
+        cursor = page_info.get("endCursor")
+
+
+def get_product(shop: ShopifyTransport, product_id: str) -> Dict[str, object]:
+    response = shop.rest("get", f"products/{product_id}.json")
+    if response.status_code != 200:
+        raise RuntimeError(f"Failed to fetch product {product_id}: {response.status_code} {response.text}")
+    return response.json().get("product", {})
 
 
-def delete_product(session: requests.Session, rest_base: str, product_id: str, throttle: float) -> None:
-    url = f"{rest_base}/products/{product_id}.json"
-    response = session.delete(url, timeout=30)
+def delete_product(shop: ShopifyTransport, product_id: str) -> None:
+    response = shop.rest("delete", f"products/{product_id}.json")
     if response.status_code not in (200, 202, 204):
         raise RuntimeError(f"Failed to delete product {product_id}: {response.status_code} {response.text}")
-    time.sleep(throttle)
 
 
 def build_product_payload(handle: str, variants: Iterable[VariantRow]) -> Dict[str, object]:
@@ -250,28 +281,22 @@ def build_product_payload(handle: str, variants: Iterable[VariantRow]) -> Dict[s
 
 
 def create_product(
-    session: requests.Session,
-    rest_base: str,
+    shop: ShopifyTransport,
     product_payload: Dict[str, object],
-    throttle: float,
 ) -> Dict[str, object]:
-    url = f"{rest_base}/products.json"
-    response = session.post(url, json={"product": product_payload}, timeout=60)
+    response = shop.rest("post", "products.json", json={"product": product_payload}, timeout=60)
     if response.status_code not in (200, 201):
         raise RuntimeError(
             f"Failed to create product {product_payload.get('handle')}: {response.status_code} {response.text}"
         )
-    time.sleep(throttle)
     return response.json().get("product", {})
 
 
 def set_inventory_levels(
-    session: requests.Session,
-    rest_base: str,
+    shop: ShopifyTransport,
     location_id: str,
     variant_rows: List[VariantRow],
     created_product: Dict[str, object],
-    throttle: float,
     dry_run: bool,
 ) -> None:
     variants = created_product.get("variants", [])
@@ -295,26 +320,257 @@ def set_inventory_levels(
             "location_id": int(location_id),
             "available": int(qty),
         }
-        url = f"{rest_base}/inventory_levels/set.json"
-        response = session.post(url, json=payload, timeout=30)
+        response = shop.rest("post", "inventory_levels/set.json", json=payload)
         if response.status_code not in (200, 201):
             raise RuntimeError(
                 f"Failed to set inventory for SKU {sku}: {response.status_code} {response.text}"
             )
-        time.sleep(throttle)
+
+
+def build_product_set_input(
+    product_payload: Dict[str, object],
+    location_gid: str,
+    existing_id: Optional[str] = None,
+) -> Dict[str, object]:
+    """Translate a REST product payload into a GraphQL ``ProductSetInput``.
+
+    ``published_at`` and ``fulfillment_service`` have no productSet
+    equivalent and are dropped.
+    """
+    option_name = product_payload["options"][0]["name"]  # type: ignore[index]
+    variants = []
+    for variant in product_payload["variants"]:  # type: ignore[union-attr]
+        inventory_item: Dict[str, object] = {
+            "sku": variant.get("sku") or None,
+            "tracked": bool(variant.get("inventory_management")),
+            "requiresShipping": variant.get("requires_shipping", True),
+        }
+        if variant.get("weight"):
+            inventory_item["measurement"] = {
+                "weight": {"value": variant["weight"], "unit": WEIGHT_UNITS[variant["weight_unit"]]}
+            }
+        entry: Dict[str, object] = {
+            "optionValues": [{"optionName": option_name, "name": variant["option1"]}],
+            "price": variant["price"],
+            "compareAtPrice": variant.get("compare_at_price"),
+            "barcode": variant.get("barcode"),
+            "inventoryPolicy": str(variant.get("inventory_policy", "continue")).upper(),
+            "taxable": variant.get("taxable", True),
+            "inventoryItem": inventory_item,
+        }
+        if variant.get("inventory_quantity") is not None:
+            entry["inventoryQuantities"] = [
+                {"locationId": location_gid, "name": "available", "quantity": variant["inventory_quantity"]}
+            ]
+        variants.append(entry)
+
+    product_input: Dict[str, object] = {
+        "title": product_payload["title"],
+        "handle": product_payload["handle"],
+        "descriptionHtml": product_payload.get("body_html") or "",
+        "vendor": product_payload.get("vendor") or "",
+        "productType": product_payload.get("product_type") or "",
+        "status": str(product_payload.get("status") or "draft").upper(),
+        "tags": [tag.strip() for tag in str(product_payload.get("tags") or "").split(",") if tag.strip()],
+        "productOptions": [
+            {"name": option_name, "values": [{"name": v["option1"]} for v in product_payload["variants"]]}  # type: ignore[union-attr]
+        ],
+        "variants": variants,
+    }
+    images = product_payload.get("images") or []
+    if images:
+        product_input["files"] = [
+            {"originalSource": image["src"], "contentType": "IMAGE"} for image in images  # type: ignore[union-attr]
+        ]
+    if existing_id:
+        # productSet with an id replaces that product's options/variants in place
+        product_input["id"] = f"gid://shopify/Product/{existing_id}"
+    return product_input
+
+
+BULK_PRODUCT_SET_MUTATION = """
+mutation call($input: ProductSetInput!) {
+  productSet(input: $input) {
+    product { id handle }
+    userErrors { field message }
+  }
+}
+"""
+
+
+def run_bulk_mutation(shop: ShopifyTransport, jsonl_path: Path, poll_interval: float = BULK_POLL_INTERVAL) -> Dict:
+    """Staged-upload ``jsonl_path`` and run it as a productSet bulk mutation.
+
+    Blocks until the operation leaves CREATED/RUNNING and returns the final
+    ``currentBulkOperation`` node (status, errorCode, objectCount, url, ...).
+    """
+    staged = shop.graphql_data(
+        """
+        mutation($input: [StagedUploadInput!]!) {
+          stagedUploadsCreate(input: $input) {
+            stagedTargets { url resourceUrl parameters { name value } }
+            userErrors { field message }
+          }
+        }
+        """,
+        {"input": [{
+            "resource": "BULK_MUTATION_VARIABLES",
+            "filename": jsonl_path.name,
+            "mimeType": "text/jsonl",
+            "httpMethod": "POST",
+        }]},
+    )["stagedUploadsCreate"]
+    if staged["userErrors"]:
+        raise RuntimeError(f"stagedUploadsCreate failed: {staged['userErrors']}")
+    target = staged["stagedTargets"][0]
+    params = {p["name"]: p["value"] for p in target["parameters"]}
+    with jsonl_path.open("rb") as handle:
+        upload = requests.post(target["url"], data=params, files={"file": (jsonl_path.name, handle)}, timeout=300)
+    if upload.status_code not in (200, 201, 204):
+        raise RuntimeError(f"Staged upload failed: {upload.status_code} {upload.text[:300]}")
+
+    run = shop.graphql_data(
+        """
+        mutation($mutation: String!, $path: String!) {
+          bulkOperationRunMutation(mutation: $mutation, stagedUploadPath: $path) {
+            bulkOperation { id status }
+            userErrors { field message }
+          }
+        }
+        """,
+        {"mutation": BULK_PRODUCT_SET_MUTATION, "path": params["key"]},
+    )["bulkOperationRunMutation"]
+    if run["userErrors"]:
+        raise RuntimeError(f"bulkOperationRunMutation failed: {run['userErrors']}")
+    print(f"  🚚 Bulk operation {run['bulkOperation']['id']} started")
+
+    poll_query = """
+    query {
+      currentBulkOperation(type: MUTATION) {
+        id status errorCode objectCount url partialDataUrl
+      }
+    }
+    """
+    while True:
+        time.sleep(poll_interval)
+        operation = shop.graphql_data(poll_query)["currentBulkOperation"] or {}
+        print(f"  ⏳ {operation.get('status')} – {operation.get('objectCount', 0)} objects")
+        if operation.get("status") not in ("CREATED", "RUNNING"):
+            return operation
+
+
+def reconcile_bulk_results(result_url: Optional[str], handles: List[str], report_path: Path) -> Dict[str, int]:
+    """Match result lines (``__lineNumber`` = input line) back to handles; write a CSV report."""
+    outcomes: Dict[str, Dict[str, str]] = {
+        handle: {"Handle": handle, "Status": "missing_from_results", "Product ID": "", "Errors": ""}
+        for handle in handles
+    }
+    if result_url:
+        response = requests.get(result_url, timeout=300)
+        response.raise_for_status()
+        for line in response.text.splitlines():
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            line_no = entry.get("__lineNumber")
+            if line_no is None or line_no >= len(handles):
+                continue
+            result = (entry.get("data") or {}).get("productSet") or {}
+            errors = result.get("userErrors") or entry.get("errors") or []
+            product = result.get("product") or {}
+            outcomes[handles[line_no]].update(
+                Status="error" if errors or not product else "ok",
+                **{"Product ID": str(product.get("id", "")).split("/")[-1], "Errors": json.dumps(errors) if errors else ""},
+            )
+
+    report_path.parent.mkdir(parents=True, exist_ok=True)
+    with report_path.open("w", encoding="utf-8", newline="") as handle:
+        writer = csv.DictWriter(handle, fieldnames=["Handle", "Status", "Product ID", "Errors"])
+        writer.writeheader()
+        writer.writerows(outcomes.values())
+
+    counts: Dict[str, int] = {}
+    for outcome in outcomes.values():
+        counts[outcome["Status"]] = counts.get(outcome["Status"], 0) + 1
+    return counts
 
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Import consolidated Shopify products via API")
     parser.add_argument("--csv", type=Path, default=DEFAULT_CSV_PATH, help="CSV file path with consolidated variants")
-    parser.add_argument("--throttle", type=float, default=DEFAULT_THROTTLE, help="Delay between API calls in seconds")
+    parser.add_argument("--throttle", type=float, default=DEFAULT_THROTTLE, help="Minimum delay between API calls in seconds (default: pace by rate-limit headers)")
     parser.add_argument("--offset", type=int, default=0, help="Skip this many products from the start of the CSV")
     parser.add_argument("--limit", type=int, help="Limit number of products imported (for testing)")
     parser.add_argument("--overwrite", action="store_true", help="Delete existing products that share the same handle")
     parser.add_argument("--dry-run", action="store_true", help="Print intended actions without calling the API")
+    parser.add_argument(
+        "--bulk",
+        action="store_true",
+        help="Import everything as one productSet bulk mutation (with --overwrite, existing products are updated in place)",
+    )
+    parser.add_argument("--bulk-dir", type=Path, default=DEFAULT_BULK_DIR, help="Where bulk JSONL/report files are written")
+    parser.add_argument("--resume", action="store_true", help="Continue the last interrupted import, skipping completed handles")
+    parser.add_argument("--run-id", help="Journal run id to create or resume (default: timestamp / latest unfinished)")
+    parser.add_argument(
+        "--assume-empty-store",
+        action="store_true",
+        help="Carry on if existing products cannot be indexed, treating every handle as new",
+    )
     return parser.parse_args()
 
 
+def run_bulk_import(
+    args: argparse.Namespace,
+    shop: ShopifyTransport,
+    products: "OrderedDict[str, List[VariantRow]]",
+    handles: List[str],
+    existing_ids: Dict[str, str],
+    location_id: str,
+    total_products: int,
+) -> int:
+    """``--bulk``: one JSONL line per product, one bulk mutation, one report."""
+    location_gid = location_id if location_id.startswith("gid://") else f"gid://shopify/Location/{location_id}"
+    stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    jsonl_path = args.bulk_dir / f"bulk_product_set_{stamp}.jsonl"
+    jsonl_path.parent.mkdir(parents=True, exist_ok=True)
+
+    line_handles: List[str] = []
+    skipped = 0
+    with jsonl_path.open("w", encoding="utf-8") as out:
+        for handle in handles:
+            existing_id = existing_ids.get(handle)
+            if existing_id and not args.overwrite:
+                skipped += 1
+                continue
+            try:
+                product_input = build_product_set_input(
+                    build_product_payload(handle, products[handle]), location_gid, existing_id
+                )
+            except Exception as exc:  # pylint: disable=broad-except
+                print(f"  ⚠️  Skipping '{handle}' due to payload error: {exc}")
+                skipped += 1
+                continue
+            out.write(json.dumps({"input": product_input}) + "\n")
+            line_handles.append(handle)
+
+    print(f"📦 Wrote {len(line_handles)} productSet inputs to {jsonl_path} ({skipped} skipped)")
+    if args.dry_run or not line_handles:
+        print("   • Mode: dry-run (bulk file written, nothing uploaded)" if args.dry_run else "   • Nothing to import")
+        return 0
+
+    operation = run_bulk_mutation(shop, jsonl_path)
+    report_path = args.bulk_dir / f"bulk_product_set_{stamp}_results.csv"
+    counts = reconcile_bulk_results(operation.get("url") or operation.get("partialDataUrl"), line_handles, report_path)
+
+    print("\n🎯 Bulk import summary")
+    print(f"   • Products in CSV range: {len(handles)} of {total_products}")
+    print(f"   • Bulk status: {operation.get('status')} {operation.get('errorCode') or ''}".rstrip())
+    print(f"   • Imported OK: {counts.get('ok', 0)}  |  Errors: {counts.get('error', 0)}  |  "
+          f"Missing from results: {counts.get('missing_from_results', 0)}  |  Skipped: {skipped}")
+    print(f"   • Report: {report_path}")
+    return 0 if operation.get("status") == "COMPLETED" else 1
+
+
 def main() -> int:
     args = parse_args()
 
@@ -336,8 +592,6 @@ def main() -> int:
         return 1
 
     domain = normalise_domain(domain)
-    rest_base = f"https://{domain}/admin/api/{SHOPIFY_API_VERSION}"
-    graphql_url = f"https://{domain}/admin/api/{SHOPIFY_API_VERSION}/graphql.json"
 
     products = load_csv(args.csv)
     total_products = len(products)
@@ -352,17 +606,30 @@ def main() -> int:
     if args.limit is not None:
         handles = handles[: args.limit]
 
-    session = requests.Session()
-    session.headers.update(
-        {
-            "Content-Type": "application/json",
-            "Accept": "application/json",
-            "X-Shopify-Access-Token": access_token,
-        }
+    shop = ShopifyTransport(
+        domain, access_token, BULK_API_VERSION if args.bulk else SHOPIFY_API_VERSION, min_interval=args.throttle
     )
+    try:
+        existing_ids = fetch_handle_map(shop)
+        print(f"🔎 {len(existing_ids)} existing products indexed by handle")
+    except (requests.RequestException, RuntimeError) as exc:
+        if not args.assume_empty_store:
+            print(f"❌ Failed to index existing products: {exc}", file=sys.stderr)
+            print("   Importing without the index would duplicate every existing handle; "
+                  "re-run later or pass --assume-empty-store", file=sys.stderr)
+            return 1
+        print(f"  ⚠️  Failed to index existing products: {exc} (--assume-empty-store: treating all as new)")
+        existing_ids = {}
+
+    if args.bulk:
+        return run_bulk_import(args, shop, products, handles, existing_ids, location_id, total_products)
 
     created = 0
     skipped = 0
+    resumed = 0
+    failed = 0
+    journal = None if args.dry_run else SyncJournal("import_consolidated_products", run_id=args.run_id, resume=args.resume)
+    in_doubt = journal.in_doubt() if journal else set()
     for index, handle in enumerate(handles, start=1):
         variant_rows = products[handle]
         print(f"[{index}/{len(handles)}] Processing handle '{handle}' with {len(variant_rows)} variants")
@@ -373,11 +640,23 @@ def main() -> int:
             skipped += 1
             continue
 
-        existing_id = None
-        try:
-            existing_id = product_exists(session, graphql_url, handle)
-        except requests.HTTPError as exc:
-            print(f"  ⚠️  Failed to check existing product: {exc}")
+        existing_id = existing_ids.get(handle)
+
+        create_key = f"create:{handle}"
+        if journal and existing_id and (journal.is_done(create_key) or create_key in in_doubt):
+            # Created by the interrupted run; only its inventory write may be outstanding
+            try:
+                if not journal.is_done(f"inventory:{handle}"):
+                    journal.intent([f"inventory:{handle}"])
+                    set_inventory_levels(shop, location_id, variant_rows, get_product(shop, existing_id), False)
+                journal.done([create_key, f"inventory:{handle}"], product_id=existing_id)
+                print(f"  ↩️  Already created in run {journal.run_id} (id {existing_id})")
+                resumed += 1
+            except Exception as exc:  # pylint: disable=broad-except
+                journal.failed(f"inventory:{handle}", str(exc))
+                print(f"  ❌ Failed to finish resumed product: {exc}")
+                failed += 1
+            continue
 
         if existing_id and not args.overwrite:
             print(f"  ⏭️  Product already exists (id {existing_id}); skipping (use --overwrite to replace)")
@@ -386,7 +665,9 @@ def main() -> int:
 
         if existing_id and args.overwrite and not args.dry_run:
             print(f"  🗑️  Deleting existing product with id {existing_id}")
-            delete_product(session, rest_base, existing_id, args.throttle)
+            journal.intent([f"delete:{handle}"], product_id=existing_id)
+            delete_product(shop, existing_id)
+            journal.done([f"delete:{handle}"], product_id=existing_id)
 
         if args.dry_run:
             print("  📝 Dry run – product payload preview:")
@@ -396,21 +677,35 @@ def main() -> int:
             continue
 
         try:
-            created_product = create_product(session, rest_base, product_payload, args.throttle)
-            set_inventory_levels(session, rest_base, location_id, variant_rows, created_product, args.throttle, args.dry_run)
+            journal.intent([create_key])
+            created_product = create_product(shop, product_payload)
+            journal.done([create_key], product_id=created_product.get("id"))
+            journal.intent([f"inventory:{handle}"])
+            set_inventory_levels(shop, location_id, variant_rows, created_product, args.dry_run)
+            journal.done([f"inventory:{handle}"])
             created += 1
             print(f"  ✅ Created product id {created_product.get('id')}")
         except Exception as exc:  # pylint: disable=broad-except
             print(f"  ❌ Failed to create product: {exc}")
-            skipped += 1
+            journal.failed(create_key if not journal.is_done(create_key) else f"inventory:{handle}", str(exc))
+            failed += 1
 
     print("\n🎯 Import summary")
     processed_range = f"{args.offset + 1}-{args.offset + len(handles)}" if handles else "0"
     print(f"   • Products processed: {len(handles)} of {total_products} (rows {processed_range})")
     print(f"   • Products created:  {created}")
     print(f"   • Products skipped:   {skipped}")
+    if resumed:
+        print(f"   • Already done (resumed): {resumed}")
+    if failed:
+        print(f"   • Products failed:    {failed}")
     if args.dry_run:
         print("   • Mode: dry-run (no API writes performed)")
+    elif failed:
+        journal.close()
+        print(f"   • Journal: {journal.path} (re-run with --resume to retry the failures)")
+    else:
+        journal.finish()
 
     return 0
 
@@ -6,6 +6,11 @@ Usage:
     python scripts/import_to_woocommerce.py                                # Dry run (backup + upload only)
     python scripts/import_to_woocommerce.py --confirm                      # Actually import
     python scripts/import_to_woocommerce.py --csv outputs/woo_grouping_waves/grouping_wave_air_filtration_YYYYMMDD_HHMMSS.csv --label air_filtration_wave1
+    python scripts/import_to_woocommerce.py --full-backup                  # Old full-table SQL export instead of a restore point
+
+The backup is a per-wave restore point (rows for the CSV's SKUs/IDs only, see
+restore_points.py) taken in the background while the CSV uploads.  Undo with:
+    python scripts/restore_points.py restore <restore point path> --confirm --delete-new
 """
 import sys
 import json
@@ -15,6 +20,8 @@ from pathlib import Path
 from datetime import datetime
 import paramiko
 
+from restore_points import collect_csv_keys, start_restore_point
+
 WORKSPACE = Path(__file__).parent.parent
 
 
@@ -59,6 +66,11 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="Actually run import. Without this flag, script runs in dry-run mode.",
     )
+    parser.add_argument(
+        "--full-backup",
+        action="store_true",
+        help="Export whole wp_posts/wp_postmeta/wp_term_relationships tables instead of a per-wave restore point",
+    )
     return parser.parse_args()
 
 
@@ -134,17 +146,25 @@ def run_cmd(cmd, timeout=300):
 print("\n[1/5] Creating backup directory...")
 run_cmd(f'mkdir -p {BACKUP_DIR}')
 
-# Step 2: Backup current products (via SQL export)
-print("[2/5] Backing up current products...")
+# Step 2: Backup current products
 backup_suffix = f"_{label}" if label else ""
-backup_file = f'{BACKUP_DIR}/products_backup_{timestamp}{backup_suffix}.sql'
-out, err = run_cmd(f'cd {SITE_DIR} && wp db export {backup_file} --tables=wp_posts,wp_postmeta,wp_term_relationships --porcelain 2>&1 | head -5', timeout=120)
-if 'Error' in str(err) or 'error' in str(out):
-    # Try simpler export
-    print("  Using simple product export...")
-    backup_file = f'{BACKUP_DIR}/products_backup_{timestamp}{backup_suffix}.json'
-    out, err = run_cmd(f'''cd {SITE_DIR} && wp post list --post_type=product --fields=ID,post_title,post_name --format=json > {backup_file}''', timeout=120)
-print(f"  ✓ Backup created: {backup_file}")
+pending_backup = None
+if args.full_backup:
+    print("[2/5] Backing up current products (full table export)...")
+    backup_file = f'{BACKUP_DIR}/products_backup_{timestamp}{backup_suffix}.sql'
+    out, err = run_cmd(f'cd {SITE_DIR} && wp db export {backup_file} --tables=wp_posts,wp_postmeta,wp_term_relationships --porcelain 2>&1 | head -5', timeout=120)
+    if 'Error' in str(err) or 'error' in str(out):
+        # Try simpler export
+        print("  Using simple product export...")
+        backup_file = f'{BACKUP_DIR}/products_backup_{timestamp}{backup_suffix}.json'
+        out, err = run_cmd(f'''cd {SITE_DIR} && wp post list --post_type=product --fields=ID,post_title,post_name --format=json > {backup_file}''', timeout=120)
+    print(f"  ✓ Backup created: {backup_file}")
+else:
+    # Snapshot only the rows this CSV can touch; runs alongside steps 3-4
+    csv_ids, csv_skus = collect_csv_keys(LOCAL_CSV)
+    print(f"[2/5] Starting restore point ({len(csv_skus)} SKUs, {len(csv_ids)} IDs) in background...")
+    pending_backup = start_restore_point(ssh, SITE_DIR, f"products_backup{backup_suffix}",
+                                         ids=csv_ids, skus=csv_skus)
 
 # Step 3: Get current product count
 print("[3/5] Checking current product count...")
@@ -166,6 +186,16 @@ except Exception as e:
     ssh.close()
     sys.exit(1)
 
+if pending_backup is not None:
+    try:
+        point = pending_backup.result()
+    except Exception as e:
+        print(f"  ❌ Restore point failed: {e}")
+        ssh.close()
+        sys.exit(1)
+    print(f"  ✓ Restore point: {point['path']} ({point['products']} products, "
+          f"{point['rows']} rows, {point['bytes'] / 1024:.0f} KB)")
+
 # Step 5: Import (if confirmed)
 if confirm:
     print("[5/5] Running WooCommerce import...")
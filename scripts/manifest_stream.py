@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""
+manifest_stream.py — Paged NDJSON product export from WooCommerce over SSH.
+
+The old exporters built one giant PHP array with ``posts_per_page => -1`` and
+``json_encode``d it at the end, so both PHP and Python held the whole catalog
+in memory and nothing was visible until the very last byte arrived.
+
+Here the PHP side walks product IDs a page at a time, primes the meta/term
+caches for that page, and echoes one JSON object per line.  The Python side
+reads the SSH channel incrementally and yields each product as soon as its
+line is complete.  Lines that are not JSON objects (PHP notices, deprecation
+warnings) are skipped instead of derailing the parse.
+
+Delta refresh: ``refresh_manifest_file`` first pulls a cheap checksum list
+(ID, post_modified_gmt, md5 of the title/slug/content lengths, relevant
+postmeta and term relationships) computed in one SQL query.  Only products
+whose checksum differs from the last sync are re-exported; IDs missing from
+the list are dropped as deleted.  The watermark and checksums live in a
+``<manifest>.sync.json`` sidecar next to the manifest.
+
+Usage (from another script):
+    from manifest_stream import build_stream_php, stream_products, write_json_array
+
+    php = build_stream_php(ROW_PHP)
+    rows = stream_products(ssh, SITE_DIR, php)
+    count = write_json_array(MANIFEST_PATH, rows)
+
+    # or, incrementally:
+    stats = refresh_manifest_file(ssh, SITE_DIR, MANIFEST_PATH, php)
+"""
+
+import json
+import os
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+DEFAULT_PER_PAGE = 200
+REMOTE_SCRIPT = "wp-content/run_script.php"
+
+# Paged driver shared by every exporter.  {ROW_FUNCTION} must define
+# hmoon_manifest_row($pid) returning an array, or null to skip the product.
+PAGED_EXPORT_PHP = r"""<?php
+wp_set_current_user(1);
+
+{ROW_FUNCTION}
+
+$per_page = isset($args[0]) ? max(1, (int) $args[0]) : {PER_PAGE};
+$query = array_merge(array(
+    'post_type'      => 'product',
+    'post_status'    => 'publish',
+    'fields'         => 'ids',
+    'orderby'        => 'ID',
+    'order'          => 'ASC',
+    'no_found_rows'  => true,
+), array({QUERY_ARGS}));
+// Optional second arg: file of comma-separated IDs (delta refresh)
+if (!empty($args[1])) {
+    $only = array_filter(array_map('intval', explode(',', (string) @file_get_contents($args[1]))));
+    $query['post__in'] = $only ? array_values($only) : array(0);
+}
+
+$page = 1;
+$count = 0;
+do {
+    $ids = get_posts(array_merge($query, array('posts_per_page' => $per_page, 'paged' => $page)));
+    if ($ids) {
+        _prime_post_caches($ids, false, false);
+        update_meta_cache('post', $ids);
+        update_object_term_cache($ids, 'product');
+    }
+    foreach ($ids as $pid) {
+        $row = hmoon_manifest_row($pid);
+        if ($row === null) continue;
+        echo json_encode($row, JSON_UNESCAPED_UNICODE | JSON_UNESCAPED_SLASHES) . "\n";
+        $count++;
+    }
+    if (function_exists('wp_cache_flush_runtime')) wp_cache_flush_runtime();
+    flush();
+    $page++;
+} while (count($ids) === $per_page);
+
+fprintf(STDERR, "Streamed %d products\n", $count);
+"""
+
+
+# Checksum list for delta refresh.  Covers everything the row exporters read:
+# post fields (content only by length), manifest-relevant postmeta and term
+# assignments.  Direct-SQL writes that skip post_modified still change it.
+CHECKSUM_PHP = r"""<?php
+global $wpdb;
+$wpdb->query('SET SESSION group_concat_max_len = 1048576');
+$keys = "'_sku','_regular_price','_sale_price','_price','_weight','_thumbnail_id','_product_image_gallery','_stock','_stock_status'";
+$rows = $wpdb->get_results("
+    SELECT p.ID, p.post_modified_gmt,
+        MD5(CONCAT_WS('|', p.post_title, p.post_name, p.post_modified_gmt,
+            LENGTH(p.post_content), LENGTH(p.post_excerpt),
+            IFNULL((SELECT GROUP_CONCAT(pm.meta_key, '=', MD5(pm.meta_value) ORDER BY pm.meta_key, pm.meta_id)
+                    FROM {$wpdb->postmeta} pm WHERE pm.post_id = p.ID AND pm.meta_key IN ($keys)), ''),
+            IFNULL((SELECT GROUP_CONCAT(tr.term_taxonomy_id ORDER BY tr.term_taxonomy_id)
+                    FROM {$wpdb->term_relationships} tr WHERE tr.object_id = p.ID), '')))
+    FROM {$wpdb->posts} p
+    WHERE p.post_type = 'product' AND p.post_status = 'publish'
+    ORDER BY p.ID", ARRAY_N);
+foreach ($rows as $r) {
+    echo '{"id":' . (int) $r[0] . ',"m":"' . $r[1] . '","h":"' . $r[2] . "\"}\n";
+}
+fprintf(STDERR, "Checksummed %d products\n", count($rows));
+"""
+
+
+def build_stream_php(row_function: str, query_args: str = "", per_page: int = DEFAULT_PER_PAGE) -> str:
+    """Wrap a ``hmoon_manifest_row($pid)`` definition in the paged NDJSON driver.
+
+    ``query_args`` is extra PHP array body merged into the ``get_posts`` args,
+    e.g. ``"'tax_query' => [...],"``.
+    """
+    return (PAGED_EXPORT_PHP
+            .replace("{ROW_FUNCTION}", row_function.strip())
+            .replace("{QUERY_ARGS}", query_args)
+            .replace("{PER_PAGE}", str(int(per_page))))
+
+
+def iter_remote_lines(ssh, cmd: str, timeout: int = 900, stderr_sink=None):
+    """Run ``cmd`` over SSH and yield decoded stdout lines as they arrive.
+
+    stderr is drained alongside stdout so a chatty PHP script can never stall
+    the channel; each stderr line is passed to ``stderr_sink`` (default: echo
+    to our stderr).
+
+    ``timeout`` is how long the command may go without producing any output;
+    past that the channel is closed and ``TimeoutError`` raised, so a hung
+    ``wp eval-file`` cannot block the caller forever.
+    """
+    if stderr_sink is None:
+        def stderr_sink(line):
+            print(f"  {line}", file=sys.stderr)
+
+    chan = ssh.get_transport().open_session()
+    chan.settimeout(timeout)
+    chan.exec_command(cmd)
+
+    out_buf = b""
+    err_buf = b""
+    deadline = time.monotonic() + timeout
+    while True:
+        got = False
+        if chan.recv_ready():
+            chunk = chan.recv(65536)
+            got = True
+            out_buf += chunk
+            *lines, out_buf = out_buf.split(b"\n")
+            for raw in lines:
+                yield raw.decode("utf-8", errors="replace").rstrip("\r")
+        if chan.recv_stderr_ready():
+            chunk = chan.recv_stderr(65536)
+            got = True
+            err_buf += chunk
+            *lines, err_buf = err_buf.split(b"\n")
+            for raw in lines:
+                if raw.strip():
+                    stderr_sink(raw.decode("utf-8", errors="replace").rstrip("\r"))
+        if got:
+            deadline = time.monotonic() + timeout
+        else:
+            if chan.exit_status_ready() and not chan.recv_ready() and not chan.recv_stderr_ready():
+                break
+            if time.monotonic() > deadline:
+                chan.close()
+                raise TimeoutError(f"Remote command produced no output for {timeout}s: {cmd}")
+            time.sleep(0.02)
+
+    if out_buf.strip():
+        yield out_buf.decode("utf-8", errors="replace").rstrip("\r")
+    if err_buf.strip():
+        stderr_sink(err_buf.decode("utf-8", errors="replace").rstrip("\r"))
+    status = chan.recv_exit_status()
+    chan.close()
+    if status != 0:
+        raise RuntimeError(f"Remote command exited with status {status}: {cmd}")
+
+
+def iter_ndjson(lines, progress_every: int = 500, label: str = "products"):
+    """Parse NDJSON lines, skipping anything that is not a JSON object."""
+    count = 0
+    skipped = 0
+    for line in lines:
+        line = line.strip()
+        if not line.startswith("{"):
+            if line:
+                skipped += 1
+            continue
+        try:
+            obj = json.loads(line)
+        except json.JSONDecodeError:
+            skipped += 1
+            continue
+        count += 1
+        if progress_every and count % progress_every == 0:
+            print(f"  ... {count} {label} received", flush=True)
+        yield obj
+    if skipped:
+        print(f"  Skipped {skipped} non-JSON output lines")
+
+
+def stream_products(ssh, site_dir: str, php: str, remote_path: str = None,
+                    per_page: int = DEFAULT_PER_PAGE, timeout: int = 900,
+                    extra_flags: str = "", progress_every: int = 500, only_ids=None):
+    """Upload ``php`` and yield one product dict per NDJSON line it prints.
+
+    ``only_ids`` limits the export to those product IDs; they are uploaded as
+    a side file and passed to the script as its second argument.
+    """
+    remote_path = remote_path or f"{site_dir}/{REMOTE_SCRIPT}"
+    ids_arg = ""
+    sftp = ssh.open_sftp()
+    with sftp.file(remote_path, "w") as f:
+        f.write(php)
+    if only_ids is not None:
+        ids_arg = f"{remote_path}.ids"
+        with sftp.file(ids_arg, "w") as f:
+            f.write(",".join(str(int(i)) for i in only_ids))
+    sftp.close()
+
+    cmd = f"cd {site_dir} && wp eval-file {remote_path} {int(per_page)} {ids_arg} {extra_flags}".rstrip()
+    yield from iter_ndjson(iter_remote_lines(ssh, cmd, timeout=timeout),
+                           progress_every=progress_every)
+
+
+def write_json_array(path, rows, indent: int = 2) -> int:
+    """Write an iterable of dicts as a JSON array without materialising it.
+
+    Output goes to a temp file that replaces ``path`` only once the stream
+    completes, so an interrupted export never clobbers the last good file.
+    Returns the number of rows written.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".part")
+    pad = " " * indent
+    count = 0
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write("[")
+        for row in rows:
+            body = json.dumps(row, indent=indent, ensure_ascii=False)
+            f.write(",\n" if count else "\n")
+            f.write("\n".join(pad + ln for ln in body.split("\n")))
+            count += 1
+        f.write("\n]\n" if count else "]\n")
+    os.replace(tmp, path)
+    return count
+
+
+# ─── Delta refresh ───────────────────────────────────────────────────────────
+
+def sync_state_path(manifest_path) -> Path:
+    manifest_path = Path(manifest_path)
+    return manifest_path.with_name(manifest_path.stem + ".sync.json")
+
+
+def load_sync_state(manifest_path) -> dict:
+    path = sync_state_path(manifest_path)
+    if not path.exists() or not Path(manifest_path).exists():
+        return {}
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def fetch_checksums(ssh, site_dir: str, remote_path: str = None,
+                    extra_flags: str = "", timeout: int = 300) -> dict:
+    """Return ``{id: (post_modified_gmt, checksum)}`` for every published product."""
+    remote_path = remote_path or f"{site_dir}/{REMOTE_SCRIPT}"
+    sftp = ssh.open_sftp()
+    with sftp.file(remote_path, "w") as f:
+        f.write(CHECKSUM_PHP)
+    sftp.close()
+
+    cmd = f"cd {site_dir} && wp eval-file {remote_path} {extra_flags}".rstrip()
+    lines = iter_remote_lines(ssh, cmd, timeout=timeout)
+    return {str(r["id"]): (r["m"], r["h"])
+            for r in iter_ndjson(lines, progress_every=0, label="checksums")}
+
+
+def refresh_manifest_file(ssh, site_dir: str, manifest_path, php: str,
+                          remote_path: str = None, full: bool = False,
+                          extra_flags: str = "", tally=None) -> dict:
+    """Bring ``manifest_path`` up to date, re-exporting only changed products.
+
+    Falls back to a full export when ``full`` is set or there is no previous
+    sync state.  ``tally`` is an optional generator wrapper applied to the
+    final row stream (e.g. to count gaps) as it is written.
+    Returns ``{"mode", "total", "changed", "deleted", "watermark"}``.
+    """
+    manifest_path = Path(manifest_path)
+    tally = tally or (lambda rows: rows)
+    state = {} if full else load_sync_state(manifest_path)
+    old_hashes = state.get("hashes", {})
+
+    print("  Fetching product checksums...")
+    checksums = fetch_checksums(ssh, site_dir, remote_path, extra_flags)
+    watermark = max((m for m, _ in checksums.values()), default=state.get("watermark", ""))
+
+    if not state:
+        mode = "full"
+        changed = list(checksums)
+        deleted = []
+        rows = stream_products(ssh, site_dir, php, remote_path, extra_flags=extra_flags)
+        total = write_json_array(manifest_path, tally(rows))
+    else:
+        mode = "delta"
+        changed = [pid for pid, (_, h) in checksums.items() if old_hashes.get(pid) != h]
+        deleted = [pid for pid in old_hashes if pid not in checksums]
+        print(f"  Since {state.get('watermark') or 'last sync'}: "
+              f"{len(changed)} changed, {len(deleted)} deleted of {len(checksums)}")
+
+        fresh = {}
+        if changed:
+            rows = stream_products(ssh, site_dir, php, remote_path, extra_flags=extra_flags,
+                                   only_ids=sorted(int(pid) for pid in changed))
+            fresh = {str(r["id"]): r for r in rows}
+
+        existing = json.loads(manifest_path.read_text(encoding="utf-8"))
+        drop = set(deleted) | set(changed)
+        merged = {str(r["id"]): r for r in existing if str(r["id"]) not in drop}
+        merged.update(fresh)
+        ordered = (merged[pid] for pid in sorted(merged, key=int))
+        total = write_json_array(manifest_path, tally(ordered))
+
+    sync_state_path(manifest_path).write_text(json.dumps({
+        "watermark": watermark,
+        "synced_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "mode": mode,
+        "hashes": {pid: h for pid, (_, h) in checksums.items()},
+    }), encoding="utf-8")
+
+    return {"mode": mode, "total": total, "changed": len(changed),
+            "deleted": len(deleted), "watermark": watermark}
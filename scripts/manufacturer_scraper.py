@@ -13,20 +13,32 @@ Usage:
     python scripts/manufacturer_scraper.py                    # Probe all brands
     python scripts/manufacturer_scraper.py --brand "FoxFarm"  # Single brand
     python scripts/manufacturer_scraper.py --scrape            # Full scrape
+    python scripts/manufacturer_scraper.py --scrape --resume   # Continue an interrupted scrape
+
+Every product result is journaled as it arrives (outputs/sync_journal/
+manufacturer_scraper_<run_id>.jsonl), so an interrupted scrape loses nothing;
+``--resume`` skips the brands and products it already finished.
 """
 
 import json
 import os
 import re
 import sys
-import time
 import urllib.parse
 from difflib import SequenceMatcher
 from pathlib import Path
 
-import requests
 from bs4 import BeautifulSoup
 
+try:
+    from lxml import etree, html as lxml_html  # optional: parses pages far faster than BeautifulSoup
+except ImportError:
+    etree = lxml_html = None
+
+from catalog_crawler import crawl_catalogs, load_catalog
+from http_cache import CachedResponse, default_cache
+from sync_journal import SyncJournal
+
 # ============================================================
 # Configuration
 # ============================================================
@@ -35,6 +47,7 @@ WORKSPACE = Path(__file__).parent.parent
 MANIFEST_PATH = WORKSPACE / "outputs" / "enrichment_manifest.json"
 OUTPUT_DIR = WORKSPACE / "outputs" / "scraped"
 RESULTS_PATH = OUTPUT_DIR / "scrape_results.json"
+BRAND_CATALOG_DIR = OUTPUT_DIR / "brand_catalogs"  # <slug>_products.json written by the probe
 
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
@@ -105,27 +118,234 @@ def fuzzy_match(a: str, b: str) -> float:
     return SequenceMatcher(None, normalize_title(a), normalize_title(b)).ratio()
 
 
-def safe_get(url: str, **kwargs) -> requests.Response | None:
-    """Make a GET request with error handling."""
-    try:
-        resp = requests.get(url, headers=HEADERS, timeout=REQUEST_TIMEOUT, **kwargs)
-        if resp.status_code == 200:
-            return resp
-        return None
-    except Exception as e:
-        print(f"    [ERR] {url}: {e}")
-        return None
+class TitleIndex:
+    """A brand catalog pre-normalized once for repeated ``fuzzy_match`` lookups.
+
+    Each catalog title is normalized and gets a ``SequenceMatcher`` with it as
+    the cached second sequence.  A lookup scores products sharing a token
+    with the query first, then skips any product whose ``real_quick_ratio`` /
+    ``quick_ratio`` upper bound cannot beat the best so far, so the result is
+    the same product and score a full ``fuzzy_match`` scan would give.
+    """
+    
+    def __init__(self, products: list):
+        self.products = products
+        self.matchers = []
+        self.tokens = {}
+        for i, p in enumerate(products):
+            norm = normalize_title(p.get('title') or '')
+            matcher = SequenceMatcher(None)
+            matcher.set_seq2(norm)
+            self.matchers.append(matcher)
+            for token in set(norm.split()):
+                self.tokens.setdefault(token, []).append(i)
+    
+    def best(self, our_title: str, threshold: float = 0.55) -> tuple:
+        """Return (product, score) for the best match at or above ``threshold``, else (None, 0.0)."""
+        query = normalize_title(our_title)
+        shared = {}
+        for token in set(query.split()):
+            for i in self.tokens.get(token, ()):
+                shared[i] = shared.get(i, 0) + 1
+        order = sorted(shared, key=lambda i: (-shared[i], i))
+        order += [i for i in range(len(self.products)) if i not in shared]
+        
+        best_i, best_score = None, 0.0
+        for i in order:
+            matcher = self.matchers[i]
+            matcher.set_seq1(query)
+            floor = max(best_score, threshold)
+            if matcher.real_quick_ratio() < floor or matcher.quick_ratio() < floor:
+                continue
+            score = matcher.ratio()
+            # same winner as a scan in catalog order: higher score, ties go to the earlier product
+            if score > best_score or (score == best_score and best_i is not None and i < best_i):
+                best_i, best_score = i, score
+        if best_i is not None and best_score >= threshold:
+            return self.products[best_i], best_score
+        return None, 0.0
+    
+    def match_all(self, titles: list, threshold: float = 0.55) -> list:
+        """Batch ``best`` for every title of a brand."""
+        return [self.best(title, threshold) for title in titles]
+
+
+def brand_slug(brand: str) -> str:
+    """File-name key for a brand's cached catalog ("B'Cuzz" -> "b_cuzz")."""
+    return re.sub(r'[^a-z0-9]+', '_', brand.lower()).strip('_')
+
+
+def crawl_brand_catalogs(sites: dict, **options) -> dict:
+    """Crawl ``{brand: url}`` concurrently into BRAND_CATALOG_DIR; returns {brand: CrawlResult}."""
+    options.setdefault('headers', HEADERS)
+    options.setdefault('per_host_interval', RATE_LIMIT_DELAY)
+    options.setdefault('timeout', REQUEST_TIMEOUT)
+    keys = {brand: brand_slug(brand) for brand in sites}
+    results = crawl_catalogs({keys[b]: url for b, url in sites.items()}, BRAND_CATALOG_DIR, **options)
+    return {brand: results[keys[brand]] for brand in sites}
+
+
+def fetch(url: str) -> CachedResponse:
+    """GET through the shared HTTP cache (never raises; check ``fetch_failed``).
+
+    Network requests to one host are spaced RATE_LIMIT_DELAY apart by the
+    cache, so cache hits (and cached 404s / dead hosts) cost no wait.
+    """
+    resp = default_cache(per_host_interval=RATE_LIMIT_DELAY, timeout=REQUEST_TIMEOUT).get(url, headers=HEADERS)
+    if resp.error:
+        print(f"    [ERR] {url}: {resp.error}")
+    return resp
+
+
+def fetch_failed(resp: CachedResponse) -> bool:
+    """True when the request did not really complete (network error, throttled, 5xx) – worth retrying later."""
+    return resp.status_code == 0 or resp.status_code == 429 or resp.status_code >= 500
+
+
+def safe_get(url: str) -> CachedResponse | None:
+    """GET through the shared HTTP cache; the 200 response or None."""
+    resp = fetch(url)
+    return resp if resp.status_code == 200 else None
+
+
+# Description containers, tried in order; the first whose text is over 30 chars wins
+DESCRIPTION_SELECTORS = [
+    '.product-description', '.product__description', '#product-description',
+    '.woocommerce-product-details__short-description',
+    '.product-single__description', '.product-details',
+    '[itemprop="description"]', '.description',
+]
+PRODUCT_IMAGE_HINTS = ['product', 'upload', 'media', 'image', 'photo', 'cdn']
+_NO_TEXT_TAGS = {'script', 'style', 'template'}  # BeautifulSoup's get_text() skips these too
+
+
+def _selector_xpath(selector: str) -> str:
+    """XPath for the ``.class`` / ``#id`` / ``[attr="value"]`` forms in DESCRIPTION_SELECTORS."""
+    if selector.startswith('.'):
+        return f"//*[contains(concat(' ', normalize-space(@class), ' '), ' {selector[1:]} ')]"
+    if selector.startswith('#'):
+        return f"//*[@id='{selector[1:]}']"
+    attr, value = re.fullmatch(r'\[([\w-]+)="([^"]*)"\]', selector).groups()
+    return f"//*[@{attr}='{value}']"
+
+
+if lxml_html is not None:
+    _DESCRIPTION_XPATHS = [etree.XPath(_selector_xpath(sel)) for sel in DESCRIPTION_SELECTORS]
+
+
+def _lxml_root(markup: str):
+    # bytes + explicit encoding: lxml rejects str input carrying an <?xml encoding?> declaration
+    return lxml_html.document_fromstring(markup.encode('utf-8'), parser=lxml_html.HTMLParser(encoding='utf-8'))
+
+
+def _lxml_strings(el):
+    """Text nodes under ``el`` as BeautifulSoup sees them (no comments, scripts or styles)."""
+    if isinstance(el.tag, str) and el.tag not in _NO_TEXT_TAGS and el.text:
+        yield el.text
+    for child in el:
+        yield from _lxml_strings(child)
+        if child.tail:
+            yield child.tail
+
+
+def _lxml_text(el, separator: str = '', strip: bool = True) -> str:
+    """``el.get_text(separator, strip=strip)`` for an lxml element."""
+    if not strip:
+        return separator.join(_lxml_strings(el))
+    return separator.join(s for s in (s.strip() for s in _lxml_strings(el)) if s)
+
+
+def _page_parts_lxml(markup: str) -> dict:
+    """One lxml parse, then one pass per tag kind over the C-level tree."""
+    root = _lxml_root(markup)
+    parts = {'images': [], 'anchors': [], 'description': None, 'table_rows': [], 'dl_pairs': []}
+    metas = root.xpath("//meta[@name='description']")
+    parts['meta_description'] = metas[0].get('content') if metas else None
+    og = root.xpath("//meta[@property='og:image']")
+    parts['og_image'] = og[0].get('content') if og else None
+    parts['json_ld'] = [s.text for s in root.xpath("//script[@type='application/ld+json']")]
+    for img in root.iter('img'):
+        parts['images'].append((img.get('src', '') or img.get('data-src', ''), img.get('width', '0'),
+                                img.get('height', '0'), img.get('alt', '')))
+    for a in root.iter('a'):
+        if a.get('href') is not None:
+            parts['anchors'].append((a.get('href'), _lxml_text(a, strip=False), a.get('title', '')))
+    for xpath in _DESCRIPTION_XPATHS:
+        found = xpath(root)
+        if found and len(_lxml_text(found[0])) > 30:
+            html = lxml_html.tostring(found[0], encoding='unicode', with_tail=False)
+            parts['description'] = (html, _lxml_text(found[0], ' '))
+            break
+    for table in root.iter('table'):
+        for row in table.iter('tr'):
+            cells = list(row.iter('td', 'th'))
+            if len(cells) >= 2:
+                parts['table_rows'].append((_lxml_text(cells[0]), _lxml_text(cells[1])))
+    for dl in root.iter('dl'):
+        parts['dl_pairs'].extend((_lxml_text(dt), _lxml_text(dd)) for dt, dd in zip(dl.iter('dt'), dl.iter('dd')))
+    return parts
+
+
+def _page_parts_soup(markup: str) -> dict:
+    """BeautifulSoup fallback for when lxml is not installed (same parts, several times slower)."""
+    soup = BeautifulSoup(markup, 'html.parser')
+    parts = {'images': [], 'anchors': [], 'description': None, 'table_rows': [], 'dl_pairs': []}
+    meta = soup.find('meta', attrs={'name': 'description'})
+    parts['meta_description'] = meta.get('content') if meta else None
+    og = soup.find('meta', attrs={'property': 'og:image'})
+    parts['og_image'] = og.get('content') if og else None
+    parts['json_ld'] = [s.string for s in soup.find_all('script', type='application/ld+json')]
+    for img in soup.find_all('img'):
+        parts['images'].append((img.get('src', '') or img.get('data-src', ''), img.get('width', '0'),
+                                img.get('height', '0'), img.get('alt', '')))
+    for a in soup.find_all('a', href=True):
+        parts['anchors'].append((a['href'], a.get_text(), a.get('title', '')))
+    for sel in DESCRIPTION_SELECTORS:
+        desc_el = soup.select_one(sel)
+        if desc_el and len(desc_el.get_text(strip=True)) > 30:
+            parts['description'] = (str(desc_el), desc_el.get_text(' ', strip=True))
+            break
+    for table in soup.find_all('table'):
+        for row in table.find_all('tr'):
+            cells = row.find_all(['td', 'th'])
+            if len(cells) >= 2:
+                parts['table_rows'].append((cells[0].get_text(strip=True), cells[1].get_text(strip=True)))
+    for dl in soup.find_all('dl'):
+        parts['dl_pairs'].extend((dt.get_text(strip=True), dd.get_text(strip=True))
+                                 for dt, dd in zip(dl.find_all('dt'), dl.find_all('dd')))
+    return parts
+
+
+def page_parts(markup: str) -> dict:
+    """Everything the generic scraper reads from a page, as plain strings and tuples."""
+    if lxml_html is not None:
+        try:
+            return _page_parts_lxml(markup)
+        except (etree.LxmlError, ValueError):
+            pass  # e.g. an empty document; html.parser copes
+    return _page_parts_soup(markup)
+
+
+def page_links(markup: str) -> list:
+    """``(href, stripped text)`` for every ``<a href>`` on a page (search results)."""
+    if lxml_html is not None:
+        try:
+            return [(a.get('href'), _lxml_text(a)) for a in _lxml_root(markup).iter('a') if a.get('href') is not None]
+        except (etree.LxmlError, ValueError):
+            pass
+    soup = BeautifulSoup(markup, 'html.parser')
+    return [(a['href'], a.get_text(strip=True)) for a in soup.find_all('a', href=True)]
 
 
-def extract_pdf_links(soup: BeautifulSoup, base_url: str) -> dict:
-    """Find SDS, feeding chart, instruction PDF links on a page."""
+def extract_pdf_links(anchors: list, base_url: str) -> dict:
+    """Find SDS, feeding chart, instruction PDF links among ``(href, text, title)`` anchors."""
     pdfs = {}
-    for a in soup.find_all('a', href=True):
-        href = a['href'].lower()
-        text = (a.get_text() + ' ' + a.get('title', '')).lower()
+    for raw_href, anchor_text, title in anchors:
+        href = raw_href.lower()
+        text = (anchor_text + ' ' + title).lower()
         if not href.endswith('.pdf') and 'pdf' not in href:
             continue
-        full_url = urllib.parse.urljoin(base_url, a['href'])
+        full_url = urllib.parse.urljoin(base_url, raw_href)
         if any(kw in href or kw in text for kw in ['sds', 'safety', 'msds']):
             pdfs['sds'] = full_url
         elif any(kw in href or kw in text for kw in ['feed', 'schedule', 'chart', 'program']):
@@ -139,59 +359,61 @@ def extract_pdf_links(soup: BeautifulSoup, base_url: str) -> dict:
     return pdfs
 
 
-def extract_product_specs(soup: BeautifulSoup) -> dict:
+def _json_ld_product(data) -> dict | None:
+    """The first schema.org Product in a JSON-LD document (bare, list or ``@graph``)."""
+    if isinstance(data, dict):
+        data = data.get('@graph', [data])
+    for item in data if isinstance(data, list) else []:
+        if isinstance(item, dict):
+            kind = item.get('@type')
+            if kind == 'Product' or (isinstance(kind, list) and 'Product' in kind):
+                return item
+    return None
+
+
+def extract_product_specs(parts: dict) -> dict:
     """Extract structured specs from product page (weight, dimensions, NPK, etc.)."""
     specs = {}
     
     # Look for specification tables
-    for table in soup.find_all('table'):
-        for row in table.find_all('tr'):
-            cells = row.find_all(['td', 'th'])
-            if len(cells) >= 2:
-                key = cells[0].get_text(strip=True).lower()
-                val = cells[1].get_text(strip=True)
-                if any(kw in key for kw in ['weight', 'wt']):
-                    specs['weight'] = val
-                elif any(kw in key for kw in ['dimension', 'size', 'length', 'width', 'height']):
-                    specs['dimensions'] = val
-                elif 'npk' in key or 'analysis' in key:
-                    specs['npk'] = val
-                elif any(kw in key for kw in ['upc', 'barcode', 'ean']):
-                    specs['upc'] = val
-                elif any(kw in key for kw in ['sku', 'item', 'model']):
-                    specs['sku'] = val
+    for key, val in parts['table_rows']:
+        key = key.lower()
+        if any(kw in key for kw in ['weight', 'wt']):
+            specs['weight'] = val
+        elif any(kw in key for kw in ['dimension', 'size', 'length', 'width', 'height']):
+            specs['dimensions'] = val
+        elif 'npk' in key or 'analysis' in key:
+            specs['npk'] = val
+        elif any(kw in key for kw in ['upc', 'barcode', 'ean']):
+            specs['upc'] = val
+        elif any(kw in key for kw in ['sku', 'item', 'model']):
+            specs['sku'] = val
     
     # Look for spec lists (dt/dd or label/value patterns)
-    for dl in soup.find_all('dl'):
-        dts = dl.find_all('dt')
-        dds = dl.find_all('dd')
-        for dt, dd in zip(dts, dds):
-            key = dt.get_text(strip=True).lower()
-            val = dd.get_text(strip=True)
-            if 'weight' in key:
-                specs['weight'] = val
-            elif 'npk' in key:
-                specs['npk'] = val
+    for key, val in parts['dl_pairs']:
+        key = key.lower()
+        if 'weight' in key:
+            specs['weight'] = val
+        elif 'npk' in key:
+            specs['npk'] = val
     
     # Look for structured data (JSON-LD)
-    for script in soup.find_all('script', type='application/ld+json'):
+    for text in parts['json_ld']:
         try:
-            data = json.loads(script.string)
-            if isinstance(data, list):
-                data = data[0]
-            if data.get('@type') == 'Product':
-                if 'weight' in data:
-                    specs['weight'] = str(data['weight'])
-                if 'description' in data:
-                    specs['meta_description'] = data['description']
-                if 'image' in data:
-                    imgs = data['image']
-                    if isinstance(imgs, str):
-                        specs['json_ld_image'] = imgs
-                    elif isinstance(imgs, list):
-                        specs['json_ld_images'] = imgs
+            data = _json_ld_product(json.loads(text))
         except (json.JSONDecodeError, TypeError):
-            pass
+            continue
+        if data:
+            if 'weight' in data:
+                specs['weight'] = str(data['weight'])
+            if 'description' in data:
+                specs['meta_description'] = data['description']
+            if 'image' in data:
+                imgs = data['image']
+                if isinstance(imgs, str):
+                    specs['json_ld_image'] = imgs
+                elif isinstance(imgs, list):
+                    specs['json_ld_images'] = imgs
     
     return specs
 
@@ -207,6 +429,8 @@ class ShopifyScraper:
         self.base_url = base_url.rstrip('/')
         self.brand = brand
         self.products_cache = None
+        self.catalog_error = None  # set when the catalog could not be fetched
+        self._title_index = None
     
     def is_shopify(self) -> bool:
         """Check if the site is a Shopify store."""
@@ -220,45 +444,26 @@ class ShopifyScraper:
         return False
     
     def fetch_all_products(self) -> list:
-        """Fetch all products from Shopify JSON API."""
+        """Fetch all products from Shopify JSON API (reuses the probe's catalog if < 24h old)."""
         if self.products_cache is not None:
             return self.products_cache
         
-        all_products = []
-        page = 1
-        while True:
-            resp = safe_get(f"{self.base_url}/products.json?limit=250&page={page}")
-            if not resp:
-                break
-            try:
-                data = resp.json()
-                products = data.get('products', [])
-                if not products:
-                    break
-                all_products.extend(products)
-                page += 1
-                time.sleep(RATE_LIMIT_DELAY)
-            except (json.JSONDecodeError, ValueError):
-                break
-        
-        self.products_cache = all_products
-        return all_products
+        result = crawl_brand_catalogs({self.brand: self.base_url}, probe_root=False)[self.brand]
+        if result.status not in ('ok', 'cached'):
+            self.catalog_error = f"catalog {result.status}: {result.error or ''}".strip()
+        self.products_cache = load_catalog(result)
+        return self.products_cache
+    
+    def title_index(self) -> TitleIndex:
+        """Token index over the store's titles, built once per scraper."""
+        if self._title_index is None:
+            self._title_index = TitleIndex(self.fetch_all_products())
+        return self._title_index
     
     def match_product(self, our_title: str) -> dict | None:
         """Find the best matching product by fuzzy title match."""
-        products = self.fetch_all_products()
-        best_match = None
-        best_score = 0.0
-        
-        for p in products:
-            score = fuzzy_match(our_title, p['title'])
-            if score > best_score:
-                best_score = score
-                best_match = p
-        
-        if best_score >= 0.55:  # Threshold for acceptable match
-            return best_match
-        return None
+        match, _score = self.title_index().best(our_title, 0.55)  # Threshold for acceptable match
+        return match
     
     def extract_enrichment(self, shopify_product: dict) -> dict:
         """Extract enrichment data from a Shopify product."""
@@ -331,45 +536,58 @@ class ShopifyScraper:
 # ============================================================
 
 class GenericScraper:
-    """Scrape product data from generic websites using BeautifulSoup."""
+    """Scrape product data from generic websites (lxml when installed, else BeautifulSoup)."""
     
     def __init__(self, base_url: str, brand: str):
         self.base_url = base_url.rstrip('/')
         self.brand = brand
+        self.last_error = None  # why the last search / page fetch could not complete
     
     def search_product(self, title: str) -> str | None:
-        """Try to find a product page URL by searching the site."""
+        """Try to find a product page URL by searching the site.
+
+        None with ``last_error`` set means a search page failed to load, so
+        "no match" is not certain.
+        """
+        self.last_error = None
+        failed = None
         search_patterns = [
             f"{self.base_url}/?s={urllib.parse.quote_plus(title)}",
             f"{self.base_url}/search?q={urllib.parse.quote_plus(title)}",
             f"{self.base_url}/search?type=product&q={urllib.parse.quote_plus(title)}",
         ]
+        # our title is normalized once; each link only pays for its own text
+        matcher = SequenceMatcher(None)
+        matcher.set_seq2(normalize_title(title))
         
         for search_url in search_patterns:
-            resp = safe_get(search_url)
-            if not resp:
+            resp = fetch(search_url)
+            if fetch_failed(resp):
+                failed = resp.error or f"HTTP {resp.status_code}"
+                continue
+            if resp.status_code != 200:
                 continue
             
-            soup = BeautifulSoup(resp.text, 'html.parser')
             # Look for product links in search results
-            for a in soup.find_all('a', href=True):
-                href = a['href']
-                text = a.get_text(strip=True).lower()
-                norm_title = normalize_title(title)
-                if fuzzy_match(text, title) > 0.5 and '/product' in href.lower():
+            for href, text in page_links(resp.text):
+                if '/product' not in href.lower():
+                    continue
+                matcher.set_seq1(normalize_title(text.lower()))
+                # same test as fuzzy_match(text, title) > 0.5, cheap upper bounds first
+                if matcher.real_quick_ratio() > 0.5 and matcher.quick_ratio() > 0.5 and matcher.ratio() > 0.5:
                     return urllib.parse.urljoin(self.base_url, href)
-            
-            time.sleep(RATE_LIMIT_DELAY)
         
+        self.last_error = failed and f"search failed: {failed}"
         return None
     
     def scrape_product_page(self, url: str) -> dict:
-        """Scrape product data from a generic product page."""
-        resp = safe_get(url)
-        if not resp:
+        """Scrape product data from a generic product page ({} with ``last_error`` set if it failed to load)."""
+        resp = fetch(url)
+        self.last_error = f"page failed: {resp.error or f'HTTP {resp.status_code}'}" if fetch_failed(resp) else None
+        if resp.status_code != 200:
             return {}
         
-        soup = BeautifulSoup(resp.text, 'html.parser')
+        parts = page_parts(resp.text)
         enrichment = {
             'source': 'html_scrape',
             'source_url': url,
@@ -377,67 +595,52 @@ class GenericScraper:
         
         # Images
         images = []
+        seen = set()
         # Look for product images in common patterns
-        for img in soup.find_all('img'):
-            src = img.get('src', '') or img.get('data-src', '')
+        for src, w, h, alt in parts['images']:
             if not src:
                 continue
             # Filter for likely product images
             src_lower = src.lower()
-            if any(kw in src_lower for kw in ['product', 'upload', 'media', 'image', 'photo', 'cdn']):
+            if any(kw in src_lower for kw in PRODUCT_IMAGE_HINTS):
                 # Skip tiny icons/thumbnails
-                w = img.get('width', '0')
-                h = img.get('height', '0')
                 try:
                     if int(w) < 50 or int(h) < 50:
                         continue
                 except (ValueError, TypeError):
                     pass
                 full_url = urllib.parse.urljoin(url, src)
-                if full_url not in [i['url'] for i in images]:
+                if full_url not in seen:
+                    seen.add(full_url)
                     images.append({
                         'url': full_url,
-                        'alt': img.get('alt', ''),
+                        'alt': alt,
                     })
         if images:
             enrichment['images'] = images[:10]  # Limit to 10 images
         
         # Description
-        # Common description selectors
-        desc_selectors = [
-            '.product-description', '.product__description', '#product-description',
-            '.woocommerce-product-details__short-description',
-            '.product-single__description', '.product-details',
-            '[itemprop="description"]', '.description',
-        ]
-        for sel in desc_selectors:
-            desc_el = soup.select_one(sel)
-            if desc_el and len(desc_el.get_text(strip=True)) > 30:
-                enrichment['description_html'] = str(desc_el)
-                enrichment['description_text'] = desc_el.get_text(' ', strip=True)
-                break
+        if parts['description']:
+            enrichment['description_html'], enrichment['description_text'] = parts['description']
         
         # Meta description fallback
-        if 'description_text' not in enrichment:
-            meta = soup.find('meta', attrs={'name': 'description'})
-            if meta and meta.get('content'):
-                enrichment['meta_description'] = meta['content']
+        if 'description_text' not in enrichment and parts['meta_description']:
+            enrichment['meta_description'] = parts['meta_description']
         
         # Open Graph image
-        og_img = soup.find('meta', attrs={'property': 'og:image'})
-        if og_img and og_img.get('content'):
+        if parts['og_image']:
             enrichment.setdefault('images', []).insert(0, {
-                'url': og_img['content'],
+                'url': parts['og_image'],
                 'alt': 'OG Image',
             })
         
         # Specs
-        specs = extract_product_specs(soup)
+        specs = extract_product_specs(parts)
         if specs:
             enrichment['specs'] = specs
         
         # PDFs
-        pdfs = extract_pdf_links(soup, url)
+        pdfs = extract_pdf_links(parts['anchors'], url)
         if pdfs:
             enrichment['pdfs'] = pdfs
         
@@ -460,40 +663,35 @@ def probe_brand_sites() -> dict:
     print("  PROBING MANUFACTURER WEBSITES")
     print("=" * 60)
     
+    # All sites at once; brands sharing a site share its rate limit and are fetched once
+    crawled = crawl_brand_catalogs(BRAND_SITES)
+    
     results = {}
     for brand, url in sorted(BRAND_SITES.items()):
         print(f"\n  {brand}: {url}")
-        scraper = ShopifyScraper(url, brand)
+        crawl = crawled[brand]
         
-        # Check if it's a Shopify store
-        is_shopify = scraper.is_shopify()
-        if is_shopify:
-            products = scraper.fetch_all_products()
-            print(f"    ✅ SHOPIFY STORE — {len(products)} products found!")
+        if crawl.status in ('ok', 'cached'):
+            print(f"    ✅ SHOPIFY STORE — {crawl.products} products found!")
             results[brand] = {
                 'url': url,
                 'platform': 'shopify',
-                'product_count': len(products),
+                'product_count': crawl.products,
+            }
+        elif crawl.status == 'not_shopify':
+            print(f"    ⚠️  Non-Shopify (HTML scraping available)")
+            results[brand] = {
+                'url': url,
+                'platform': 'generic',
+                'reachable': True,
             }
         else:
-            # Try to reach the site at all
-            resp = safe_get(url)
-            if resp:
-                print(f"    ⚠️  Non-Shopify (HTML scraping available)")
-                results[brand] = {
-                    'url': url,
-                    'platform': 'generic',
-                    'reachable': True,
-                }
-            else:
-                print(f"    ❌ Unreachable")
-                results[brand] = {
-                    'url': url,
-                    'platform': 'unknown',
-                    'reachable': False,
-                }
-        
-        time.sleep(RATE_LIMIT_DELAY)
+            print(f"    ❌ Unreachable")
+            results[brand] = {
+                'url': url,
+                'platform': 'unknown',
+                'reachable': False,
+            }
     
     # Save probe results
     probe_path = OUTPUT_DIR / "brand_probe_results.json"
@@ -504,57 +702,122 @@ def probe_brand_sites() -> dict:
     return results
 
 
-def scrape_brand(brand: str, products: list, probe_info: dict = None) -> list:
-    """Scrape enrichment data for all products of a given brand."""
+def product_key(brand: str, product_id) -> str:
+    """Journal key of one manifest product's lookup."""
+    return f"product:{brand}:{product_id}"
+
+
+def scrape_brand(brand: str, products: list, probe_info: dict = None, journal: SyncJournal = None) -> list:
+    """Scrape enrichment data for all products of a given brand.
+
+    With a ``journal`` every product's outcome (enrichment or ``None`` for no
+    match) is checkpointed as soon as it is known, and products already done
+    in a resumed run are skipped.  Products whose catalog, search or page
+    fetch failed are journaled as failed, so a resume retries them.  Returns
+    this call's new enrichments.
+    """
     url = BRAND_SITES.get(brand)
     if not url:
         print(f"  No manufacturer URL for '{brand}', skipping")
         return []
     
     platform = (probe_info or {}).get('platform', 'unknown')
-    print(f"\n--- Scraping: {brand} ({len(products)} products) via {platform} ---")
+    if journal:
+        done_before = len(products)
+        products = [p for p in products if not journal.is_done(product_key(brand, p['id']))]
+        done_before -= len(products)
+    else:
+        done_before = 0
+    resumed = f", {done_before} already done" if done_before else ""
+    print(f"\n--- Scraping: {brand} ({len(products)} products{resumed}) via {platform} ---")
     
     enriched = []
     
+    def record(p, data):
+        if data:
+            enriched.append(data)
+        if journal:
+            journal.done([product_key(brand, p['id'])], brand=brand, result=data)
+    
+    def record_failure(p, error):
+        print(f"    ⚠️  {p['title'][:50]}: {error}")
+        if journal:
+            journal.failed(product_key(brand, p['id']), error)
+    
+    if not products:
+        return enriched
+    
     if platform == 'shopify':
         scraper = ShopifyScraper(url, brand)
-        shopify_products = scraper.fetch_all_products()
+        # one catalog fetch, then pure CPU: no per-product sleeps
+        matches = scraper.title_index().match_all([p['title'] for p in products])
+        if scraper.catalog_error:
+            print(f"  ⚠️  {brand}: {scraper.catalog_error} – products left for a later run")
+            if journal:
+                for p in products:
+                    journal.failed(product_key(brand, p['id']), scraper.catalog_error)
+            return enriched
         
-        for p in products:
+        for p, (match, score) in zip(products, matches):
             title = p['title']
-            match = scraper.match_product(title)
             if match:
                 data = scraper.extract_enrichment(match)
                 data['our_product_id'] = p['id']
                 data['our_title'] = title
-                data['match_score'] = fuzzy_match(title, match['title'])
-                enriched.append(data)
+                data['match_score'] = score
+                record(p, data)
                 print(f"    ✅ {title[:50]}  →  {match['title'][:50]} ({data['match_score']:.0%})")
             else:
+                record(p, None)
                 print(f"    ❌ No match: {title[:60]}")
-            time.sleep(0.5)
     
     elif platform == 'generic':
         scraper = GenericScraper(url, brand)
+        # pages come through the HTTP cache, which spaces out real requests per host
         for p in products:
             title = p['title']
             product_url = scraper.search_product(title)
+            data = None
             if product_url:
                 data = scraper.scrape_product_page(product_url)
                 if data:
                     data['our_product_id'] = p['id']
                     data['our_title'] = title
-                    enriched.append(data)
                     print(f"    ✅ {title[:50]}  →  {product_url[:60]}")
-            else:
+            elif not scraper.last_error:
                 print(f"    ❌ No match: {title[:60]}")
-            time.sleep(RATE_LIMIT_DELAY)
+            if scraper.last_error:
+                record_failure(p, scraper.last_error)
+                continue
+            record(p, data)
     
     return enriched
 
 
-def run_full_scrape(target_brand: str = None):
-    """Run the full scrape pipeline."""
+def compact_results(journal: SyncJournal) -> dict:
+    """Collect the journal's checkpointed enrichments per brand, in scrape order."""
+    by_brand = {}
+    for key, entry in journal.done_entries().items():
+        if key.startswith('product:') and entry.get('result'):
+            by_brand.setdefault(entry.get('brand', ''), []).append(entry['result'])
+    return by_brand
+
+
+def write_brand_file(brand: str, enriched: list) -> Path:
+    brand_file = OUTPUT_DIR / f"scraped_{brand.lower().replace(' ', '_')}.json"
+    with open(brand_file, 'w', encoding='utf-8') as f:
+        json.dump(enriched, f, indent=2, ensure_ascii=False)
+    return brand_file
+
+
+def run_full_scrape(target_brand: str = None, resume: bool = False, run_id: str = None):
+    """Run the full scrape pipeline.
+
+    Progress is journaled per product and per brand (``sync_journal.py``);
+    ``resume=True`` continues the newest unfinished run (or ``run_id``) and
+    skips brands and products it already finished.  The per-brand files and
+    ``scrape_results.json`` are compacted from the journal at the end.
+    """
     OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
     
     manifest = load_manifest()
@@ -577,34 +840,55 @@ def run_full_scrape(target_brand: str = None):
         probe_results = probe_brand_sites()
     
     # Scrape each brand
-    all_enriched = []
+    journal = SyncJournal("manufacturer_scraper", run_id=run_id, resume=resume)
+    checkpointed = compact_results(journal) if journal.resumed else {}
+    incomplete = {}  # brand -> products whose fetch failed this run
     brands_to_scrape = [target_brand] if target_brand else sorted(by_brand.keys(), key=lambda b: -len(by_brand[b]))
     
-    for brand in brands_to_scrape:
-        if brand not in by_brand:
-            print(f"  Brand '{brand}' not found in manifest")
-            continue
-        if brand not in BRAND_SITES:
-            continue
-        
-        probe_info = probe_results.get(brand, {})
-        if probe_info.get('platform') == 'unknown' or not probe_info.get('reachable', True):
-            print(f"  Skipping {brand} (unreachable)")
-            continue
-        
-        enriched = scrape_brand(brand, by_brand[brand], probe_info)
-        all_enriched.extend(enriched)
-        
-        # Save intermediate results
-        brand_file = OUTPUT_DIR / f"scraped_{brand.lower().replace(' ', '_')}.json"
-        with open(brand_file, 'w', encoding='utf-8') as f:
-            json.dump(enriched, f, indent=2, ensure_ascii=False)
-        
-        print(f"  → Saved {len(enriched)} enrichments to {brand_file.name}")
+    try:
+        for brand in brands_to_scrape:
+            if brand not in by_brand:
+                print(f"  Brand '{brand}' not found in manifest")
+                continue
+            if brand not in BRAND_SITES:
+                continue
+            if journal.is_done(f"brand:{brand}"):
+                print(f"  ↩️  {brand}: finished in run {journal.run_id}, skipped")
+                continue
+            
+            probe_info = probe_results.get(brand, {})
+            if probe_info.get('platform') == 'unknown' or not probe_info.get('reachable', True):
+                print(f"  Skipping {brand} (unreachable)")
+                continue
+            
+            enriched = scrape_brand(brand, by_brand[brand], probe_info, journal=journal)
+            
+            # Save intermediate results (products checkpointed by an earlier attempt included)
+            enriched = checkpointed.pop(brand, []) + enriched
+            brand_file = write_brand_file(brand, enriched)
+            print(f"  → Saved {len(enriched)} enrichments to {brand_file.name}")
+            pending = sum(1 for p in by_brand[brand] if not journal.is_done(product_key(brand, p['id'])))
+            if pending:
+                incomplete[brand] = pending
+            else:
+                journal.done([f"brand:{brand}"], enriched=len(enriched))
+    except KeyboardInterrupt:
+        journal.close()
+        print(f"\n⏸️  Interrupted – progress kept in {journal.path}")
+        print(f"  Continue with: python scripts/manufacturer_scraper.py --scrape --resume --run-id {journal.run_id}")
+        raise
     
-    # Save combined results
+    # Compact the journal into the combined results
+    all_enriched = [e for enriched in compact_results(journal).values() for e in enriched]
     with open(RESULTS_PATH, 'w', encoding='utf-8') as f:
         json.dump(all_enriched, f, indent=2, ensure_ascii=False)
+    if incomplete:
+        journal.close()
+        print(f"\n⚠️  Fetch failures left {sum(incomplete.values())} products unfinished "
+              f"({', '.join(f'{b}: {n}' for b, n in incomplete.items())})")
+        print(f"  Retry them with: python scripts/manufacturer_scraper.py --scrape --resume --run-id {journal.run_id}")
+    else:
+        journal.finish()
     
     # Print summary
     print("\n" + "=" * 60)
@@ -624,6 +908,7 @@ def run_full_scrape(target_brand: str = None):
     print(f"  With PDFs:        {has_pdfs}")
     print(f"  With variants:    {has_variants}")
     print(f"\n  Results: {RESULTS_PATH}")
+    print(f"  {default_cache().summary()}")
     
     return all_enriched
 
@@ -634,6 +919,8 @@ def run_full_scrape(target_brand: str = None):
 
 if __name__ == '__main__':
     args = sys.argv[1:]
+    resume = '--resume' in args
+    run_id = args[args.index('--run-id') + 1] if '--run-id' in args and args.index('--run-id') + 1 < len(args) else None
     
     if '--probe' in args:
         probe_brand_sites()
@@ -641,16 +928,17 @@ if __name__ == '__main__':
         idx = args.index('--brand')
         brand = args[idx + 1] if idx + 1 < len(args) else None
         if brand:
-            run_full_scrape(target_brand=brand)
+            run_full_scrape(target_brand=brand, resume=resume, run_id=run_id)
         else:
             print("Usage: --brand 'Brand Name'")
     elif '--scrape' in args:
-        run_full_scrape()
+        run_full_scrape(resume=resume, run_id=run_id)
     else:
         # Default: probe first
         print("Usage:")
         print("  --probe            Probe all brand websites (Shopify vs generic)")
         print("  --brand 'FoxFarm'  Scrape a single brand")
         print("  --scrape           Full scrape of all brands")
+        print("  --resume           Continue the last interrupted scrape (--run-id ID to pick one)")
         print()
         probe_brand_sites()
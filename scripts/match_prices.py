@@ -16,6 +16,8 @@ import re
 import os
 from difflib import SequenceMatcher
 
+from catalog_store import open_store, parse_price
+
 BASE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
 # ── Missing-price products (parsed from server output) ──────────────────
@@ -420,7 +422,12 @@ def load_pos_inventory():
 
 
 def load_enrichment_matches():
-    """Load already-matched enrichment data with prices."""
+    """Load already-matched enrichment data with prices.
+
+    Variant prices come from the catalog store's normalized variants table
+    (current crawl) by retailer + handle; matches whose product is no longer
+    in the store fall back to the prices recorded in the enrichment.
+    """
     em_path = os.path.join(BASE, 'outputs', 'scraped', 'enrichment_matches.json')
     prices = {}
     
@@ -428,36 +435,36 @@ def load_enrichment_matches():
         with open(em_path, 'r', encoding='utf-8') as f:
             data = json.load(f)
         
+        matches = []
         for item in data:
-            prod_id = str(item.get('id', ''))
             enrichment = item.get('enrichment', {})
             if not enrichment:
                 continue
+            handle = enrichment.get('source_url', '').rsplit('/products/', 1)[-1]
+            matches.append((str(item.get('id', '')), enrichment, (enrichment.get('retailer', ''), handle)))
+        
+        store = open_store()
+        catalog_prices = store.variant_prices(key for _pid, _enrichment, key in matches)
+        store.close()
+        
+        for prod_id, enrichment, key in matches:
+            valid_prices = catalog_prices.get(key)
+            if not valid_prices:
+                recorded = (parse_price(v.get('price')) for v in enrichment.get('variants', []))
+                valid_prices = sorted(p for p in recorded if p is not None)
             
-            variants = enrichment.get('variants', [])
-            if variants:
-                # Use the cheapest variant (likely base/smallest size)
-                valid_prices = []
-                for v in variants:
-                    p = v.get('price', '')
-                    try:
-                        if p and float(p) > 0:
-                            valid_prices.append(float(p))
-                    except (ValueError, TypeError):
-                        pass
-                
-                if valid_prices:
-                    # Use the MINIMUM variant price — most likely the "from" price
-                    min_price = min(valid_prices)
-                    source_url = enrichment.get('source_url', '')
-                    matched_title = enrichment.get('matched_title', '')
-                    prices[f'id:{prod_id}'] = {
-                        'price': f'{min_price:.2f}',
-                        'source': 'enrichment_match',
-                        'matched_via': f'Enrichment: {matched_title}',
-                        'source_url': source_url,
-                        'all_prices': sorted(valid_prices)
-                    }
+            if valid_prices:
+                # Use the MINIMUM variant price — most likely the "from" price
+                min_price = valid_prices[0]
+                source_url = enrichment.get('source_url', '')
+                matched_title = enrichment.get('matched_title', '')
+                prices[f'id:{prod_id}'] = {
+                    'price': f'{min_price:.2f}',
+                    'source': 'enrichment_match',
+                    'matched_via': f'Enrichment: {matched_title}',
+                    'source_url': source_url,
+                    'all_prices': valid_prices
+                }
     except Exception as e:
         print(f'Warning: Could not load enrichment matches: {e}')
     
@@ -465,37 +472,22 @@ def load_enrichment_matches():
 
 
 def load_retailer_catalog(filename):
-    """Load a Shopify retailer catalog for fuzzy matching."""
-    path = os.path.join(BASE, 'outputs', 'scraped', 'catalogs', filename)
+    """Load a Shopify retailer catalog for fuzzy matching (priced slim rows from the catalog store)."""
+    source = filename.replace('_products.json', '')
     products = []
     
     try:
-        with open(path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        for prod in data:
-            title = prod.get('title', '')
-            vendor = prod.get('vendor', '')
-            variants = prod.get('variants', [])
-            
-            valid_prices = []
-            for v in variants:
-                p = v.get('price', '')
-                try:
-                    if p and float(p) > 0:
-                        valid_prices.append(float(p))
-                except (ValueError, TypeError):
-                    pass
-            
-            if valid_prices and title:
-                products.append({
-                    'title': title,
-                    'vendor': vendor,
-                    'min_price': min(valid_prices),
-                    'max_price': max(valid_prices),
-                    'handle': prod.get('handle', ''),
-                    'source': filename.replace('_products.json', '')
-                })
+        store = open_store()
+        for row in store.slim(source, priced=True):
+            products.append({
+                'title': row['title'],
+                'vendor': row['vendor'],
+                'min_price': row['min_price'],
+                'max_price': row['max_price'],
+                'handle': row['handle'],
+                'source': source
+            })
+        store.close()
     except Exception as e:
         print(f'Warning: Could not load {filename}: {e}')
     
@@ -1,9 +1,19 @@
 #!/usr/bin/env python3
-"""Refresh product manifest from WooCommerce server."""
+"""Refresh product manifest from WooCommerce server (paged NDJSON stream).
+
+Incremental by default: only products whose checksum changed since the last
+sync are re-exported and merged into outputs/fresh_manifest.json.
+
+Usage:
+    python scripts/refresh_manifest.py          # delta refresh
+    python scripts/refresh_manifest.py --full   # re-export every product
+"""
 import os
-import json
+import sys
 import paramiko
 
+from manifest_stream import build_stream_php, refresh_manifest_file
+
 ssh = paramiko.SSHClient()
 ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
 
@@ -18,19 +28,16 @@ if not SSH_HOST or not SSH_USER or not SSH_PASS:
 
 ssh.connect(SSH_HOST, username=SSH_USER, password=SSH_PASS)
 
-php = r"""<?php
-wp_set_current_user(1);
-$products = get_posts(['post_type'=>'product','post_status'=>'publish','posts_per_page'=>-1,'fields'=>'ids']);
-$data = [];
-foreach($products as $pid) {
+ROW_PHP = r"""
+function hmoon_manifest_row($pid) {
     $p = wc_get_product($pid);
-    if(!($p instanceof WC_Product)) continue;
+    if(!($p instanceof WC_Product)) return null;
     $thumb_id = get_post_thumbnail_id($pid);
     $gallery = $p->get_gallery_image_ids();
     $brands = wp_get_object_terms($pid, 'pwb-brand', ['fields'=>'names']);
     $cats = wp_get_object_terms($pid, 'product_cat', ['fields'=>'names']);
     $has_brand = !empty($brands) ? $brands[0] : '';
-    $data[] = [
+    return [
         'id' => $pid,
         'title' => $p->get_name(),
         'sku' => $p->get_sku(),
@@ -47,51 +54,64 @@ foreach($products as $pid) {
         'slug' => $p->get_slug(),
     ];
 }
-echo json_encode($data);
 """
 
-sftp = ssh.open_sftp()
-with sftp.file(f'{WP_CONTENT_DIR}/run_script.php', 'w') as f:
-    f.write(php)
-sftp.close()
+# Summary is tallied while rows stream to disk; only capped samples are kept
+SAMPLE_LIMITS = {'thumb': 60, 'brand': 60, 'price': 30, 'desc': 30}
+counts = {'thumb': 0, 'brand': 0, 'gallery': 0, 'price': 0, 'desc': 0, 'short': 0}
+samples = {k: [] for k in SAMPLE_LIMITS}
+
+
+def tally(rows):
+    for p in rows:
+        gaps = {
+            'thumb': not p.get('thumb'),
+            'brand': not p.get('brand'),
+            'gallery': p.get('gallery_count', 0) == 0,
+            'price': not p.get('price'),
+            'desc': p.get('desc') != 'has',
+            'short': p.get('short_desc') != 'has',
+        }
+        for key, missing in gaps.items():
+            if not missing:
+                continue
+            counts[key] += 1
+            if key in samples and len(samples[key]) < SAMPLE_LIMITS[key]:
+                samples[key].append(p)
+        yield p
 
-stdin, stdout, stderr = ssh.exec_command(f'cd {SITE_DIR} && wp eval-file wp-content/run_script.php', timeout=300)
-output = stdout.read().decode('utf-8', errors='replace')
-errors = stderr.read().decode('utf-8', errors='replace')
 
-data = json.loads(output)
-with open('outputs/fresh_manifest.json', 'w', encoding='utf-8') as f:
-    json.dump(data, f, indent=2)
+php = build_stream_php(ROW_PHP)
+stats = refresh_manifest_file(ssh, SITE_DIR, 'outputs/fresh_manifest.json', php,
+                              f'{WP_CONTENT_DIR}/run_script.php',
+                              full='--full' in sys.argv, tally=tally)
+total = stats['total']
+print(f"Refresh mode: {stats['mode']} ({stats['changed']} changed, {stats['deleted']} deleted, "
+      f"watermark {stats['watermark']})")
 
 # Summary
-no_thumb = [p for p in data if not p.get('thumb')]
-no_brand = [p for p in data if not p.get('brand')]
-no_gallery = [p for p in data if p.get('gallery_count', 0) == 0]
-no_price = [p for p in data if not p.get('price')]
-no_desc = [p for p in data if p.get('desc') != 'has']
-no_short = [p for p in data if p.get('short_desc') != 'has']
-print(f'Total: {len(data)}')
-print(f'No thumbnail: {len(no_thumb)}')
-print(f'No brand: {len(no_brand)}')
-print(f'No gallery: {len(no_gallery)}')
-print(f'No price: {len(no_price)}')
-print(f'No description: {len(no_desc)}')
-print(f'No short desc: {len(no_short)}')
+print(f'Total: {total}')
+print(f'No thumbnail: {counts["thumb"]}')
+print(f'No brand: {counts["brand"]}')
+print(f'No gallery: {counts["gallery"]}')
+print(f'No price: {counts["price"]}')
+print(f'No description: {counts["desc"]}')
+print(f'No short desc: {counts["short"]}')
 print()
 print('--- Missing thumbnails ---')
-for p in no_thumb[:60]:
+for p in samples['thumb']:
     print(f"  {p['id']}: {p['title']}  brand=[{p.get('brand','')}]  cat=[{p.get('categories','')}]")
 print()
 print('--- Missing brands (sample 60) ---')
-for p in no_brand[:60]:
+for p in samples['brand']:
     print(f"  {p['id']}: {p['title']}  cat=[{p.get('categories','')}]")
 print()
 print('--- Missing price ---')
-for p in no_price[:30]:
+for p in samples['price']:
     print(f"  {p['id']}: {p['title']}  brand=[{p.get('brand','')}]")
 print()
 print('--- Missing description (sample 30) ---')
-for p in no_desc[:30]:
+for p in samples['desc']:
     print(f"  {p['id']}: {p['title']}  brand=[{p.get('brand','')}]")
 
 ssh.close()
@@ -0,0 +1,429 @@
+#!/usr/bin/env python3
+"""
+restore_points.py — Per-wave restore points for destructive WooCommerce runs
+
+Instead of a full `wp db export` in front of every wave, snapshot only the rows
+a wave can touch: wp_posts, wp_postmeta and wp_term_relationships filtered to
+the affected product IDs (resolved from SKUs/IDs, plus their variations and,
+optionally, grouped _children).  The snapshot is a gzipped JSON file written on
+the server, so its cost is proportional to the wave, and it can run in a
+background thread while the wave CSV/script is still uploading.
+
+Restoring puts those rows back in one transaction, recounts the affected terms
+and clears caches for the affected products.  Products created after the
+snapshot that carry one of its SKUs can optionally be deleted (--delete-new).
+
+Usage:
+    python scripts/restore_points.py list
+    python scripts/restore_points.py create --label air_wave1 --csv outputs/woo_grouping_waves/wave.csv
+    python scripts/restore_points.py create --label fix --sku hmh00648 --sku hmh00661 --children
+    python scripts/restore_points.py restore <remote .json.gz>                           # Dry run
+    python scripts/restore_points.py restore <remote .json.gz> --confirm [--delete-new]  # LIVE
+
+From another script:
+    from restore_points import collect_csv_keys, start_restore_point
+
+    ids, skus = collect_csv_keys(local_csv)
+    pending = start_restore_point(ssh, site_dir, 'air_wave1', ids=ids, skus=skus)
+    ... upload ...
+    point = pending.result()        # wait before applying; raises on failure
+"""
+
+import argparse
+import csv
+import json
+import os
+import shlex
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+WORKSPACE = Path(__file__).parent.parent
+RESTORE_SUBDIR = 'wp-content/backups/restore_points'
+
+
+def load_env_file(env_path: Path) -> None:
+    """Load KEY=VALUE pairs from a .env file into process env if unset."""
+    if not env_path.exists():
+        return
+
+    for raw_line in env_path.read_text(encoding='utf-8').splitlines():
+        line = raw_line.strip()
+        if not line or line.startswith('#') or '=' not in line:
+            continue
+        key, value = line.split('=', 1)
+        key = key.strip()
+        value = value.strip().strip('"').strip("'")
+        if key and key not in os.environ:
+            os.environ[key] = value
+
+
+SNAPSHOT_PHP = r'''<?php
+/**
+ * Snapshot posts/postmeta/term_relationships rows for a set of products.
+ *   $args[0] = JSON spec file {ids, skus, include_children, label}
+ *   $args[1] = output .json.gz path
+ */
+global $wpdb;
+$spec = json_decode((string) @file_get_contents($args[0]), true);
+$out_path = $args[1];
+if (!is_array($spec)) {
+    fwrite(STDERR, "Unreadable spec file\n");
+    exit(1);
+}
+
+$ids = array_map('intval', isset($spec['ids']) ? $spec['ids'] : array());
+$skus = array_values(array_filter(array_map('strval', isset($spec['skus']) ? $spec['skus'] : array())));
+foreach (array_chunk($skus, 500) as $chunk) {
+    $ph = implode(',', array_fill(0, count($chunk), '%s'));
+    $ids = array_merge($ids, array_map('intval', $wpdb->get_col($wpdb->prepare(
+        "SELECT post_id FROM {$wpdb->postmeta} WHERE meta_key = '_sku' AND meta_value IN ($ph)", $chunk))));
+}
+$ids = array_values(array_unique(array_filter($ids)));
+
+// Variations always follow their parent; grouped _children only when asked
+$extra = array();
+foreach (array_chunk($ids, 500) as $chunk) {
+    $in = implode(',', $chunk);
+    $extra = array_merge($extra, array_map('intval', $wpdb->get_col(
+        "SELECT ID FROM {$wpdb->posts} WHERE post_parent IN ($in) AND post_type = 'product_variation'")));
+    if (!empty($spec['include_children'])) {
+        foreach ($wpdb->get_col("SELECT meta_value FROM {$wpdb->postmeta} WHERE meta_key = '_children' AND post_id IN ($in)") as $raw) {
+            $extra = array_merge($extra, array_map('intval', (array) maybe_unserialize($raw)));
+        }
+    }
+}
+$ids = array_values(array_unique(array_filter(array_merge($ids, $extra))));
+sort($ids);
+
+$tables = array('posts' => array(), 'postmeta' => array(), 'term_relationships' => array());
+foreach (array_chunk($ids, 500) as $chunk) {
+    $in = implode(',', $chunk);
+    $tables['posts'] = array_merge($tables['posts'],
+        $wpdb->get_results("SELECT * FROM {$wpdb->posts} WHERE ID IN ($in)", ARRAY_A));
+    $tables['postmeta'] = array_merge($tables['postmeta'],
+        $wpdb->get_results("SELECT * FROM {$wpdb->postmeta} WHERE post_id IN ($in)", ARRAY_A));
+    $tables['term_relationships'] = array_merge($tables['term_relationships'],
+        $wpdb->get_results("SELECT * FROM {$wpdb->term_relationships} WHERE object_id IN ($in)", ARRAY_A));
+}
+
+$gz = gzencode(wp_json_encode(array(
+    'version' => 1,
+    'created' => gmdate('c'),
+    'label' => isset($spec['label']) ? $spec['label'] : '',
+    'ids' => $ids,
+    'skus' => $skus,
+    'tables' => $tables,
+)), 6);
+if ($gz === false || @file_put_contents($out_path, $gz) === false) {
+    fwrite(STDERR, "Could not write $out_path\n");
+    exit(1);
+}
+
+echo 'RESTORE_POINT_JSON ' . wp_json_encode(array(
+    'path' => $out_path,
+    'products' => count($ids),
+    'rows' => count($tables['posts']) + count($tables['postmeta']) + count($tables['term_relationships']),
+    'bytes' => strlen($gz),
+)) . "\n";
+'''
+
+RESTORE_PHP = r'''<?php
+/**
+ * Restore a snapshot written by SNAPSHOT_PHP.
+ *   $args[0] = snapshot .json.gz path
+ *   $args[1] = dry-run | confirm
+ *   $args[2] = delete-new (optional): delete products created since, matched by SKU
+ */
+global $wpdb;
+$path = $args[0];
+$confirm = isset($args[1]) && $args[1] === 'confirm';
+$delete_new = isset($args[2]) && $args[2] === 'delete-new';
+
+$snap = json_decode((string) @gzdecode((string) @file_get_contents($path)), true);
+if (!is_array($snap) || empty($snap['tables'])) {
+    fwrite(STDERR, "Unreadable restore point: $path\n");
+    exit(1);
+}
+$ids = array_map('intval', $snap['ids']);
+$t = $snap['tables'];
+
+$new_ids = array();
+foreach (array_chunk($snap['skus'], 500) as $chunk) {
+    $ph = implode(',', array_fill(0, count($chunk), '%s'));
+    $found = array_map('intval', $wpdb->get_col($wpdb->prepare(
+        "SELECT post_id FROM {$wpdb->postmeta} WHERE meta_key = '_sku' AND meta_value IN ($ph)", $chunk)));
+    $new_ids = array_merge($new_ids, array_diff($found, $ids));
+}
+
+echo "Restore point: $path\n";
+echo "  Label: {$snap['label']}  Created: {$snap['created']}\n";
+echo "  Products: " . count($ids) . "  posts=" . count($t['posts']) . " postmeta=" . count($t['postmeta'])
+    . " term_relationships=" . count($t['term_relationships']) . "\n";
+echo "  Products created since (by SKU): " . count($new_ids) . ($delete_new ? " (will delete)" : " (kept)") . "\n";
+
+if (!$confirm) {
+    echo "DRY RUN: no changes made.\n";
+    exit(0);
+}
+
+function hmoon_restore_insert($table, $rows) {
+    global $wpdb;
+    if (!$rows) return 0;
+    $cols = array_keys($rows[0]);
+    $n = 0;
+    foreach (array_chunk($rows, 200) as $chunk) {
+        $values = array();
+        foreach ($chunk as $row) {
+            $vals = array();
+            foreach ($cols as $c) {
+                $vals[] = $row[$c] === null ? 'NULL' : "'" . esc_sql($row[$c]) . "'";
+            }
+            $values[] = '(' . implode(',', $vals) . ')';
+        }
+        $r = $wpdb->query("INSERT INTO $table (`" . implode('`,`', $cols) . "`) VALUES " . implode(',', $values));
+        if ($r === false) return false;
+        $n += $r;
+    }
+    return $n;
+}
+
+// Terms attached now or in the snapshot both need recounting afterwards
+$tt_ids = array_map('intval', wp_list_pluck($t['term_relationships'], 'term_taxonomy_id'));
+
+$wpdb->query('START TRANSACTION');
+$ok = true;
+foreach (array_chunk($ids, 500) as $chunk) {
+    $in = implode(',', $chunk);
+    $tt_ids = array_merge($tt_ids, array_map('intval', $wpdb->get_col(
+        "SELECT term_taxonomy_id FROM {$wpdb->term_relationships} WHERE object_id IN ($in)")));
+    $ok = $ok && $wpdb->query("DELETE FROM {$wpdb->postmeta} WHERE post_id IN ($in)") !== false;
+    $ok = $ok && $wpdb->query("DELETE FROM {$wpdb->term_relationships} WHERE object_id IN ($in)") !== false;
+    $ok = $ok && $wpdb->query("DELETE FROM {$wpdb->posts} WHERE ID IN ($in)") !== false;
+}
+$ok = $ok && hmoon_restore_insert($wpdb->posts, $t['posts']) !== false;
+$ok = $ok && hmoon_restore_insert($wpdb->postmeta, $t['postmeta']) !== false;
+$ok = $ok && hmoon_restore_insert($wpdb->term_relationships, $t['term_relationships']) !== false;
+if (!$ok) {
+    $wpdb->query('ROLLBACK');
+    fwrite(STDERR, "Restore failed, rolled back: {$wpdb->last_error}\n");
+    exit(1);
+}
+$wpdb->query('COMMIT');
+
+if ($delete_new) {
+    foreach ($new_ids as $id) wp_delete_post($id, true);
+}
+
+$tt_ids = array_values(array_unique($tt_ids));
+if ($tt_ids) {
+    $by_tax = array();
+    foreach ($wpdb->get_results("SELECT term_taxonomy_id, taxonomy FROM {$wpdb->term_taxonomy}
+                                 WHERE term_taxonomy_id IN (" . implode(',', $tt_ids) . ")") as $row) {
+        $by_tax[$row->taxonomy][] = (int) $row->term_taxonomy_id;
+    }
+    foreach ($by_tax as $taxonomy => $tts) wp_update_term_count_now($tts, $taxonomy);
+}
+foreach ($ids as $id) {
+    clean_post_cache($id);
+    if (function_exists('wc_delete_product_transients')) wc_delete_product_transients($id);
+}
+if (function_exists('wc_update_product_lookup_tables_column')) {
+    foreach (array('min_max_price', 'stock_quantity', 'sku', 'stock_status') as $col) {
+        wc_update_product_lookup_tables_column($col);
+    }
+}
+delete_transient('wc_term_counts');
+
+echo "RESTORED " . count($ids) . " products" . ($delete_new ? ", deleted " . count($new_ids) . " new" : "") . "\n";
+'''
+
+
+def q(value: str) -> str:
+    """Shell-quote helper for remote commands."""
+    return shlex.quote(value)
+
+
+def run_cmd(ssh, cmd: str, timeout: int = 300) -> tuple:
+    """Run a command on remote host and return (exit_code, stdout, stderr)."""
+    _, stdout, stderr = ssh.exec_command(cmd, timeout=timeout)
+    out = stdout.read().decode('utf-8', errors='replace')
+    err = stderr.read().decode('utf-8', errors='replace')
+    code = stdout.channel.recv_exit_status()
+    return code, out, err
+
+
+def _parse_marker(out: str, marker: str):
+    for line in out.splitlines():
+        if line.startswith(marker + ' '):
+            try:
+                return json.loads(line[len(marker) + 1:])
+            except json.JSONDecodeError:
+                return None
+    return None
+
+
+def collect_csv_keys(csv_path) -> tuple:
+    """Return (ids, skus) referenced by a wave/import CSV's ID and SKU columns."""
+    ids, skus = set(), set()
+    with open(csv_path, newline='', encoding='utf-8-sig') as f:
+        reader = csv.DictReader(f)
+        cols = {(name or '').strip().lower(): name for name in (reader.fieldnames or [])}
+        id_col, sku_col = cols.get('id'), cols.get('sku')
+        for row in reader:
+            raw_id = (row.get(id_col) or '').strip() if id_col else ''
+            if raw_id.isdigit():
+                ids.add(int(raw_id))
+            sku = (row.get(sku_col) or '').strip() if sku_col else ''
+            if sku:
+                skus.add(sku)
+    return sorted(ids), sorted(skus)
+
+
+def create_restore_point(ssh, site_dir: str, label: str, ids=(), skus=(),
+                         include_children: bool = False, timeout: int = 600) -> dict:
+    """Snapshot the rows for ``ids``/``skus`` on the server.
+
+    Returns the RESTORE_POINT_JSON summary ({path, products, rows, bytes});
+    raises RuntimeError if the snapshot could not be written.
+    """
+    stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    safe_label = ''.join(c if c.isalnum() or c in '._-' else '_' for c in (label or 'wave'))
+    restore_dir = f'{site_dir}/{RESTORE_SUBDIR}'
+    out_path = f'{restore_dir}/{safe_label}_{stamp}.json.gz'
+    remote_php = f'{restore_dir}/.snapshot_{safe_label}_{stamp}.php'
+    remote_spec = f'{restore_dir}/.snapshot_{safe_label}_{stamp}.json'
+
+    code, _, err = run_cmd(ssh, f'mkdir -p {q(restore_dir)}', timeout=60)
+    if code != 0:
+        raise RuntimeError(f'Cannot create {restore_dir}: {err.strip()}')
+
+    sftp = ssh.open_sftp()
+    with sftp.file(remote_php, 'w') as f:
+        f.write(SNAPSHOT_PHP)
+    with sftp.file(remote_spec, 'w') as f:
+        f.write(json.dumps({'ids': list(ids), 'skus': list(skus),
+                            'include_children': include_children, 'label': label}))
+    sftp.close()
+
+    code, out, err = run_cmd(
+        ssh,
+        f'cd {q(site_dir)} && wp eval-file {q(remote_php)} {q(remote_spec)} {q(out_path)}',
+        timeout=timeout,
+    )
+    run_cmd(ssh, f'rm -f {q(remote_php)} {q(remote_spec)}', timeout=30)
+
+    summary = _parse_marker(out, 'RESTORE_POINT_JSON')
+    if code != 0 or not summary:
+        raise RuntimeError(f'Restore point failed (exit {code}): {(err or out).strip()[:300]}')
+    return summary
+
+
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='restore-point')
+
+
+def start_restore_point(ssh, site_dir: str, label: str, ids=(), skus=(),
+                        include_children: bool = False):
+    """Run ``create_restore_point`` in the background; returns a Future.
+
+    The snapshot runs on its own SSH channel, so uploads on the same client
+    can proceed in parallel.  Call ``.result()`` before applying changes.
+    """
+    return _executor.submit(create_restore_point, ssh, site_dir, label,
+                            ids, skus, include_children)
+
+
+def restore(ssh, site_dir: str, path: str, confirm: bool = False,
+            delete_new: bool = False, timeout: int = 900) -> tuple:
+    """Restore a snapshot.  Returns (exit_code, output)."""
+    remote_php = f'{site_dir}/{RESTORE_SUBDIR}/.restore.php'
+    sftp = ssh.open_sftp()
+    with sftp.file(remote_php, 'w') as f:
+        f.write(RESTORE_PHP)
+    sftp.close()
+
+    mode = 'confirm' if confirm else 'dry-run'
+    extra = ' delete-new' if delete_new else ''
+    code, out, err = run_cmd(
+        ssh,
+        f'cd {q(site_dir)} && wp eval-file {q(remote_php)} {q(path)} {mode}{extra}',
+        timeout=timeout,
+    )
+    run_cmd(ssh, f'rm -f {q(remote_php)}', timeout=30)
+    return code, out + (err if err.strip() else '')
+
+
+def list_restore_points(ssh, site_dir: str) -> list:
+    code, out, _ = run_cmd(ssh, f'ls -1t {q(site_dir + "/" + RESTORE_SUBDIR)}/*.json.gz 2>/dev/null', timeout=30)
+    return [line.strip() for line in out.splitlines() if line.strip()]
+
+
+# ─── CLI ──────────────────────────────────────────────────────────────────────
+
+def _connect():
+    import paramiko
+
+    load_env_file(WORKSPACE / '.env')
+    host = os.getenv('HMOON_SSH_HOST')
+    user = os.getenv('HMOON_SSH_USER')
+    password = os.getenv('HMOON_SSH_PASS')
+    site_dir = os.getenv('HMOON_SITE_DIR', '~/hmoonhydro.com')
+    if not host or not user or not password:
+        raise SystemExit('Missing SSH env vars: HMOON_SSH_HOST, HMOON_SSH_USER, HMOON_SSH_PASS')
+
+    ssh = paramiko.SSHClient()
+    ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+    ssh.connect(host, username=user, password=password, timeout=30)
+    if site_dir.startswith('~'):
+        _, home, _ = run_cmd(ssh, 'printf "%s" "$HOME"', timeout=30)
+        site_dir = site_dir.replace('~', home.strip(), 1)
+    return ssh, site_dir
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Per-wave WooCommerce restore points')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    sub.add_parser('list', help='List restore points on the server (newest first)')
+
+    p_create = sub.add_parser('create', help='Snapshot products by CSV/SKU/ID')
+    p_create.add_argument('--label', default='manual')
+    p_create.add_argument('--csv', help='Wave/import CSV with SKU and/or ID columns')
+    p_create.add_argument('--sku', action='append', default=[])
+    p_create.add_argument('--id', type=int, action='append', default=[])
+    p_create.add_argument('--children', action='store_true', help='Include grouped _children')
+
+    p_restore = sub.add_parser('restore', help='Restore a snapshot (dry run unless --confirm)')
+    p_restore.add_argument('path', help='Remote .json.gz path (see `list`)')
+    p_restore.add_argument('--confirm', action='store_true')
+    p_restore.add_argument('--delete-new', action='store_true',
+                           help='Also delete products created since the snapshot (matched by SKU)')
+    args = parser.parse_args()
+
+    ssh, site_dir = _connect()
+    try:
+        if args.command == 'list':
+            points = list_restore_points(ssh, site_dir)
+            for path in points:
+                print(path)
+            print(f'{len(points)} restore point(s)')
+        elif args.command == 'create':
+            ids, skus = collect_csv_keys(args.csv) if args.csv else ([], [])
+            point = create_restore_point(ssh, site_dir, args.label,
+                                         ids=sorted(set(ids) | set(args.id)),
+                                         skus=sorted(set(skus) | set(args.sku)),
+                                         include_children=args.children)
+            print(f"Restore point: {point['path']} ({point['products']} products, "
+                  f"{point['rows']} rows, {point['bytes'] / 1024:.0f} KB)")
+        else:
+            code, out = restore(ssh, site_dir, args.path, args.confirm, args.delete_new)
+            print(out.strip())
+            return code
+    finally:
+        ssh.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -13,23 +13,24 @@ This is far more efficient than scraping 20+ individual manufacturer sites.
 
 Usage:
     python scripts/retailer_scraper.py --fetch          # Download all product catalogs
+    python scripts/retailer_scraper.py --fetch --refresh  # Refresh catalogs now (only changed products)
     python scripts/retailer_scraper.py --match          # Match our products to retailer products
     python scripts/retailer_scraper.py --all            # Fetch + Match in one shot
     python scripts/retailer_scraper.py --stats          # Show match statistics
 """
 
 import json
-import os
 import re
 import sys
-import time
 from collections import defaultdict
 from difflib import SequenceMatcher
 from pathlib import Path
 
-import requests
 from bs4 import BeautifulSoup
 
+from catalog_crawler import crawl_catalogs, load_catalog
+from catalog_store import IMAGE_COLUMNS, VARIANT_COLUMNS, normalize_product, open_store
+
 # ============================================================
 # Configuration
 # ============================================================
@@ -43,7 +44,7 @@ HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
     "Accept": "application/json",
 }
-RATE_LIMIT = 1.0  # seconds between pages
+RATE_LIMIT = 1.0  # seconds between requests to the same host
 
 # Shopify retailers that carry hydro products
 RETAILERS = {
@@ -78,71 +79,48 @@ HIGH_CONFIDENCE = 0.80  # Confident enough to auto-import
 # Shopify API Fetcher
 # ============================================================
 
+_store = None
+
+
+def catalog_store():
+    """Shared CatalogStore over CATALOG_DIR, synced on first use."""
+    global _store
+    if _store is None:
+        _store = open_store(catalog_dir=CATALOG_DIR)
+    return _store
+
+
+def load_catalogs() -> dict:
+    """Slim rows (title, handle, prices, ...) per retailer from the catalog store."""
+    store = catalog_store()
+    store.sync()
+    return {key: {'info': info, 'products': store.slim(key)} for key, info in RETAILERS.items()}
+
+
 def fetch_shopify_catalog(retailer_key: str, retailer_info: dict) -> list:
-    """Fetch ALL products from a Shopify store via paginated JSON API."""
-    base_url = retailer_info["url"]
-    name = retailer_info["name"]
-    cache_file = CATALOG_DIR / f"{retailer_key}_products.json"
-    
-    # Check cache (less than 24h old)
-    if cache_file.exists():
-        mtime = os.path.getmtime(cache_file)
-        age_hours = (time.time() - mtime) / 3600
-        if age_hours < 24:
-            with open(cache_file, encoding='utf-8') as f:
-                products = json.load(f)
-            print(f"  {name}: Using cached catalog ({len(products)} products, {age_hours:.1f}h old)")
-            return products
-    
-    print(f"  {name}: Fetching products from {base_url}...")
-    all_products = []
-    page = 1
-    
-    while True:
-        url = f"{base_url}/products.json?limit=250&page={page}"
-        try:
-            resp = requests.get(url, headers=HEADERS, timeout=30)
-            if resp.status_code != 200:
-                print(f"    Page {page}: HTTP {resp.status_code}")
-                break
-            
-            data = resp.json()
-            products = data.get('products', [])
-            if not products:
-                break
-            
-            all_products.extend(products)
-            print(f"    Page {page}: +{len(products)} products (total: {len(all_products)})")
-            
-            page += 1
-            time.sleep(RATE_LIMIT)
-            
-        except Exception as e:
-            print(f"    Page {page} error: {e}")
-            break
-    
-    # Cache the results
-    CATALOG_DIR.mkdir(parents=True, exist_ok=True)
-    with open(cache_file, 'w', encoding='utf-8') as f:
-        json.dump(all_products, f, ensure_ascii=False)
-    
-    print(f"  {name}: {len(all_products)} products saved to {cache_file.name}")
-    return all_products
+    """Fetch ALL products from a Shopify store via paginated JSON API (cached 24h)."""
+    results = crawl_catalogs(
+        {retailer_key: retailer_info["url"]}, CATALOG_DIR,
+        headers=HEADERS, per_host_interval=RATE_LIMIT, verbose=True,
+    )
+    return load_catalog(results[retailer_key])
 
 
-def fetch_all_catalogs() -> dict:
-    """Fetch catalogs from all retailers."""
+def fetch_all_catalogs(max_age_hours: float = 24) -> dict:
+    """Fetch catalogs from all retailers (stores in parallel, each host rate-limited).
+
+    Catalogs older than ``max_age_hours`` are refreshed incrementally (conditional
+    GETs, only changed products merged); 0 refreshes every store now.
+    """
     print("\n" + "=" * 60)
     print("  FETCHING RETAILER CATALOGS")
     print("=" * 60)
     
-    catalogs = {}
-    for key, info in RETAILERS.items():
-        products = fetch_shopify_catalog(key, info)
-        catalogs[key] = {
-            'info': info,
-            'products': products,
-        }
+    crawl_catalogs(
+        {key: info["url"] for key, info in RETAILERS.items()}, CATALOG_DIR,
+        headers=HEADERS, per_host_interval=RATE_LIMIT, max_age_hours=max_age_hours,
+    )
+    catalogs = load_catalogs()
     
     total = sum(len(c['products']) for c in catalogs.values())
     print(f"\n  Total products across all retailers: {total}")
@@ -207,27 +185,35 @@ def match_score(our_title: str, their_title: str, brand: str = '') -> float:
     return min(combined, 1.0)
 
 
-def extract_enrichment_from_shopify(product: dict, retailer_url: str) -> dict:
-    """Extract all enrichment data from a Shopify product object."""
+def extract_enrichment_from_shopify(product: dict, retailer_url: str,
+                                    variants: list = None, images: list = None) -> dict:
+    """Extract all enrichment data from a Shopify product object.
+
+    ``variants`` / ``images`` are the product's normalized catalog-store rows;
+    without them the product is normalized here.
+    """
+    if variants is None or images is None:
+        variant_rows, image_rows = normalize_product('', product)
+        variants = [dict(zip(VARIANT_COLUMNS, row)) for row in variant_rows]
+        images = [dict(zip(IMAGE_COLUMNS, row)) for row in image_rows]
+    
     enrichment = {
         'source_url': f"{retailer_url}/products/{product['handle']}",
         'matched_title': product['title'],
     }
     
     # --- Images ---
-    images = product.get('images', [])
     if images:
         enrichment['images'] = []
         for img in images:
-            src = img.get('src', '')
             # Get highest resolution (remove Shopify size suffixes)
-            hi_res = re.sub(r'_(\d+x\d*|\d*x\d+)\.', '.', src)
+            hi_res = re.sub(r'_(\d+x\d*|\d*x\d+)\.', '.', img['src'])
             enrichment['images'].append({
                 'url': hi_res,
-                'alt': img.get('alt', ''),
-                'width': img.get('width'),
-                'height': img.get('height'),
-                'position': img.get('position'),
+                'alt': img['alt'] or '',
+                'width': img['width'],
+                'height': img['height'],
+                'position': img['position'],
             })
     
     # --- Description ---
@@ -284,39 +270,40 @@ def extract_enrichment_from_shopify(product: dict, retailer_url: str) -> dict:
             enrichment['specs'] = specs
     
     # --- Variants (sizes, weights, prices, SKUs) ---
-    variants = product.get('variants', [])
     if variants:
         enrichment['variants'] = []
         for v in variants:
             var = {}
-            if v.get('title') and v['title'] != 'Default Title':
+            if v['title'] and v['title'] != 'Default Title':
                 var['title'] = v['title']
                 # Extract size from variant title
                 size_match = re.search(r'(\d+\.?\d*)\s*(lt?|gal|ml|oz|qt|lb|kg|g)', v['title'], re.I)
                 if size_match:
                     var['size'] = f"{size_match.group(1)} {size_match.group(2)}"
-            if v.get('sku'):
+            if v['sku']:
                 var['sku'] = v['sku']
-            if v.get('price') and float(v['price']) > 0:
-                var['price'] = v['price']
-            if v.get('compare_at_price'):
-                var['compare_at_price'] = v['compare_at_price']
-            if v.get('weight') and v['weight'] > 0:
+            if v['price'] is not None:
+                var['price'] = f"{v['price']:.2f}"
+            if v['compare_at_price'] is not None:
+                var['compare_at_price'] = f"{v['compare_at_price']:.2f}"
+            if v['weight']:
                 var['weight'] = v['weight']
-                var['weight_unit'] = v.get('weight_unit', 'lb')
-            if v.get('barcode'):
+                var['weight_unit'] = v['weight_unit']
+            if v['grams']:
+                var['grams'] = v['grams']
+            if v['barcode']:
                 var['barcode'] = v['barcode']
-            if v.get('option1'):
+            if v['option1']:
                 var['option1'] = v['option1']
-            if v.get('option2'):
+            if v['option2']:
                 var['option2'] = v['option2']
             enrichment['variants'].append(var)
         
         # Extract weight from first variant with weight
         for v in variants:
-            if v.get('weight') and v['weight'] > 0:
+            if v['weight']:
                 enrichment['weight'] = v['weight']
-                enrichment['weight_unit'] = v.get('weight_unit', 'lb')
+                enrichment['weight_unit'] = v['weight_unit']
                 break
     
     # --- Tags ---
@@ -411,9 +398,19 @@ def match_products(catalogs: dict) -> list:
         }
         
         if best_match and best_score >= MATCH_THRESHOLD:
+            product = best_match['product']
+            variants = images = None
+            if 'variants' not in product:  # slim catalog-store row: full product + its normalized rows
+                store = catalog_store()
+                handle = product['handle']
+                product = store.get(best_match['retailer'], handle) or product
+                variants = store.variants(best_match['retailer'], handle)
+                images = store.images(best_match['retailer'], handle)
             enrichment = extract_enrichment_from_shopify(
-                best_match['product'], 
-                best_match['retailer_url']
+                product, 
+                best_match['retailer_url'],
+                variants,
+                images,
             )
             enrichment['match_score'] = round(best_score, 3)
             enrichment['retailer'] = best_retailer
@@ -537,20 +534,15 @@ if __name__ == '__main__':
     args = sys.argv[1:]
     
     if '--fetch' in args:
-        fetch_all_catalogs()
+        fetch_all_catalogs(max_age_hours=0 if '--refresh' in args else 24)
     
     elif '--match' in args:
         # Load cached catalogs
-        catalogs = {}
         for key, info in RETAILERS.items():
-            cache_file = CATALOG_DIR / f"{key}_products.json"
-            if cache_file.exists():
-                with open(cache_file, encoding='utf-8') as f:
-                    catalogs[key] = {'info': info, 'products': json.load(f)}
-            else:
+            if not (CATALOG_DIR / f"{key}_products.json").exists():
                 print(f"  No cached catalog for {key}, fetching...")
-                products = fetch_shopify_catalog(key, info)
-                catalogs[key] = {'info': info, 'products': products}
+                fetch_shopify_catalog(key, info)
+        catalogs = load_catalogs()
         
         results = match_products(catalogs)
         save_results(results)
@@ -575,7 +567,7 @@ if __name__ == '__main__':
         print(f"  Retailers: {', '.join(r['name'] for r in RETAILERS.values())}")
         print()
         print("Usage:")
-        print("  --fetch   Download all retailer product catalogs")
+        print("  --fetch   Download all retailer product catalogs (--refresh: ignore 24h cache)")
         print("  --match   Match our products against cached catalogs")
         print("  --all     Fetch + Match in one shot")
         print("  --stats   Show statistics from previous match run")
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""Compare desired variant values with the store's current values.
+
+Sync scripts read the store once (a paged snapshot), then ask ``diff_fields``
+which of price / compare-at / barcode / cost / quantity actually differ, so
+only those are sent.  Values are normalised before comparing: money to two
+decimals, ``0``/blank compare-at prices to "none", ``"123.0"`` barcodes to
+``"123"`` and quantities to ints.
+
+Usage:
+    from shopify_diff import diff_fields
+
+    changes = diff_fields(
+        {"price": "19.99", "barcode": None, "quantity": 4},        # store
+        {"price": "19.990", "barcode": "", "quantity": 6},         # CSV
+    )
+    # -> {"quantity": 6}
+"""
+
+from __future__ import annotations
+
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+from typing import Callable, Dict, Mapping, Optional
+
+DIFF_FIELDS = ("price", "compare_at_price", "barcode", "cost", "quantity")
+
+
+def normalise_money(value: object) -> Optional[str]:
+    text = str(value if value is not None else "").strip()
+    if not text:
+        return None
+    try:
+        amount = Decimal(text)
+    except InvalidOperation:
+        return text
+    return format(amount.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP), "f")
+
+
+def normalise_compare_at(value: object) -> Optional[str]:
+    amount = normalise_money(value)
+    # Shopify stores "no compare-at price" as null; CSVs often say 0
+    return None if amount in (None, "0.00") else amount
+
+
+def normalise_barcode(value: object) -> Optional[str]:
+    text = str(value if value is not None else "").strip()
+    if text.endswith(".0") and text[:-2].isdigit():
+        text = text[:-2]
+    return text or None
+
+
+def normalise_quantity(value: object) -> Optional[int]:
+    text = str(value if value is not None else "").strip()
+    if not text:
+        return None
+    try:
+        return int(float(text))
+    except ValueError:
+        return None
+
+
+NORMALISERS: Dict[str, Callable[[object], object]] = {
+    "price": normalise_money,
+    "compare_at_price": normalise_compare_at,
+    "barcode": normalise_barcode,
+    "cost": normalise_money,
+    "quantity": normalise_quantity,
+}
+
+
+def diff_fields(current: Mapping[str, object], desired: Mapping[str, object]) -> Dict[str, object]:
+    """Return the entries of ``desired`` whose normalised value differs from ``current``.
+
+    A desired value of ``None`` means "leave as is" and is never returned.
+    """
+    changes: Dict[str, object] = {}
+    for field in DIFF_FIELDS:
+        if field not in desired or desired[field] is None:
+            continue
+        normalise = NORMALISERS[field]
+        if normalise(desired[field]) != normalise(current.get(field)):
+            changes[field] = desired[field]
+    return changes
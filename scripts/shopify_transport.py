@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""Shared Shopify Admin API transport paced by the store's own rate limits.
+
+Instead of sleeping a fixed delay after every call, the transport keeps a
+leaky-bucket model of both Shopify limits and only waits when the next call
+would overdraw it:
+
+* GraphQL – cost points.  Every response's ``extensions.cost.throttleStatus``
+  (``maximumAvailable``, ``currentlyAvailable``, ``restoreRate``) resets the
+  model; the cost of the next call is estimated from the last actual cost of
+  the same query.
+* REST – request count.  ``X-Shopify-Shop-Api-Call-Limit: used/size`` resets
+  the model; the bucket leaks ``size / 20`` calls per second (2/s standard,
+  20/s Plus).
+
+The transport is thread-safe, so ``map()`` can run calls concurrently while
+the shared bucket keeps the combined rate just under the limit.  429s and
+``THROTTLED`` GraphQL errors are still retried as a backstop, as are 5xx
+responses and dropped connections / timeouts (``Retry-After`` when given,
+otherwise exponential backoff with jitter).
+
+Usage:
+    from shopify_transport import ShopifyTransport
+
+    shop = ShopifyTransport("h-moon-hydro", token, "2024-07")
+    data = shop.graphql_data(query, variables)         # raises on errors
+    resp = shop.rest("get", "variants.json", params={"sku": sku})
+    results = shop.map(push_one, items)                 # concurrent, paced
+
+Set SHOPIFY_API_BASE_URL (e.g. ``http://127.0.0.1:8765``) to send every call
+to a local stand-in such as api_simulator.py instead of the real shop.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional
+
+import requests
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+MAX_ATTEMPTS = 6
+BACKOFF = 1.0                # seconds; doubled per attempt, capped at MAX_BACKOFF
+MAX_BACKOFF = 30.0
+DEFAULT_QUERY_COST = 50      # estimate for a query not seen yet
+GRAPHQL_BUCKET = 1000.0      # standard plan defaults until the first response
+GRAPHQL_RESTORE_RATE = 50.0
+REST_BUCKET = 40.0
+SAFETY = 0.9                 # use up to 90% of a bucket, leave the rest as headroom
+
+
+def normalise_shop_domain(domain: str) -> str:
+    """Accept ``h-moon-hydro``, ``h-moon-hydro.myshopify.com`` or a URL."""
+    cleaned = domain.strip().lower()
+    for prefix in ("https://", "http://"):
+        if cleaned.startswith(prefix):
+            cleaned = cleaned[len(prefix):]
+    cleaned = cleaned.strip("/")
+    if not cleaned.endswith(".myshopify.com"):
+        cleaned = f"{cleaned}.myshopify.com"
+    return cleaned
+
+
+class LeakyBucket:
+    """Client-side model of a Shopify leaky bucket, measured in units of capacity used."""
+
+    def __init__(self, capacity: float, leak_rate: float, safety: float = SAFETY) -> None:
+        self.capacity = capacity
+        self.leak_rate = leak_rate
+        self.safety = safety
+        self.used = 0.0
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _leak(self, now: float) -> None:
+        self.used = max(0.0, self.used - (now - self.updated) * self.leak_rate)
+        self.updated = now
+
+    def acquire(self, amount: float) -> float:
+        """Reserve ``amount`` of capacity, sleeping until it fits; returns seconds waited."""
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self._leak(now)
+                limit = self.capacity * self.safety
+                # A single call larger than the headroom still goes once the bucket is empty
+                if self.used + amount <= limit or self.used == 0.0:
+                    self.used += amount
+                    return waited
+                wait = (self.used + amount - limit) / self.leak_rate
+            time.sleep(wait)
+            waited += wait
+
+    def observe(self, used: float, capacity: Optional[float] = None, leak_rate: Optional[float] = None) -> None:
+        """Reset the model from what the server reported."""
+        with self.lock:
+            if capacity:
+                self.capacity = capacity
+            if leak_rate:
+                self.leak_rate = leak_rate
+            self.used = max(0.0, used)
+            self.updated = time.monotonic()
+
+
+class ShopifyTransport:
+    """Thread-safe Shopify Admin API client paced by rate-limit feedback."""
+
+    def __init__(
+        self,
+        domain: str,
+        token: str,
+        api_version: str,
+        *,
+        max_workers: int = 4,
+        timeout: int = 30,
+        min_interval: float = 0.0,
+        base_url: Optional[str] = None,
+    ) -> None:
+        self.shop = normalise_shop_domain(domain)
+        base_url = base_url or os.environ.get("SHOPIFY_API_BASE_URL") or f"https://{self.shop}"
+        self.rest_base = f"{base_url.rstrip('/')}/admin/api/{api_version}"
+        self.graphql_url = f"{self.rest_base}/graphql.json"
+        self.timeout = timeout
+        self.max_workers = max(1, max_workers)
+        self.min_interval = min_interval
+        self._headers = {
+            "X-Shopify-Access-Token": token,
+            "Content-Type": "application/json",
+            "Accept": "application/json",
+        }
+        self._local = threading.local()
+        self._cost_lock = threading.Lock()
+        self._query_costs: Dict[str, float] = {}
+        self._interval_lock = threading.Lock()
+        self._last_call = 0.0
+        self.graphql_bucket = LeakyBucket(GRAPHQL_BUCKET, GRAPHQL_RESTORE_RATE)
+        self.rest_bucket = LeakyBucket(REST_BUCKET, REST_BUCKET / 20)
+        self.stats = {"requests": 0, "retries": 0, "throttle_wait": 0.0}
+
+    # ── plumbing ────────────────────────────────────────────────────────────
+    @property
+    def session(self) -> requests.Session:
+        """One ``requests.Session`` per thread (sessions are not thread-safe)."""
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            session.headers.update(self._headers)
+            self._local.session = session
+        return session
+
+    def _space_calls(self) -> None:
+        if self.min_interval <= 0:
+            return
+        with self._interval_lock:
+            wait = self._last_call + self.min_interval - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            self._last_call = time.monotonic()
+
+    def _note(self, waited: float, retry: bool) -> None:
+        with self._cost_lock:
+            self.stats["retries" if retry else "requests"] += 1
+            self.stats["throttle_wait"] += waited
+
+    @staticmethod
+    def _retry_after(response: Optional[requests.Response], attempt: int) -> float:
+        """``Retry-After`` when the response has one, else exponential backoff with jitter."""
+        header = response.headers.get("Retry-After") if response is not None else None
+        if header:
+            try:
+                return max(1.0, float(header))
+            except ValueError:
+                pass
+        delay = min(MAX_BACKOFF, BACKOFF * 2 ** (attempt - 1))
+        return delay + random.uniform(0, delay / 2)
+
+    # ── GraphQL ─────────────────────────────────────────────────────────────
+    def graphql(self, query: str, variables: Optional[Dict] = None) -> Dict:
+        """POST a GraphQL query; returns the full JSON body (data/errors/extensions)."""
+        with self._cost_lock:
+            estimate = self._query_costs.get(query, DEFAULT_QUERY_COST)
+        payload = {"query": query, "variables": variables or {}}
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            waited = self.graphql_bucket.acquire(estimate)
+            self._space_calls()
+            self._note(waited, retry=attempt > 1)
+            try:
+                response = self.session.post(self.graphql_url, json=payload, timeout=self.timeout)
+            except requests.RequestException:
+                if attempt == MAX_ATTEMPTS:
+                    raise
+                time.sleep(self._retry_after(None, attempt))
+                continue
+            if response.status_code in RETRY_STATUS and attempt < MAX_ATTEMPTS:
+                self.graphql_bucket.observe(self.graphql_bucket.capacity)  # treat as full
+                time.sleep(self._retry_after(response, attempt))
+                continue
+            if response.status_code != 200:
+                raise RuntimeError(f"GraphQL request failed: {response.status_code} {response.text}")
+            body = response.json()
+            cost = (body.get("extensions") or {}).get("cost") or {}
+            status = cost.get("throttleStatus") or {}
+            if status:
+                capacity = float(status.get("maximumAvailable") or self.graphql_bucket.capacity)
+                self.graphql_bucket.observe(
+                    capacity - float(status.get("currentlyAvailable", capacity)),
+                    capacity=capacity,
+                    leak_rate=float(status.get("restoreRate") or 0) or None,
+                )
+            actual = cost.get("actualQueryCost") or cost.get("requestedQueryCost")
+            if actual:
+                with self._cost_lock:
+                    self._query_costs[query] = float(actual)
+            throttled = any(
+                (err.get("extensions") or {}).get("code") == "THROTTLED" for err in body.get("errors") or []
+            )
+            if throttled and attempt < MAX_ATTEMPTS:
+                needed = float(cost.get("requestedQueryCost") or estimate)
+                time.sleep(max(1.0, needed / self.graphql_bucket.leak_rate))
+                continue
+            return body
+        raise RuntimeError("GraphQL request still throttled after retries")
+
+    def graphql_data(self, query: str, variables: Optional[Dict] = None) -> Dict:
+        """Like ``graphql`` but returns ``data`` and raises on top-level errors."""
+        body = self.graphql(query, variables)
+        if body.get("errors"):
+            raise RuntimeError(f"GraphQL errors: {json.dumps(body['errors'], indent=2)}")
+        return body.get("data", {})
+
+    # ── REST ────────────────────────────────────────────────────────────────
+    def rest(self, method: str, path: str, **kwargs) -> requests.Response:
+        """Call a REST endpoint (``path`` relative to the API base, or a full URL)."""
+        url = path if path.startswith("http") else f"{self.rest_base}/{path.lstrip('/')}"
+        kwargs.setdefault("timeout", self.timeout)
+        response = None
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            waited = self.rest_bucket.acquire(1)
+            self._space_calls()
+            self._note(waited, retry=attempt > 1)
+            try:
+                response = self.session.request(method.upper(), url, **kwargs)
+            except requests.RequestException:
+                if attempt == MAX_ATTEMPTS:
+                    raise
+                time.sleep(self._retry_after(None, attempt))
+                continue
+            limit = response.headers.get("X-Shopify-Shop-Api-Call-Limit", "")
+            if "/" in limit:
+                used, size = limit.split("/", 1)
+                try:
+                    size_f = float(size)
+                    self.rest_bucket.observe(float(used), capacity=size_f, leak_rate=size_f / 20)
+                except ValueError:
+                    pass
+            if response.status_code in RETRY_STATUS and attempt < MAX_ATTEMPTS:
+                if response.status_code == 429:
+                    self.rest_bucket.observe(self.rest_bucket.capacity)
+                time.sleep(self._retry_after(response, attempt))
+                continue
+            return response
+        return response
+
+    # ── concurrency ─────────────────────────────────────────────────────────
+    def map(self, fn: Callable, items: Iterable, max_workers: Optional[int] = None) -> List:
+        """Run ``fn(item)`` for every item on a thread pool; results keep input order.
+
+        All calls share this transport's buckets, so concurrency only adds
+        throughput while budget is available.
+        """
+        items = list(items)
+        workers = min(max_workers or self.max_workers, len(items)) or 1
+        if workers == 1:
+            return [fn(item) for item in items]
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="shopify") as pool:
+            return list(pool.map(fn, items))
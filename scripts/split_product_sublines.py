@@ -20,6 +20,11 @@ Usage:
 
   # Apply all confirmed splits
   python scripts/split_product_sublines.py --all --confirm
+
+Before a confirmed run, a restore point of the affected parents, their children
+and any existing sub-line parents is taken (see restore_points.py); pass
+--full-backup for the old whole-database `wp db export`.  Undo with:
+  python scripts/restore_points.py restore <restore point path> --confirm --delete-new
 """
 
 from __future__ import annotations
@@ -41,6 +46,9 @@ except ImportError:
     print("Missing deps: pip install paramiko python-dotenv")
     sys.exit(1)
 
+from restore_points import start_restore_point
+from wp_bulk_sql import BULK_SQL_LIB_PHP
+
 WORKSPACE = Path(__file__).resolve().parent.parent
 GROUPING_ISSUES_CSV = WORKSPACE / "outputs" / "audit" / "grouping_issues.csv"
 DEC31_EXPORT = WORKSPACE / "CSVs" / "WooExport" / "Products-Export-2025-Dec-31-180709.csv"
@@ -99,8 +107,12 @@ def run_remote(ssh: paramiko.SSHClient, cmd: str) -> tuple[str, str, int]:
     return out, err, code
 
 
-def build_split_php(issue: dict, new_sku: str, dry_run: bool) -> str:
-    """Generate PHP that creates a new grouped parent and moves sub-line children."""
+def build_split_php(issue: dict, new_sku: str, dry_run: bool, bulk: bool = False) -> str:
+    """Generate PHP that creates a new grouped parent and moves sub-line children.
+
+    With ``bulk`` the _children relink and visibility terms are written as
+    set-based SQL (see wp_bulk_sql.py) instead of per-child WP calls.
+    """
     parent_sku = issue["parent_sku"]
     parent_name = issue["parent_name"]
     subline = issue["subline"]
@@ -112,7 +124,38 @@ def build_split_php(issue: dict, new_sku: str, dry_run: bool) -> str:
     # For "Liquid" sublines: we want children whose title STARTS WITH "Liquid" or CONTAINS "Liquid"
     # For "Max/Pro/Powder/Soluble": title ENDS WITH or CONTAINS keyword
 
-    return f"""<?php
+    if bulk:
+        relink_php = """    // Relink children + visibility as set-based writes in one transaction
+    $exclude_catalog = get_term_by('slug', 'exclude-from-catalog', 'product_visibility');
+    $exclude_search = get_term_by('slug', 'exclude-from-search', 'product_visibility');
+    hmoon_bulk_begin();
+    hmoon_bulk_set_meta('_children', [$new_parent_id => $subline_ids, $parent_id => $remaining_children]);
+    if ($exclude_catalog && $exclude_search) {
+        hmoon_bulk_set_terms('product_visibility', $subline_ids, [$exclude_catalog->term_id, $exclude_search->term_id], true);
+    }
+    if (!hmoon_bulk_finish()) {
+        die("ERROR: bulk SQL rolled back\\n");
+    }
+"""
+    else:
+        relink_php = """    // Link sub-line children to new parent
+    update_post_meta($new_parent_id, '_children', $subline_ids);
+
+    // Set visibility on sub-line children (ensure they stay hidden from catalog/search)
+    $exclude_catalog = get_term_by('slug', 'exclude-from-catalog', 'product_visibility');
+    $exclude_search = get_term_by('slug', 'exclude-from-search', 'product_visibility');
+    foreach ($subline_ids as $child_id) {
+        if ($exclude_catalog && $exclude_search) {
+            wp_set_object_terms($child_id, [$exclude_catalog->term_id, $exclude_search->term_id], 'product_visibility', true);
+        }
+    }
+
+    // Update original parent's children (remove sub-line children)
+    update_post_meta($parent_id, '_children', $remaining_children);
+"""
+    bulk_lib = BULK_SQL_LIB_PHP if bulk else ""
+
+    return f"""<?php{bulk_lib}
 // split_subline_{parent_sku}.php — generated by split_product_sublines.py
 $dry_run = {dry_run_php};
 $parent_sku = '{parent_sku}';
@@ -208,21 +251,7 @@ if (!$dry_run) {{
         echo "New parent already exists: $new_parent_id\\n";
     }}
 
-    // Link sub-line children to new parent
-    update_post_meta($new_parent_id, '_children', $subline_ids);
-
-    // Set visibility on sub-line children (ensure they stay hidden from catalog/search)
-    $exclude_catalog = get_term_by('slug', 'exclude-from-catalog', 'product_visibility');
-    $exclude_search = get_term_by('slug', 'exclude-from-search', 'product_visibility');
-    foreach ($subline_ids as $child_id) {{
-        if ($exclude_catalog && $exclude_search) {{
-            wp_set_object_terms($child_id, [$exclude_catalog->term_id, $exclude_search->term_id], 'product_visibility', true);
-        }}
-    }}
-
-    // Update original parent's children (remove sub-line children)
-    update_post_meta($parent_id, '_children', $remaining_children);
-
+{relink_php}
     // Clear caches
     wc_delete_product_transients($parent_id);
     wc_delete_product_transients($new_parent_id);
@@ -268,12 +297,13 @@ def connect_ssh() -> paramiko.SSHClient:
     return ssh
 
 
-def apply_split(issue: dict, confirm: bool, site_dir: str, ssh: paramiko.SSHClient) -> dict:
+def apply_split(issue: dict, confirm: bool, site_dir: str, ssh: paramiko.SSHClient,
+                bulk: bool = False) -> dict:
     parent_sku = issue["parent_sku"]
     new_sku = generate_new_sku(parent_sku, issue["subline"])
     dry_run = not confirm
     
-    php = build_split_php(issue, new_sku, dry_run)
+    php = build_split_php(issue, new_sku, dry_run, bulk=bulk and confirm)
     
     # Upload PHP via SFTP
     remote_php = f"{site_dir}/wp-content/split_{parent_sku}.php"
@@ -316,6 +346,10 @@ def main():
     parser.add_argument("--all", action="store_true", help="Process all detected issues")
     parser.add_argument("--confirm", action="store_true", help="Actually apply changes (default: dry-run)")
     parser.add_argument("--list", action="store_true", help="Just list detected issues and exit")
+    parser.add_argument("--bulk-sql", action="store_true",
+                        help="Write children/visibility with set-based SQL instead of per-child WP calls")
+    parser.add_argument("--full-backup", action="store_true",
+                        help="Export the whole database instead of a restore point of the touched products")
     args = parser.parse_args()
 
     issues = load_issues()
@@ -353,7 +387,7 @@ def main():
     print(f"Site dir: {site_dir}")
     
     # Take DB backup before any confirms
-    if confirm:
+    if confirm and args.full_backup:
         backup_dir = f"{site_dir}/wp-content/backups"
         ts = datetime.now().strftime("%Y%m%d_%H%M%S")
         backup_path = f"{backup_dir}/subline_split_{ts}.sql"
@@ -363,10 +397,23 @@ def main():
             print(f"DB backup: {backup_path}")
         else:
             print(f"WARNING: DB backup failed: {err[:100]}")
+    elif confirm:
+        # Parents + their _children, plus the new sub-line SKUs so a restore
+        # can also drop parents this run creates (--delete-new)
+        skus = sorted({i["parent_sku"] for i in to_process}
+                      | {generate_new_sku(i["parent_sku"], i["subline"]) for i in to_process})
+        pending = start_restore_point(ssh, site_dir, "subline_split", skus=skus, include_children=True)
+        try:
+            point = pending.result()
+        except Exception as e:
+            print(f"Restore point failed, aborting: {e}")
+            ssh.close()
+            sys.exit(1)
+        print(f"Restore point: {point['path']} ({point['products']} products, {point['rows']} rows)")
     
     results = []
     for issue in to_process:
-        result = apply_split(issue, confirm, site_dir, ssh)
+        result = apply_split(issue, confirm, site_dir, ssh, bulk=args.bulk_sql)
         results.append(result)
     
     ssh.close()
@@ -20,12 +20,14 @@ import csv
 import json
 import os
 import sys
-import time
 from collections import defaultdict
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, Iterable, List, Optional, Tuple
 
+from shopify_diff import normalise_quantity
+from sync_journal import SyncJournal
+
 # Default locations relative to the repository root
 DEFAULT_WOO_PATH = Path("CSVs/Products-Export-2025-Oct-29-171532.csv")
 DEFAULT_SHOPIFY_PATH = Path("CSVs/products_export_1.csv")
@@ -331,6 +333,48 @@ def resolve_variant_id(woo_product: Dict[str, object], store_domain: str) -> Opt
     return None
 
 
+def prefetch_shopify_variants(transport, page_size: int = 250) -> Tuple[Dict[str, Dict[str, object]], Dict[str, Dict[str, object]]]:
+    """Page through every product's variants once; return (by_id, by_sku) maps."""
+    by_id: Dict[str, Dict[str, object]] = {}
+    by_sku: Dict[str, Dict[str, object]] = {}
+    url = "products.json"
+    params: Optional[Dict[str, object]] = {"limit": page_size, "fields": "id,variants"}
+    pages = 0
+    while url:
+        response = transport.rest("get", url, params=params)
+        if response.status_code != 200:
+            raise RuntimeError(f"Variant prefetch failed: {response.status_code} {response.text[:200]}")
+        for product in response.json().get("products", []):
+            for variant in product.get("variants", []):
+                by_id[str(variant.get("id"))] = variant
+                sku = (variant.get("sku") or "").strip()
+                if sku:
+                    by_sku.setdefault(sku, variant)
+        pages += 1
+        # Cursor pagination: the next page URL already carries limit/fields/page_info
+        url = response.links.get("next", {}).get("url")
+        params = None
+    print(f"   • Prefetched {len(by_id):,} Shopify variants in {pages} page(s)")
+    return by_id, by_sku
+
+
+def prefetch_location_levels(transport, location_id: str, page_size: int = 250) -> Dict[str, int]:
+    """Return {inventory_item_id: available} for one location (variant totals span all locations)."""
+    levels: Dict[str, int] = {}
+    url = "inventory_levels.json"
+    params: Optional[Dict[str, object]] = {"location_ids": location_id, "limit": page_size}
+    while url:
+        response = transport.rest("get", url, params=params)
+        if response.status_code != 200:
+            raise RuntimeError(f"Inventory level prefetch failed: {response.status_code} {response.text[:200]}")
+        for level in response.json().get("inventory_levels", []):
+            if level.get("available") is not None:
+                levels[str(level.get("inventory_item_id"))] = int(level["available"])
+        url = response.links.get("next", {}).get("url")
+        params = None
+    return levels
+
+
 def update_shopify_remote(
     woo_products: Dict[str, Dict[str, object]],
     store_domain: str,
@@ -338,151 +382,142 @@ def update_shopify_remote(
     location_id: str,
     *,
     include_zero: bool = True,
-    delay: float = 0.8,
+    delay: float = 0.0,
     limit: Optional[int] = None,
     dry_run: bool = False,
+    workers: int = 4,
+    changed_only: bool = True,
+    journal: Optional[SyncJournal] = None,
 ) -> Tuple[int, int, List[str], List[Dict[str, str]]]:
-    """Push inventory levels to Shopify via the Admin API."""
+    """Push inventory levels to Shopify via the Admin API.
+
+    Variants and the location's current levels are prefetched in pages of
+    250, then SKUs are pushed by a pool of ``workers`` threads.  With
+    ``changed_only`` SKUs already tracked at the target quantity are not
+    sent.  Calls are paced by the REST call-limit header (see
+    shopify_transport.py); ``delay`` is only an optional minimum spacing
+    between calls.  Dry runs only do the prefetch reads.  With a ``journal``
+    each SKU's write is recorded and SKUs completed by the resumed run are
+    skipped.
+    """
     try:
-        import requests  # type: ignore import
+        import requests
+        from shopify_transport import ShopifyTransport
     except ImportError as exc:  # pragma: no cover - helps users without requests installed
         raise RuntimeError(
             "The 'requests' library is required for --update-shopify. Install it via 'pip install requests'."
         ) from exc
-    base_url = f"https://{store_domain}.myshopify.com/admin/api/{SHOPIFY_API_VERSION}"
-    session = requests.Session()
-    session.headers.update({
-        "Content-Type": "application/json",
-        "Accept": "application/json",
-        "X-Shopify-Access-Token": access_token,
-    })
-
-    def perform_request(method: str, url: str, *, params=None, json=None, max_attempts: int = 3):
-        attempts = 0
-        while True:
-            response = session.request(method.upper(), url, params=params, json=json, timeout=30)
-            if response.status_code != 429 or attempts >= max_attempts - 1:
-                return response
-            wait_time = max(delay * (2 ** attempts), delay) + 0.5
-            time.sleep(wait_time)
-            attempts += 1
-
-    success = 0
-    skipped = 0
-    missing_variant: List[str] = []
-    failure_details: List[Dict[str, str]] = []
-    processed = 0
+    transport = ShopifyTransport(
+        store_domain, access_token, SHOPIFY_API_VERSION,
+        max_workers=workers, min_interval=0.0 if dry_run else delay,
+    )
+    by_id, by_sku = prefetch_shopify_variants(transport)
+    current_levels = prefetch_location_levels(transport, location_id) if changed_only else {}
 
     sku_items = sorted(woo_products.values(), key=lambda item: item.get("sku", ""))
-    for product in sku_items:
-        if limit is not None and processed >= limit:
-            break
+    if limit is not None:
+        sku_items = sku_items[:limit]
+
+    def push_one(product: Dict[str, object]) -> Tuple[str, Optional[Dict[str, str]]]:
+        """Return ("ok" | "unchanged" | "resumed" | "skipped" | "failed", failure detail).
+
+        Errors from one SKU are reported as its failure instead of aborting the push.
+        """
+        try:
+            return push_sku(product)
+        except (requests.RequestException, RuntimeError, ValueError) as exc:
+            return "failed", {"SKU": str(product.get("sku")), "Reason": "exception", "Status": "",
+                              "Details": f"{type(exc).__name__}: {exc}"[:500]}
+
+    def push_sku(product: Dict[str, object]) -> Tuple[str, Optional[Dict[str, str]]]:
         sku = product.get("sku")
         stock = product.get("stock")
+        if journal and journal.is_done(f"inventory:{sku}"):
+            return "resumed", None
         if stock is None:
-            if include_zero:
-                stock = 0
-            else:
-                skipped += 1
-                processed += 1
-                continue
+            if not include_zero:
+                return "skipped", None
+            stock = 0
 
         variant_id = resolve_variant_id(product, store_domain)
-        variant_payload: Optional[Dict[str, object]] = None
-
-        if variant_id:
-            variant_url = f"{base_url}/variants/{variant_id}.json"
-            variant_resp = perform_request("get", variant_url)
-            if variant_resp.status_code == 200:
-                variant_payload = variant_resp.json().get("variant", {})
-        
+        variant_payload = by_id.get(str(variant_id)) if variant_id else None
         if variant_payload is None:
-            search_resp = perform_request("get", f"{base_url}/variants.json", params={"sku": sku})
-            if search_resp.status_code == 200:
-                variants = search_resp.json().get("variants", [])
-                if variants:
-                    variant_payload = variants[0]
-                    variant_id = variant_payload.get("id")
-                else:
-                    failure_details.append({
-                        "SKU": str(sku),
-                        "Reason": "variant_not_found_by_sku",
-                        "Status": str(search_resp.status_code),
-                        "Details": search_resp.text[:200],
-                    })
-            else:
-                failure_details.append({
-                    "SKU": str(sku),
-                    "Reason": "variant_lookup_http_error",
-                    "Status": str(search_resp.status_code),
-                    "Details": search_resp.text[:200],
-                })
-
-        if not variant_payload or not variant_id:
-            missing_variant.append(str(sku))
-            failure_details.append({
-                "SKU": str(sku),
-                "Reason": "variant_lookup_failed",
-                "Status": "",
-                "Details": "",
-            })
-            processed += 1
-            time.sleep(delay)
-            continue
+            variant_payload = by_sku.get(str(sku))
+        if variant_payload is None:
+            return "failed", {"SKU": str(sku), "Reason": "variant_not_found_by_sku", "Status": "", "Details": ""}
+        variant_id = variant_payload.get("id")
 
         inventory_item_id = variant_payload.get("inventory_item_id")
         if not inventory_item_id:
-            missing_variant.append(str(sku))
-            failure_details.append({
-                "SKU": str(sku),
-                "Reason": "missing_inventory_item_id",
-                "Status": "",
-                "Details": "",
-            })
-            time.sleep(delay)
-            continue
+            return "failed", {"SKU": str(sku), "Reason": "missing_inventory_item_id", "Status": "", "Details": ""}
 
-        inventory_management = variant_payload.get("inventory_management")
-        if inventory_management != "shopify" and not dry_run:
+        tracked = variant_payload.get("inventory_management") == "shopify"
+        if changed_only and tracked and current_levels.get(str(inventory_item_id)) == normalise_quantity(stock):
+            return "unchanged", None
+
+        if dry_run:
+            print(f"DRY RUN: would set SKU {sku} (variant {variant_id}) to {stock}")
+            return "ok", None
+
+        if journal:
+            journal.intent([f"inventory:{sku}"], available=int(stock))
+        if not tracked:
             update_payload = {"variant": {"id": int(variant_id), "inventory_management": "shopify"}}
-            update_resp = perform_request("put", f"{base_url}/variants/{variant_id}.json", json=update_payload)
+            update_resp = transport.rest("put", f"variants/{variant_id}.json", json=update_payload)
             if update_resp.status_code not in (200, 201):
-                missing_variant.append(str(sku))
-                failure_details.append({
+                return "failed", {
                     "SKU": str(sku),
                     "Reason": "enable_tracking_failed",
                     "Status": str(update_resp.status_code),
                     "Details": update_resp.text[:500],
-                })
-                time.sleep(delay)
-                continue
-
-        processed += 1
-        if dry_run:
-            print(f"DRY RUN: would set SKU {sku} (variant {variant_id}) to {stock}")
-            success += 1
-            time.sleep(delay)
-            continue
+                }
 
         payload = {
             "inventory_item_id": int(inventory_item_id),
             "location_id": int(location_id),
             "available": int(stock),
         }
-        level_url = f"{base_url}/inventory_levels/set.json"
-        level_resp = perform_request("post", level_url, json=payload)
+        level_resp = transport.rest("post", "inventory_levels/set.json", json=payload)
         if level_resp.status_code in (200, 201):
+            if journal:
+                journal.done([f"inventory:{sku}"])
+            return "ok", None
+        return "failed", {
+            "SKU": str(sku),
+            "Reason": "inventory_set_failed",
+            "Status": str(level_resp.status_code),
+            "Details": level_resp.text[:500],
+        }
+
+    success = 0
+    skipped = 0
+    unchanged = 0
+    resumed = 0
+    missing_variant: List[str] = []
+    failure_details: List[Dict[str, str]] = []
+    for product, (outcome, detail) in zip(sku_items, transport.map(push_one, sku_items)):
+        if outcome == "ok":
             success += 1
+        elif outcome == "unchanged":
+            unchanged += 1
+        elif outcome == "resumed":
+            resumed += 1
+        elif outcome == "skipped":
+            skipped += 1
         else:
-            missing_variant.append(str(sku))
-            failure_details.append({
-                "SKU": str(sku),
-                "Reason": "inventory_set_failed",
-                "Status": str(level_resp.status_code),
-                "Details": level_resp.text[:500],
-            })
-        time.sleep(delay)
-
+            if journal and detail:
+                journal.failed(f"inventory:{product.get('sku')}", detail.get("Reason", ""))
+            missing_variant.append(str(product.get("sku")))
+            failure_details.append(detail or {"SKU": str(product.get("sku")), "Reason": "unknown",
+                                              "Status": "", "Details": ""})
+
+    if changed_only:
+        print(f"   • Already at target quantity (not sent): {unchanged:,}")
+    if resumed:
+        print(f"   • Already pushed by run {journal.run_id} (not sent): {resumed:,}")
+    stats = transport.stats
+    print(f"   • API requests: {stats['requests']:,} (retries {stats['retries']}, "
+          f"throttle wait {stats['throttle_wait']:.1f}s)")
     return success, skipped, missing_variant, failure_details
 
 
@@ -499,11 +534,24 @@ def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
     parser.add_argument("--dry-run", action="store_true", help="Log intended Shopify updates without calling the API")
     parser.add_argument("--limit", type=int, help="Limit the number of Shopify API updates (for testing)")
     parser.add_argument("--skip-zero", action="store_true", help="Skip products with unknown/zero stock when updating Shopify")
+    parser.add_argument("--resume", action="store_true", help="Continue the last interrupted --update-shopify run")
+    parser.add_argument("--run-id", help="Journal run id to create or resume (default: timestamp / latest unfinished)")
+    parser.add_argument(
+        "--full-push",
+        action="store_true",
+        help="Send every SKU's quantity, even when Shopify already has it",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=int(os.environ.get("SHOPIFY_WORKERS", "4")),
+        help="Concurrent Shopify API calls, paced by the call-limit header (default 4)",
+    )
     parser.add_argument(
         "--throttle",
         type=float,
-        default=float(os.environ.get("SHOPIFY_THROTTLE", "0.8")),
-        help="Delay between Shopify API calls in seconds (default 0.8)",
+        default=float(os.environ.get("SHOPIFY_THROTTLE", "0")),
+        help="Minimum delay between Shopify API calls in seconds (default 0: pace by the call-limit header)",
     )
     return parser.parse_args(argv)
 
@@ -561,6 +609,7 @@ def main(argv: Optional[List[str]] = None) -> int:
             print("❌ Missing Shopify credentials (access token or location ID). Skipping remote update.")
         else:
             print("\n🌐 Pushing inventory to Shopify dev store...")
+            journal = None if args.dry_run else SyncJournal("sync_inventory", run_id=args.run_id, resume=args.resume)
             success, skipped, missing_variant, failure_details = update_shopify_remote(
                 woo_products,
                 args.shopify_domain,
@@ -570,7 +619,16 @@ def main(argv: Optional[List[str]] = None) -> int:
                 limit=args.limit,
                 dry_run=args.dry_run,
                 delay=args.throttle,
+                workers=args.workers,
+                changed_only=not args.full_push,
+                journal=journal,
             )
+            if journal:
+                if missing_variant:
+                    journal.close()
+                    print(f"   • Journal: {journal.path} (re-run with --resume to retry failures only)")
+                else:
+                    journal.finish()
             print(f"✅ Remote updates succeeded for {success:,} SKUs")
             if skipped:
                 print(f"➖ Skipped {skipped:,} SKUs due to missing quantities")
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""Write-ahead journal for remote sync pushes, so interrupted runs can resume.
+
+Each run appends JSON lines to ``outputs/sync_journal/<tool>_<run_id>.jsonl``
+(``SYNC_JOURNAL_DIR`` overrides the directory):
+
+    {"key": "variants:ABC-1", "status": "intent", "ts": ...}   before the call
+    {"key": "variants:ABC-1", "status": "done", "ts": ...}     after it succeeded
+    {"key": "variants:ABC-1", "status": "failed", ...}         after it failed
+    {"status": "finished", ...}                                 run completed
+
+``resume=True`` reopens the newest unfinished journal for the tool (or the
+one named by ``run_id``) and ``is_done`` reports keys completed in it, so a
+re-run skips them.  Keys with an intent but no outcome are "in doubt" – the
+call may or may not have landed – and are listed by ``in_doubt()`` so the
+caller can check them; idempotent writes (set quantity, set price) can
+simply be repeated.  Lines are flushed as written; a torn last line from a
+crash is ignored on load.  ``done(keys, **info)`` stores ``info`` on the
+line and ``done_entries()`` reads it back, so a journal can also checkpoint
+results (manufacturer_scraper.py keeps each enrichment there).
+
+Usage:
+    journal = SyncJournal("update_shopify_from_csv", resume=args.resume, run_id=args.run_id)
+    if not journal.is_done(key):
+        journal.intent([key])
+        ...remote call...
+        journal.done([key])
+    journal.finish()
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+DEFAULT_JOURNAL_DIR = Path(__file__).resolve().parent.parent / "outputs" / "sync_journal"
+
+
+def _read_entries(path: Path) -> List[Dict]:
+    entries = []
+    with path.open(encoding="utf-8") as handle:
+        for line in handle:
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                continue  # torn write from a crash
+    return entries
+
+
+def journal_dir() -> Path:
+    return Path(os.environ.get("SYNC_JOURNAL_DIR") or DEFAULT_JOURNAL_DIR)
+
+
+def latest_unfinished(tool: str, directory: Optional[Path] = None) -> Optional[str]:
+    """Return the run id of the newest journal for ``tool`` without a ``finished`` line."""
+    directory = directory or journal_dir()
+    for path in sorted(directory.glob(f"{tool}_*.jsonl"), reverse=True):
+        if not any(entry.get("status") == "finished" for entry in _read_entries(path)):
+            return path.stem[len(tool) + 1:]
+    return None
+
+
+class SyncJournal:
+    """Append-only intent/done journal keyed by run id and item key (thread-safe)."""
+
+    def __init__(
+        self,
+        tool: str,
+        run_id: Optional[str] = None,
+        resume: bool = False,
+        directory: Optional[Path] = None,
+    ) -> None:
+        directory = directory or journal_dir()
+        directory.mkdir(parents=True, exist_ok=True)
+        if resume and not run_id:
+            run_id = latest_unfinished(tool, directory)
+            if run_id is None:
+                print(f"ℹ️  No unfinished {tool} run to resume; starting a new one")
+        self.resumed = bool(resume and run_id and (directory / f"{tool}_{run_id}.jsonl").exists())
+        self.run_id = run_id or datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.path = directory / f"{tool}_{self.run_id}.jsonl"
+        self.completed: Set[str] = set()
+        self._pending: Set[str] = set()
+        if self.resumed:
+            for entry in _read_entries(self.path):
+                key = entry.get("key")
+                if key is None:
+                    continue
+                status = entry.get("status")
+                if status == "done":
+                    self.completed.add(key)
+                    self._pending.discard(key)
+                elif status == "intent":
+                    self._pending.add(key)
+                elif status == "failed":
+                    self._pending.discard(key)
+            print(f"↩️  Resuming run {self.run_id}: {len(self.completed):,} items already done, "
+                  f"{len(self._pending):,} in doubt")
+        self._lock = threading.Lock()
+        self._handle = self.path.open("a", encoding="utf-8")
+        if not self.resumed:
+            self._write({"status": "started", "tool": tool})
+
+    def _write(self, entry: Dict) -> None:
+        entry["ts"] = round(time.time(), 3)
+        self._handle.write(json.dumps(entry) + "\n")
+        self._handle.flush()
+
+    def is_done(self, key: str) -> bool:
+        return key in self.completed
+
+    def in_doubt(self) -> Set[str]:
+        """Keys from the resumed run whose call started but never recorded an outcome."""
+        return set(self._pending)
+
+    def intent(self, keys: Iterable[str], **info) -> None:
+        with self._lock:
+            for key in keys:
+                self._write({"key": key, "status": "intent", **info})
+
+    def done(self, keys: Iterable[str], **info) -> None:
+        with self._lock:
+            for key in keys:
+                self._write({"key": key, "status": "done", **info})
+                self.completed.add(key)
+                self._pending.discard(key)
+
+    def failed(self, key: str, reason: str) -> None:
+        with self._lock:
+            self._write({"key": key, "status": "failed", "reason": reason[:500]})
+            self._pending.discard(key)
+
+    def done_entries(self) -> Dict[str, Dict]:
+        """Latest ``done`` line per key in this run (resumed lines included), in first-done order."""
+        with self._lock:
+            if not self._handle.closed:
+                self._handle.flush()
+        entries: Dict[str, Dict] = {}
+        for entry in _read_entries(self.path):
+            if entry.get("status") == "done" and "key" in entry:
+                entries[entry["key"]] = entry
+        return entries
+
+    def finish(self) -> None:
+        """Mark the run complete so ``--resume`` will not pick it up again."""
+        with self._lock:
+            self._write({"status": "finished", "completed": len(self.completed)})
+            self._handle.close()
+
+    def close(self) -> None:
+        """Close without marking finished (run can still be resumed)."""
+        with self._lock:
+            if not self._handle.closed:
+                self._handle.close()
@@ -14,6 +14,22 @@ Example:
     export SHOPIFY_ACCESS_TOKEN="shpat_..."
     export SHOPIFY_LOCATION_ID="75941806154"
     python update_shopify_from_csv.py --csv CSVs/shopify_inventory_from_pos__DEDUP_20251103_211920.csv
+
+SKUs are resolved from a SKU -> variant index built by paging through every
+variant once (250 per request) and cached at outputs/shopify_variant_index.json.
+The index is rebuilt when older than --index-max-age hours (or with
+--refresh-index); SKUs missing from it fall back to a per-SKU lookup.
+
+Only fields whose normalised value differs from the store are sent (see
+shopify_diff.py).  The index also caches each variant's price, compare-at
+price, barcode, cost and available quantity, but a cached copy can be a day
+old, so a diff run first re-reads those values for the CSV's SKUs (nodes()
+in batches of VARIANT_PAGE_SIZE) and diffs against the live store; the
+index is only trusted for IDs.  --full-push sends every field as before.
+
+Every remote write is journalled (see sync_journal.py); if a run dies,
+``--resume`` re-runs it skipping the variant/inventory/status writes that
+already completed.
 """
 
 from __future__ import annotations
@@ -22,17 +38,25 @@ import argparse
 import json
 import os
 import sys
-import time
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
 from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+from pathlib import Path
 from typing import Dict, List, Optional
 
 import pandas as pd
-import requests
+
+from shopify_diff import diff_fields
+from sync_journal import SyncJournal
+from shopify_transport import ShopifyTransport
 
 API_VERSION = "2024-07"
 API_TIMEOUT = 30
-RETRY_STATUS = {429, 502, 503}
+DEFAULT_WORKERS = 4
+VARIANT_PAGE_SIZE = 150  # the snapshot fields cost ~5 points per variant; one query may cost at most 1000
+DEFAULT_VARIANT_INDEX = Path(__file__).resolve().parent.parent / "outputs" / "shopify_variant_index.json"
+DEFAULT_INDEX_MAX_AGE_HOURS = 24.0
+INVENTORY_BATCH_SIZE = 250  # inventorySetQuantities accepts at most 250 quantities per call
 
 FIELD_ALIASES = {
     "sku": ("Variant SKU", "SKU"),
@@ -57,37 +81,168 @@ class VariantRecord:
     product_id: str
     sku: str
     barcode: Optional[str]
+    # Current store values; only meaningful when ``snapshot`` is True
+    price: Optional[str] = None
+    compare_at_price: Optional[str] = None
+    cost: Optional[str] = None
+    quantity: Optional[int] = None
+    snapshot: bool = False
+
+    @classmethod
+    def from_node(cls, node: Dict) -> "VariantRecord":
+        item = node["inventoryItem"]
+        level = item.get("inventoryLevel") or {}
+        quantities = level.get("quantities") or []
+        return cls(
+            variant_id=node["id"],
+            inventory_item_id=item["id"],
+            product_id=node["product"]["id"],
+            sku=(node.get("sku") or "").strip(),
+            barcode=node.get("barcode"),
+            price=node.get("price"),
+            compare_at_price=node.get("compareAtPrice"),
+            cost=(item.get("unitCost") or {}).get("amount"),
+            quantity=quantities[0]["quantity"] if quantities else None,
+            snapshot=True,
+        )
+
+
+VARIANT_FIELDS = """
+                id
+                sku
+                barcode
+                price
+                compareAtPrice
+                product { id }
+                inventoryItem {
+                  id
+                  unitCost { amount }
+                  inventoryLevel(locationId: $location) {
+                    quantities(names: ["available"]) { quantity }
+                  }
+                }
+"""
 
 
 class ShopifyClient:
-    def __init__(self, domain: str, token: str) -> None:
-        self.endpoint = f"https://{domain}/admin/api/{API_VERSION}/graphql.json"
-        self.session = requests.Session()
-        self.session.headers.update(
-            {
-                "X-Shopify-Access-Token": token,
-                "Content-Type": "application/json",
-                "Accept": "application/json",
-            }
-        )
+    def __init__(self, domain: str, token: str, location_gid: str, workers: int = DEFAULT_WORKERS) -> None:
+        # Paced by Shopify's cost throttle status; see shopify_transport.py
+        self.transport = ShopifyTransport(domain, token, API_VERSION, max_workers=workers, timeout=API_TIMEOUT)
+        self.domain = domain
+        self.location_gid = location_gid
         self.variant_cache: Dict[str, Optional[VariantRecord]] = {}
+        self.index_loaded = False
+        self.index_generated_at: Optional[str] = None
+        self.index_additions = 0
+        self.live_skus: set[str] = set()  # SKUs whose values were read from the store this run
 
     def graphql(self, query: str, variables: Optional[Dict] = None) -> Dict:
-        payload = {"query": query, "variables": variables or {}}
-        attempt = 0
+        return self.transport.graphql_data(query, variables)
+
+    def fetch_all_variants(self) -> Dict[str, VariantRecord]:
+        """Page through every product variant once and map SKU -> VariantRecord (with current values)."""
+        query = """
+        query allVariants($first: Int!, $after: String, $location: ID!) {
+          productVariants(first: $first, after: $after) {
+            pageInfo { hasNextPage endCursor }
+            edges {
+              node {%s}
+            }
+          }
+        }
+        """ % VARIANT_FIELDS
+        index: Dict[str, VariantRecord] = {}
+        cursor: Optional[str] = None
+        pages = 0
         while True:
-            attempt += 1
-            response = self.session.post(self.endpoint, json=payload, timeout=API_TIMEOUT)
-            if response.status_code in RETRY_STATUS and attempt <= 5:
-                retry_after = int(response.headers.get("Retry-After", 1))
-                time.sleep(max(1, retry_after))
-                continue
-            if response.status_code != 200:
-                raise RuntimeError(f"GraphQL request failed: {response.status_code} {response.text}")
-            data = response.json()
-            if "errors" in data and data["errors"]:
-                raise RuntimeError(f"GraphQL errors: {json.dumps(data['errors'], indent=2)}")
-            return data.get("data", {})
+            data = self.graphql(query, {"first": VARIANT_PAGE_SIZE, "after": cursor, "location": self.location_gid})
+            connection = data.get("productVariants", {})
+            for edge in connection.get("edges", []):
+                node = edge["node"]
+                sku = (node.get("sku") or "").strip()
+                if not sku or sku in index:
+                    continue  # first variant wins for duplicate SKUs
+                index[sku] = VariantRecord.from_node(node)
+            pages += 1
+            page_info = connection.get("pageInfo", {})
+            if not page_info.get("hasNextPage"):
+                break
+            cursor = page_info.get("endCursor")
+        print(f"Variant index: {len(index)} SKUs from {pages} page(s)")
+        self.live_skus.update(index)
+        return index
+
+    def refresh_current_values(self, skus: List[str]) -> int:
+        """Re-read current values for indexed ``skus`` not yet read this run; returns how many.
+
+        Variants that are gone (or whose SKU changed) are dropped from the
+        cache so get_variant_by_sku looks them up again.
+        """
+        stale = [sku for sku in dict.fromkeys(skus)
+                 if sku not in self.live_skus and self.variant_cache.get(sku) is not None]
+        if not stale:
+            return 0
+        query = """
+        query currentValues($ids: [ID!]!, $location: ID!) {
+          nodes(ids: $ids) {
+            ... on ProductVariant {%s}
+          }
+        }
+        """ % VARIANT_FIELDS
+        batches = [stale[start:start + VARIANT_PAGE_SIZE] for start in range(0, len(stale), VARIANT_PAGE_SIZE)]
+
+        def fetch(batch: List[str]) -> List[Optional[Dict]]:
+            ids = [self.variant_cache[sku].variant_id for sku in batch]
+            return self.graphql(query, {"ids": ids, "location": self.location_gid}).get("nodes") or []
+
+        for batch, nodes in zip(batches, self.transport.map(fetch, batches)):
+            by_id = {node["id"]: node for node in nodes if node}
+            for sku in batch:
+                node = by_id.get(self.variant_cache[sku].variant_id)
+                if node is None or (node.get("sku") or "").strip() != sku:
+                    del self.variant_cache[sku]
+                    continue
+                self.variant_cache[sku] = VariantRecord.from_node(node)
+                self.live_skus.add(sku)
+        print(f"Current values: re-read {len(stale)} SKU(s) from the store")
+        return len(stale)
+
+    def load_variant_index(self, path: Path, max_age_hours: float, refresh: bool = False) -> None:
+        """Fill the SKU cache from ``path`` if fresh for this shop, else rebuild and save it."""
+        if not refresh and path.exists():
+            try:
+                cached = json.loads(path.read_text(encoding="utf-8"))
+                generated = datetime.fromisoformat(cached["generated_at"])
+                age_hours = (datetime.now(timezone.utc) - generated).total_seconds() / 3600
+                same_store = cached.get("shop") == self.domain and cached.get("location") == self.location_gid
+                if same_store and age_hours <= max_age_hours:
+                    self.variant_cache.update(
+                        {sku: VariantRecord(**row) for sku, row in cached["variants"].items()}
+                    )
+                    self.index_loaded = True
+                    self.index_generated_at = cached["generated_at"]
+                    print(f"Variant index: {len(cached['variants'])} SKUs from {path} ({age_hours:.1f}h old)")
+                    return
+            except (OSError, ValueError, KeyError, TypeError):
+                pass
+        self.variant_cache.update(self.fetch_all_variants())
+        self.index_loaded = True
+        self.index_generated_at = datetime.now(timezone.utc).isoformat()
+        self.save_variant_index(path)
+
+    def save_variant_index(self, path: Path) -> None:
+        """Write the SKU cache; the stamp stays that of the last full rebuild."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {
+            "generated_at": self.index_generated_at or datetime.now(timezone.utc).isoformat(),
+            "shop": self.domain,
+            "location": self.location_gid,
+            "api_version": API_VERSION,
+            "variants": {sku: asdict(rec) for sku, rec in self.variant_cache.items() if rec is not None},
+        }
+        tmp = path.with_suffix(path.suffix + ".part")
+        tmp.write_text(json.dumps(payload), encoding="utf-8")
+        tmp.replace(path)
 
     def get_variant_by_sku(self, sku: str) -> Optional[VariantRecord]:
         sku = sku.strip()
@@ -95,35 +250,26 @@ class ShopifyClient:
             return None
         if sku in self.variant_cache:
             return self.variant_cache[sku]
+        # Not in the index (or no index loaded): ask Shopify for this one SKU
         query = """
-        query variantBySku($query: String!) {
+        query variantBySku($query: String!, $location: ID!) {
           productVariants(first: 1, query: $query) {
             edges {
-              node {
-                id
-                sku
-                barcode
-                product { id }
-                inventoryItem { id }
-              }
+              node {%s}
             }
           }
         }
-        """
-        data = self.graphql(query, {"query": f"sku:{sku}"})
+        """ % VARIANT_FIELDS
+        data = self.graphql(query, {"query": f"sku:{sku}", "location": self.location_gid})
         edges = data.get("productVariants", {}).get("edges", [])
         if not edges:
             self.variant_cache[sku] = None
             return None
-        node = edges[0]["node"]
-        record = VariantRecord(
-            variant_id=node["id"],
-            inventory_item_id=node["inventoryItem"]["id"],
-            product_id=node["product"]["id"],
-            sku=node["sku"],
-            barcode=node.get("barcode"),
-        )
+        record = VariantRecord.from_node(edges[0]["node"])
         self.variant_cache[sku] = record
+        self.live_skus.add(sku)
+        if self.index_loaded:
+            self.index_additions += 1
         return record
 
     def product_variants_bulk_update(
@@ -131,9 +277,14 @@ class ShopifyClient:
         product_id: str,
         variants: List[Dict],
         allow_partial: bool = True,
-    ) -> None:
+    ) -> List[Dict]:
+        """Update several variants of one product; returns the userErrors.
+
+        Each error's ``field`` starts with ``["variants", "<index>", ...]`` so
+        callers can map it back to the input variant.
+        """
         if not variants:
-            return
+            return []
         mutation = """
         mutation bulkUpdate($productId: ID!, $variants: [ProductVariantsBulkInput!]!, $allowPartial: Boolean) {
           productVariantsBulkUpdate(productId: $productId, variants: $variants, allowPartialUpdates: $allowPartial) {
@@ -147,11 +298,21 @@ class ShopifyClient:
             "allowPartial": allow_partial,
         }
         data = self.graphql(mutation, variables)
-        errors = data.get("productVariantsBulkUpdate", {}).get("userErrors", [])
-        if errors:
-            raise RuntimeError(f"Variant update error: {errors}")
+        return data.get("productVariantsBulkUpdate", {}).get("userErrors", [])
 
     def inventory_set_quantity(self, inventory_item_id: str, location_gid: str, quantity: int) -> None:
+        errors = self.inventory_set_quantities([(inventory_item_id, quantity)], location_gid)
+        if errors:
+            raise RuntimeError(f"Inventory quantity update error: {errors}")
+
+    def inventory_set_quantities(self, quantities: List[tuple[str, int]], location_gid: str) -> List[Dict]:
+        """Set available quantities for up to INVENTORY_BATCH_SIZE items in one call.
+
+        Returns the userErrors; their ``field`` is
+        ``["input", "quantities", "<index>", ...]`` for per-item problems.
+        """
+        if not quantities:
+            return []
         mutation = """
         mutation setQuantities($input: InventorySetQuantitiesInput!) {
           inventorySetQuantities(input: $input) {
@@ -169,12 +330,11 @@ class ShopifyClient:
                     "locationId": location_gid,
                     "quantity": quantity,
                 }
+                for inventory_item_id, quantity in quantities
             ],
         }
         data = self.graphql(mutation, {"input": payload})
-        errors = data.get("inventorySetQuantities", {}).get("userErrors", [])
-        if errors:
-            raise RuntimeError(f"Inventory quantity update error: {errors}")
+        return data.get("inventorySetQuantities", {}).get("userErrors", [])
 
     def product_update(self, product_id: str, *, status: Optional[str] = None) -> None:
         if not status:
@@ -241,6 +401,14 @@ def normalise_status(value: str) -> Optional[str]:
     return mapping.get(text)
 
 
+def error_index(error: Dict, position: int) -> Optional[int]:
+    """Return the input index named at ``field[position]`` of a userError, if any."""
+    field = error.get("field") or []
+    if len(field) > position and str(field[position]).isdigit():
+        return int(field[position])
+    return None
+
+
 def build_location_gid(location_id: str) -> str:
     location_id = str(location_id).strip()
     if not location_id:
@@ -255,6 +423,20 @@ def main() -> None:
     parser.add_argument("--csv", default="CSVs/shopify_inventory_from_pos__DEDUP_20251103_211920.csv", help="Path to the Shopify-formatted CSV")
     parser.add_argument("--dry-run", action="store_true", help="Print actions without calling the API")
     parser.add_argument("--limit", type=int, default=None, help="Limit number of variant rows processed")
+    parser.add_argument("--variant-index", default=str(DEFAULT_VARIANT_INDEX),
+                        help="Cached SKU -> variant index (JSON)")
+    parser.add_argument("--index-max-age", type=float, default=DEFAULT_INDEX_MAX_AGE_HOURS,
+                        help="Rebuild the variant index when older than this many hours")
+    parser.add_argument("--refresh-index", action="store_true", help="Rebuild the variant index now")
+    parser.add_argument("--no-index", action="store_true",
+                        help="Skip the index and look up each SKU individually")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue the last interrupted run, skipping writes it already completed")
+    parser.add_argument("--run-id", help="Journal run id to create or resume (default: timestamp / latest unfinished)")
+    parser.add_argument("--full-push", action="store_true",
+                        help="Send every field from the CSV instead of only values that differ from the store")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help="Concurrent API calls (paced by Shopify's cost limit)")
     args = parser.parse_args()
 
     domain = os.getenv("SHOPIFY_DOMAIN")
@@ -266,7 +448,15 @@ def main() -> None:
     location_gid = build_location_gid(location_id or "")
 
     df = pd.read_csv(args.csv, dtype=str).fillna("")
-    client = ShopifyClient(domain, token)
+    client = ShopifyClient(domain, token, location_gid, workers=args.workers)
+    index_path = Path(args.variant_index)
+    if not args.no_index:
+        client.load_variant_index(index_path, args.index_max_age, refresh=args.refresh_index)
+        if not args.full_push:
+            # Diff against the store as it is now, not the cached snapshot
+            csv_skus = [sku for sku in (resolve_field(record, FIELD_ALIASES["sku"]).strip()
+                                        for record in df.to_dict("records")) if sku]
+            client.refresh_current_values(csv_skus[:args.limit] if args.limit else csv_skus)
 
     processed = 0
     updated = 0
@@ -275,6 +465,14 @@ def main() -> None:
     product_status_targets: Dict[str, str] = {}
     product_conflicts: List[str] = []
     product_failures: List[str] = []
+    # Keyed by variant / inventory item so a repeated SKU keeps its last row
+    variant_groups: Dict[str, Dict[str, tuple[str, Dict[str, object]]]] = {}
+    inventory_targets: Dict[str, tuple[str, int]] = {}
+    changed_skus: List[str] = []
+    applied: Dict[str, Dict[str, object]] = {}
+    unchanged = 0
+    already_done = 0
+    journal = None if args.dry_run else SyncJournal("update_shopify_from_csv", run_id=args.run_id, resume=args.resume)
 
     for record in df.to_dict("records"):
         sku = resolve_field(record, FIELD_ALIASES["sku"]).strip()
@@ -305,47 +503,115 @@ def main() -> None:
             else:
                 product_status_targets[variant.product_id] = status_normalised
 
-        try:
-            if args.dry_run:
-                print(
-                    json.dumps(
-                        {
-                            "sku": sku,
-                            "variant_id": variant.variant_id,
-                            "product_id": variant.product_id,
-                            "price": price,
-                            "cost": cost,
-                            "compareAtPrice": compare_price,
-                            "inventoryQty": qty,
-                            "barcode": barcode,
-                        },
-                        indent=2,
-                    )
-                )
-                updated += 1
+        desired = {
+            "price": price,
+            "compare_at_price": compare_price,
+            "barcode": barcode,
+            "cost": cost,
+            "quantity": qty,
+        }
+        if args.full_push or not variant.snapshot:
+            changes = {field: value for field, value in desired.items() if value is not None}
+        else:
+            changes = diff_fields(asdict(variant), desired)
+        if not changes:
+            unchanged += 1
+            continue
+
+        if journal and journal.resumed:
+            if journal.is_done(f"inventory:{sku}"):
+                changes.pop("quantity", None)
+            if journal.is_done(f"variants:{sku}"):
+                for field in ("price", "compare_at_price", "barcode", "cost"):
+                    changes.pop(field, None)
+            if not changes:
+                already_done += 1
                 continue
 
-            variant_payload: Dict[str, object] = {"id": variant.variant_id}
-            if price is not None:
-                variant_payload["price"] = price
-            if compare_price is not None:
-                variant_payload["compareAtPrice"] = compare_price
-            if barcode is not None:
-                variant_payload["barcode"] = barcode
-            if cost is not None:
-                variant_payload["inventoryItem"] = {"cost": cost}
-
-            made_change = False
-            if len(variant_payload) > 1:
-                client.product_variants_bulk_update(variant.product_id, [variant_payload])
-                made_change = True
-            if qty is not None:
-                client.inventory_set_quantity(variant.inventory_item_id, location_gid, qty)
-                made_change = True
-            if made_change:
-                updated += 1
+        if args.dry_run:
+            print(
+                json.dumps(
+                    {
+                        "sku": sku,
+                        "variant_id": variant.variant_id,
+                        "product_id": variant.product_id,
+                        "changes": changes,
+                    },
+                    indent=2,
+                )
+            )
+            updated += 1
+            continue
+
+        variant_payload: Dict[str, object] = {"id": variant.variant_id}
+        if "price" in changes:
+            variant_payload["price"] = changes["price"]
+        if "compare_at_price" in changes:
+            variant_payload["compareAtPrice"] = changes["compare_at_price"]
+        if "barcode" in changes:
+            variant_payload["barcode"] = changes["barcode"]
+        if "cost" in changes:
+            variant_payload["inventoryItem"] = {"cost": changes["cost"]}
+
+        if len(variant_payload) > 1:
+            variant_groups.setdefault(variant.product_id, {})[variant.variant_id] = (sku, variant_payload)
+        if "quantity" in changes:
+            inventory_targets[variant.inventory_item_id] = (sku, changes["quantity"])
+        changed_skus.append(sku)
+        applied[sku] = changes
+
+    # One productVariantsBulkUpdate per product, one inventorySetQuantities per
+    # INVENTORY_BATCH_SIZE rows; userErrors are mapped back to the row's SKU.
+    failed: Dict[str, str] = {}
+
+    def push_variants(item: tuple[str, List[tuple[str, Dict[str, object]]]]) -> List[Dict]:
+        product_id, group = item
+        journal.intent([f"variants:{sku}" for sku, _ in group])
+        try:
+            return client.product_variants_bulk_update(product_id, [payload for _, payload in group])
+        except Exception as exc:  # noqa: BLE001
+            return [{"field": None, "message": str(exc)}]
+
+    def push_inventory(batch: List[tuple[str, str, int]]) -> List[Dict]:
+        journal.intent([f"inventory:{sku}" for sku, _, _ in batch])
+        try:
+            return client.inventory_set_quantities([(item, qty) for _, item, qty in batch], location_gid)
         except Exception as exc:  # noqa: BLE001
-            failures.append((sku, str(exc)))
+            return [{"field": None, "message": str(exc)}]
+
+    # Groups/batches run concurrently; the shared transport keeps them under the cost limit
+    groups = [(product_id, list(by_variant.values())) for product_id, by_variant in variant_groups.items()]
+    for (_, group), errors in zip(groups, client.transport.map(push_variants, groups)):
+        for error in errors:
+            index = error_index(error, 1)
+            targets = [group[index][0]] if index is not None and index < len(group) else [s for s, _ in group]
+            for target in targets:
+                failed.setdefault(target, f"Variant update error: {error}")
+                journal.failed(f"variants:{target}", str(error))
+        journal.done(f"variants:{sku}" for sku, _ in group if sku not in failed)
+
+    inventory_rows = [(sku, item, qty) for item, (sku, qty) in inventory_targets.items()]
+    batches = [inventory_rows[start:start + INVENTORY_BATCH_SIZE]
+               for start in range(0, len(inventory_rows), INVENTORY_BATCH_SIZE)]
+    for batch, errors in zip(batches, client.transport.map(push_inventory, batches)):
+        for error in errors:
+            index = error_index(error, 2)
+            targets = [batch[index][0]] if index is not None and index < len(batch) else [s for s, _, _ in batch]
+            for target in targets:
+                failed.setdefault(target, f"Inventory quantity update error: {error}")
+                journal.failed(f"inventory:{target}", str(error))
+        journal.done(f"inventory:{sku}" for sku, _, _ in batch if sku not in failed)
+
+    failures.extend(failed.items())
+    updated += sum(1 for sku in changed_skus if sku not in failed)
+
+    # Fold what was applied into the cached copy so the saved index stays close to the store
+    for sku, changes in applied.items():
+        record = client.variant_cache.get(sku)
+        if sku in failed or record is None or not record.snapshot:
+            continue
+        for field, value in changes.items():
+            setattr(record, field, value)
 
     product_status_updated = 0
     for product_id, status in product_status_targets.items():
@@ -354,12 +620,29 @@ def main() -> None:
                 print(json.dumps({"product_id": product_id, "status": status, "action": "productUpdate"}, indent=2))
                 product_status_updated += 1
                 continue
+            if journal.is_done(f"status:{product_id}"):
+                continue
+            journal.intent([f"status:{product_id}"])
             client.product_update(product_id, status=status)
+            journal.done([f"status:{product_id}"])
             product_status_updated += 1
         except Exception as exc:  # noqa: BLE001
             product_failures.append(f"{product_id}: {exc}")
+            journal.failed(f"status:{product_id}", str(exc))
+
+    if not args.no_index and (client.index_additions or (applied and not args.dry_run)):
+        client.save_variant_index(index_path)
 
     print(f"Processed variant rows: {processed}")
+    print(f"Unchanged (skipped): {unchanged}")
+    if already_done:
+        print(f"Already applied in run {journal.run_id} (skipped): {already_done}")
+    if not args.dry_run:
+        inventory_calls = -(-len(inventory_targets) // INVENTORY_BATCH_SIZE)
+        print(f"Variant update calls: {len(variant_groups)} (products)  |  Inventory calls: {inventory_calls}")
+        stats = client.transport.stats
+        print(f"API requests: {stats['requests']}  |  retries: {stats['retries']}  |  "
+              f"throttle wait: {stats['throttle_wait']:.1f}s")
     print(f"Updated successfully: {updated}")
     if missing:
         print(f"Missing variants (SKU not found): {len(missing)}", file=sys.stderr)
@@ -380,6 +663,13 @@ def main() -> None:
         print(f"Product update failures: {len(product_failures)}", file=sys.stderr)
         for entry in product_failures[:10]:
             print(f"  {entry}", file=sys.stderr)
+    if journal:
+        if failures or product_failures:
+            journal.close()
+            print(f"Journal: {journal.path} – re-run with --resume to retry only the failed writes",
+                  file=sys.stderr)
+        else:
+            journal.finish()
 
 
 if __name__ == "__main__":
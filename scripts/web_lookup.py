@@ -2,10 +2,32 @@
 """
 Phase 3: Targeted web lookups via Shopify JSON API search
 For remaining 55 products that still need images/descriptions.
+
+Each product's search goes to every store at once; per store only the
+best-scoring hit with an image is kept, and the best of those gets the
+/products/{handle}.json detail fetch.  PRODUCT_CONCURRENCY products are
+looked up together (asyncio driving the blocking cache in a thread pool, as
+catalog_crawler.py does), at most PER_HOST_CONCURRENCY requests in flight
+per store, and a product that takes longer than PRODUCT_DEADLINE seconds
+is given up.
+
+Every lookup goes through the on-disk HTTP cache (http_cache.py), so a
+re-run replays earlier searches; HTTP_CACHE_MODE=offline replays without
+touching the network.
+
+Usage:
+    python scripts/web_lookup.py
+
+    from web_lookup import lookup_products
+    found = lookup_products({"42": "FoxFarm Big Bloom"}, stores=[("local", "http://127.0.0.1:8000")])
 """
-import json, re, time, urllib.request, urllib.parse
+import asyncio, json, re, urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from difflib import SequenceMatcher
 from pathlib import Path
 
+from http_cache import default_cache
+
 BASE = Path(__file__).resolve().parent.parent
 
 SHOPIFY_STORES = [
@@ -15,37 +37,128 @@ SHOPIFY_STORES = [
     ('growace', 'https://growace.com'),
 ]
 
+HEADERS = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
+PER_HOST_INTERVAL = 1.0  # seconds between real requests to one store (cache hits don't wait)
+PER_HOST_CONCURRENCY = 2  # requests in flight per store
+PRODUCT_CONCURRENCY = 8  # products looked up at once
+PRODUCT_DEADLINE = 45.0  # seconds for one product's searches + detail fetch
+
+
+def cached_get(url):
+    return default_cache(per_host_interval=PER_HOST_INTERVAL, timeout=15).get(url, headers=HEADERS)
+
 def search_shopify_store(base_url, query, limit=5):
     """Search a Shopify store via /search/suggest.json or /products.json with title filter."""
     # Try /search/suggest.json first 
     encoded = urllib.parse.quote(query)
     url = f"{base_url}/search/suggest.json?q={encoded}&resources[type]=product&resources[limit]={limit}"
-    try:
-        req = urllib.request.Request(url, headers={
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        })
-        with urllib.request.urlopen(req, timeout=15) as resp:
-            data = json.loads(resp.read().decode('utf-8'))
-            products = data.get('resources', {}).get('results', {}).get('products', [])
-            return products
-    except Exception:
-        pass
+    resp = cached_get(url)
+    if resp.status_code == 200:
+        try:
+            return resp.json().get('resources', {}).get('results', {}).get('products', [])
+        except (ValueError, AttributeError):
+            pass
     return []
 
 def fetch_product_json(base_url, handle):
     """Fetch full product details via /products/{handle}.json."""
-    url = f"{base_url}/products/{handle}.json"
+    resp = cached_get(f"{base_url}/products/{handle}.json")
+    if resp.status_code != 200:
+        return None
     try:
-        req = urllib.request.Request(url, headers={
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        })
-        with urllib.request.urlopen(req, timeout=15) as resp:
-            data = json.loads(resp.read().decode('utf-8'))
-            return data.get('product', {})
-    except Exception:
+        return resp.json().get('product', {})
+    except (ValueError, AttributeError):
         return None
 
 
+def result_image(r):
+    """Image URL of a search result ('' when it has none)."""
+    image = r.get('image', r.get('featured_image', {}) if isinstance(r.get('featured_image'), dict) else '')
+    if isinstance(image, dict):
+        image = image.get('url', image.get('src', ''))
+    return image or ''
+
+
+def best_search_hit(results, query):
+    """Best-scoring result that has an image, as (score, result), or None."""
+    wanted = query.lower()
+    best = None
+    for r in results:
+        if not result_image(r):
+            continue
+        score = SequenceMatcher(None, wanted, clean_title_for_search(r.get('title', '')).lower()).ratio()
+        if best is None or score > best[0]:
+            best = (score, r)
+    return best
+
+
+def _host(url):
+    return urllib.parse.urlparse(url).netloc.lower()
+
+
+async def _in_thread(executor, gate, fn, *args):
+    """Run ``fn`` on the pool holding a host slot until the call really ends (even past a deadline)."""
+    loop = asyncio.get_running_loop()
+    await gate.acquire()
+    call = executor.submit(fn, *args)
+    call.add_done_callback(lambda _call: loop.call_soon_threadsafe(gate.release))
+    return await asyncio.wrap_future(call)
+
+
+async def lookup_product(query, stores, executor, gates):
+    """Search every store at once and fetch details for the best hit.
+
+    Returns ``{'store', 'score', 'product', 'hits'}`` or None; ``hits`` lists
+    each store's best (store, title, score) in store order.
+    """
+    searches = await asyncio.gather(*(
+        _in_thread(executor, gates[_host(url)], search_shopify_store, url, query) for _name, url in stores
+    ))
+    hits = []
+    for (name, url), results in zip(stores, searches):
+        best = best_search_hit(results, query)
+        if best:
+            hits.append((name, url, best[0], best[1]))
+    if not hits:
+        return None
+    name, url, score, r = max(hits, key=lambda hit: hit[2])  # ties keep store order
+    product = r
+    if r.get('handle'):
+        product = await _in_thread(executor, gates[_host(url)], fetch_product_json, url, r['handle']) or r
+    return {'store': name, 'score': score, 'product': product, 'full': product is not r,
+            'hits': [(hit[0], hit[3].get('title', 'N/A'), hit[2]) for hit in hits]}
+
+
+async def _lookup_all(queries, stores, concurrency, per_host, deadline, progress):
+    gates = {_host(url): asyncio.Semaphore(max(1, per_host)) for _name, url in stores}  # stores on one host share it
+    products_gate = asyncio.Semaphore(max(1, concurrency))
+    finished = 0
+
+    async def run(pid, query):
+        nonlocal finished
+        async with products_gate:
+            try:
+                found = await asyncio.wait_for(lookup_product(query, stores, executor, gates), deadline)
+            except asyncio.TimeoutError:
+                found = {'error': f'no answer within {deadline:.0f}s'}
+        finished += 1
+        if progress:
+            progress(finished, len(queries), pid, found)
+        return pid, found
+
+    with ThreadPoolExecutor(max_workers=max(1, len(stores) * per_host), thread_name_prefix="web-lookup") as executor:
+        return dict(await asyncio.gather(*(run(pid, query) for pid, query in queries.items())))
+
+
+def lookup_products(queries, stores=SHOPIFY_STORES, concurrency=PRODUCT_CONCURRENCY,
+                    per_host=PER_HOST_CONCURRENCY, deadline=PRODUCT_DEADLINE, progress=None):
+    """Look up ``{pid: query}`` in every store; returns ``{pid: lookup_product() result}``.
+
+    Deadline misses come back as ``{'error': ...}``.
+    """
+    return asyncio.run(_lookup_all(queries, list(stores), concurrency, per_host, deadline, progress))
+
+
 def clean_title_for_search(title):
     """Clean a product title for better search results."""
     # Remove size/quantity suffixes
@@ -74,46 +187,40 @@ def main():
     print(f"Real products to search: {len(real_products)}")
     print(f"Placeholder 'Product' entries (skip): {len(placeholder_products)}")
 
+    queries = {}
+    for p in real_products:
+        search_query = clean_title_for_search(p['title'])
+        if p.get('brand', ''):
+            search_query = f"{p['brand']} {search_query}"
+        queries[str(p['id'])] = search_query
+
+    def progress(done, total, pid, found):
+        outcome = found and (found.get('error') or f"{found['store']} ({found['score']:.0%})")
+        print(f"  [{done}/{total}] {queries[pid][:60]}  →  {outcome or 'no results'}", flush=True)
+
+    print(f"Searching {len(SHOPIFY_STORES)} stores for {len(queries)} products "
+          f"({PRODUCT_CONCURRENCY} at a time, {PRODUCT_DEADLINE:.0f}s deadline each)...")
+    lookups = lookup_products(queries, progress=progress)
+
     found = 0
     for i, p in enumerate(real_products):
         pid = str(p['id'])
         title = p['title']
-        brand = p.get('brand', '')
-        search_query = clean_title_for_search(title)
-        if brand:
-            search_query = f"{brand} {search_query}"
-
-        print(f"\n[{i+1}/{len(real_products)}] Searching: {title}")
-        print(f"  Query: {search_query}")
+        print(f"\n[{i+1}/{len(real_products)}] {title}")
+        print(f"  Query: {queries[pid]}")
 
         best_result = None
         best_store = None
-
-        for store_name, store_url in SHOPIFY_STORES:
-            results = search_shopify_store(store_url, search_query)
-            if results:
-                # Pick first result
-                r = results[0]
-                print(f"  [{store_name}] Found: {r.get('title', 'N/A')}")
-                
-                # Check if it has an image
-                image = r.get('image', r.get('featured_image', {}) if isinstance(r.get('featured_image'), dict) else '')
-                if isinstance(image, dict):
-                    image = image.get('url', image.get('src', ''))
-                
-                if image and not best_result:
-                    best_result = r
-                    best_store = store_name
-                    # Try to get full product details
-                    handle = r.get('handle', '')
-                    if handle:
-                        full = fetch_product_json(store_url, handle)
-                        if full:
-                            best_result = full
-                            print(f"  -> Got full product details from {store_name}")
-                    break  # Got a good match, stop searching
-
-            time.sleep(0.3)  # Be respectful
+        lookup = lookups.get(pid) or {}
+        if lookup.get('error'):
+            print(f"  -> Gave up: {lookup['error']}")
+        elif lookup:
+            for store_name, hit_title, score in lookup['hits']:
+                print(f"  [{store_name}] Found: {hit_title} ({score:.0%})")
+            best_result = lookup['product']
+            best_store = lookup['store']
+            if lookup['full']:
+                print(f"  -> Got full product details from {best_store}")
 
         if best_result:
             found += 1
@@ -177,8 +284,6 @@ def main():
         else:
             print(f"  -> No results found")
 
-        time.sleep(0.5)  # Rate limit
-
     # Save updated enrichment
     with open(BASE / 'outputs' / 'deep_enrichment.json', 'w', encoding='utf-8') as f:
         json.dump(enrichment, f, indent=2)
@@ -200,6 +305,7 @@ def main():
     print(f"  Short descriptions: {has_short}")
     print(f"  Brands: {has_brand}")
     print(f"Web lookups found: {found}/{len(real_products)}")
+    print(default_cache().summary())
 
 
 if __name__ == '__main__':
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""Shared WooCommerce REST (``/wp-json/wc/v3``) client for bulk reads and batch writes.
+
+* Listing reads page 1, takes ``X-WP-TotalPages`` from its headers and then
+  fetches the remaining pages concurrently.  ``fields=`` maps to ``_fields``
+  so ID sweeps transfer ``[{"id": 1}, ...]`` instead of full product bodies.
+* ``batch()`` splits create/update/delete into ``/batch`` requests of up to
+  100 items (WooCommerce's limit) and keeps several in flight at once.
+* One keep-alive ``requests.Session`` per thread; 429/5xx responses and
+  dropped connections are retried with backoff.
+
+Credentials come from WOO_URL, WOO_CONSUMER_KEY and WOO_CONSUMER_SECRET
+(WooCommerce > Settings > Advanced > REST API, Read/Write key).
+
+Usage:
+    from woo_rest import client_from_env
+
+    woo = client_from_env()
+    ids = [p["id"] for p in woo.get_all("products", fields="id")]
+    result = woo.batch("products", update=[{"id": i, "status": "trash"} for i in ids])
+    print(result["errors"], woo.stats)
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import requests
+
+DEFAULT_SITE_URL = "https://hmoonhydro.com"
+BATCH_LIMIT = 100            # WooCommerce rejects /batch requests above 100 items
+MAX_PER_PAGE = 100
+RETRY_STATUS = {429, 500, 502, 503, 504}
+MAX_ATTEMPTS = 5
+
+
+class WooClient:
+    """Thread-safe WooCommerce REST client with parallel paging and batching."""
+
+    def __init__(
+        self,
+        site_url: str,
+        consumer_key: str,
+        consumer_secret: str,
+        *,
+        max_workers: int = 4,
+        timeout: int = 60,
+    ) -> None:
+        self.api_base = f"{site_url.rstrip('/')}/wp-json/wc/v3"
+        self.auth = (consumer_key, consumer_secret)
+        self.max_workers = max(1, max_workers)
+        self.timeout = timeout
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        self.stats = {"requests": 0, "retries": 0}
+
+    # ── plumbing ────────────────────────────────────────────────────────────
+    @property
+    def session(self) -> requests.Session:
+        """One keep-alive ``requests.Session`` per thread."""
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            session.auth = self.auth
+            session.headers.update({"Accept": "application/json"})
+            self._local.session = session
+        return session
+
+    def _count(self, retry: bool) -> None:
+        with self._stats_lock:
+            self.stats["retries" if retry else "requests"] += 1
+
+    def request(self, method: str, path: str, **kwargs) -> requests.Response:
+        """Call ``/wc/v3/<path>``, retrying throttling, 5xx and connection drops."""
+        url = path if path.startswith("http") else f"{self.api_base}/{path.lstrip('/')}"
+        kwargs.setdefault("timeout", self.timeout)
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            self._count(retry=attempt > 1)
+            try:
+                response = self.session.request(method.upper(), url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == MAX_ATTEMPTS:
+                    raise
+                time.sleep(2 ** attempt)
+                continue
+            if response.status_code in RETRY_STATUS and attempt < MAX_ATTEMPTS:
+                try:
+                    delay = float(response.headers.get("Retry-After", 0)) or 2 ** attempt
+                except ValueError:
+                    delay = 2 ** attempt
+                time.sleep(delay)
+                continue
+            return response
+        return response
+
+    def _get_json(self, path: str, params: Dict) -> requests.Response:
+        response = self.request("get", path, params=params)
+        if response.status_code != 200:
+            raise RuntimeError(f"GET {path} failed: {response.status_code} {response.text[:300]}")
+        return response
+
+    # ── reads ───────────────────────────────────────────────────────────────
+    def iter_pages(
+        self,
+        endpoint: str,
+        params: Optional[Dict] = None,
+        fields: Optional[str] = None,
+        per_page: int = MAX_PER_PAGE,
+    ) -> Iterator[List[Dict]]:
+        """Yield every page of a listing in page order; pages 2..N are fetched concurrently."""
+        base = dict(params or {})
+        base["per_page"] = min(per_page, MAX_PER_PAGE)
+        if fields:
+            base["_fields"] = fields
+        first = self._get_json(endpoint, {**base, "page": 1})
+        yield first.json()
+        total_pages = int(first.headers.get("X-WP-TotalPages") or 1)
+        if total_pages <= 1:
+            return
+        fetch = lambda page: self._get_json(endpoint, {**base, "page": page}).json()  # noqa: E731
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="woo") as pool:
+            yield from pool.map(fetch, range(2, total_pages + 1))
+
+    def get_all(self, endpoint: str, params: Optional[Dict] = None, fields: Optional[str] = None) -> List[Dict]:
+        """Return every record of a listing (see ``iter_pages``)."""
+        return [item for page in self.iter_pages(endpoint, params, fields) for item in page]
+
+    # ── writes ──────────────────────────────────────────────────────────────
+    def batch(
+        self,
+        endpoint: str,
+        create: Iterable[Dict] = (),
+        update: Iterable[Dict] = (),
+        delete: Iterable[int] = (),
+        batch_size: int = BATCH_LIMIT,
+        on_batch=None,
+    ) -> Dict[str, List]:
+        """Run create/update/delete through ``<endpoint>/batch`` with concurrent batches.
+
+        Returns ``{"create": [...], "update": [...], "delete": [...], "errors": [...]}``
+        where ``errors`` holds one entry per failed item (WooCommerce reports
+        per-item failures inside a 200 response) or per failed request.
+        ``delete`` is permanent: the batch endpoint always force-deletes.
+        ``on_batch(action, items, body)`` is called as each batch finishes.
+        """
+        size = max(1, min(batch_size, BATCH_LIMIT))
+        chunks = []
+        for action, items in (("create", list(create)), ("update", list(update)), ("delete", list(delete))):
+            chunks.extend((action, items[i:i + size]) for i in range(0, len(items), size))
+
+        def run(chunk):
+            action, items = chunk
+            response = self.request("post", f"{endpoint.rstrip('/')}/batch", json={action: items})
+            if response.status_code != 200:
+                body = {"error": f"{response.status_code} {response.text[:300]}"}
+            else:
+                body = response.json()
+            if on_batch:
+                on_batch(action, items, body)
+            return action, items, body
+
+        result: Dict[str, List] = {"create": [], "update": [], "delete": [], "errors": []}
+        if not chunks:
+            return result
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(chunks)), thread_name_prefix="woo") as pool:
+            for action, items, body in pool.map(run, chunks):
+                if "error" in body and action not in body:
+                    result["errors"].extend({"action": action, "item": item, "error": body["error"]} for item in items)
+                    continue
+                for item, outcome in zip(items, body.get(action, [])):
+                    if outcome.get("error"):
+                        result["errors"].append({"action": action, "item": item, "error": outcome["error"]})
+                    else:
+                        result[action].append(outcome)
+        return result
+
+
+def client_from_env(max_workers: int = 4, timeout: int = 60) -> WooClient:
+    """Build a ``WooClient`` from WOO_URL / WOO_CONSUMER_KEY / WOO_CONSUMER_SECRET."""
+    key = os.environ.get("WOO_CONSUMER_KEY")
+    secret = os.environ.get("WOO_CONSUMER_SECRET")
+    missing = [name for name, value in (("WOO_CONSUMER_KEY", key), ("WOO_CONSUMER_SECRET", secret)) if not value]
+    if missing:
+        raise RuntimeError(f"Missing required environment variables: {', '.join(missing)}")
+    return WooClient(
+        os.environ.get("WOO_URL", DEFAULT_SITE_URL), key, secret, max_workers=max_workers, timeout=timeout
+    )
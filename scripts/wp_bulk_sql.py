@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+wp_bulk_sql.py — Set-based "bulk SQL" backend for generated WP-CLI PHP scripts.
+
+The generated cleanup/enrichment/price scripts normally call
+``wp_set_object_terms`` / ``update_post_meta`` / ``wp_update_post`` once per
+product, which runs every save hook and costs several queries per call.  For
+large batches that is minutes of work for what amounts to a handful of rows
+per product.
+
+``BULK_SQL_LIB_PHP`` is a small PHP function library that generators embed
+after ``<?php`` when run with ``--bulk-sql``.  It turns a whole batch of meta
+writes, post-field fills and term reassignments into a few chunked ``$wpdb``
+statements inside one transaction, then does targeted invalidation only for
+what was touched: ``clean_post_cache`` + ``wc_delete_product_transients`` per
+product, term recounts for the affected term_taxonomy IDs, and WooCommerce
+lookup-table columns for the affected meta keys.
+
+Save hooks are deliberately skipped, so only use it for plain data writes
+(prices, descriptions, term assignments), never for product creation.
+
+PHP API (all take product IDs as ints):
+    hmoon_bulk_begin()
+    hmoon_bulk_term_id($name, $taxonomy, $create = true)       -> term_id|0
+    hmoon_bulk_set_meta($key, [$pid => $value], $only_if_empty = false)
+    hmoon_bulk_set_post_field($field, [$pid => $value], $only_if_empty = false)
+    hmoon_bulk_set_terms($taxonomy, $pids, $term_ids, $append = false)
+    hmoon_bulk_remove_terms($taxonomy, $pids, $term_ids)
+    hmoon_bulk_move_term($taxonomy, $from_term_id, $to_term_id) -> moved pids
+    hmoon_bulk_objects_in_term($taxonomy, $term_id)             -> pids
+    hmoon_bulk_existing_ids($pids, $post_type = 'product')      -> pids
+    hmoon_bulk_ids_missing_meta($pids, $key)                    -> pids
+    hmoon_bulk_finish()                                         -> bool (committed)
+
+Usage (from a generator):
+    from wp_bulk_sql import BULK_SQL_LIB_PHP
+    p.append('<?php')
+    p.append(BULK_SQL_LIB_PHP)
+    p.append('hmoon_bulk_begin();')
+    ...
+    p.append('hmoon_bulk_finish();')
+"""
+
+BULK_CHUNK = 500
+
+# Meta keys mirrored in wc_product_meta_lookup → column to rebuild
+LOOKUP_COLUMNS = {
+    '_price': 'min_max_price',
+    '_regular_price': 'min_max_price',
+    '_sale_price': 'min_max_price',
+    '_sku': 'sku',
+    '_stock': 'stock_quantity',
+    '_stock_status': 'stock_status',
+    '_manage_stock': 'stock_quantity',
+}
+
+BULK_SQL_LIB_PHP = r"""
+// ── bulk SQL backend (wp_bulk_sql.py) ─────────────────────────────────
+define('HMOON_BULK_CHUNK', {CHUNK});
+$GLOBALS['hmoon_bulk'] = array('ids' => array(), 'tt' => array(), 'meta_keys' => array(),
+                               'errors' => array(), 'statements' => 0, 'rows' => 0);
+
+function hmoon_bulk_query($sql) {
+    global $wpdb;
+    $r = $wpdb->query($sql);
+    $GLOBALS['hmoon_bulk']['statements']++;
+    if ($r === false || $wpdb->last_error) {
+        $GLOBALS['hmoon_bulk']['errors'][] = $wpdb->last_error ?: 'query failed';
+        return 0;
+    }
+    $GLOBALS['hmoon_bulk']['rows'] += (int) $r;
+    return (int) $r;
+}
+
+function hmoon_bulk_ids($ids) {
+    return implode(',', array_map('intval', $ids));
+}
+
+function hmoon_bulk_touch($ids) {
+    foreach ($ids as $id) $GLOBALS['hmoon_bulk']['ids'][(int) $id] = true;
+}
+
+function hmoon_bulk_touch_tt($taxonomy, $tt_ids) {
+    foreach ($tt_ids as $tt) $GLOBALS['hmoon_bulk']['tt'][$taxonomy][(int) $tt] = true;
+}
+
+function hmoon_bulk_tt_id($term_id, $taxonomy) {
+    global $wpdb;
+    return (int) $wpdb->get_var($wpdb->prepare(
+        "SELECT term_taxonomy_id FROM {$wpdb->term_taxonomy} WHERE term_id = %d AND taxonomy = %s",
+        $term_id, $taxonomy));
+}
+
+function hmoon_bulk_begin() {
+    global $wpdb;
+    $wpdb->query('START TRANSACTION');
+}
+
+function hmoon_bulk_term_id($name, $taxonomy, $create = true) {
+    $t = get_term_by('name', $name, $taxonomy);
+    if ($t) return (int) $t->term_id;
+    if (!$create) return 0;
+    $r = wp_insert_term($name, $taxonomy);
+    if (is_wp_error($r)) {
+        $GLOBALS['hmoon_bulk']['errors'][] = "create term '$name' in $taxonomy: " . $r->get_error_message();
+        return 0;
+    }
+    return (int) $r['term_id'];
+}
+
+// IDs whose $key meta is missing or empty (blank, '0' and '0.00' count as empty).
+function hmoon_bulk_ids_missing_meta($ids, $key) {
+    global $wpdb;
+    $filled = array();
+    foreach (array_chunk($ids, HMOON_BULK_CHUNK) as $chunk) {
+        foreach ($wpdb->get_col($wpdb->prepare(
+            "SELECT DISTINCT post_id FROM {$wpdb->postmeta}
+             WHERE meta_key = %s AND post_id IN (" . hmoon_bulk_ids($chunk) . ")
+             AND TRIM(meta_value) NOT IN ('', '0', '0.0', '0.00')", $key)) as $id) {
+            $filled[(int) $id] = true;
+        }
+    }
+    return array_values(array_filter(array_map('intval', $ids), function ($id) use ($filled) {
+        return !isset($filled[$id]);
+    }));
+}
+
+// Upsert one meta key for many products.  $only_if_empty skips products whose
+// current value is non-empty.
+function hmoon_bulk_set_meta($key, $values, $only_if_empty = false) {
+    global $wpdb;
+    if (!$values) return 0;
+    if ($only_if_empty) {
+        $values = array_intersect_key($values, array_flip(hmoon_bulk_ids_missing_meta(array_keys($values), $key)));
+    }
+    $n = 0;
+    foreach (array_chunk($values, HMOON_BULK_CHUNK, true) as $chunk) {
+        $ids = hmoon_bulk_ids(array_keys($chunk));
+        hmoon_bulk_query($wpdb->prepare(
+            "DELETE FROM {$wpdb->postmeta} WHERE meta_key = %s AND post_id IN ($ids)", $key));
+        $rows = array();
+        foreach ($chunk as $pid => $value) {
+            $rows[] = $wpdb->prepare('(%d, %s, %s)', $pid, $key, maybe_serialize($value));
+        }
+        $n += hmoon_bulk_query("INSERT INTO {$wpdb->postmeta} (post_id, meta_key, meta_value) VALUES " . implode(',', $rows));
+        hmoon_bulk_touch(array_keys($chunk));
+    }
+    $GLOBALS['hmoon_bulk']['meta_keys'][$key] = true;
+    return $n;
+}
+
+// Set a wp_posts column for many products with one CASE update per chunk.
+function hmoon_bulk_set_post_field($field, $values, $only_if_empty = false) {
+    global $wpdb;
+    $allowed = array('post_content', 'post_excerpt', 'post_title', 'post_status', 'menu_order');
+    if (!in_array($field, $allowed, true)) {
+        $GLOBALS['hmoon_bulk']['errors'][] = "post field not allowed: $field";
+        return 0;
+    }
+    if (!$values) return 0;
+    $stamp = "post_modified = '" . esc_sql(current_time('mysql')) . "', post_modified_gmt = '" . esc_sql(current_time('mysql', 1)) . "'";
+    $n = 0;
+    foreach (array_chunk($values, HMOON_BULK_CHUNK, true) as $chunk) {
+        $case = '';
+        foreach ($chunk as $pid => $value) {
+            $case .= $wpdb->prepare(' WHEN %d THEN %s', $pid, $value);
+        }
+        $ids = hmoon_bulk_ids(array_keys($chunk));
+        $where = $only_if_empty ? " AND TRIM($field) = ''" : '';
+        $n += hmoon_bulk_query("UPDATE {$wpdb->posts} SET $field = CASE ID$case END, $stamp WHERE ID IN ($ids)$where");
+        hmoon_bulk_touch(array_keys($chunk));
+    }
+    return $n;
+}
+
+// Assign $term_ids (in $taxonomy) to many products; replaces existing terms
+// of that taxonomy unless $append.
+function hmoon_bulk_set_terms($taxonomy, $object_ids, $term_ids, $append = false) {
+    global $wpdb;
+    if (!$object_ids) return 0;
+    $tt_ids = array();
+    foreach ((array) $term_ids as $tid) {
+        $tt = hmoon_bulk_tt_id($tid, $taxonomy);
+        if ($tt) $tt_ids[] = $tt;
+        else $GLOBALS['hmoon_bulk']['errors'][] = "term $tid not found in $taxonomy";
+    }
+    $n = 0;
+    foreach (array_chunk($object_ids, HMOON_BULK_CHUNK) as $chunk) {
+        $ids = hmoon_bulk_ids($chunk);
+        if (!$append) {
+            hmoon_bulk_touch_tt($taxonomy, $wpdb->get_col($wpdb->prepare(
+                "SELECT DISTINCT tr.term_taxonomy_id FROM {$wpdb->term_relationships} tr
+                 JOIN {$wpdb->term_taxonomy} tt ON tt.term_taxonomy_id = tr.term_taxonomy_id
+                 WHERE tt.taxonomy = %s AND tr.object_id IN ($ids)", $taxonomy)));
+            hmoon_bulk_query($wpdb->prepare(
+                "DELETE tr FROM {$wpdb->term_relationships} tr
+                 JOIN {$wpdb->term_taxonomy} tt ON tt.term_taxonomy_id = tr.term_taxonomy_id
+                 WHERE tt.taxonomy = %s AND tr.object_id IN ($ids)", $taxonomy));
+        }
+        $rows = array();
+        foreach ($chunk as $oid) {
+            foreach ($tt_ids as $tt) $rows[] = '(' . (int) $oid . ',' . $tt . ')';
+        }
+        if ($rows) {
+            $n += hmoon_bulk_query("INSERT IGNORE INTO {$wpdb->term_relationships} (object_id, term_taxonomy_id) VALUES " . implode(',', $rows));
+        }
+        hmoon_bulk_touch($chunk);
+    }
+    hmoon_bulk_touch_tt($taxonomy, $tt_ids);
+    return $n;
+}
+
+function hmoon_bulk_remove_terms($taxonomy, $object_ids, $term_ids) {
+    global $wpdb;
+    $tt_ids = array_filter(array_map(function ($tid) use ($taxonomy) {
+        return hmoon_bulk_tt_id($tid, $taxonomy);
+    }, (array) $term_ids));
+    if (!$object_ids || !$tt_ids) return 0;
+    $n = 0;
+    foreach (array_chunk($object_ids, HMOON_BULK_CHUNK) as $chunk) {
+        $n += hmoon_bulk_query("DELETE FROM {$wpdb->term_relationships}
+            WHERE object_id IN (" . hmoon_bulk_ids($chunk) . ") AND term_taxonomy_id IN (" . hmoon_bulk_ids($tt_ids) . ")");
+        hmoon_bulk_touch($chunk);
+    }
+    hmoon_bulk_touch_tt($taxonomy, $tt_ids);
+    return $n;
+}
+
+// Keep only IDs that exist as $post_type (one query per chunk).
+function hmoon_bulk_existing_ids($ids, $post_type = 'product') {
+    global $wpdb;
+    $found = array();
+    foreach (array_chunk($ids, HMOON_BULK_CHUNK) as $chunk) {
+        $found = array_merge($found, array_map('intval', $wpdb->get_col($wpdb->prepare(
+            "SELECT ID FROM {$wpdb->posts} WHERE post_type = %s AND ID IN (" . hmoon_bulk_ids($chunk) . ")",
+            $post_type))));
+    }
+    return $found;
+}
+
+function hmoon_bulk_objects_in_term($taxonomy, $term_id) {
+    global $wpdb;
+    $tt = hmoon_bulk_tt_id($term_id, $taxonomy);
+    if (!$tt) return array();
+    return array_map('intval', $wpdb->get_col($wpdb->prepare(
+        "SELECT object_id FROM {$wpdb->term_relationships} WHERE term_taxonomy_id = %d", $tt)));
+}
+
+// Reassign every object in $from_term_id to $to_term_id (same taxonomy) in
+// two statements.  Returns the moved object IDs.
+function hmoon_bulk_move_term($taxonomy, $from_term_id, $to_term_id) {
+    global $wpdb;
+    $from_tt = hmoon_bulk_tt_id($from_term_id, $taxonomy);
+    $to_tt = hmoon_bulk_tt_id($to_term_id, $taxonomy);
+    if (!$from_tt || !$to_tt) {
+        $GLOBALS['hmoon_bulk']['errors'][] = "move $from_term_id -> $to_term_id: term not found in $taxonomy";
+        return array();
+    }
+    $ids = hmoon_bulk_objects_in_term($taxonomy, $from_term_id);
+    if (!$ids) return array();
+    hmoon_bulk_query("INSERT IGNORE INTO {$wpdb->term_relationships} (object_id, term_taxonomy_id, term_order)
+        SELECT object_id, $to_tt, 0 FROM {$wpdb->term_relationships} WHERE term_taxonomy_id = $from_tt");
+    hmoon_bulk_query("DELETE FROM {$wpdb->term_relationships} WHERE term_taxonomy_id = $from_tt");
+    hmoon_bulk_touch($ids);
+    hmoon_bulk_touch_tt($taxonomy, array($from_tt, $to_tt));
+    return $ids;
+}
+
+// Commit (or roll back on any error), then invalidate only what was touched.
+function hmoon_bulk_finish() {
+    global $wpdb;
+    $b = $GLOBALS['hmoon_bulk'];
+    if ($b['errors']) {
+        $wpdb->query('ROLLBACK');
+        echo "BULK SQL: ROLLED BACK after " . count($b['errors']) . " error(s)\n";
+        foreach ($b['errors'] as $e) echo "  ! $e\n";
+        return false;
+    }
+    $wpdb->query('COMMIT');
+
+    foreach ($b['tt'] as $taxonomy => $tts) {
+        wp_update_term_count_now(array_keys($tts), $taxonomy);
+        clean_term_cache(array_keys($tts), $taxonomy, false);
+    }
+    foreach (array_keys($b['ids']) as $id) {
+        clean_post_cache($id);
+        if (function_exists('wc_delete_product_transients')) wc_delete_product_transients($id);
+    }
+    $columns = array();
+    $lookup = {LOOKUP_COLUMNS};
+    foreach (array_keys($b['meta_keys']) as $key) {
+        if (isset($lookup[$key])) $columns[$lookup[$key]] = true;
+    }
+    if (function_exists('wc_update_product_lookup_tables_column')) {
+        foreach (array_keys($columns) as $col) wc_update_product_lookup_tables_column($col);
+    }
+    delete_transient('wc_term_counts');
+
+    echo "BULK SQL: committed " . $b['statements'] . " statements, " . $b['rows'] . " rows, "
+        . count($b['ids']) . " products invalidated\n";
+    return true;
+}
+// ── end bulk SQL backend ──────────────────────────────────────────────
+"""
+
+
+def _php_array(d: dict) -> str:
+    return "array(" + ", ".join(f"'{k}' => '{v}'" for k, v in d.items()) + ")"
+
+
+BULK_SQL_LIB_PHP = (BULK_SQL_LIB_PHP
+                    .replace("{CHUNK}", str(BULK_CHUNK))
+                    .replace("{LOOKUP_COLUMNS}", _php_array(LOOKUP_COLUMNS)))
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# scripts/ is a flat folder of standalone tools that import their siblings directly
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
@@ -0,0 +1,63 @@
+import pytest
+
+from api_simulator import start_simulator
+from catalog_crawler import crawl_catalogs, load_catalog
+
+PRODUCTS = 600
+PAGE_LIMIT = 100
+
+
+@pytest.fixture(scope="module")
+def simulator():
+    server, base_url = start_simulator(products=PRODUCTS, variants=1, woo_products=0, latency_ms=0, jitter_ms=0)
+    yield server.simulator, base_url
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(autouse=True)
+def fresh_limits(simulator):
+    simulator[0].reset()
+
+
+def crawl(base_url, out_dir):
+    options = dict(max_age_hours=0, per_host_interval=0, backoff=0.05, page_limit=PAGE_LIMIT, log=lambda _: None)
+    return crawl_catalogs({"sim": base_url}, out_dir, **options)["sim"]
+
+
+def test_full_crawl_counts_every_product(simulator, tmp_path):
+    _sim, base_url = simulator
+    result = crawl(base_url, tmp_path)
+    assert result.status == "ok"
+    assert result.products == PRODUCTS
+    assert result.changed == PRODUCTS
+    assert len({p["id"] for p in load_catalog(result)}) == PRODUCTS
+
+
+def test_429_is_retried(simulator, tmp_path):
+    sim, base_url = simulator
+    sim.storefront_bucket.used = sim.storefront_bucket.size  # next request is throttled
+    result = crawl(base_url, tmp_path)
+    assert sim.snapshot()["throttled"] >= 1
+    assert result.retries >= 1
+    assert result.status == "ok"
+    assert result.products == PRODUCTS
+
+
+def test_recrawl_reports_only_touched_products(simulator, tmp_path):
+    sim, base_url = simulator
+    before = {p["id"]: p for p in load_catalog(crawl(base_url, tmp_path))}
+    touched = sorted(before)[:3]
+    for product_id in touched:
+        sim.catalog.touch(product_id)
+
+    result = crawl(base_url, tmp_path)
+    after = {p["id"]: p for p in load_catalog(result)}
+    assert result.status == "ok"
+    assert result.changed == len(touched)
+    assert result.pages < PRODUCTS // PAGE_LIMIT  # stopped early on the newest-first listing
+    assert set(after) == set(before)
+    for product_id in touched:
+        assert after[product_id]["updated_at"] > before[product_id]["updated_at"]
+    untouched = set(before) - set(touched)
+    assert all(after[product_id] == before[product_id] for product_id in untouched)
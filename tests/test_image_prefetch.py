@@ -0,0 +1,20 @@
+from image_prefetch import image_cache_key, normalize_image_url
+
+
+def test_dimension_suffixes_are_distinct_keys():
+    assert image_cache_key("https://x.com/gorilla-tent_2x4.jpg") != image_cache_key("https://x.com/gorilla-tent_4x4.jpg")
+    assert normalize_image_url("https://x.com/gorilla-tent_2x4.jpg") == "https://x.com/gorilla-tent_2x4.jpg"
+
+
+def test_shopify_tent_urls_are_distinct_keys():
+    a = "https://cdn.shopify.com/s/files/1/Tent_2x4.jpg?v=1"
+    b = "https://cdn.shopify.com/s/files/1/Tent_4x4_600x600.jpg"
+    assert image_cache_key(a) != image_cache_key(b)
+    assert image_cache_key(a) == "https://cdn.shopify.com/s/files/1/Tent_2x4.jpg"
+    assert normalize_image_url(b) == "https://cdn.shopify.com/s/files/1/Tent_4x4.jpg"
+
+
+def test_shopify_size_tokens_stripped_for_download_only():
+    url = "//Store.myshopify.com/cdn/shop/files/pot_grande@2x.png?v=9&width=300"
+    assert normalize_image_url(url) == "https://store.myshopify.com/cdn/shop/files/pot.png"
+    assert image_cache_key(url) == "https://store.myshopify.com/cdn/shop/files/pot_grande@2x.png?width=300"